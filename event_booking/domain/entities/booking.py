@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from decimal import Decimal
 from enum import Enum
 from uuid import UUID, uuid4
@@ -9,8 +9,10 @@ class BookingStatus(Enum):
     PENDING = "PENDING"
     CONFIRMED = "CONFIRMED"
     CANCELLED = "CANCELLED"
+    # A pending hold that ran past its TTL; its seats went back to the session
+    EXPIRED = "EXPIRED"
 
-@dataclass
+@dataclass(slots=True)
 class Booking:
     user_id: UUID
     session_id: UUID
@@ -33,9 +35,27 @@ class Booking:
         """Cancel the booking."""
         if self.status == BookingStatus.CANCELLED:
             raise ValueError("Booking is already cancelled")
+        if self.status == BookingStatus.EXPIRED:
+            raise ValueError("Booking has expired")
         self.status = BookingStatus.CANCELLED
         self.cancelled_at = datetime.utcnow()
 
+    def expire(self, at: Optional[datetime] = None) -> None:
+        """Expire a pending hold; cancelled_at records when its seats were released."""
+        if self.status != BookingStatus.PENDING:
+            raise ValueError("Can only expire pending bookings")
+        self.status = BookingStatus.EXPIRED
+        self.cancelled_at = at or datetime.utcnow()
+
+    def hold_expires_at(self, hold_ttl: timedelta) -> datetime:
+        """When a pending booking stops holding its seats."""
+        return self.created_at + hold_ttl
+
+    def is_hold_expired(self, hold_ttl: timedelta, now: Optional[datetime] = None) -> bool:
+        """Check if this is a pending hold older than hold_ttl."""
+        return (self.status == BookingStatus.PENDING
+                and (now or datetime.utcnow()) >= self.hold_expires_at(hold_ttl))
+
     def calculate_total_price(self) -> Decimal:
         """Calculate the total price for all seats."""
         return self.price_per_seat * Decimal(self.seats)
@@ -57,4 +77,6 @@ class Booking:
             raise ValueError("Confirmed bookings must have confirmation timestamp")
         if self.status == BookingStatus.CANCELLED and not self.cancelled_at:
             raise ValueError("Cancelled bookings must have cancellation timestamp")
+        if self.status == BookingStatus.EXPIRED and not self.cancelled_at:
+            raise ValueError("Expired bookings must have release timestamp")
         return True 
\ No newline at end of file
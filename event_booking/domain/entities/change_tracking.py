@@ -0,0 +1,38 @@
+from copy import copy
+from typing import Any, Dict, Optional, Tuple
+
+class ChangeTracking:
+    """Snapshot-based change tracking for entities loaded from a repository.
+
+    Subclasses list the persisted attributes in _tracked_fields and declare a
+    _persisted_state field that starts as None (never persisted).
+    """
+    # Slotted subclasses stay free of a per-instance __dict__
+    __slots__ = ()
+
+    _tracked_fields: Tuple[str, ...] = ()
+    _persisted_state: Optional[Dict[str, Any]]
+
+    def mark_persisted(self) -> None:
+        """Record the current state as the one stored in the repository."""
+        self._persisted_state = {name: copy(getattr(self, name)) for name in self._tracked_fields}
+
+    def is_persisted(self) -> bool:
+        """Check whether a persisted snapshot is available."""
+        return self._persisted_state is not None
+
+    def get_persisted_value(self, name: str) -> Any:
+        """Get the value a tracked field had when last persisted."""
+        if self._persisted_state is None:
+            raise ValueError("Entity has no persisted state")
+        return self._persisted_state[name]
+
+    def get_changed_fields(self) -> Dict[str, Any]:
+        """Get tracked fields whose value differs from the persisted snapshot."""
+        if self._persisted_state is None:
+            return {name: getattr(self, name) for name in self._tracked_fields}
+        return {
+            name: getattr(self, name)
+            for name in self._tracked_fields
+            if getattr(self, name) != self._persisted_state[name]
+        }
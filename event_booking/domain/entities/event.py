@@ -1,10 +1,12 @@
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Set
 from uuid import UUID, uuid4
 
-@dataclass
-class Event:
+from .change_tracking import ChangeTracking
+
+@dataclass(slots=True)
+class Event(ChangeTracking):
     name: str
     description: str
     venue: str
@@ -12,6 +14,10 @@ class Event:
     id: UUID = field(default_factory=uuid4)
     created_at: datetime = field(default_factory=datetime.utcnow)
     sessions: List['Session'] = field(default_factory=list)
+    _persisted_state: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    _persisted_session_ids: Set[UUID] = field(default_factory=set, init=False, repr=False, compare=False)
+
+    _tracked_fields = ('name', 'description', 'venue', 'categories')
 
     def add_session(self, session: 'Session') -> None:
         """Add a session to the event."""
@@ -30,6 +36,40 @@ class Event:
         """Get a specific session by ID."""
         return next((s for s in self.sessions if s.id == session_id), None)
 
+    def mark_persisted(self) -> None:
+        """Record the event, its categories and its sessions as stored."""
+        # Zero-argument super() does not work in slots=True dataclasses
+        ChangeTracking.mark_persisted(self)
+        self._persisted_session_ids = {s.id for s in self.sessions}
+        for session in self.sessions:
+            session.mark_persisted()
+
+    def get_added_categories(self) -> List[str]:
+        """Get categories added since the event was persisted."""
+        persisted = set(self.get_persisted_value('categories'))
+        return [c for c in dict.fromkeys(self.categories) if c not in persisted]
+
+    def get_removed_categories(self) -> List[str]:
+        """Get categories removed since the event was persisted."""
+        current = set(self.categories)
+        return [c for c in dict.fromkeys(self.get_persisted_value('categories')) if c not in current]
+
+    def get_new_sessions(self) -> List['Session']:
+        """Get sessions added since the event was persisted."""
+        return [s for s in self.sessions if s.id not in self._persisted_session_ids]
+
+    def get_removed_session_ids(self) -> List[UUID]:
+        """Get IDs of persisted sessions no longer part of the event."""
+        current = {s.id for s in self.sessions}
+        return [sid for sid in self._persisted_session_ids if sid not in current]
+
+    def get_changed_sessions(self) -> List['Session']:
+        """Get persisted sessions with modified fields."""
+        return [
+            s for s in self.sessions
+            if s.id in self._persisted_session_ids and s.get_changed_fields()
+        ]
+
     def validate(self) -> bool:
         """Validate event data."""
         if not self.name or len(self.name.strip()) == 0:
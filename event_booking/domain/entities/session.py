@@ -1,11 +1,13 @@
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, Optional
 from uuid import UUID, uuid4
 from decimal import Decimal
 
-@dataclass
-class Session:
+from .change_tracking import ChangeTracking
+
+@dataclass(slots=True)
+class Session(ChangeTracking):
     event_id: UUID
     start_time: datetime
     end_time: datetime
@@ -14,6 +16,10 @@ class Session:
     id: UUID = field(default_factory=uuid4)
     booked_seats: int = 0
     _price_adjustment_factor: Decimal = Decimal('1.0')
+    _persisted_state: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+
+    # booked_seats is written only through reserve_seats/release_seats
+    _tracked_fields = ('start_time', 'end_time', 'capacity', 'base_price')
 
     def is_available(self) -> bool:
         """Check if there are any seats available."""
@@ -54,17 +60,27 @@ class Session:
         """Get the current price based on occupancy rate."""
         return self.base_price * self._price_adjustment_factor
 
+    def get_price_for_booked_seats(self, booked_seats: int) -> Decimal:
+        """Get the price per seat when a given number of seats is already booked."""
+        return self.base_price * self._price_factor_for(booked_seats)
+
     def _adjust_price_factor(self) -> None:
         """Adjust price based on occupancy rate."""
-        occupancy_rate = self.calculate_occupancy_rate()
+        self._price_adjustment_factor = self._price_factor_for(self.booked_seats)
+
+    def _price_factor_for(self, booked_seats: int) -> Decimal:
+        """Get the price adjustment factor for a number of booked seats."""
+        if self.capacity == 0:
+            occupancy_rate = Decimal('0')
+        else:
+            occupancy_rate = Decimal(booked_seats) / Decimal(self.capacity)
         if occupancy_rate >= Decimal('0.8'):
-            self._price_adjustment_factor = Decimal('1.5')
+            return Decimal('1.5')
         elif occupancy_rate >= Decimal('0.6'):
-            self._price_adjustment_factor = Decimal('1.2')
+            return Decimal('1.2')
         elif occupancy_rate <= Decimal('0.2'):
-            self._price_adjustment_factor = Decimal('0.8')
-        else:
-            self._price_adjustment_factor = Decimal('1.0')
+            return Decimal('0.8')
+        return Decimal('1.0')
 
     def validate(self) -> bool:
         """Validate session data."""
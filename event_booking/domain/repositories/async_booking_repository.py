@@ -0,0 +1,88 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+from uuid import UUID
+
+from ..entities.booking import Booking, BookingStatus
+from .pagination import PageCursor
+
+class AsyncBookingRepository(ABC):
+    """Coroutine counterpart of BookingRepository for the asyncio API."""
+
+    @abstractmethod
+    async def save(self, booking: Booking) -> Booking:
+        """Save a booking to the repository."""
+        pass
+
+    @abstractmethod
+    async def save_all(self, bookings: List[Booking]) -> List[Booking]:
+        """Save many new bookings in one batched statement."""
+        pass
+
+    @abstractmethod
+    async def find_by_id(self, booking_id: UUID) -> Optional[Booking]:
+        """Find a booking by its ID."""
+        pass
+
+    @abstractmethod
+    async def find_by_user_id(self, user_id: UUID, limit: Optional[int] = None,
+                              after: Optional[PageCursor] = None) -> List[Booking]:
+        """Find bookings for a user, newest first, optionally one page after a cursor."""
+        pass
+
+    @abstractmethod
+    async def find_by_session_id(self, session_id: UUID, limit: Optional[int] = None,
+                                 after: Optional[PageCursor] = None) -> List[Booking]:
+        """Find bookings for a session, newest first, optionally one page after a cursor."""
+        pass
+
+    @abstractmethod
+    async def find_by_status(self, status: BookingStatus, limit: Optional[int] = None,
+                             after: Optional[PageCursor] = None) -> List[Booking]:
+        """Find bookings with a status, newest first, optionally one page after a cursor."""
+        pass
+
+    @abstractmethod
+    async def update(self, booking: Booking,
+                     expected_status: Optional[BookingStatus] = None) -> Optional[Booking]:
+        """Update an existing booking.
+
+        With expected_status, only a booking still stored in that status is
+        updated; None is returned if it changed meanwhile.
+        """
+        pass
+
+    @abstractmethod
+    async def delete(self, booking_id: UUID) -> bool:
+        """Delete a booking by its ID."""
+        pass
+
+    @abstractmethod
+    async def find_active_bookings_for_session(self, session_id: UUID) -> List[Booking]:
+        """Find all bookings of a session still holding seats."""
+        pass
+
+    @abstractmethod
+    async def expire_pending(self, created_before: datetime, limit: int) -> List[Booking]:
+        """Expire up to limit pending bookings created before created_before, oldest first.
+
+        Bookings locked by another transaction are skipped, so concurrent
+        callers work on disjoint batches. Returns the expired bookings.
+        """
+        pass
+
+    @abstractmethod
+    def iter_by_session_id(self, session_id: UUID, chunk_size: int = 1000) -> AsyncIterator[Booking]:
+        """Stream bookings for a session, oldest first, without materializing them."""
+        pass
+
+    @abstractmethod
+    def iter_by_status(self, status: BookingStatus, chunk_size: int = 1000) -> AsyncIterator[Booking]:
+        """Stream bookings with a status, oldest first, without materializing them."""
+        pass
+
+    @abstractmethod
+    def iter_by_created_between(self, start: Optional[datetime], end: Optional[datetime],
+                                chunk_size: int = 1000) -> AsyncIterator[Booking]:
+        """Stream bookings created in [start, end), oldest first; either bound may be None."""
+        pass
@@ -1,8 +1,10 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from datetime import datetime
+from typing import Iterator, List, Optional
 from uuid import UUID
 
 from ..entities.booking import Booking, BookingStatus
+from .pagination import PageCursor
 
 class BookingRepository(ABC):
     @abstractmethod
@@ -10,29 +12,42 @@ class BookingRepository(ABC):
         """Save a booking to the repository."""
         pass
 
+    @abstractmethod
+    def save_all(self, bookings: List[Booking]) -> List[Booking]:
+        """Save many new bookings in one batched statement."""
+        pass
+
     @abstractmethod
     def find_by_id(self, booking_id: UUID) -> Optional[Booking]:
         """Find a booking by its ID."""
         pass
 
     @abstractmethod
-    def find_by_user_id(self, user_id: UUID) -> List[Booking]:
-        """Find all bookings for a user."""
+    def find_by_user_id(self, user_id: UUID, limit: Optional[int] = None,
+                        after: Optional[PageCursor] = None) -> List[Booking]:
+        """Find bookings for a user, newest first, optionally one page after a cursor."""
         pass
 
     @abstractmethod
-    def find_by_session_id(self, session_id: UUID) -> List[Booking]:
-        """Find all bookings for a session."""
+    def find_by_session_id(self, session_id: UUID, limit: Optional[int] = None,
+                           after: Optional[PageCursor] = None) -> List[Booking]:
+        """Find bookings for a session, newest first, optionally one page after a cursor."""
         pass
 
     @abstractmethod
-    def find_by_status(self, status: BookingStatus) -> List[Booking]:
-        """Find all bookings with a specific status."""
+    def find_by_status(self, status: BookingStatus, limit: Optional[int] = None,
+                       after: Optional[PageCursor] = None) -> List[Booking]:
+        """Find bookings with a status, newest first, optionally one page after a cursor."""
         pass
 
     @abstractmethod
-    def update(self, booking: Booking) -> Booking:
-        """Update an existing booking."""
+    def update(self, booking: Booking,
+               expected_status: Optional[BookingStatus] = None) -> Optional[Booking]:
+        """Update an existing booking.
+
+        With expected_status, only a booking still stored in that status is
+        updated; None is returned if it changed meanwhile.
+        """
         pass
 
     @abstractmethod
@@ -42,5 +57,30 @@ class BookingRepository(ABC):
 
     @abstractmethod
     def find_active_bookings_for_session(self, session_id: UUID) -> List[Booking]:
-        """Find all non-cancelled bookings for a session."""
-        pass 
\ No newline at end of file
+        """Find all bookings of a session still holding seats."""
+        pass
+
+    @abstractmethod
+    def expire_pending(self, created_before: datetime, limit: int) -> List[Booking]:
+        """Expire up to limit pending bookings created before created_before, oldest first.
+
+        Bookings locked by another transaction are skipped, so concurrent
+        callers work on disjoint batches. Returns the expired bookings.
+        """
+        pass
+
+    @abstractmethod
+    def iter_by_session_id(self, session_id: UUID, chunk_size: int = 1000) -> Iterator[Booking]:
+        """Stream bookings for a session, oldest first, without materializing them."""
+        pass
+
+    @abstractmethod
+    def iter_by_status(self, status: BookingStatus, chunk_size: int = 1000) -> Iterator[Booking]:
+        """Stream bookings with a status, oldest first, without materializing them."""
+        pass
+
+    @abstractmethod
+    def iter_by_created_between(self, start: Optional[datetime], end: Optional[datetime],
+                                chunk_size: int = 1000) -> Iterator[Booking]:
+        """Stream bookings created in [start, end), oldest first; either bound may be None."""
+        pass
@@ -3,6 +3,12 @@ from typing import List, Optional
 from uuid import UUID
 
 from ..entities.event import Event
+from ..entities.session import Session
+from .pagination import PageCursor
+
+class SessionInUseError(Exception):
+    """Raised by update and delete when a removed session still has booking rows."""
+    pass
 
 class EventRepository(ABC):
     @abstractmethod
@@ -16,21 +22,43 @@ class EventRepository(ABC):
         pass
 
     @abstractmethod
-    def find_all(self) -> List[Event]:
-        """Find all events."""
+    def find_all(self, limit: Optional[int] = None,
+                 after: Optional[PageCursor] = None) -> List[Event]:
+        """Find all events; when paginated, newest first and one page after a cursor."""
+        pass
+
+    @abstractmethod
+    def find_by_category(self, category: str, limit: Optional[int] = None,
+                         after: Optional[PageCursor] = None) -> List[Event]:
+        """Find events by category; when paginated, newest first and one page after a cursor."""
+        pass
+
+    @abstractmethod
+    def find_session(self, session_id: UUID) -> Optional[Session]:
+        """Find a single session by its ID."""
+        pass
+
+    @abstractmethod
+    def find_event_by_session_id(self, session_id: UUID) -> Optional[Event]:
+        """Find the event owning a session."""
+        pass
+
+    @abstractmethod
+    def reserve_seats(self, session_id: UUID, num_seats: int) -> Optional[int]:
+        """Atomically book seats if enough are left; return the new booked count or None."""
         pass
 
     @abstractmethod
-    def find_by_category(self, category: str) -> List[Event]:
-        """Find events by category."""
+    def release_seats(self, session_id: UUID, num_seats: int) -> Optional[int]:
+        """Atomically release booked seats; return the new booked count or None."""
         pass
 
     @abstractmethod
     def delete(self, event_id: UUID) -> bool:
-        """Delete an event by its ID."""
+        """Delete an event by its ID; raises SessionInUseError if a session has bookings."""
         pass
 
     @abstractmethod
     def update(self, event: Event) -> Event:
-        """Update an existing event."""
+        """Update an existing event; raises SessionInUseError if a removed session has bookings."""
         pass 
\ No newline at end of file
@@ -0,0 +1,24 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
+
+@dataclass(frozen=True)
+class PageCursor:
+    """Position after the last item of a page ordered by (created_at, id) descending."""
+    created_at: datetime
+    id: UUID
+
+def encode_cursor(created_at: datetime, item_id: UUID) -> str:
+    """Encode the position of an item as an opaque cursor."""
+    raw = f"{created_at.isoformat()}|{item_id}".encode('utf-8')
+    return urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> PageCursor:
+    """Decode an opaque cursor produced by encode_cursor."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, item_id = urlsafe_b64decode(padded.encode('ascii')).decode('utf-8').split('|')
+        return PageCursor(created_at=datetime.fromisoformat(created_at), id=UUID(item_id))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
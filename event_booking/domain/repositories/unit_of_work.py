@@ -0,0 +1,43 @@
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from typing import AsyncContextManager, Awaitable, Callable, ContextManager, TypeVar
+
+T = TypeVar('T')
+
+class UnitOfWork(ABC):
+    @abstractmethod
+    def transaction(self) -> ContextManager[None]:
+        """Run the enclosed repository calls in one transaction with a single commit."""
+        pass
+
+    def run(self, work: Callable[[], T]) -> T:
+        """Run work in one transaction and return its result.
+
+        Implementations may roll back and call work again after a transient
+        failure, so work must not keep state from an earlier attempt.
+        """
+        with self.transaction():
+            return work()
+
+class NullUnitOfWork(UnitOfWork):
+    """Unit of work for repositories that commit each call on their own."""
+
+    def transaction(self) -> ContextManager[None]:
+        return nullcontext()
+
+class AsyncUnitOfWork(ABC):
+    @abstractmethod
+    def transaction(self) -> AsyncContextManager[None]:
+        """Run the enclosed repository coroutines in one transaction with a single commit."""
+        pass
+
+    async def run(self, work: Callable[[], Awaitable[T]]) -> T:
+        """Await work in one transaction; like UnitOfWork.run, it may be replayed."""
+        async with self.transaction():
+            return await work()
+
+class NullAsyncUnitOfWork(AsyncUnitOfWork):
+    """Async unit of work for repositories that commit each call on their own."""
+
+    def transaction(self) -> AsyncContextManager[None]:
+        return nullcontext()
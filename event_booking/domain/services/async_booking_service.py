@@ -0,0 +1,153 @@
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List, Optional, Tuple, TypeVar
+from uuid import UUID
+
+from ..entities.booking import Booking, BookingStatus
+from ..entities.session import Session
+from ..repositories.async_booking_repository import AsyncBookingRepository
+from ..repositories.async_event_repository import AsyncEventRepository
+from ..repositories.unit_of_work import AsyncUnitOfWork, NullAsyncUnitOfWork
+from .booking_service import (
+    BatchBookingError, BatchMode, BookingRequest, BookingResult, SeatsLeft, abort_batch, batch_bookings,
+    check_available, check_cancellable, check_updated, confirm_hold, fit_requests, found_booking,
+    group_by_session, new_booking, note_seats_released, record_reservation, record_seats_left, release_error,
+    restart_batch, screen_batch, screen_booking, seats_by_session, settle_group
+)
+from .sold_out_registry import SoldOutRegistry
+
+T = TypeVar('T')
+
+class AsyncBookingService:
+    """BookingService for coroutines: same rules, awaiting async repositories."""
+
+    def __init__(self, booking_repository: AsyncBookingRepository, event_repository: AsyncEventRepository,
+                 unit_of_work: Optional[AsyncUnitOfWork] = None, hold_ttl: Optional[timedelta] = None,
+                 sold_out: Optional[SoldOutRegistry] = None):
+        self.booking_repository = booking_repository
+        self.event_repository = event_repository
+        self.unit_of_work = unit_of_work or NullAsyncUnitOfWork()
+        self.hold_ttl = hold_ttl
+        self.sold_out = sold_out
+
+    async def create_booking(self, user_id: UUID, session_id: UUID, num_seats: int) -> Booking:
+        """Create a new booking for a session."""
+        screen_booking(self.sold_out, session_id, num_seats)
+        return await self._book(lambda seats_left: self._create_booking(user_id, session_id, num_seats, seats_left))
+
+    async def _book(self, work: Callable[[List[SeatsLeft]], Awaitable[T]]) -> T:
+        """Run work in the unit of work, then record the seats left it noted."""
+        seats_left: List[SeatsLeft] = []
+
+        async def attempt() -> T:
+            seats_left.clear()
+            return await work(seats_left)
+
+        try:
+            result = await self.unit_of_work.run(attempt)
+        except BaseException:
+            record_seats_left(self.sold_out, seats_left, committed=False)
+            raise
+        record_seats_left(self.sold_out, seats_left, committed=True)
+        return result
+
+    async def _create_booking(self, user_id: UUID, session_id: UUID, num_seats: int,
+                              seats_left: List[SeatsLeft]) -> Booking:
+        session = check_available(await self.event_repository.find_session(session_id), session_id, num_seats,
+                                  seats_left)
+        booked_seats = await self.event_repository.reserve_seats(session_id, num_seats)
+        return await self.booking_repository.save(new_booking(user_id, session, num_seats, booked_seats, seats_left))
+
+    async def create_bookings(self, requests: List[BookingRequest],
+                              mode: BatchMode = BatchMode.ALL_OR_NOTHING) -> List[BookingResult]:
+        """Book many requests in one unit of work with one reservation per session."""
+        results = screen_batch(requests, self.sold_out, mode)
+        return await self._book(lambda seats_left: self._create_bookings(results, mode, seats_left))
+
+    async def _create_bookings(self, screened: List[BookingResult], mode: BatchMode,
+                               seats_left: List[SeatsLeft]) -> List[BookingResult]:
+        # Fresh results on every attempt so a replayed transaction starts clean
+        results = restart_batch(screened)
+        reserved = []
+        try:
+            for session_id, group in group_by_session(results).items():
+                session = await self.event_repository.find_session(session_id)
+                accepted, total = fit_requests(session, group, mode)
+                booked_seats = None
+                if total:
+                    booked_seats = await self.event_repository.reserve_seats(session_id, total)
+                    if booked_seats is None and mode is BatchMode.BEST_EFFORT:
+                        # A cached or lagging read counted seats that are gone
+                        booked_seats, total = await self._reserve_each(session, accepted, reserved)
+                    else:
+                        record_reservation(session, accepted, booked_seats, total, reserved)
+                settle_group(session, group, booked_seats, total, mode, results, seats_left)
+        except BatchBookingError:
+            for session_id, seats in reserved:
+                await self.event_repository.release_seats(session_id, seats)
+            abort_batch(results)
+            raise
+
+        bookings = batch_bookings(results)
+        if bookings:
+            await self.booking_repository.save_all(bookings)
+        return results
+
+    async def _reserve_each(self, session: Session, accepted: List[BookingResult],
+                            reserved: List[Tuple[UUID, int]]) -> Tuple[Optional[int], int]:
+        booked_seats, total = None, 0
+        for result in accepted:
+            seats = result.request.seats
+            booked = await self.event_repository.reserve_seats(session.id, seats)
+            record_reservation(session, [result], booked, seats, reserved)
+            if booked is not None:
+                booked_seats, total = booked, total + seats
+        return booked_seats, total
+
+    async def confirm_booking(self, booking_id: UUID) -> Booking:
+        """Confirm a pending booking."""
+        return await self.unit_of_work.run(lambda: self._confirm_booking(booking_id))
+
+    async def _confirm_booking(self, booking_id: UUID) -> Booking:
+        booking = found_booking(await self.booking_repository.find_by_id(booking_id), booking_id)
+        confirm_hold(booking, self.hold_ttl)
+        check_updated(await self.booking_repository.update(booking, expected_status=BookingStatus.PENDING),
+                      "Booking is no longer pending")
+        return booking
+
+    async def cancel_booking(self, booking_id: UUID) -> Booking:
+        """Cancel a booking and release its seats."""
+        booking = await self.unit_of_work.run(lambda: self._cancel_booking(booking_id))
+        note_seats_released(self.sold_out, booking.session_id)
+        return booking
+
+    async def _cancel_booking(self, booking_id: UUID) -> Booking:
+        booking = found_booking(await self.booking_repository.find_by_id(booking_id), booking_id)
+        check_cancellable(booking)
+
+        if await self.event_repository.release_seats(booking.session_id, booking.seats) is None:
+            raise release_error(await self.event_repository.find_session(booking.session_id), booking.session_id)
+
+        booking.cancel()
+        check_updated(await self.booking_repository.update(booking, expected_status=BookingStatus.CONFIRMED),
+                      "Booking cannot be cancelled")
+        return booking
+
+    async def expire_holds(self, limit: int = 500) -> List[Booking]:
+        """Expire up to limit holds older than hold_ttl and release their seats in one transaction."""
+        if self.hold_ttl is None:
+            return []
+        expired = await self.unit_of_work.run(lambda: self._expire_holds(limit))
+        for session_id in seats_by_session(expired):
+            note_seats_released(self.sold_out, session_id)
+        return expired
+
+    async def _expire_holds(self, limit: int) -> List[Booking]:
+        expired = await self.booking_repository.expire_pending(datetime.utcnow() - self.hold_ttl, limit)
+        for session_id, seats in seats_by_session(expired).items():
+            await self.event_repository.release_seats(session_id, seats)
+        return expired
+
+    async def get_booking_status(self, booking_id: UUID) -> Optional[BookingStatus]:
+        """Get the current status of a booking."""
+        booking = await self.booking_repository.find_by_id(booking_id)
+        return booking.status if booking else None
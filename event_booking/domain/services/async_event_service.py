@@ -0,0 +1,63 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
+from uuid import UUID
+
+from ..entities.event import Event
+from ..entities.session import Session
+from ..repositories.async_event_repository import AsyncEventRepository
+from ..repositories.pagination import PageCursor
+from .event_service import (
+    EventError, SessionError, attach_session, change_event, check_deletable, detach_session, found_event,
+    new_event, sessions_in_use
+)
+
+class AsyncEventService:
+    """EventService for coroutines: same rules, awaiting an async repository."""
+
+    def __init__(self, event_repository: AsyncEventRepository):
+        self.event_repository = event_repository
+
+    async def _get_event(self, event_id: UUID) -> Event:
+        return found_event(await self.event_repository.find_by_id(event_id), event_id)
+
+    async def create_event(self, name: str, description: str, venue: str, categories: List[str]) -> Event:
+        """Create a new event."""
+        return await self.event_repository.save(new_event(name, description, venue, categories))
+
+    async def add_session(self, event_id: UUID, start_time: datetime, end_time: datetime,
+                          capacity: int, base_price: Decimal) -> Session:
+        """Add a session to an event."""
+        event = await self._get_event(event_id)
+        session = attach_session(event, start_time, end_time, capacity, base_price)
+        return (await self.event_repository.update(event)).get_session(session.id)
+
+    async def remove_session(self, event_id: UUID, session_id: UUID) -> None:
+        """Remove a session from an event."""
+        event = await self._get_event(event_id)
+        detach_session(event, session_id)
+        with sessions_in_use(SessionError("Cannot remove session with existing bookings")):
+            await self.event_repository.update(event)
+
+    async def get_available_sessions(self, event_id: UUID) -> List[Session]:
+        """Get all available sessions for an event."""
+        return (await self._get_event(event_id)).get_available_sessions()
+
+    async def get_events_by_category(self, category: str, limit: Optional[int] = None,
+                                     after: Optional[PageCursor] = None) -> List[Event]:
+        """Get events in a specific category, optionally one page at a time."""
+        return await self.event_repository.find_by_category(category, limit=limit, after=after)
+
+    async def update_event(self, event_id: UUID, name: str = None, description: str = None,
+                           venue: str = None, categories: List[str] = None) -> Event:
+        """Update an event's details."""
+        event = await self._get_event(event_id)
+        change_event(event, name, description, venue, categories)
+        return await self.event_repository.update(event)
+
+    async def delete_event(self, event_id: UUID) -> bool:
+        """Delete an event and all its sessions."""
+        event = await self._get_event(event_id)
+        check_deletable(event)
+        with sessions_in_use(EventError("Cannot delete event with existing bookings")):
+            return await self.event_repository.delete(event_id)
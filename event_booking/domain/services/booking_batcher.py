@@ -0,0 +1,117 @@
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+import asyncio
+
+from ..entities.booking import Booking
+from .async_booking_service import AsyncBookingService
+from .booking_service import BatchMode, BookingRequest
+
+class _SessionQueue:
+    __slots__ = ('pending', 'timer', 'busy')
+
+    def __init__(self):
+        self.pending: List[Tuple[BookingRequest, asyncio.Future]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.busy = False
+
+class BookingBatcher:
+    """Group-commits concurrent create_booking calls for the same session.
+
+    Requests for one session arriving within window seconds are booked by
+    one create_bookings call in BEST_EFFORT mode: one transaction, one seat
+    counter update and one multi-row insert. A batch is sent early once it
+    holds max_batch_size requests. While a batch of a session commits, the
+    next one collects and is sent as soon as it finishes. Each caller gets
+    its own booking or the error create_booking would have raised.
+    """
+
+    def __init__(self, service: AsyncBookingService, window: float = 0.002, max_batch_size: int = 64):
+        if window < 0 or max_batch_size <= 0:
+            raise ValueError("window must not be negative and max_batch_size must be positive")
+        self.service = service
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._queues: Dict[UUID, _SessionQueue] = {}
+
+        # Counters exposed through stats()
+        self._batches = 0
+        self._requests = 0
+        self._largest = 0
+        self._failed_batches = 0
+
+    async def create_booking(self, user_id: UUID, session_id: UUID, num_seats: int) -> Booking:
+        """Book like AsyncBookingService.create_booking, sharing a transaction with concurrent callers."""
+        if num_seats <= 0:
+            raise ValueError("Number of seats must be positive")
+
+        loop = asyncio.get_running_loop()
+        queue = self._queues.get(session_id)
+        if queue is None:
+            queue = self._queues[session_id] = _SessionQueue()
+        future = loop.create_future()
+        queue.pending.append((BookingRequest(user_id, session_id, num_seats), future))
+
+        if len(queue.pending) >= self.max_batch_size:
+            self._flush(session_id)
+        elif queue.timer is None and not queue.busy:
+            queue.timer = loop.call_later(self.window, self._flush, session_id)
+        return await future
+
+    def _flush(self, session_id: UUID) -> None:
+        queue = self._queues[session_id]
+        if queue.timer is not None:
+            queue.timer.cancel()
+            queue.timer = None
+        if not queue.busy:
+            # A running drain picks the pending requests up when its batch is done
+            queue.busy = True
+            asyncio.get_running_loop().create_task(self._drain(session_id, queue))
+
+    async def _drain(self, session_id: UUID, queue: _SessionQueue) -> None:
+        try:
+            while queue.pending:
+                batch = queue.pending[:self.max_batch_size]
+                del queue.pending[:self.max_batch_size]
+                # Callers that gave up before the flush are not booked
+                batch = [(request, future) for request, future in batch if not future.done()]
+                if batch:
+                    await self._send(batch)
+        finally:
+            queue.busy = False
+            if queue.pending:
+                self._flush(session_id)
+            elif self._queues.get(session_id) is queue and queue.timer is None:
+                del self._queues[session_id]
+
+    async def _send(self, batch: List[Tuple[BookingRequest, asyncio.Future]]) -> None:
+        self._batches += 1
+        self._requests += len(batch)
+        self._largest = max(self._largest, len(batch))
+        try:
+            results = await self.service.create_bookings([request for request, _ in batch], BatchMode.BEST_EFFORT)
+        except Exception as e:
+            # Nothing was booked: every caller sees the failure
+            self._failed_batches += 1
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if result.error is not None:
+                future.set_exception(result.error)
+            else:
+                future.set_result(result.booking)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return batching counters."""
+        return {
+            'batches': self._batches,
+            'requests': self._requests,
+            'avg_batch_size': round(self._requests / self._batches, 2) if self._batches else 0.0,
+            'max_batch_size': self._largest,
+            'failed_batches': self._failed_batches,
+            'sessions_queued': len(self._queues),
+        }
@@ -1,12 +1,17 @@
-from datetime import datetime
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Optional
-from uuid import UUID
+from enum import Enum
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+from uuid import UUID, uuid4
 
 from ..entities.booking import Booking, BookingStatus
 from ..entities.session import Session
 from ..repositories.booking_repository import BookingRepository
 from ..repositories.event_repository import EventRepository
+from ..repositories.unit_of_work import NullUnitOfWork, UnitOfWork
+from .sold_out_registry import SoldOutRegistry
 
 class BookingError(Exception):
     """Base class for booking-related errors."""
@@ -20,94 +25,397 @@ class SessionNotFoundError(BookingError):
     """Raised when the requested session is not found."""
     pass
 
+class HoldExpiredError(BookingError):
+    """Raised when confirming a pending booking whose hold ran out."""
+    pass
+
+class BatchMode(Enum):
+    ALL_OR_NOTHING = "all_or_nothing"
+    BEST_EFFORT = "best_effort"
+
+@dataclass
+class BookingRequest:
+    user_id: UUID
+    session_id: UUID
+    seats: int
+    # Id for the booking, so a replayed request can find what it already booked
+    booking_id: Optional[UUID] = None
+
+@dataclass
+class BookingResult:
+    request: BookingRequest
+    booking: Optional[Booking] = None
+    error: Optional[BookingError] = None
+
+class BatchBookingError(BookingError):
+    """Raised when an all-or-nothing batch cannot be booked in full."""
+
+    def __init__(self, results: List[BookingResult]):
+        failed = sum(1 for result in results if result.error is not None)
+        super().__init__(f"{failed} of {len(results)} booking requests failed")
+        self.results = results
+
+def group_by_session(results: List[BookingResult]) -> Dict[UUID, List[BookingResult]]:
+    """Group pending batch results by session, keeping request order within each session."""
+    groups: Dict[UUID, List[BookingResult]] = OrderedDict()
+    for result in results:
+        if result.error is None:
+            groups.setdefault(result.request.session_id, []).append(result)
+    return groups
+
+def fit_requests(session: Optional[Session], group: List[BookingResult],
+                 mode: BatchMode) -> Tuple[List[BookingResult], int]:
+    """Pick the requests of one session that fit its free seats; fail the others.
+
+    Returns the accepted results and the number of seats they need.
+    """
+    if session is None:
+        for result in group:
+            result.error = SessionNotFoundError(f"Session {result.request.session_id} not found")
+        return [], 0
+
+    available = session.available_seats
+    if mode is BatchMode.ALL_OR_NOTHING and sum(r.request.seats for r in group) > available:
+        for result in group:
+            result.error = InsufficientSeatsError("Not enough seats available")
+        return [], 0
+
+    # Best effort serves requests in order while seats remain
+    accepted, total = [], 0
+    for result in group:
+        if total + result.request.seats <= available:
+            accepted.append(result)
+            total += result.request.seats
+        else:
+            result.error = InsufficientSeatsError("Not enough seats available")
+    return accepted, total
+
+def issue_bookings(session: Session, accepted: List[BookingResult],
+                   booked_seats: Optional[int], total: int) -> None:
+    """Create the bookings of one reserved session group, priced as if made one after another."""
+    if booked_seats is None:
+        for result in accepted:
+            result.error = InsufficientSeatsError("Not enough seats available")
+        return
+
+    occupied = booked_seats - total
+    for result in accepted:
+        request = result.request
+        result.booking = Booking(
+            user_id=request.user_id,
+            session_id=request.session_id,
+            seats=request.seats,
+            price_per_seat=session.get_price_for_booked_seats(occupied),
+            id=request.booking_id or uuid4()
+        )
+        occupied += request.seats
+
+def abort_batch(results: List[BookingResult]) -> None:
+    """Mark every request of a failed all-or-nothing batch as not booked."""
+    for result in results:
+        result.booking = None
+        if result.error is None:
+            result.error = BookingError("Not booked because another request in the batch failed")
+
+def seats_by_session(bookings: List[Booking]) -> Dict[UUID, int]:
+    """Total seats per session, so expired holds are released with one update per session."""
+    seats: Dict[UUID, int] = OrderedDict()
+    for booking in bookings:
+        seats[booking.session_id] = seats.get(booking.session_id, 0) + booking.seats
+    return seats
+
+def check_hold(booking: Booking, hold_ttl: Optional[timedelta]) -> None:
+    """Refuse to confirm a hold past its TTL, even before the sweeper expires it."""
+    if hold_ttl is not None and booking.is_hold_expired(hold_ttl):
+        raise HoldExpiredError(f"Booking {booking.id} hold has expired")
+
+def start_batch(requests: List[BookingRequest]) -> List[BookingResult]:
+    """Create one result per request, failing malformed requests up front."""
+    results = [BookingResult(request) for request in requests]
+    for result in results:
+        if result.request.seats <= 0:
+            result.error = BookingError("Number of seats must be positive")
+    return results
+
+def screen_sold_out(results: List[BookingResult], sold_out: Optional[SoldOutRegistry]) -> None:
+    """Fail requests the sold-out registry knows cannot fit, before any query."""
+    if sold_out is None:
+        return
+    for result in results:
+        if result.error is None and sold_out.rejects(result.request.session_id, result.request.seats):
+            result.error = InsufficientSeatsError("Not enough seats available")
+
+def restart_batch(screened: List[BookingResult]) -> List[BookingResult]:
+    """Fresh results for one attempt, keeping the failures found before the unit of work."""
+    return [BookingResult(result.request, error=result.error) for result in screened]
+
+# (session id, seats left, whether the count includes seats this transaction reserved)
+SeatsLeft = Tuple[UUID, int, bool]
+
+def note_seats_left(seats_left: List[SeatsLeft], session: Optional[Session],
+                    booked_seats: Optional[int], wanted: int) -> None:
+    """Note the seats left after trying to reserve wanted seats; booked_seats is None on failure."""
+    if session is None:
+        return
+    if booked_seats is not None:
+        seats_left.append((session.id, session.capacity - booked_seats, True))
+    else:
+        # Fewer than wanted seats are left, whatever the session read said
+        seats_left.append((session.id, min(session.available_seats, wanted - 1), False))
+
+def record_seats_left(sold_out: Optional[SoldOutRegistry], seats_left: List[SeatsLeft], committed: bool) -> None:
+    """Record noted seat counts once the transaction is over.
+
+    After a rollback the seats this transaction reserved are free again,
+    so those sessions are forgotten; a shortage seen without reserving
+    still holds.
+    """
+    if sold_out is None:
+        return
+    for session_id, remaining, reserved in seats_left:
+        if committed or not reserved:
+            sold_out.record(session_id, remaining)
+        else:
+            sold_out.released(session_id)
+
+def note_seats_released(sold_out: Optional[SoldOutRegistry], session_id: UUID) -> None:
+    if sold_out is not None:
+        sold_out.released(session_id)
+
+def screen_booking(sold_out: Optional[SoldOutRegistry], session_id: UUID, num_seats: int) -> None:
+    """Refuse a single booking that cannot succeed, before its unit of work."""
+    if num_seats <= 0:
+        raise ValueError("Number of seats must be positive")
+    if sold_out is not None and sold_out.rejects(session_id, num_seats):
+        raise InsufficientSeatsError("Not enough seats available")
+
+def check_available(session: Optional[Session], session_id: UUID, num_seats: int,
+                    seats_left: List[SeatsLeft]) -> Session:
+    """Check that the session exists and its read shows num_seats free."""
+    if not session:
+        raise SessionNotFoundError(f"Session {session_id} not found")
+    if session.available_seats < num_seats:
+        note_seats_left(seats_left, session, None, num_seats)
+        raise InsufficientSeatsError("Not enough seats available")
+    return session
+
+def new_booking(user_id: UUID, session: Session, num_seats: int, booked_seats: Optional[int],
+                seats_left: List[SeatsLeft]) -> Booking:
+    """Build the booking of a guarded reservation; booked_seats is None when it failed."""
+    note_seats_left(seats_left, session, booked_seats, num_seats)
+    if booked_seats is None:
+        raise InsufficientSeatsError("Not enough seats available")
+
+    # Price from the occupancy just before this reservation
+    return Booking(
+        user_id=user_id,
+        session_id=session.id,
+        seats=num_seats,
+        price_per_seat=session.get_price_for_booked_seats(booked_seats - num_seats)
+    )
+
+def screen_batch(requests: List[BookingRequest], sold_out: Optional[SoldOutRegistry],
+                 mode: BatchMode) -> List[BookingResult]:
+    """Results for a batch after the checks that need no query; an all-or-nothing failure raises."""
+    results = start_batch(requests)
+    screen_sold_out(results, sold_out)
+    if mode is BatchMode.ALL_OR_NOTHING and any(r.error for r in results):
+        error = BatchBookingError(results)
+        abort_batch(results)
+        raise error
+    return results
+
+def record_reservation(session: Session, accepted: List[BookingResult], booked_seats: Optional[int],
+                       total: int, reserved: List[Tuple[UUID, int]]) -> None:
+    """Remember a successful guarded reservation for undo and issue its bookings."""
+    if booked_seats is not None:
+        reserved.append((session.id, total))
+    issue_bookings(session, accepted, booked_seats, total)
+
+def settle_group(session: Optional[Session], group: List[BookingResult], booked_seats: Optional[int],
+                 total: int, mode: BatchMode, results: List[BookingResult], seats_left: List[SeatsLeft]) -> None:
+    """Note the seats left after a session group; an all-or-nothing batch stops at its first failure."""
+    note_seats_left(seats_left, session, booked_seats, total or min(r.request.seats for r in group))
+    if mode is BatchMode.ALL_OR_NOTHING and any(r.error for r in group):
+        raise BatchBookingError(results)
+
+def batch_bookings(results: List[BookingResult]) -> List[Booking]:
+    return [result.booking for result in results if result.booking is not None]
+
+def found_booking(booking: Optional[Booking], booking_id: UUID) -> Booking:
+    if not booking:
+        raise BookingError(f"Booking {booking_id} not found")
+    return booking
+
+def confirm_hold(booking: Booking, hold_ttl: Optional[timedelta]) -> None:
+    check_hold(booking, hold_ttl)
+    booking.confirm()
+
+def check_cancellable(booking: Booking) -> None:
+    if not booking.is_cancellable():
+        raise BookingError("Booking cannot be cancelled")
+
+def check_updated(updated: Optional[Booking], message: str) -> Booking:
+    """Raise when a status-guarded update found the booking changed since it was read."""
+    if updated is None:
+        raise BookingError(message)
+    return updated
+
+def release_error(session: Optional[Session], session_id: UUID) -> BookingError:
+    """Error for a seat release the guarded update refused."""
+    if not session:
+        return SessionNotFoundError(f"Session {session_id} not found")
+    return BookingError("Failed to release seats")
+
+T = TypeVar('T')
+
 class BookingService:
-    def __init__(self, booking_repository: BookingRepository, event_repository: EventRepository):
+    def __init__(self, booking_repository: BookingRepository, event_repository: EventRepository,
+                 unit_of_work: Optional[UnitOfWork] = None, hold_ttl: Optional[timedelta] = None,
+                 sold_out: Optional[SoldOutRegistry] = None):
+        """hold_ttl: how long a pending booking holds its seats; None holds them until cancelled.
+
+        sold_out: registry used to refuse requests for sessions known to be full without a query.
+        """
         self.booking_repository = booking_repository
         self.event_repository = event_repository
+        self.unit_of_work = unit_of_work or NullUnitOfWork()
+        self.hold_ttl = hold_ttl
+        self.sold_out = sold_out
 
     def create_booking(self, user_id: UUID, session_id: UUID, num_seats: int) -> Booking:
         """Create a new booking for a session."""
-        # Find the event and session
-        event = None
-        session = None
-        for evt in self.event_repository.find_all():
-            if (s := evt.get_session(session_id)) is not None:
-                event = evt
-                session = s
-                break
-
-        if not session:
-            raise SessionNotFoundError(f"Session {session_id} not found")
-
-        # Check seat availability
-        if not session.is_available() or session.available_seats < num_seats:
-            raise InsufficientSeatsError("Not enough seats available")
-
-        # Calculate price
-        current_price = session.get_current_price()
-
-        # Create booking
-        booking = Booking(
-            user_id=user_id,
-            session_id=session_id,
-            seats=num_seats,
-            price_per_seat=current_price
-        )
+        screen_booking(self.sold_out, session_id, num_seats)
+        return self._book(lambda seats_left: self._create_booking(user_id, session_id, num_seats, seats_left))
+
+    def _book(self, work: Callable[[List[SeatsLeft]], T]) -> T:
+        """Run work in the unit of work, then record the seats left it noted."""
+        seats_left: List[SeatsLeft] = []
+
+        def attempt() -> T:
+            # A replayed transaction notes its own counts
+            seats_left.clear()
+            return work(seats_left)
+
+        try:
+            result = self.unit_of_work.run(attempt)
+        except BaseException:
+            record_seats_left(self.sold_out, seats_left, committed=False)
+            raise
+        record_seats_left(self.sold_out, seats_left, committed=True)
+        return result
+
+    def _create_booking(self, user_id: UUID, session_id: UUID, num_seats: int,
+                        seats_left: List[SeatsLeft]) -> Booking:
+        session = check_available(self.event_repository.find_session(session_id), session_id, num_seats, seats_left)
+        # Reserve seats with a single guarded update
+        booked_seats = self.event_repository.reserve_seats(session_id, num_seats)
+        return self.booking_repository.save(new_booking(user_id, session, num_seats, booked_seats, seats_left))
 
-        # Update session
-        if not session.book_seats(num_seats):
-            raise BookingError("Failed to book seats")
+    def create_bookings(self, requests: List[BookingRequest],
+                        mode: BatchMode = BatchMode.ALL_OR_NOTHING) -> List[BookingResult]:
+        """Book many requests in one unit of work with one reservation per session.
 
-        # Save booking
-        saved_booking = self.booking_repository.save(booking)
-        
-        # Update event
-        self.event_repository.update(event)
+        In ALL_OR_NOTHING mode any failure raises BatchBookingError and no
+        seats stay reserved; in BEST_EFFORT mode failures are reported per
+        request and the rest is booked. When the session read overstated the
+        free seats, best effort falls back to one guarded reservation per
+        request rather than failing the whole group.
+        """
+        results = screen_batch(requests, self.sold_out, mode)
+        return self._book(lambda seats_left: self._create_bookings(results, mode, seats_left))
 
-        return saved_booking
+    def _create_bookings(self, screened: List[BookingResult], mode: BatchMode,
+                         seats_left: List[SeatsLeft]) -> List[BookingResult]:
+        # Fresh results on every attempt so a replayed transaction starts clean
+        results = restart_batch(screened)
+        reserved = []
+        try:
+            for session_id, group in group_by_session(results).items():
+                session = self.event_repository.find_session(session_id)
+                accepted, total = fit_requests(session, group, mode)
+                booked_seats = None
+                if total:
+                    booked_seats = self.event_repository.reserve_seats(session_id, total)
+                    if booked_seats is None and mode is BatchMode.BEST_EFFORT:
+                        # A cached or lagging read counted seats that are gone
+                        booked_seats, total = self._reserve_each(session, accepted, reserved)
+                    else:
+                        record_reservation(session, accepted, booked_seats, total, reserved)
+                settle_group(session, group, booked_seats, total, mode, results, seats_left)
+        except BatchBookingError:
+            # Undo earlier sessions for units of work that do not roll back
+            for session_id, seats in reserved:
+                self.event_repository.release_seats(session_id, seats)
+            abort_batch(results)
+            raise
+
+        bookings = batch_bookings(results)
+        if bookings:
+            self.booking_repository.save_all(bookings)
+        return results
+
+    def _reserve_each(self, session: Session, accepted: List[BookingResult],
+                      reserved: List[Tuple[UUID, int]]) -> Tuple[Optional[int], int]:
+        """Reserve accepted requests one by one; return the last booked count and the seats reserved."""
+        booked_seats, total = None, 0
+        for result in accepted:
+            seats = result.request.seats
+            booked = self.event_repository.reserve_seats(session.id, seats)
+            record_reservation(session, [result], booked, seats, reserved)
+            if booked is not None:
+                booked_seats, total = booked, total + seats
+        return booked_seats, total
 
     def confirm_booking(self, booking_id: UUID) -> Booking:
         """Confirm a pending booking."""
-        booking = self.booking_repository.find_by_id(booking_id)
-        if not booking:
-            raise BookingError(f"Booking {booking_id} not found")
+        return self.unit_of_work.run(lambda: self._confirm_booking(booking_id))
 
-        booking.confirm()
-        return self.booking_repository.update(booking)
+    def _confirm_booking(self, booking_id: UUID) -> Booking:
+        booking = found_booking(self.booking_repository.find_by_id(booking_id), booking_id)
+        confirm_hold(booking, self.hold_ttl)
+        # The sweeper may have expired the hold since it was read
+        check_updated(self.booking_repository.update(booking, expected_status=BookingStatus.PENDING),
+                      "Booking is no longer pending")
+        return booking
 
     def cancel_booking(self, booking_id: UUID) -> Booking:
         """Cancel a booking and release its seats."""
-        booking = self.booking_repository.find_by_id(booking_id)
-        if not booking:
-            raise BookingError(f"Booking {booking_id} not found")
+        booking = self.unit_of_work.run(lambda: self._cancel_booking(booking_id))
+        note_seats_released(self.sold_out, booking.session_id)
+        return booking
 
-        if not booking.is_cancellable():
-            raise BookingError("Booking cannot be cancelled")
+    def _cancel_booking(self, booking_id: UUID) -> Booking:
+        booking = found_booking(self.booking_repository.find_by_id(booking_id), booking_id)
+        check_cancellable(booking)
 
-        # Find the session
-        event = None
-        session = None
-        for evt in self.event_repository.find_all():
-            if (s := evt.get_session(booking.session_id)) is not None:
-                event = evt
-                session = s
-                break
+        # Release seats with a single guarded update
+        if self.event_repository.release_seats(booking.session_id, booking.seats) is None:
+            raise release_error(self.event_repository.find_session(booking.session_id), booking.session_id)
 
-        if not session:
-            raise SessionNotFoundError(f"Session {booking.session_id} not found")
+        # Cancel booking; a concurrent cancel already released the seats
+        booking.cancel()
+        check_updated(self.booking_repository.update(booking, expected_status=BookingStatus.CONFIRMED),
+                      "Booking cannot be cancelled")
+        return booking
 
-        # Release seats
-        if not session.release_seats(booking.seats):
-            raise BookingError("Failed to release seats")
+    def expire_holds(self, limit: int = 500) -> List[Booking]:
+        """Expire up to limit holds older than hold_ttl and release their seats in one transaction."""
+        if self.hold_ttl is None:
+            return []
+        expired = self.unit_of_work.run(lambda: self._expire_holds(limit))
+        for session_id in seats_by_session(expired):
+            note_seats_released(self.sold_out, session_id)
+        return expired
 
-        # Cancel booking
-        booking.cancel()
-        
-        # Save changes
-        self.event_repository.update(event)
-        return self.booking_repository.update(booking)
+    def _expire_holds(self, limit: int) -> List[Booking]:
+        expired = self.booking_repository.expire_pending(datetime.utcnow() - self.hold_ttl, limit)
+        for session_id, seats in seats_by_session(expired).items():
+            # None means the counter already lacks these seats; the holds expire all the same
+            self.event_repository.release_seats(session_id, seats)
+        return expired
 
     def get_booking_status(self, booking_id: UUID) -> Optional[BookingStatus]:
         """Get the current status of a booking."""
         booking = self.booking_repository.find_by_id(booking_id)
-        return booking.status if booking else None 
\ No newline at end of file
+        return booking.status if booking else None
@@ -0,0 +1,285 @@
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from dataclasses import replace
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+from uuid import UUID
+import asyncio
+import time
+
+from ..entities.booking import Booking
+from ..entities.session import Session
+from ..repositories.async_event_repository import AsyncEventRepository
+from ..repositories.unit_of_work import AsyncUnitOfWork
+from .async_booking_service import AsyncBookingService
+from .booking_service import BatchMode, BookingError, BookingRequest, InsufficientSeatsError
+
+class _SessionLane:
+    __slots__ = ('session', 'loaded_at', 'jobs', 'busy')
+
+    def __init__(self):
+        self.session: Optional[Session] = None
+        self.loaded_at = 0.0
+        # (request, work, future): request for a booking, work for anything else
+        self.jobs: Deque[Tuple[Optional[BookingRequest], Optional[Callable[[], Awaitable[Any]]],
+                               asyncio.Future]] = deque()
+        self.busy = False
+
+class _WriteThroughEvents:
+    """Event repository seen by the writers' service: sessions come from memory,
+    seat changes go to the database and the counts it returns go back to memory
+    once their transaction commits."""
+
+    def __init__(self, repository: AsyncEventRepository, writers: 'SessionWriters'):
+        self.repository = repository
+        self.writers = writers
+
+    def __getattr__(self, name):
+        return getattr(self.repository, name)
+
+    async def find_session(self, session_id: UUID) -> Optional[Session]:
+        lane = self.writers._lanes.get(session_id)
+        if lane is not None and lane.session is not None:
+            return lane.session
+        return await self.repository.find_session(session_id)
+
+    async def reserve_seats(self, session_id: UUID, num_seats: int) -> Optional[int]:
+        booked_seats = await self.repository.reserve_seats(session_id, num_seats)
+        self.writers._observe(session_id, booked_seats)
+        return booked_seats
+
+    async def release_seats(self, session_id: UUID, num_seats: int) -> Optional[int]:
+        booked_seats = await self.repository.release_seats(session_id, num_seats)
+        self.writers._observe(session_id, booked_seats)
+        return booked_seats
+
+class _ObservingUnitOfWork(AsyncUnitOfWork):
+    """Unit of work of the writers' service: a replayed attempt forgets the counts seen by the last one."""
+
+    def __init__(self, unit_of_work: AsyncUnitOfWork, writers: 'SessionWriters'):
+        self.unit_of_work = unit_of_work
+        self.writers = writers
+
+    def transaction(self):
+        return self.unit_of_work.transaction()
+
+    async def run(self, work):
+        async def attempt():
+            observed = self.writers._observed.get()
+            if observed is not None:
+                observed.clear()
+            return await work()
+        return await self.unit_of_work.run(attempt)
+
+class SessionWriters:
+    """Runs all booking writes of a session through one queue with a single consumer.
+
+    Bookings, confirmations and cancellations of a session are applied one
+    transaction at a time, consecutive bookings sharing one create_bookings
+    call, so requests of this process never wait on each other's row locks
+    while different sessions run in parallel. Each session's seat count is
+    kept in memory, taken from the counts the guarded database updates
+    return once their transaction commits, and requests that cannot fit are
+    rejected without a query.
+
+    Other processes and the hold sweeper also change seat counts: memory is
+    reloaded once older than state_ttl seconds, and the guarded updates
+    stay the final check, so a stale count only delays a rejection or an
+    acceptance, never oversells.
+    """
+
+    def __init__(self, service: AsyncBookingService, state_ttl: float = 1.0, max_batch_size: int = 64,
+                 max_sessions: int = 10000):
+        if state_ttl < 0 or max_batch_size <= 0 or max_sessions <= 0:
+            raise ValueError("state_ttl must not be negative; max_batch_size and max_sessions must be positive")
+        self.service = AsyncBookingService(service.booking_repository,
+                                           _WriteThroughEvents(service.event_repository, self),
+                                           _ObservingUnitOfWork(service.unit_of_work, self),
+                                           service.hold_ttl, service.sold_out)
+        self.state_ttl = state_ttl
+        self.max_batch_size = max_batch_size
+        self.max_sessions = max_sessions
+        self._lanes: Dict[UUID, _SessionLane] = OrderedDict()
+        # session id -> count returned by the database, per write job until it commits
+        self._observed: ContextVar = ContextVar(f'session_writers_{id(self)}', default=None)
+
+        # Counters exposed through stats()
+        self._transactions = 0
+        self._requests = 0
+        self._rejected = 0
+        self._reloads = 0
+
+    async def create_booking(self, user_id: UUID, session_id: UUID, num_seats: int) -> Booking:
+        """Book like AsyncBookingService.create_booking, after the session's earlier writes."""
+        if num_seats <= 0:
+            raise ValueError("Number of seats must be positive")
+
+        lane = self._lanes.get(session_id)
+        if lane is not None and self._is_fresh(lane) and lane.session.available_seats < num_seats:
+            self._rejected += 1
+            raise InsufficientSeatsError("Not enough seats available")
+        return await self._submit(session_id, BookingRequest(user_id, session_id, num_seats), None)
+
+    async def confirm_booking(self, booking_id: UUID) -> Booking:
+        """Confirm a pending booking in its session's queue."""
+        return await self._submit_for_booking(booking_id, self.service.confirm_booking)
+
+    async def cancel_booking(self, booking_id: UUID) -> Booking:
+        """Cancel a booking in its session's queue and return its seats to memory."""
+        return await self._submit_for_booking(booking_id, self.service.cancel_booking)
+
+    async def _submit_for_booking(self, booking_id: UUID,
+                                  operation: Callable[[UUID], Awaitable[Booking]]) -> Booking:
+        # In a unit of work the read goes to the writer, not a replica that may lack a new booking
+        booking = await self.service.unit_of_work.run(
+            lambda: self.service.booking_repository.find_by_id(booking_id))
+        if not booking:
+            raise BookingError(f"Booking {booking_id} not found")
+        return await self._submit(booking.session_id, None, lambda: operation(booking_id))
+
+    async def _submit(self, session_id: UUID, request: Optional[BookingRequest],
+                      work: Optional[Callable[[], Awaitable[Any]]]) -> Any:
+        lane = self._lane(session_id)
+        future = asyncio.get_running_loop().create_future()
+        lane.jobs.append((request, work, future))
+        if not lane.busy:
+            lane.busy = True
+            asyncio.get_running_loop().create_task(self._drain(session_id, lane))
+        return await future
+
+    def _lane(self, session_id: UUID) -> _SessionLane:
+        lane = self._lanes.get(session_id)
+        if lane is None:
+            lane = self._lanes[session_id] = _SessionLane()
+            if len(self._lanes) > self.max_sessions:
+                self._evict()
+        self._lanes.move_to_end(session_id)
+        return lane
+
+    def _evict(self) -> None:
+        # Least recently used idle sessions go; a session with queued work keeps its consumer
+        for session_id, lane in list(self._lanes.items())[:-1]:
+            if len(self._lanes) <= self.max_sessions:
+                break
+            if not lane.busy and not lane.jobs:
+                del self._lanes[session_id]
+
+    def _is_fresh(self, lane: _SessionLane) -> bool:
+        return lane.session is not None and time.monotonic() - lane.loaded_at < self.state_ttl
+
+    def _observe(self, session_id: UUID, booked_seats: Optional[int]) -> None:
+        observed = self._observed.get()
+        if observed is None:
+            return
+        # A refused update means memory was wrong; later counts do not undo that
+        if session_id not in observed or observed[session_id] is not None:
+            observed[session_id] = booked_seats
+
+    def _apply(self, observed: Dict[UUID, Optional[int]]) -> None:
+        """Bring memory up to the counts of a committed transaction."""
+        for session_id, booked_seats in observed.items():
+            lane = self._lanes.get(session_id)
+            if lane is None or lane.session is None:
+                continue
+            if booked_seats is None:
+                # The database disagrees with memory: reload before the next write
+                lane.session = None
+            else:
+                lane.session.booked_seats = booked_seats
+
+    async def _write(self, work: Callable[[], Awaitable[Any]]) -> Any:
+        """Run one write job, applying the counts it saw only if it succeeds."""
+        observed: Dict[UUID, Optional[int]] = {}
+        token = self._observed.set(observed)
+        try:
+            result = await work()
+        finally:
+            self._observed.reset(token)
+        self._apply(observed)
+        return result
+
+    async def _load(self, session_id: UUID, lane: _SessionLane) -> None:
+        session = await self.service.event_repository.repository.find_session(session_id)
+        # A private copy: cached repositories may share their session objects
+        lane.session = replace(session) if session is not None else None
+        lane.loaded_at = time.monotonic()
+        self._reloads += 1
+
+    async def _drain(self, session_id: UUID, lane: _SessionLane) -> None:
+        try:
+            while lane.jobs:
+                try:
+                    if not self._is_fresh(lane):
+                        await self._load(session_id, lane)
+                except Exception as e:
+                    self._fail(lane.jobs.popleft()[2], e)
+                    continue
+
+                if lane.jobs[0][0] is not None:
+                    batch = []
+                    while lane.jobs and lane.jobs[0][0] is not None and len(batch) < self.max_batch_size:
+                        batch.append(lane.jobs.popleft())
+                    await self._book(lane, batch)
+                else:
+                    _, work, future = lane.jobs.popleft()
+                    await self._run(lane, work, future)
+        finally:
+            lane.busy = False
+            if lane.jobs:
+                lane.busy = True
+                asyncio.get_running_loop().create_task(self._drain(session_id, lane))
+
+    async def _book(self, lane: _SessionLane, batch) -> None:
+        batch = [job for job in batch if not job[2].done()]
+        if not batch:
+            return
+        self._transactions += 1
+        self._requests += len(batch)
+        try:
+            results = await self._write(lambda: self.service.create_bookings([request for request, _, _ in batch],
+                                                                            BatchMode.BEST_EFFORT))
+        except Exception as e:
+            # Another process may have moved the count the failed transaction saw
+            lane.session = None
+            for _, _, future in batch:
+                self._fail(future, e)
+            return
+
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if result.error is not None:
+                future.set_exception(result.error)
+            else:
+                future.set_result(result.booking)
+
+    async def _run(self, lane: _SessionLane, work: Callable[[], Awaitable[Any]], future: asyncio.Future) -> None:
+        if future.done():
+            return
+        self._transactions += 1
+        self._requests += 1
+        try:
+            result = await self._write(work)
+        except Exception as e:
+            lane.session = None
+            self._fail(future, e)
+        else:
+            if not future.done():
+                future.set_result(result)
+
+    @staticmethod
+    def _fail(future: asyncio.Future, error: Exception) -> None:
+        if not future.done():
+            future.set_exception(error)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue and write counters."""
+        return {
+            'sessions': len(self._lanes),
+            'queued': sum(len(lane.jobs) for lane in self._lanes.values()),
+            'transactions': self._transactions,
+            'requests': self._requests,
+            'avg_requests_per_transaction': (round(self._requests / self._transactions, 2)
+                                             if self._transactions else 0.0),
+            'rejected_from_memory': self._rejected,
+            'reloads': self._reloads,
+        }
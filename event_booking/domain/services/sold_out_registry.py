@@ -0,0 +1,70 @@
+from collections import OrderedDict
+from typing import Any, Dict
+from uuid import UUID
+import threading
+import time
+
+class SoldOutRegistry:
+    """Remaining seats per session as last seen by this process, to refuse
+    requests that cannot fit without loading the session.
+
+    The booking services record the count once the transaction of a
+    reservation attempt commits, and drop the entry when seats are
+    released or the transaction rolls back a reservation. Releases made by other
+    processes are not seen, so entries expire after ttl seconds; a stale
+    entry can only delay a booking by that long, never oversell, since
+    accepted requests still go through the guarded update.
+    """
+
+    def __init__(self, ttl: float = 2.0, max_entries: int = 100000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # session id -> (remaining seats, expiry)
+        self._remaining = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Counters exposed through stats()
+        self._rejected = 0
+        self._rejected_seats = 0
+
+    def rejects(self, session_id: UUID, num_seats: int) -> bool:
+        """Check whether num_seats are known not to be available, counting the rejection."""
+        with self._lock:
+            entry = self._remaining.get(session_id)
+            if entry is None:
+                return False
+            remaining, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._remaining[session_id]
+                return False
+            if num_seats <= remaining:
+                return False
+            self._rejected += 1
+            self._rejected_seats += num_seats
+            return True
+
+    def record(self, session_id: UUID, remaining: int) -> None:
+        """Remember that at most remaining seats are left."""
+        with self._lock:
+            self._remaining[session_id] = (max(0, remaining), time.monotonic() + self.ttl)
+            self._remaining.move_to_end(session_id)
+            while len(self._remaining) > self.max_entries:
+                self._remaining.popitem(last=False)
+
+    def released(self, session_id: UUID) -> None:
+        """Forget a session whose seats were just released."""
+        with self._lock:
+            self._remaining.pop(session_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return rejection counters and the number of sessions known to be sold out."""
+        with self._lock:
+            now = time.monotonic()
+            sold_out = sum(1 for remaining, expires_at in self._remaining.values()
+                           if remaining == 0 and expires_at > now)
+            return {
+                'rejected': self._rejected,
+                'rejected_seats': self._rejected_seats,
+                'tracked_sessions': len(self._remaining),
+                'sold_out_sessions': sold_out,
+            }
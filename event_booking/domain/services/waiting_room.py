@@ -0,0 +1,352 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from uuid import UUID, uuid4
+import base64
+import hashlib
+import hmac
+import threading
+import time
+
+class AdmissionError(Exception):
+    """Raised when a booking for a protected session has no valid admission token."""
+    pass
+
+class AdmissionTokens:
+    """HMAC-SHA256 signed tokens, verified with the shared secret and no lookup.
+
+    A token is kind:room:generation:number:expiry signed with the secret;
+    processes sharing the secret accept each other's tokens.
+    """
+
+    def __init__(self, secret: bytes):
+        if not secret:
+            raise ValueError("secret must not be empty")
+        self._secret = secret
+
+    def _sign(self, payload: bytes) -> bytes:
+        return hmac.new(self._secret, payload, hashlib.sha256).digest()
+
+    def issue(self, kind: str, room_id: UUID, generation: str, number: int, expires_at: float) -> str:
+        payload = f"{kind}:{room_id}:{generation}:{number}:{int(expires_at)}".encode()
+        return (base64.urlsafe_b64encode(payload).decode().rstrip('=') + '.'
+                + base64.urlsafe_b64encode(self._sign(payload)).decode().rstrip('='))
+
+    def verify(self, token: str, kind: str,
+               now: Optional[float] = None) -> Optional[Tuple[UUID, str, int, float]]:
+        """Return (room_id, generation, number, expires_at) of a genuine unexpired token of this kind, else None."""
+        try:
+            encoded_payload, encoded_signature = token.split('.')
+            payload = base64.urlsafe_b64decode(encoded_payload + '=' * (-len(encoded_payload) % 4))
+            signature = base64.urlsafe_b64decode(encoded_signature + '=' * (-len(encoded_signature) % 4))
+        except (ValueError, AttributeError):
+            return None
+        if not hmac.compare_digest(signature, self._sign(payload)):
+            return None
+
+        token_kind, room_id, generation, number, expires_at = payload.decode().split(':')
+        if token_kind != kind or float(expires_at) <= (now if now is not None else time.time()):
+            return None
+        return UUID(room_id), generation, int(number), float(expires_at)
+
+class WaitingRoom:
+    """Admits visitors of one session or event in arrival order at rate per second.
+
+    Visitors get consecutive numbers; everyone up to admitted_upto may
+    book. The admission front moves forward at rate while people wait and
+    runs at most burst places ahead of the last arrival, so an empty room
+    lets a burst straight in and credit does not pile up while idle.
+
+    joined, front and updated (wall clock) are the queue state a store
+    saves; a room rebuilt from them carries on where it stopped. generation
+    is new each time the room is opened, so tickets and tokens of a closed
+    queue do not count in the next one.
+    """
+
+    def __init__(self, room_id: UUID, session_ids: Iterable[UUID], rate: float, burst: int = 0,
+                 joined: int = 0, front: Optional[float] = None, updated: Optional[float] = None,
+                 generation: Optional[str] = None):
+        self.room_id = room_id
+        self.generation = generation or uuid4().hex
+        self.session_ids: FrozenSet[UUID] = frozenset(session_ids)
+        self.rate = rate
+        self.burst = burst
+        self.joined = joined
+        self.front = float(burst) if front is None else front
+        self.updated = time.time() if updated is None else updated
+
+    def configure(self, session_ids: Iterable[UUID], rate: float, burst: int) -> None:
+        self._advance()
+        self.session_ids = frozenset(session_ids)
+        self.rate = rate
+        self.burst = burst
+
+    def _advance(self) -> None:
+        now = time.time()
+        # Processes sharing a store may disagree on the clock by a little; never move back
+        self.front = min(self.joined + self.burst, self.front + self.rate * max(0.0, now - self.updated))
+        self.updated = max(self.updated, now)
+
+    @property
+    def admitted_upto(self) -> int:
+        self._advance()
+        return int(self.front)
+
+    def join(self) -> int:
+        self._advance()
+        self.joined += 1
+        return self.joined
+
+    def position(self, number: int) -> int:
+        """Visitors ahead of number, itself included; 0 once admitted."""
+        return max(0, number - self.admitted_upto)
+
+    def estimated_wait(self, number: int) -> Optional[float]:
+        """Seconds until number is admitted at the current rate; None while the room is paused."""
+        position = self.position(number)
+        if not position:
+            return 0.0
+        return position / self.rate if self.rate > 0 else None
+
+class WaitingRoomStore(ABC):
+    """Rooms, their queue state and the places that already booked.
+
+    Processes sharing a store share the rooms, hand out distinct numbers
+    and let each place book once between them.
+    """
+
+    @abstractmethod
+    def get(self, room_id: UUID) -> Optional[WaitingRoom]:
+        """Current state of a room; changes made to it are not saved."""
+        pass
+
+    @abstractmethod
+    def all(self) -> List[WaitingRoom]:
+        pass
+
+    @abstractmethod
+    def rooms_of(self, session_ids: Iterable[UUID]) -> Set[UUID]:
+        """Ids of the rooms protecting any of these sessions."""
+        pass
+
+    @abstractmethod
+    def open(self, room_id: UUID, session_ids: List[UUID], rate: float, burst: int) -> WaitingRoom:
+        """Create a room, or change the sessions, rate and burst of an open one."""
+        pass
+
+    @abstractmethod
+    def close(self, room_id: UUID) -> bool:
+        """Drop a room with its queue and used places; False if it was not open."""
+        pass
+
+    @abstractmethod
+    def join(self, room_id: UUID) -> Optional[Tuple[WaitingRoom, int]]:
+        """Take the next number in a room; None if the room is not open."""
+        pass
+
+    @abstractmethod
+    def claim(self, room_id: UUID, number: int, until: float) -> bool:
+        """Mark a place as booked until a wall-clock time; False if it already is."""
+        pass
+
+    @abstractmethod
+    def release(self, room_id: UUID, number: int) -> None:
+        pass
+
+class MemoryWaitingRoomStore(WaitingRoomStore):
+    """WaitingRoomStore of one process, lost when it exits."""
+
+    def __init__(self):
+        self._rooms: Dict[UUID, WaitingRoom] = {}
+        self._by_session: Dict[UUID, WaitingRoom] = {}
+        # (room_id, number) -> until when that place has booked
+        self._used: Dict[Tuple[UUID, int], float] = {}
+        self._next_purge = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, room_id: UUID) -> Optional[WaitingRoom]:
+        return self._rooms.get(room_id)
+
+    def all(self) -> List[WaitingRoom]:
+        with self._lock:
+            return list(self._rooms.values())
+
+    def rooms_of(self, session_ids: Iterable[UUID]) -> Set[UUID]:
+        with self._lock:
+            return {self._by_session[s].room_id for s in set(session_ids) if s in self._by_session}
+
+    def open(self, room_id: UUID, session_ids: List[UUID], rate: float, burst: int) -> WaitingRoom:
+        with self._lock:
+            room = self._rooms.get(room_id)
+            if room is None:
+                room = self._rooms[room_id] = WaitingRoom(room_id, session_ids, rate, burst)
+            else:
+                for session_id in room.session_ids:
+                    self._by_session.pop(session_id, None)
+                room.configure(session_ids, rate, burst)
+            for session_id in room.session_ids:
+                self._by_session[session_id] = room
+            return room
+
+    def close(self, room_id: UUID) -> bool:
+        with self._lock:
+            room = self._rooms.pop(room_id, None)
+            if room is None:
+                return False
+            for session_id in room.session_ids:
+                if self._by_session.get(session_id) is room:
+                    del self._by_session[session_id]
+            # A reopened room numbers from 1 again
+            self._used = {key: until for key, until in self._used.items() if key[0] != room_id}
+            return True
+
+    def join(self, room_id: UUID) -> Optional[Tuple[WaitingRoom, int]]:
+        with self._lock:
+            room = self._rooms.get(room_id)
+            return (room, room.join()) if room is not None else None
+
+    def claim(self, room_id: UUID, number: int, until: float) -> bool:
+        now = time.time()
+        with self._lock:
+            if now >= self._next_purge:
+                self._used = {key: expiry for key, expiry in self._used.items() if expiry > now}
+                self._next_purge = now + 1.0
+            key = (room_id, number)
+            if self._used.get(key, 0.0) > now:
+                return False
+            self._used[key] = until
+            return True
+
+    def release(self, room_id: UUID, number: int) -> None:
+        with self._lock:
+            self._used.pop((room_id, number), None)
+
+class WaitingRooms:
+    """Waiting rooms and the admission check of protected sessions.
+
+    Rooms, queue numbers and used places live in the store: the default
+    MemoryWaitingRoomStore keeps them in this process, a store shared by
+    every worker also shares the admission rate and survives restarts.
+    Admission tokens are checked with the secret alone. Each place in a
+    queue books once.
+    """
+
+    def __init__(self, tokens: AdmissionTokens, admission_ttl: float = 300.0, ticket_ttl: float = 6 * 3600.0,
+                 store: Optional[WaitingRoomStore] = None):
+        self.tokens = tokens
+        self.admission_ttl = admission_ttl
+        self.ticket_ttl = ticket_ttl
+        self.store = store or MemoryWaitingRoomStore()
+        self._lock = threading.Lock()
+
+        # Counters exposed through stats()
+        self._admitted_bookings = 0
+        self._refused = 0
+
+    def open(self, room_id: UUID, session_ids: Iterable[UUID], rate: float, burst: int = 0) -> WaitingRoom:
+        """Protect sessions behind a room, or change the sessions, rate and burst of an open one."""
+        if rate < 0 or burst < 0:
+            raise ValueError("rate and burst must not be negative")
+        return self.store.open(room_id, list(session_ids), rate, burst)
+
+    def close(self, room_id: UUID) -> bool:
+        """Stop protecting the sessions of a room; its queue is dropped."""
+        return self.store.close(room_id)
+
+    def join(self, room_id: UUID) -> Optional[Dict[str, Any]]:
+        """Take the next place in a room; None if the room is not open."""
+        joined = self.store.join(room_id)
+        if joined is None:
+            return None
+        room, number = joined
+        ticket = self.tokens.issue('queue', room_id, room.generation, number, time.time() + self.ticket_ttl)
+        return self._status(room, number, ticket)
+
+    def status(self, ticket: str) -> Optional[Dict[str, Any]]:
+        """Position of a queue ticket, with an admission token once admitted; None if invalid."""
+        claims = self.tokens.verify(ticket, 'queue')
+        if claims is None:
+            return None
+        room_id, generation, number, _ = claims
+        room = self.store.get(room_id)
+        if room is None or room.generation != generation:
+            return None
+        return self._status(room, number, ticket)
+
+    def _status(self, room: WaitingRoom, number: int, ticket: str) -> Dict[str, Any]:
+        position = room.position(number)
+        status = {
+            'room_id': room.room_id,
+            'ticket': ticket,
+            'position': position,
+            'estimated_wait': room.estimated_wait(number),
+            'admission_token': None,
+            'admission_expires_at': None,
+        }
+        if not position:
+            expires_at = time.time() + self.admission_ttl
+            status['admission_token'] = self.tokens.issue('admit', room.room_id, room.generation, number,
+                                                          expires_at)
+            status['admission_expires_at'] = expires_at
+        return status
+
+    def is_protected(self, session_id: UUID) -> bool:
+        return bool(self.store.rooms_of([session_id]))
+
+    def admit(self, token: Optional[str], session_ids: Iterable[UUID]) -> Optional[Tuple[UUID, int]]:
+        """Use an admission token for bookings of these sessions.
+
+        Returns the token's (room_id, number) to pass to release if the
+        bookings could not be attempted, or None when no session is
+        protected. Raises AdmissionError when the token is missing,
+        forged, expired, already used or for another room.
+        """
+        rooms = self.store.rooms_of(session_ids)
+        if not rooms:
+            return None
+        claims = self.tokens.verify(token, 'admit') if token else None
+        if claims is None or rooms != {claims[0]}:
+            self._count(refused=True)
+            raise AdmissionError("A valid admission token from the waiting room is required")
+
+        room_id, generation, number, _ = claims
+        room = self.store.get(room_id)
+        if room is None or room.generation != generation:
+            # Issued before the room was closed and opened again
+            self._count(refused=True)
+            raise AdmissionError("Admission token is from an earlier opening of the waiting room")
+        if not self.store.claim(room_id, number, time.time() + self.ticket_ttl):
+            self._count(refused=True)
+            raise AdmissionError("Admission token already used")
+        self._count(refused=False)
+        return room_id, number
+
+    def _count(self, refused: bool) -> None:
+        with self._lock:
+            if refused:
+                self._refused += 1
+            else:
+                self._admitted_bookings += 1
+
+    def release(self, key: Tuple[UUID, int]) -> None:
+        """Give back an admission token whose booking failed before reaching the service."""
+        self.store.release(*key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-room queue state and admission counters."""
+        rooms: List[Dict[str, Any]] = []
+        for room in self.store.all():
+            admitted = min(room.joined, room.admitted_upto)
+            rooms.append({
+                'room_id': str(room.room_id),
+                'sessions': len(room.session_ids),
+                'rate': room.rate,
+                'burst': room.burst,
+                'joined': room.joined,
+                'admitted': admitted,
+                'waiting': room.joined - admitted,
+            })
+        return {
+            'rooms': rooms,
+            'bookings_admitted': self._admitted_bookings,
+            'bookings_refused': self._refused,
+        }
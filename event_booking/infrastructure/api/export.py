@@ -0,0 +1,52 @@
+from typing import Any, AsyncIterator, Dict, List
+import csv
+import io
+import json
+
+from ...domain.entities.booking import Booking
+
+EXPORT_FIELDS = ['id', 'user_id', 'session_id', 'seats', 'price_per_seat', 'status',
+                 'created_at', 'confirmed_at', 'cancelled_at']
+
+# Bookings serialized per chunk written to the response
+EXPORT_BATCH_SIZE = 500
+
+def booking_record(booking: Booking) -> Dict[str, Any]:
+    """Flatten a booking into JSON and CSV friendly strings."""
+    return {
+        'id': str(booking.id),
+        'user_id': str(booking.user_id),
+        'session_id': str(booking.session_id),
+        'seats': booking.seats,
+        'price_per_seat': str(booking.price_per_seat),
+        'status': booking.status.value,
+        'created_at': booking.created_at.isoformat(),
+        'confirmed_at': booking.confirmed_at.isoformat() if booking.confirmed_at else None,
+        'cancelled_at': booking.cancelled_at.isoformat() if booking.cancelled_at else None,
+    }
+
+async def _batches(bookings: AsyncIterator[Booking], size: int) -> AsyncIterator[List[Booking]]:
+    batch = []
+    async for booking in bookings:
+        batch.append(booking)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+async def ndjson_stream(bookings: AsyncIterator[Booking], batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[str]:
+    async for batch in _batches(bookings, batch_size):
+        yield "".join(json.dumps(booking_record(booking)) + "\n" for booking in batch)
+
+async def csv_stream(bookings: AsyncIterator[Booking], batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    # The header goes out before the first row is fetched
+    yield buffer.getvalue()
+    async for batch in _batches(bookings, batch_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(booking_record(booking) for booking in batch)
+        yield buffer.getvalue()
@@ -1,42 +1,189 @@
-from datetime import datetime
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
 from decimal import Decimal
 from typing import List, Optional
 from uuid import UUID
 import os
 import logging
+import pymysql
 
-from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
 from ...domain.entities.booking import BookingStatus
-from ...domain.services.booking_service import BookingService, BookingError
-from ...domain.services.event_service import EventService, EventError
-from ..persistence.connection_pool import DatabaseConnectionPool
+from ...domain.repositories.pagination import PageCursor, decode_cursor, encode_cursor
+from ...domain.services.async_booking_service import AsyncBookingService
+from ...domain.services.async_event_service import AsyncEventService
+from ...domain.services.booking_batcher import BookingBatcher
+from ...domain.services.booking_service import (
+    BatchBookingError, BatchMode, BookingError, BookingRequest, BookingService
+)
+from ...domain.services.event_service import EventError
+from ...domain.services.session_writers import SessionWriters
+from ...domain.services.sold_out_registry import SoldOutRegistry
+from ...domain.services.waiting_room import AdmissionError, AdmissionTokens, WaitingRooms
+from ..cache.cached_event_repository import AsyncCachingEventRepository
+from ..cache.catalog_snapshot import (
+    AsyncSnapshotEventRepository, CatalogChanges, CatalogSnapshotPublisher, CatalogSnapshotReader,
+    CatalogSnapshotWriter
+)
+from ..cache.ttl_cache import TTLCache
+from .export import csv_stream, ndjson_stream
+from ..config.booking import get_booking_config
+from ..config.cache import get_cache_config
+from ..config.database import (
+    get_async_pool_options, get_database_config, get_pool_options, get_read_pool_options, get_retry_options
+)
+from ..persistence.async_connection_pool import AsyncDatabaseConnectionPool
+from ..persistence.async_mariadb_booking_repository import AsyncMariaDBBookingRepository
+from ..persistence.async_mariadb_event_repository import AsyncMariaDBEventRepository
+from ..persistence.connection_pool import DatabaseConnectionPool, ConnectionPoolError
+from ..persistence.intake_queue import BookingIntakeQueue, IntakeStatus
 from ..persistence.mariadb_booking_repository import MariaDBBookingRepository
 from ..persistence.mariadb_event_repository import MariaDBEventRepository
+from ..persistence.mariadb_unit_of_work import AsyncMariaDBUnitOfWork, MariaDBUnitOfWork
+from ..persistence.read_write_pool import AsyncReadWritePool
+from ..persistence.retry import RetryPolicy
+from ..persistence.waiting_room_store import SQLiteWaitingRoomStore
+from ..tasks.booking_intake import BookingIntakeWorkers
+from ..tasks.hold_sweeper import HoldSweeper
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Initialisation de la pool de connexions
+db_config = get_database_config()
+db_connection = {
+    'host': os.getenv('DB_HOST', 'haproxy'),
+    'port': int(os.getenv('DB_PORT', '3306')),
+    'user': os.getenv('DB_USER', 'app_user'),
+    'password': os.getenv('DB_PASSWORD', 'app_password'),
+    'database': os.getenv('DB_NAME', 'event_booking'),
+}
 try:
-    DatabaseConnectionPool.get_instance(
-        host=os.getenv('DB_HOST', 'haproxy'),
-        port=int(os.getenv('DB_PORT', '3306')),
-        user=os.getenv('DB_USER', 'app_user'),
-        password=os.getenv('DB_PASSWORD', 'app_password'),
-        database=os.getenv('DB_NAME', 'event_booking')
-    )
+    # Pool synchrone pour les tâches de fond (publication du snapshot)
+    DatabaseConnectionPool.get_instance(**db_connection, **get_pool_options(db_config))
     logger.info("Database connection pool initialized successfully")
 except Exception as e:
     logger.error(f"Failed to initialize database connection pool: {str(e)}")
     raise
 
+# Pools asyncio utilisées par les endpoints ; ouvertes au démarrage sur la boucle d'événements.
+# Les écritures passent par le nœud écrivain, les lectures par tous les nœuds si DB_READ_HOST est défini
+read_pool = None
+if db_config['read_host']:
+    read_pool = AsyncDatabaseConnectionPool(
+        **{**db_connection, 'host': db_config['read_host'], 'port': db_config['read_port']},
+        **get_read_pool_options(db_config)
+    )
+async_pool = AsyncReadWritePool(
+    AsyncDatabaseConnectionPool(**db_connection, **get_async_pool_options(db_config)),
+    read_pool,
+    sync_wait=db_config['read_sync_wait']
+)
+
+# Rejoue les transactions en conflit (deadlock, certification Galera) ; partagée pour les métriques
+retry_policy = RetryPolicy(**get_retry_options(db_config))
+
+# Les réservations PENDING bloquent leurs places pendant hold_ttl ; le balayeur libère les expirées.
+# Chaque worker a le sien : SKIP LOCKED répartit les lots entre eux
+booking_config = get_booking_config()
+hold_ttl = timedelta(seconds=booking_config['hold_ttl']) if booking_config['hold_ttl'] > 0 else None
+
+# Séances complètes connues du processus : refusées sans requête, oubliées dès qu'une place se libère.
+# Partagé par tous les services de réservation, balayeur compris
+sold_out_registry = SoldOutRegistry(ttl=booking_config['sold_out_ttl']) \
+    if booking_config['sold_out_cache'] else None
+hold_sweeper = None
+if hold_ttl is not None:
+    sync_pool = DatabaseConnectionPool.get_instance()
+    hold_sweeper = HoldSweeper(
+        BookingService(MariaDBBookingRepository(sync_pool), MariaDBEventRepository(sync_pool),
+                       MariaDBUnitOfWork(sync_pool, retry_policy), hold_ttl=hold_ttl, sold_out=sold_out_registry),
+        interval=booking_config['sweep_interval'],
+        batch_size=booking_config['sweep_batch_size'],
+        max_batches=booking_config['sweep_max_batches']
+    )
+
+# File d'entrée durable : POST /bookings/ répond 202 avec un ticket, des threads réservent par lots.
+# Les workers qui partagent le fichier SQLite se répartissent les demandes
+booking_intake = None
+if booking_config['intake']:
+    sync_pool = DatabaseConnectionPool.get_instance()
+    booking_intake = BookingIntakeWorkers(
+        BookingIntakeQueue(booking_config['intake_path']),
+        BookingService(MariaDBBookingRepository(sync_pool), MariaDBEventRepository(sync_pool),
+                       MariaDBUnitOfWork(sync_pool, retry_policy), hold_ttl=hold_ttl, sold_out=sold_out_registry),
+        workers=booking_config['intake_workers'],
+        batch_size=booking_config['intake_batch_size'],
+        max_attempts=booking_config['intake_max_attempts'],
+        retention=booking_config['intake_retention']
+    )
+
+# Salles d'attente des mises en vente : jetons d'admission signés (HMAC), vérifiés sans la base.
+# Salles, numéros et places utilisées sont dans un fichier SQLite partagé par les workers de l'hôte
+# et conservé au redémarrage
+waiting_room_secret = booking_config['waiting_room_secret'].encode()
+if not waiting_room_secret:
+    logger.warning("WAITING_ROOM_SECRET is not set: admission tokens are only valid in this process")
+    waiting_room_secret = os.urandom(32)
+waiting_room_store = SQLiteWaitingRoomStore(booking_config['waiting_room_path'])
+waiting_rooms = WaitingRooms(AdmissionTokens(waiting_room_secret), admission_ttl=booking_config['admission_ttl'],
+                             store=waiting_room_store)
+
+# Cache du catalogue partagé par toutes les requêtes du worker
+cache_config = get_cache_config()
+event_cache = TTLCache(maxsize=cache_config['maxsize'], ttl=cache_config['ttl']) \
+    if cache_config['enabled'] else None
+
+# Snapshot du catalogue partagé entre workers ; un seul worker le publie.
+# Il ne sert que les listes d'événements ; chaque écriture, quel que soit
+# le worker, le signale au publieur par le fichier de changements
+snapshot_reader = None
+snapshot_publisher = None
+catalog_changes = None
+if cache_config['snapshot_path']:
+    snapshot_reader = CatalogSnapshotReader(cache_config['snapshot_path'])
+    catalog_changes = CatalogChanges(cache_config['snapshot_path'] + '.changes')
+    snapshot_publisher = CatalogSnapshotPublisher(
+        CatalogSnapshotWriter(
+            MariaDBEventRepository(DatabaseConnectionPool.get_instance()),
+            cache_config['snapshot_path'],
+            # Une transaction par publication : jamais la vue figée d'une lecture précédente
+            MariaDBUnitOfWork(DatabaseConnectionPool.get_instance(), retry_policy)
+        ),
+        catalog_changes,
+        interval=cache_config['snapshot_interval']
+    )
+    if snapshot_publisher.start():
+        logger.info("This worker publishes the catalog snapshot")
+    else:
+        snapshot_publisher = None
+
 app = FastAPI(title="Event Booking System")
 
+@app.on_event("startup")
+async def open_async_pool():
+    await async_pool.open()
+    if hold_sweeper is not None:
+        hold_sweeper.start()
+    if booking_intake is not None:
+        booking_intake.start()
+
+@app.on_event("shutdown")
+async def close_async_pool():
+    if hold_sweeper is not None:
+        hold_sweeper.stop()
+    if booking_intake is not None:
+        booking_intake.stop()
+    waiting_room_store.disconnect()
+    await async_pool.close()
+
 # Configuration CORS simplifiée
 app.add_middleware(
     CORSMiddleware,
@@ -52,7 +199,8 @@ async def add_cors_headers(request: Request, call_next):
     response.headers["Access-Control-Allow-Origin"] = "*"
     response.headers["Access-Control-Allow-Credentials"] = "true"
     response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
-    response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
+    response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization, X-Admission-Token"
+    response.headers["Access-Control-Expose-Headers"] = "X-Next-Cursor"
     return response
 
 @app.options("/{full_path:path}")
@@ -62,10 +210,29 @@ async def options_handler(request: Request):
         headers={
             "Access-Control-Allow-Origin": "*",
             "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
-            "Access-Control-Allow-Headers": "Content-Type, Authorization",
+            "Access-Control-Allow-Headers": "Content-Type, Authorization, X-Admission-Token",
         },
     )
 
+@app.exception_handler(AdmissionError)
+async def admission_error_handler(request: Request, exc: AdmissionError):
+    return JSONResponse(status_code=403, content={"detail": str(exc)})
+
+@app.exception_handler(ConnectionPoolError)
+async def connection_pool_error_handler(request: Request, exc: ConnectionPoolError):
+    logger.warning(f"Database connection unavailable: {exc}")
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+@app.exception_handler(pymysql.err.OperationalError)
+async def database_error_handler(request: Request, exc: pymysql.err.OperationalError):
+    if retry_policy.is_retryable(exc):
+        # Conflit persistant malgré les rejeux : le client peut réessayer plus tard
+        logger.warning(f"Transaction conflict not resolved by retries: {exc}")
+        return JSONResponse(status_code=503, content={"detail": "Transaction conflict, retry later"},
+                            headers={"Retry-After": "1"})
+    logger.error(f"Database error: {exc}")
+    return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
+
 # DTOs
 class EventCreate(BaseModel):
     name: str
@@ -108,28 +275,140 @@ class BookingResponse(BaseModel):
     session_id: UUID
     seats: int
     price_per_seat: Decimal
-    status: str
+    status: BookingStatus
     created_at: datetime
     confirmed_at: Optional[datetime]
     cancelled_at: Optional[datetime]
 
+class BookingTicketResponse(BaseModel):
+    ticket: UUID
+    user_id: UUID
+    session_id: UUID
+    seats: int
+    status: IntakeStatus
+    booking_id: Optional[UUID] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+class WaitingRoomStatus(BaseModel):
+    room_id: UUID
+    ticket: str
+    position: int
+    estimated_wait: Optional[float]
+    admission_token: Optional[str]
+    admission_expires_at: Optional[float]
+
+MAX_BATCH_SIZE = int(os.getenv('API_MAX_BATCH_SIZE', '500'))
+
+class BatchBookingCreate(BaseModel):
+    items: List[BookingCreate] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+    mode: BatchMode = BatchMode.ALL_OR_NOTHING
+
+class BatchBookingItemResponse(BaseModel):
+    user_id: UUID
+    session_id: UUID
+    seats: int
+    booking: Optional[BookingResponse] = None
+    error: Optional[str] = None
+
+def batch_results_response(results) -> List[dict]:
+    return [
+        {
+            "user_id": result.request.user_id,
+            "session_id": result.request.session_id,
+            "seats": result.request.seats,
+            "booking": result.booking,
+            "error": str(result.error) if result.error else None
+        }
+        for result in results
+    ]
+
+# Pagination
+DEFAULT_PAGE_SIZE = int(os.getenv('API_DEFAULT_PAGE_SIZE', '100'))
+MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', '500'))
+
+def parse_cursor(cursor: Optional[str]) -> Optional[PageCursor]:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def set_next_cursor(response: Response, items: list, limit: int) -> None:
+    """Expose the cursor of the next page when this page is full."""
+    if len(items) == limit:
+        last = items[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+
 # Dependencies
+def get_event_repository(pool):
+    repository = AsyncMariaDBEventRepository(pool)
+    if event_cache is not None:
+        repository = AsyncCachingEventRepository(repository, event_cache, cache_config['availability_ttl'])
+    if snapshot_reader is not None:
+        repository = AsyncSnapshotEventRepository(snapshot_reader, repository, catalog_changes.bump)
+    return repository
+
 def get_event_service():
-    pool = DatabaseConnectionPool.get_instance()
-    repository = MariaDBEventRepository(pool)
-    return EventService(repository)
+    return AsyncEventService(get_event_repository(async_pool))
 
 def get_booking_service():
-    pool = DatabaseConnectionPool.get_instance()
-    event_repository = MariaDBEventRepository(pool)
-    booking_repository = MariaDBBookingRepository(pool)
-    return BookingService(booking_repository, event_repository)
+    event_repository = get_event_repository(async_pool)
+    booking_repository = AsyncMariaDBBookingRepository(async_pool)
+    return AsyncBookingService(booking_repository, event_repository, AsyncMariaDBUnitOfWork(async_pool, retry_policy),
+                               hold_ttl=hold_ttl, sold_out=sold_out_registry)
+
+# Une seule file d'écriture par séance : réservations, confirmations et annulations
+# d'une séance ne se disputent plus ses verrous de ligne
+session_writers = SessionWriters(
+    get_booking_service(),
+    state_ttl=booking_config['session_state_ttl'],
+    max_batch_size=booking_config['batch_max_size']
+) if booking_config['session_writers'] else None
+
+# Sur demande (BOOKING_GROUP_COMMIT), les réservations simultanées d'une même séance partagent
+# une transaction (group commit)
+booking_batcher = BookingBatcher(
+    get_booking_service(),
+    window=booking_config['batch_window'],
+    max_batch_size=booking_config['batch_max_size']
+) if booking_config['group_commit'] and session_writers is None else None
+
+# Monitoring endpoints
+@app.get("/metrics")
+async def metrics():
+    stats = {
+        "pool": DatabaseConnectionPool.get_instance().stats(),
+        "async_pool": async_pool.stats(),
+        "transaction_retries": retry_policy.stats()
+    }
+    if hold_sweeper is not None:
+        stats["hold_sweeper"] = hold_sweeper.stats()
+    if booking_batcher is not None:
+        stats["booking_batcher"] = booking_batcher.stats()
+    if session_writers is not None:
+        stats["session_writers"] = session_writers.stats()
+    if booking_intake is not None:
+        stats["booking_intake"] = await run_in_threadpool(booking_intake.stats)
+    stats["waiting_rooms"] = await run_in_threadpool(waiting_rooms.stats)
+    if sold_out_registry is not None:
+        stats["sold_out"] = sold_out_registry.stats()
+    if event_cache is not None:
+        stats["event_cache"] = event_cache.stats()
+    if snapshot_reader is not None:
+        stats["catalog_snapshot"] = {
+            "version": snapshot_reader.version,
+            "publisher": snapshot_publisher is not None
+        }
+    return stats
 
 # Event endpoints
 @app.post("/events/", response_model=EventResponse)
-async def create_event(event: EventCreate, service: EventService = Depends(get_event_service)):
+async def create_event(event: EventCreate, service: AsyncEventService = Depends(get_event_service)):
     try:
-        created_event = service.create_event(
+        created_event = await service.create_event(
             name=event.name,
             description=event.description,
             venue=event.venue,
@@ -140,22 +419,30 @@ async def create_event(event: EventCreate, service: EventService = Depends(get_e
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/events/", response_model=List[EventResponse])
-async def list_events(category: Optional[str] = None, service: EventService = Depends(get_event_service)):
+async def list_events(
+    response: Response,
+    category: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    service: AsyncEventService = Depends(get_event_service)
+):
+    after = parse_cursor(cursor)
     try:
         logger.info(f"Fetching events with category: {category}")
         if category:
-            events = service.get_events_by_category(category)
+            events = await service.get_events_by_category(category, limit=limit, after=after)
         else:
-            events = service.event_repository.find_all()
+            events = await service.event_repository.find_all(limit=limit, after=after)
         logger.info(f"Found {len(events)} events")
+        set_next_cursor(response, events, limit)
         return events
     except Exception as e:
         logger.error(f"Error fetching events: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/events/{event_id}", response_model=EventResponse)
-async def get_event(event_id: UUID, service: EventService = Depends(get_event_service)):
-    event = service.event_repository.find_by_id(event_id)
+async def get_event(event_id: UUID, service: AsyncEventService = Depends(get_event_service)):
+    event = await service.event_repository.find_by_id(event_id)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
     return event
@@ -164,31 +451,33 @@ async def get_event(event_id: UUID, service: EventService = Depends(get_event_se
 async def add_session(
     event_id: UUID,
     session: SessionCreate,
-    service: EventService = Depends(get_event_service)
+    service: AsyncEventService = Depends(get_event_service)
 ):
     try:
-        created_session = service.add_session(
-            event_id=event_id,
-            start_time=session.start_time,
-            end_time=session.end_time,
-            capacity=session.capacity,
-            base_price=session.base_price
-        )
+        # L'événement vient peut-être d'être créé : lecture cohérente avec le nœud écrivain
+        async with async_pool.consistent_reads():
+            created_session = await service.add_session(
+                event_id=event_id,
+                start_time=session.start_time,
+                end_time=session.end_time,
+                capacity=session.capacity,
+                base_price=session.base_price
+            )
         return created_session
     except EventError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/events/{event_id}/sessions", response_model=List[SessionResponse])
-async def list_sessions(event_id: UUID, service: EventService = Depends(get_event_service)):
+async def list_sessions(event_id: UUID, service: AsyncEventService = Depends(get_event_service)):
     try:
-        return service.get_available_sessions(event_id)
+        return await service.get_available_sessions(event_id)
     except EventError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.delete("/events/{event_id}")
-async def delete_event(event_id: UUID, service: EventService = Depends(get_event_service)):
+async def delete_event(event_id: UUID, service: AsyncEventService = Depends(get_event_service)):
     try:
-        success = service.delete_event(event_id)
+        success = await service.delete_event(event_id)
         if success:
             return {"message": "Event deleted successfully"}
         raise HTTPException(status_code=404, detail="Event not found")
@@ -199,44 +488,108 @@ async def delete_event(event_id: UUID, service: EventService = Depends(get_event
 @app.post("/bookings/", response_model=BookingResponse)
 async def create_booking(
     booking: BookingCreate,
-    service: BookingService = Depends(get_booking_service)
+    service: AsyncBookingService = Depends(get_booking_service),
+    admission_token: Optional[str] = Header(None, alias="X-Admission-Token")
 ):
+    async with admitted(admission_token, [booking.session_id]):
+        if booking_intake is not None:
+            return await enqueue_booking(booking)
+        try:
+            created_booking = await (session_writers or booking_batcher or service).create_booking(
+                user_id=booking.user_id,
+                session_id=booking.session_id,
+                num_seats=booking.seats
+            )
+            return created_booking
+        except BookingError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+@asynccontextmanager
+async def admitted(admission_token: Optional[str], session_ids: List[UUID]):
+    # Séances protégées par une salle d'attente : chaque place admise réserve une fois
+    place = await run_in_threadpool(waiting_rooms.admit, admission_token, session_ids)
     try:
-        created_booking = service.create_booking(
-            user_id=booking.user_id,
-            session_id=booking.session_id,
-            num_seats=booking.seats
-        )
-        return created_booking
-    except BookingError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        yield
+    except (ConnectionPoolError, pymysql.err.OperationalError):
+        # Panne technique avant toute réservation : la place reste utilisable
+        if place is not None:
+            await run_in_threadpool(waiting_rooms.release, place)
+        raise
+
+async def enqueue_booking(booking: BookingCreate) -> JSONResponse:
+    # Validation seulement ; la réservation est faite par les threads de booking_intake
+    if booking.seats <= 0:
+        raise HTTPException(status_code=400, detail="Number of seats must be positive")
+    if sold_out_registry is not None and sold_out_registry.rejects(booking.session_id, booking.seats):
+        raise HTTPException(status_code=400, detail="Not enough seats available")
+    record = await run_in_threadpool(booking_intake.queue.enqueue, booking.user_id, booking.session_id,
+                                     booking.seats)
+    booking_intake.notify()
+    return JSONResponse(
+        status_code=202,
+        content=jsonable_encoder(BookingTicketResponse(**vars(record))),
+        headers={"Location": f"/bookings/requests/{record.ticket}"}
+    )
+
+@app.get("/bookings/requests/{ticket}", response_model=BookingTicketResponse)
+async def get_booking_request(ticket: UUID):
+    if booking_intake is None:
+        raise HTTPException(status_code=404, detail="Booking intake is disabled")
+    record = await run_in_threadpool(booking_intake.queue.get, ticket)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Booking request not found")
+    return vars(record)
+
+@app.post("/bookings/batch", response_model=List[BatchBookingItemResponse])
+async def create_bookings(
+    batch: BatchBookingCreate,
+    service: AsyncBookingService = Depends(get_booking_service),
+    admission_token: Optional[str] = Header(None, alias="X-Admission-Token")
+):
+    requests = [BookingRequest(item.user_id, item.session_id, item.seats) for item in batch.items]
+    async with admitted(admission_token, [request.session_id for request in requests]):
+        try:
+            results = await service.create_bookings(requests, batch.mode)
+        except BatchBookingError as e:
+            # Rien n'a été réservé ; le détail indique quelles demandes ont échoué
+            return JSONResponse(
+                status_code=409,
+                content={"detail": str(e), "results": jsonable_encoder(batch_results_response(e.results))}
+            )
+    return batch_results_response(results)
 
 @app.post("/bookings/{booking_id}/confirm", response_model=BookingResponse)
 async def confirm_booking(
     booking_id: UUID,
-    service: BookingService = Depends(get_booking_service)
+    service: AsyncBookingService = Depends(get_booking_service)
 ):
     try:
-        return service.confirm_booking(booking_id)
+        return await (session_writers or service).confirm_booking(booking_id)
     except BookingError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/bookings/{booking_id}/cancel", response_model=BookingResponse)
 async def cancel_booking(
     booking_id: UUID,
-    service: BookingService = Depends(get_booking_service)
+    service: AsyncBookingService = Depends(get_booking_service)
 ):
     try:
-        return service.cancel_booking(booking_id)
+        return await (session_writers or service).cancel_booking(booking_id)
     except BookingError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/bookings/{booking_id}", response_model=BookingResponse)
 async def get_booking(
     booking_id: UUID,
-    service: BookingService = Depends(get_booking_service)
+    consistent: bool = False,
+    service: AsyncBookingService = Depends(get_booking_service)
 ):
-    booking = service.booking_repository.find_by_id(booking_id)
+    if consistent:
+        # Relecture d'une réservation tout juste créée : attendre que le nœud lu soit à jour
+        async with async_pool.consistent_reads():
+            booking = await service.booking_repository.find_by_id(booking_id)
+    else:
+        booking = await service.booking_repository.find_by_id(booking_id)
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
     return booking
@@ -244,6 +597,92 @@ async def get_booking(
 @app.get("/users/{user_id}/bookings", response_model=List[BookingResponse])
 async def list_user_bookings(
     user_id: UUID,
-    service: BookingService = Depends(get_booking_service)
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    service: AsyncBookingService = Depends(get_booking_service)
+):
+    bookings = await service.booking_repository.find_by_user_id(user_id, limit=limit, after=parse_cursor(cursor))
+    set_next_cursor(response, bookings, limit)
+    return bookings
+
+# Admin endpoints
+@app.get("/admin/bookings/export")
+async def export_bookings(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    session_id: Optional[UUID] = None,
+    status: Optional[BookingStatus] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
 ):
-    return service.booking_repository.find_by_user_id(user_id) 
\ No newline at end of file
+    filters = [session_id is not None, status is not None,
+               created_from is not None or created_to is not None]
+    if sum(filters) != 1:
+        raise HTTPException(
+            status_code=400,
+            detail="Filter by exactly one of session_id, status or created_from/created_to"
+        )
+
+    # Le flux garde sa propre connexion jusqu'au dernier octet envoyé
+    repository = AsyncMariaDBBookingRepository(async_pool)
+    if session_id is not None:
+        bookings = repository.iter_by_session_id(session_id)
+    elif status is not None:
+        bookings = repository.iter_by_status(status)
+    else:
+        bookings = repository.iter_by_created_between(created_from, created_to)
+
+    if format == "csv":
+        return StreamingResponse(csv_stream(bookings), media_type="text/csv",
+                                 headers={"Content-Disposition": "attachment; filename=bookings.csv"})
+    return StreamingResponse(ndjson_stream(bookings), media_type="application/x-ndjson")
+
+@app.post("/admin/sessions/{session_id}/seat-shards")
+async def shard_session_seats(session_id: UUID, shards: int = Query(..., ge=2, le=256)):
+    # Pour les mises en vente très demandées : le compteur de places est réparti sur plusieurs lignes
+    repository = AsyncMariaDBEventRepository(async_pool)
+    if not await repository.shard_seats(session_id, shards):
+        raise HTTPException(status_code=409, detail="Session not found or already sharded")
+    return {"session_id": str(session_id), "seat_shards": shards}
+
+# Salles d'attente : le débit d'admission borne la charge qui atteint BookingService
+@app.post("/admin/sessions/{session_id}/waiting-room")
+async def open_session_waiting_room(session_id: UUID, rate: float = Query(..., ge=0),
+                                    burst: int = Query(0, ge=0)):
+    if not await get_event_repository(async_pool).find_session(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    await run_in_threadpool(waiting_rooms.open, session_id, [session_id], rate, burst)
+    return {"room_id": str(session_id), "sessions": 1, "rate": rate, "burst": burst}
+
+@app.post("/admin/events/{event_id}/waiting-room")
+async def open_event_waiting_room(event_id: UUID, rate: float = Query(..., ge=0),
+                                  burst: int = Query(0, ge=0)):
+    event = await get_event_repository(async_pool).find_by_id(event_id)
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    await run_in_threadpool(waiting_rooms.open, event_id, [session.id for session in event.sessions], rate, burst)
+    return {"room_id": str(event_id), "sessions": len(event.sessions), "rate": rate, "burst": burst}
+
+@app.delete("/admin/waiting-rooms/{room_id}")
+async def close_waiting_room(room_id: UUID):
+    if not await run_in_threadpool(waiting_rooms.close, room_id):
+        raise HTTPException(status_code=404, detail="Waiting room not found")
+    return {"room_id": str(room_id), "closed": True}
+
+@app.get("/admin/waiting-rooms")
+async def waiting_room_stats():
+    return await run_in_threadpool(waiting_rooms.stats)
+
+@app.post("/waiting-rooms/{room_id}/join", response_model=WaitingRoomStatus)
+async def join_waiting_room(room_id: UUID):
+    status = await run_in_threadpool(waiting_rooms.join, room_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Waiting room not found")
+    return status
+
+@app.get("/waiting-rooms/{room_id}/status", response_model=WaitingRoomStatus)
+async def waiting_room_status(room_id: UUID, ticket: str):
+    status = await run_in_threadpool(waiting_rooms.status, ticket)
+    if status is None or status["room_id"] != room_id:
+        raise HTTPException(status_code=404, detail="Unknown or expired ticket")
+    return status
@@ -0,0 +1,195 @@
+from copy import deepcopy
+from typing import List, Optional
+from uuid import UUID
+
+from ...domain.entities.event import Event
+from ...domain.entities.session import Session
+from ...domain.repositories.async_event_repository import AsyncEventRepository
+from ...domain.repositories.event_repository import EventRepository
+from ...domain.repositories.pagination import PageCursor
+from .ttl_cache import MISSING, TTLCache
+
+class _EventCache:
+    """Keys and invalidation shared by the sync and async caching repositories."""
+
+    def __init__(self, delegate, cache: TTLCache, availability_ttl: float = 2.0):
+        self.delegate = delegate
+        self.cache = cache
+        self.availability_ttl = availability_ttl
+
+    def _lookup(self, key, ttl: Optional[float]):
+        """Return a copy of the cached value, or MISSING when it must be loaded."""
+        if ttl is not None and ttl <= 0:
+            return MISSING
+        value = self.cache.get(key)
+        return value if value is MISSING else deepcopy(value)
+
+    def _store(self, key, value, ttl: Optional[float]) -> None:
+        if value is not None and (ttl is None or ttl > 0):
+            self.cache.set(key, deepcopy(value), ttl)
+
+    def _remember_session_event(self, session_id: UUID, event: Optional[Event]) -> None:
+        # A session never moves to another event, so the mapping follows the catalog TTL
+        if event is not None:
+            self.cache.set(('session_event', session_id), event.id)
+            self._store(('event', event.id), event, self.availability_ttl)
+
+    def _invalidate_session(self, session_id: UUID) -> None:
+        self.cache.invalidate(('session', session_id))
+        event_id = self.cache.peek(('session_event', session_id))
+        if event_id is not MISSING:
+            self.cache.invalidate(('event', event_id))
+
+    def _invalidate_event(self, event: Event) -> None:
+        self.cache.invalidate(('event', event.id))
+        for session in event.sessions:
+            self.cache.invalidate(('session', session.id))
+        self._invalidate_listings()
+
+    def _invalidate_listings(self) -> None:
+        self.cache.invalidate_matching(lambda key: key[0] in ('all', 'category'))
+
+class CachingEventRepository(_EventCache, EventRepository):
+    """Read-through cache in front of another EventRepository.
+
+    Events embed their sessions and seat counts, and reserve/release_seats
+    only invalidate the session touched, so single events, sessions and
+    listings are all kept for availability_ttl (0 bypasses the cache).
+    Writes made through this repository invalidate the affected keys;
+    callers always receive copies they are free to mutate.
+    """
+
+    def __init__(self, delegate: EventRepository, cache: TTLCache, availability_ttl: float = 2.0):
+        super().__init__(delegate, cache, availability_ttl)
+
+    def _cached(self, key, ttl: Optional[float], load):
+        value = self._lookup(key, ttl)
+        if value is MISSING:
+            value = load()
+            self._store(key, value, ttl)
+        return value
+
+    def save(self, event: Event) -> Event:
+        saved = self.delegate.save(event)
+        self._invalidate_event(event)
+        return saved
+
+    def find_by_id(self, event_id: UUID) -> Optional[Event]:
+        return self._cached(('event', event_id), self.availability_ttl,
+                            lambda: self.delegate.find_by_id(event_id))
+
+    def find_all(self, limit: Optional[int] = None,
+                 after: Optional[PageCursor] = None) -> List[Event]:
+        return self._cached(('all', limit, after), self.availability_ttl,
+                            lambda: self.delegate.find_all(limit=limit, after=after))
+
+    def find_by_category(self, category: str, limit: Optional[int] = None,
+                         after: Optional[PageCursor] = None) -> List[Event]:
+        return self._cached(('category', category, limit, after), self.availability_ttl,
+                            lambda: self.delegate.find_by_category(category, limit=limit, after=after))
+
+    def find_session(self, session_id: UUID) -> Optional[Session]:
+        return self._cached(('session', session_id), self.availability_ttl,
+                            lambda: self.delegate.find_session(session_id))
+
+    def find_event_by_session_id(self, session_id: UUID) -> Optional[Event]:
+        event_id = self.cache.get(('session_event', session_id))
+        if event_id is not MISSING:
+            return self.find_by_id(event_id)
+        event = self.delegate.find_event_by_session_id(session_id)
+        self._remember_session_event(session_id, event)
+        return event
+
+    def reserve_seats(self, session_id: UUID, num_seats: int) -> Optional[int]:
+        booked_seats = self.delegate.reserve_seats(session_id, num_seats)
+        self._invalidate_session(session_id)
+        return booked_seats
+
+    def release_seats(self, session_id: UUID, num_seats: int) -> Optional[int]:
+        booked_seats = self.delegate.release_seats(session_id, num_seats)
+        self._invalidate_session(session_id)
+        return booked_seats
+
+    def delete(self, event_id: UUID) -> bool:
+        cached = self.cache.peek(('event', event_id))
+        deleted = self.delegate.delete(event_id)
+        if cached is not MISSING:
+            self._invalidate_event(cached)
+        else:
+            self.cache.invalidate(('event', event_id))
+            self._invalidate_listings()
+        return deleted
+
+    def update(self, event: Event) -> Event:
+        updated = self.delegate.update(event)
+        self._invalidate_event(event)
+        return updated
+
+class AsyncCachingEventRepository(_EventCache, AsyncEventRepository):
+    """CachingEventRepository for an AsyncEventRepository, sharing the same TTLCache semantics."""
+
+    def __init__(self, delegate: AsyncEventRepository, cache: TTLCache, availability_ttl: float = 2.0):
+        super().__init__(delegate, cache, availability_ttl)
+
+    async def _cached(self, key, ttl: Optional[float], load):
+        value = self._lookup(key, ttl)
+        if value is MISSING:
+            value = await load()
+            self._store(key, value, ttl)
+        return value
+
+    async def save(self, event: Event) -> Event:
+        saved = await self.delegate.save(event)
+        self._invalidate_event(event)
+        return saved
+
+    async def find_by_id(self, event_id: UUID) -> Optional[Event]:
+        return await self._cached(('event', event_id), self.availability_ttl,
+                                  lambda: self.delegate.find_by_id(event_id))
+
+    async def find_all(self, limit: Optional[int] = None,
+                       after: Optional[PageCursor] = None) -> List[Event]:
+        return await self._cached(('all', limit, after), self.availability_ttl,
+                                  lambda: self.delegate.find_all(limit=limit, after=after))
+
+    async def find_by_category(self, category: str, limit: Optional[int] = None,
+                               after: Optional[PageCursor] = None) -> List[Event]:
+        return await self._cached(('category', category, limit, after), self.availability_ttl,
+                                  lambda: self.delegate.find_by_category(category, limit=limit, after=after))
+
+    async def find_session(self, session_id: UUID) -> Optional[Session]:
+        return await self._cached(('session', session_id), self.availability_ttl,
+                                  lambda: self.delegate.find_session(session_id))
+
+    async def find_event_by_session_id(self, session_id: UUID) -> Optional[Event]:
+        event_id = self.cache.get(('session_event', session_id))
+        if event_id is not MISSING:
+            return await self.find_by_id(event_id)
+        event = await self.delegate.find_event_by_session_id(session_id)
+        self._remember_session_event(session_id, event)
+        return event
+
+    async def reserve_seats(self, session_id: UUID, num_seats: int) -> Optional[int]:
+        booked_seats = await self.delegate.reserve_seats(session_id, num_seats)
+        self._invalidate_session(session_id)
+        return booked_seats
+
+    async def release_seats(self, session_id: UUID, num_seats: int) -> Optional[int]:
+        booked_seats = await self.delegate.release_seats(session_id, num_seats)
+        self._invalidate_session(session_id)
+        return booked_seats
+
+    async def delete(self, event_id: UUID) -> bool:
+        cached = self.cache.peek(('event', event_id))
+        deleted = await self.delegate.delete(event_id)
+        if cached is not MISSING:
+            self._invalidate_event(cached)
+        else:
+            self.cache.invalidate(('event', event_id))
+            self._invalidate_listings()
+        return deleted
+
+    async def update(self, event: Event) -> Event:
+        updated = await self.delegate.update(event)
+        self._invalidate_event(event)
+        return updated
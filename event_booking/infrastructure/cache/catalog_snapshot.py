@@ -0,0 +1,439 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+from ...domain.entities.event import Event
+from ...domain.entities.session import Session
+from ...domain.repositories.async_event_repository import AsyncEventRepository
+from ...domain.repositories.event_repository import EventRepository
+from ...domain.repositories.pagination import PageCursor
+from ...domain.repositories.unit_of_work import NullUnitOfWork, UnitOfWork
+
+logger = logging.getLogger('event_booking.events')
+
+# File layout, all integers little-endian. A slot numbers an event in
+# listing order, (created_at, id) descending.
+#   header         magic, version, event count, categories offset and length
+#   record table   (record offset, record length) per slot
+#   categories     JSON object mapping a category to its slots, in order
+#   records        one compact JSON document per event
+MAGIC = b'EVSNAP02'
+HEADER = struct.Struct('<8sQIQI')
+RECORD_ENTRY = struct.Struct('<QI')
+
+def _encode_event(event: Event) -> bytes:
+    return json.dumps({
+        'id': str(event.id),
+        'name': event.name,
+        'description': event.description,
+        'venue': event.venue,
+        'categories': event.categories,
+        'created_at': event.created_at.isoformat(),
+        'sessions': [
+            [str(s.id), s.start_time.isoformat(), s.end_time.isoformat(),
+             s.capacity, s.booked_seats, str(s.base_price)]
+            for s in event.sessions
+        ]
+    }, separators=(',', ':')).encode('utf-8')
+
+def _decode_event(data) -> Event:
+    record = json.loads(bytes(data))
+    event_id = UUID(record['id'])
+    event = Event(
+        name=record['name'],
+        description=record['description'],
+        venue=record['venue'],
+        categories=record['categories'],
+        id=event_id,
+        created_at=datetime.fromisoformat(record['created_at']),
+        sessions=[
+            Session(
+                event_id=event_id,
+                start_time=datetime.fromisoformat(start_time),
+                end_time=datetime.fromisoformat(end_time),
+                capacity=capacity,
+                base_price=Decimal(base_price),
+                id=UUID(session_id),
+                booked_seats=booked_seats
+            )
+            for session_id, start_time, end_time, capacity, booked_seats, base_price
+            in record['sessions']
+        ]
+    )
+    event.mark_persisted()
+    return event
+
+def read_snapshot_version(path: str) -> int:
+    """Read the version of the snapshot at path, or 0 if there is none."""
+    try:
+        with open(path, 'rb') as f:
+            magic, version, *_ = HEADER.unpack(f.read(HEADER.size))
+    except (OSError, struct.error):
+        return 0
+    return version if magic == MAGIC else 0
+
+class CatalogSnapshotWriter:
+    """Serializes the catalog from a repository into an atomically replaced snapshot file.
+
+    Each publish reads the catalog in its own unit of work, so it sees the
+    rows committed since the previous one rather than an older read view.
+    """
+
+    def __init__(self, repository: EventRepository, path: str, unit_of_work: Optional[UnitOfWork] = None):
+        self.repository = repository
+        self.path = path
+        self.unit_of_work = unit_of_work or NullUnitOfWork()
+
+    def publish(self) -> int:
+        """Build a new snapshot and swap it in; return its version."""
+        # Stored in listing order so pages are slices of slots
+        events = sorted(self.unit_of_work.run(self.repository.find_all), key=lambda e: (e.created_at, e.id),
+                        reverse=True)
+        version = read_snapshot_version(self.path) + 1
+
+        records = [_encode_event(event) for event in events]
+        categories: Dict[str, List[int]] = {}
+        for slot, event in enumerate(events):
+            for category in dict.fromkeys(event.categories):
+                categories.setdefault(category, []).append(slot)
+        categories_blob = json.dumps(categories, separators=(',', ':')).encode('utf-8')
+
+        categories_offset = HEADER.size + RECORD_ENTRY.size * len(events)
+        offset = categories_offset + len(categories_blob)
+        record_table = []
+        for record in records:
+            record_table.append((offset, len(record)))
+            offset += len(record)
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix='.catalog-', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, version, len(events), categories_offset, len(categories_blob)))
+                for entry in record_table:
+                    f.write(RECORD_ENTRY.pack(*entry))
+                f.write(categories_blob)
+                for record in records:
+                    f.write(record)
+                f.flush()
+                os.fsync(f.fileno())
+            # Readers keep the old inode mapped until they notice the swap
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        logger.info(f"Published catalog snapshot v{version} with {len(events)} events")
+        return version
+
+class _MappedSnapshot:
+    """One memory-mapped snapshot file."""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self.stat = os.fstat(f.fileno())
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self.version, self.event_count,
+         self.categories_offset, self.categories_length) = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            self.data.close()
+            raise ValueError(f"{path} is not a catalog snapshot")
+        self._categories = None
+
+    def _event_at(self, slot: int) -> Event:
+        offset, length = RECORD_ENTRY.unpack_from(self.data, HEADER.size + slot * RECORD_ENTRY.size)
+        return _decode_event(memoryview(self.data)[offset:offset + length])
+
+    def _page(self, slots: Sequence[int], limit: Optional[int], after: Optional[PageCursor]) -> List[Event]:
+        """Events of slots after the cursor, decoding only the records probed and returned."""
+        start = 0
+        if after is not None:
+            cursor = (after.created_at, after.id)
+            low, high = 0, len(slots)
+            while low < high:
+                middle = (low + high) // 2
+                event = self._event_at(slots[middle])
+                if (event.created_at, event.id) < cursor:
+                    high = middle
+                else:
+                    low = middle + 1
+            start = low
+        end = len(slots) if limit is None else start + limit
+        return [self._event_at(slot) for slot in slots[start:end]]
+
+    def find_all(self, limit: Optional[int] = None, after: Optional[PageCursor] = None) -> List[Event]:
+        return self._page(range(self.event_count), limit, after)
+
+    def find_by_category(self, category: str, limit: Optional[int] = None,
+                         after: Optional[PageCursor] = None) -> List[Event]:
+        if self._categories is None:
+            start = self.categories_offset
+            self._categories = json.loads(bytes(self.data[start:start + self.categories_length]))
+        return self._page(self._categories.get(category, []), limit, after)
+
+class CatalogSnapshotReader:
+    """Reads the current catalog snapshot, remapping it when a new version is swapped in."""
+
+    def __init__(self, path: str, check_interval: float = 0.5):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot: Optional[_MappedSnapshot] = None
+        self._next_check = 0.0
+
+    def current(self) -> Optional[_MappedSnapshot]:
+        """Get the mapped snapshot, or None if none has been published yet."""
+        now = time.monotonic()
+        if now < self._next_check:
+            return self._snapshot
+        with self._lock:
+            if now < self._next_check:
+                return self._snapshot
+            self._next_check = now + self.check_interval
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                return self._snapshot
+            current = self._snapshot
+            if current is None or (stat.st_ino, stat.st_mtime_ns) != (current.stat.st_ino, current.stat.st_mtime_ns):
+                try:
+                    # The previous mapping is left to the garbage collector since
+                    # other threads may still be decoding from it
+                    self._snapshot = _MappedSnapshot(self.path)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Could not map catalog snapshot {self.path}: {e}")
+            return self._snapshot
+
+    @property
+    def version(self) -> int:
+        """Version of the mapped snapshot, 0 if none."""
+        snapshot = self.current()
+        return snapshot.version if snapshot else 0
+
+class CatalogChanges:
+    """Tells the publishing worker, whichever process it runs in, that the catalog changed.
+
+    Each change appends a byte to a file next to the snapshot; the
+    publisher compares the file's size and mtime with what it last saw.
+    """
+
+    # The publisher empties the file once it grows past this size
+    MAX_SIZE = 64 * 1024
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def bump(self) -> None:
+        """Record a catalog change."""
+        try:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, b'.')
+            finally:
+                os.close(fd)
+        except OSError as e:
+            logger.warning(f"Could not signal catalog change through {self.path}: {e}")
+
+    def stamp(self) -> Tuple[int, int]:
+        """Return a value that differs after every bump."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return 0, 0
+        return stat.st_size, stat.st_mtime_ns
+
+    def compact(self) -> None:
+        # Emptying the file changes its stamp: at worst one extra publish
+        if self.stamp()[0] > self.MAX_SIZE:
+            with open(self.path, 'w'):
+                pass
+
+class CatalogSnapshotPublisher:
+    """Rebuilds the snapshot in the one process holding the publisher lock.
+
+    It publishes every interval seconds, and within poll_interval of a
+    change recorded through changes by any worker.
+    """
+
+    def __init__(self, writer: CatalogSnapshotWriter, changes: Optional[CatalogChanges] = None,
+                 interval: float = 5.0, poll_interval: float = 0.25):
+        self.writer = writer
+        self.changes = changes
+        self.interval = interval
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._lock_file = None
+        self._thread = None
+
+    def start(self) -> bool:
+        """Try to become the publisher; return whether this process publishes."""
+        import fcntl
+
+        lock_file = open(self.writer.path + '.lock', 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        self._thread = threading.Thread(target=self._run, name="catalog-snapshot-publisher", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def publish_if_due(self, seen: Optional[Tuple[int, int]], due: float) -> Tuple[Optional[Tuple[int, int]], float]:
+        """Publish when the catalog changed since seen or due has passed; return the new (seen, due)."""
+        stamp = self.changes.stamp() if self.changes is not None else None
+        if stamp == seen and time.monotonic() < due:
+            return seen, due
+        try:
+            # Changes recorded from here on are picked up by the next check
+            self.writer.publish()
+            if self.changes is not None:
+                self.changes.compact()
+        except Exception as e:
+            logger.error(f"Catalog snapshot publish failed: {e}")
+        return stamp, time.monotonic() + self.interval
+
+    def _run(self) -> None:
+        seen, due = None, 0.0
+        while not self._stop.is_set():
+            seen, due = self.publish_if_due(seen, due)
+            self._stop.wait(self.poll_interval)
+
+class SnapshotEventRepository(EventRepository):
+    """Serves event listings from the shared snapshot and delegates everything else.
+
+    Listings are as fresh as the last publish, new events included; writes
+    call on_change, normally CatalogChanges.bump. Single events, sessions
+    and seat changes go to the delegate, so the event and booking services
+    read their own writes and live (or briefly cached) availability.
+    """
+
+    def __init__(self, reader: CatalogSnapshotReader, delegate: EventRepository,
+                 on_change: Optional[Callable[[], None]] = None):
+        self.reader = reader
+        self.delegate = delegate
+        self.on_change = on_change
+
+    def _changed(self) -> None:
+        if self.on_change is not None:
+            self.on_change()
+
+    def save(self, event: Event) -> Event:
+        saved = self.delegate.save(event)
+        self._changed()
+        return saved
+
+    def find_by_id(self, event_id: UUID) -> Optional[Event]:
+        return self.delegate.find_by_id(event_id)
+
+    def find_all(self, limit: Optional[int] = None,
+                 after: Optional[PageCursor] = None) -> List[Event]:
+        snapshot = self.reader.current()
+        if snapshot is None:
+            return self.delegate.find_all(limit=limit, after=after)
+        return snapshot.find_all(limit, after)
+
+    def find_by_category(self, category: str, limit: Optional[int] = None,
+                         after: Optional[PageCursor] = None) -> List[Event]:
+        snapshot = self.reader.current()
+        if snapshot is None:
+            return self.delegate.find_by_category(category, limit=limit, after=after)
+        return snapshot.find_by_category(category, limit, after)
+
+    def find_session(self, session_id: UUID) -> Optional[Session]:
+        return self.delegate.find_session(session_id)
+
+    def find_event_by_session_id(self, session_id: UUID) -> Optional[Event]:
+        return self.delegate.find_event_by_session_id(session_id)
+
+    def reserve_seats(self, session_id: UUID, num_seats: int) -> Optional[int]:
+        return self.delegate.reserve_seats(session_id, num_seats)
+
+    def release_seats(self, session_id: UUID, num_seats: int) -> Optional[int]:
+        return self.delegate.release_seats(session_id, num_seats)
+
+    def delete(self, event_id: UUID) -> bool:
+        deleted = self.delegate.delete(event_id)
+        self._changed()
+        return deleted
+
+    def update(self, event: Event) -> Event:
+        updated = self.delegate.update(event)
+        self._changed()
+        return updated
+
+class AsyncSnapshotEventRepository(AsyncEventRepository):
+    """SnapshotEventRepository for an AsyncEventRepository delegate.
+
+    Snapshot reads decode from the mapped file and stay synchronous.
+    """
+
+    def __init__(self, reader: CatalogSnapshotReader, delegate: AsyncEventRepository,
+                 on_change: Optional[Callable[[], None]] = None):
+        self.reader = reader
+        self.delegate = delegate
+        self.on_change = on_change
+
+    def _changed(self) -> None:
+        if self.on_change is not None:
+            self.on_change()
+
+    async def save(self, event: Event) -> Event:
+        saved = await self.delegate.save(event)
+        self._changed()
+        return saved
+
+    async def find_by_id(self, event_id: UUID) -> Optional[Event]:
+        return await self.delegate.find_by_id(event_id)
+
+    async def find_all(self, limit: Optional[int] = None,
+                       after: Optional[PageCursor] = None) -> List[Event]:
+        snapshot = self.reader.current()
+        if snapshot is None:
+            return await self.delegate.find_all(limit=limit, after=after)
+        return snapshot.find_all(limit, after)
+
+    async def find_by_category(self, category: str, limit: Optional[int] = None,
+                               after: Optional[PageCursor] = None) -> List[Event]:
+        snapshot = self.reader.current()
+        if snapshot is None:
+            return await self.delegate.find_by_category(category, limit=limit, after=after)
+        return snapshot.find_by_category(category, limit, after)
+
+    async def find_session(self, session_id: UUID) -> Optional[Session]:
+        return await self.delegate.find_session(session_id)
+
+    async def find_event_by_session_id(self, session_id: UUID) -> Optional[Event]:
+        return await self.delegate.find_event_by_session_id(session_id)
+
+    async def reserve_seats(self, session_id: UUID, num_seats: int) -> Optional[int]:
+        return await self.delegate.reserve_seats(session_id, num_seats)
+
+    async def release_seats(self, session_id: UUID, num_seats: int) -> Optional[int]:
+        return await self.delegate.release_seats(session_id, num_seats)
+
+    async def delete(self, event_id: UUID) -> bool:
+        deleted = await self.delegate.delete(event_id)
+        self._changed()
+        return deleted
+
+    async def update(self, event: Event) -> Event:
+        updated = await self.delegate.update(event)
+        self._changed()
+        return updated
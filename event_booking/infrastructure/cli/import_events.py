@@ -0,0 +1,335 @@
+"""Stream events and their sessions from a JSONL or CSV file into the database.
+
+    python -m event_booking.infrastructure.cli.import_events season.jsonl --commit-size 500
+
+JSONL: one event per line, with its sessions nested:
+    {"name": ..., "description": ..., "venue": ..., "categories": [...],
+     "sessions": [{"start_time": ..., "end_time": ..., "capacity": ..., "base_price": ...}]}
+
+CSV: one session per row; consecutive rows with the same ``event`` key form one
+event, categories are separated by ``|`` and a row without start_time declares
+an event without sessions:
+    event,name,description,venue,categories,start_time,end_time,capacity,base_price
+
+Ids are derived from the file's content hash and record number unless given,
+so a chunk written again after a crash is skipped by the database instead of
+duplicated, while a corrected file imports under new ids. Rows found already
+present are reported as duplicates rather than written.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, Iterator, Optional, TextIO
+from uuid import UUID, uuid5
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from ...domain.entities.event import Event
+from ...domain.entities.session import Session
+from ..persistence.mariadb_event_repository import (
+    INSERT_CATEGORY_SQL, INSERT_EVENT_SQL, INSERT_SESSION_SQL, category_params, event_params, session_params
+)
+
+logger = logging.getLogger('event_booking.events')
+
+IMPORT_NAMESPACE = UUID('6f1c3c52-5d0e-4b8e-9a57-2f3b0c1d7e41')
+
+# Rows already present from an earlier, partly recorded run are left as they
+# are and count 0 affected rows (the connections do not set CLIENT.FOUND_ROWS)
+IMPORT_EVENT_SQL = INSERT_EVENT_SQL + " ON DUPLICATE KEY UPDATE id = id"
+IMPORT_CATEGORY_SQL = INSERT_CATEGORY_SQL + " ON DUPLICATE KEY UPDATE category = category"
+IMPORT_SESSION_SQL = INSERT_SESSION_SQL + " ON DUPLICATE KEY UPDATE id = id"
+
+CSV_REQUIRED_COLUMNS = ('event', 'name', 'venue')
+
+class ImportAborted(Exception):
+    """Raised when a chunk fails to commit; the checkpoint still points before it."""
+
+    def __init__(self, message: str, records_done: int):
+        super().__init__(message)
+        self.records_done = records_done
+
+@dataclass
+class ImportStats:
+    read: int = 0
+    skipped: int = 0
+    events: int = 0
+    sessions: int = 0
+    # Valid records whose rows were already in the database
+    duplicate_events: int = 0
+    duplicate_sessions: int = 0
+    rejected: int = 0
+    chunks: int = 0
+    # Records covered by committed chunks, including skipped and rejected ones
+    committed: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    def rate(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.read / elapsed if elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.read} records read, {self.events} events and {self.sessions} sessions "
+                f"written, {self.duplicate_events} events and {self.duplicate_sessions} sessions "
+                f"already present, {self.rejected} rejected, {self.rate():.0f} records/s")
+
+def read_jsonl(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    for line in stream:
+        line = line.strip()
+        if line:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                # Keep numbering aligned; parse_record rejects it
+                yield {'_invalid': f"Invalid JSON: {e.msg}", 'line': line[:200]}
+
+def read_csv(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    """Fold consecutive rows sharing an event key into one nested record.
+
+    Raises ValueError at once if the header lacks a required column.
+    """
+    rows = csv.DictReader(stream)
+    missing = [column for column in CSV_REQUIRED_COLUMNS if column not in (rows.fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV header lacks required column(s): {', '.join(missing)}")
+    return _fold_csv_rows(rows)
+
+def _fold_csv_rows(rows: csv.DictReader) -> Iterator[Dict[str, Any]]:
+    for _, group in itertools.groupby(rows, key=lambda row: row['event']):
+        group = list(group)
+        first = group[0]
+        yield {
+            'name': first['name'],
+            'description': first.get('description', ''),
+            'venue': first['venue'],
+            'categories': [c for c in (first.get('categories') or '').split('|') if c],
+            'sessions': [
+                {key: row[key] for key in ('start_time', 'end_time', 'capacity', 'base_price')}
+                for row in group if row.get('start_time')
+            ]
+        }
+
+def read_records(path: str, stream: TextIO) -> Iterator[Dict[str, Any]]:
+    if path.endswith('.csv'):
+        return read_csv(stream)
+    return read_jsonl(stream)
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's content, the key default ids are derived from."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def parse_record(record: Dict[str, Any], default_id: UUID) -> Event:
+    """Build and validate an event from one input record; raise ValueError if it is invalid."""
+    if '_invalid' in record:
+        raise ValueError(record['_invalid'])
+    try:
+        event_id = UUID(record['id']) if record.get('id') else default_id
+        event = Event(
+            name=record['name'],
+            description=record.get('description') or '',
+            venue=record['venue'],
+            categories=list(record.get('categories') or []),
+            id=event_id
+        )
+        for index, data in enumerate(record.get('sessions') or []):
+            event.add_session(Session(
+                event_id=event_id,
+                start_time=datetime.fromisoformat(data['start_time']),
+                end_time=datetime.fromisoformat(data['end_time']),
+                capacity=int(data['capacity']),
+                base_price=Decimal(str(data['base_price'])),
+                id=UUID(data['id']) if data.get('id') else uuid5(event_id, str(index))
+            ))
+    except KeyError as e:
+        raise ValueError(f"Missing field {e}")
+    except (TypeError, InvalidOperation) as e:
+        raise ValueError(f"Invalid value: {e}")
+
+    if not event.name or not event.venue:
+        raise ValueError("Event name and venue are required")
+    event.validate()
+    for session in event.sessions:
+        session.validate()
+    check_overlaps(event)
+    return event
+
+def check_overlaps(event: Event) -> None:
+    """Reject events whose sessions overlap, as EventService.add_session would."""
+    sessions = sorted(event.sessions, key=lambda s: s.start_time)
+    for previous, current in zip(sessions, sessions[1:]):
+        if current.start_time < previous.end_time:
+            raise ValueError(f"Session starting {current.start_time.isoformat()} overlaps "
+                             f"with session starting {previous.start_time.isoformat()}")
+
+class Checkpoint:
+    """Number of input records durably imported, stored next to the source file."""
+
+    def __init__(self, path: str, source: str, digest: Optional[str] = None):
+        self.path = path
+        self.source = os.path.abspath(source)
+        self.digest = digest
+
+    def load(self) -> int:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return 0
+        if data.get('source') != self.source:
+            raise ValueError(f"Checkpoint {self.path} belongs to {data.get('source')}")
+        if data.get('digest') != self.digest:
+            raise ValueError(f"{self.source} changed since checkpoint {self.path} was written")
+        return int(data['records'])
+
+    def save(self, records: int) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix='.import-', dir=directory)
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'source': self.source, 'digest': self.digest, 'records': records}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+class EventImporter:
+    """Writes validated events in chunks of commit_size events, one transaction per chunk."""
+
+    def __init__(self, connection_pool, commit_size: int = 500, checkpoint: Optional[Checkpoint] = None,
+                 rejects: Optional[TextIO] = None, progress_interval: float = 5.0):
+        if commit_size <= 0:
+            raise ValueError("commit_size must be positive")
+        self.connection_pool = connection_pool
+        self.commit_size = commit_size
+        self.checkpoint = checkpoint
+        self.rejects = rejects
+        self.progress_interval = progress_interval
+
+    def run(self, records: Iterable[Dict[str, Any]], source_key: str, skip: int = 0) -> ImportStats:
+        """Import records, skipping the first skip ones already imported.
+
+        source_key identifies the input's content, normally its file_digest;
+        default ids are derived from it.
+        """
+        stats = ImportStats(committed=skip)
+        chunk = []
+        last_progress = time.monotonic()
+        record_no = 0
+
+        for record_no, record in enumerate(records, start=1):
+            stats.read += 1
+            if record_no <= skip:
+                stats.skipped += 1
+                continue
+            try:
+                event = parse_record(record, uuid5(IMPORT_NAMESPACE, f"{source_key}:{record_no}"))
+            except ValueError as e:
+                self._reject(stats, record_no, record, e)
+                continue
+
+            chunk.append(event)
+            if len(chunk) >= self.commit_size:
+                self._write(chunk, record_no, stats)
+                chunk = []
+                if time.monotonic() - last_progress >= self.progress_interval:
+                    logger.info(f"Import progress: {stats.summary()}")
+                    last_progress = time.monotonic()
+
+        # The final checkpoint also covers trailing rejected records
+        self._write(chunk, record_no, stats)
+        logger.info(f"Import finished: {stats.summary()}")
+        return stats
+
+    def _reject(self, stats: ImportStats, record_no: int, record: Dict[str, Any], error: Exception) -> None:
+        stats.rejected += 1
+        logger.warning(f"Rejected record {record_no}: {error}")
+        if self.rejects is not None:
+            self.rejects.write(json.dumps({'record': record_no, 'error': str(error), 'data': record},
+                                          default=str) + "\n")
+
+    def _write(self, chunk, records_done: int, stats: ImportStats) -> None:
+        if chunk:
+            sessions = [session_params(event.id, s) for event in chunk for s in event.sessions]
+            categories = [row for event in chunk for row in category_params(event.id, event.categories)]
+            try:
+                with self.connection_pool.transaction() as connection:
+                    with connection.cursor() as cursor:
+                        cursor.executemany(IMPORT_EVENT_SQL, [event_params(event) for event in chunk])
+                        events_written = cursor.rowcount
+                        if categories:
+                            cursor.executemany(IMPORT_CATEGORY_SQL, categories)
+                        sessions_written = 0
+                        if sessions:
+                            cursor.executemany(IMPORT_SESSION_SQL, sessions)
+                            sessions_written = cursor.rowcount
+            except Exception as e:
+                raise ImportAborted(f"Chunk ending at record {records_done} failed: {e}",
+                                    stats.committed) from e
+            stats.chunks += 1
+            stats.events += events_written
+            stats.sessions += sessions_written
+            stats.duplicate_events += len(chunk) - events_written
+            stats.duplicate_sessions += len(sessions) - sessions_written
+        if records_done > stats.committed:
+            stats.committed = records_done
+            if self.checkpoint is not None:
+                self.checkpoint.save(records_done)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk import events and sessions from JSONL or CSV.")
+    parser.add_argument('path', help="input file (.jsonl or .csv)")
+    parser.add_argument('--commit-size', type=int, default=500, help="events per transaction")
+    parser.add_argument('--checkpoint', help="checkpoint file (default: <path>.checkpoint)")
+    parser.add_argument('--resume', action='store_true', help="skip records recorded in the checkpoint")
+    parser.add_argument('--rejects', help="write rejected records to this JSONL file")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    from ..config.database import init_database_pool
+
+    digest = file_digest(args.path)
+    checkpoint = Checkpoint(args.checkpoint or args.path + '.checkpoint', args.path, digest)
+    try:
+        skip = checkpoint.load() if args.resume else 0
+    except ValueError as e:
+        logger.error(str(e))
+        return 2
+    if skip:
+        logger.info(f"Resuming after record {skip}")
+
+    rejects = open(args.rejects, 'a') if args.rejects else None
+    try:
+        importer = EventImporter(init_database_pool(), args.commit_size, checkpoint, rejects)
+        with open(args.path, newline='') as stream:
+            importer.run(read_records(args.path, stream), digest, skip)
+    except ValueError as e:
+        logger.error(f"Cannot import {args.path}: {e}")
+        return 2
+    except ImportAborted as e:
+        logger.error(f"{e}; {e.records_done} records are imported, rerun with --resume")
+        return 1
+    finally:
+        if rejects is not None:
+            rejects.close()
+
+    checkpoint.clear()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
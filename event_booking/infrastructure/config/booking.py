@@ -0,0 +1,39 @@
+import os
+from typing import Dict, Any
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+def get_booking_config() -> Dict[str, Any]:
+    """Get booking hold configuration from environment variables."""
+    return {
+        # Seconds a pending booking holds its seats; 0 holds them until cancelled
+        'hold_ttl': float(os.getenv('BOOKING_HOLD_TTL', '900')),
+        'sweep_interval': float(os.getenv('BOOKING_SWEEP_INTERVAL', '5')),
+        'sweep_batch_size': int(os.getenv('BOOKING_SWEEP_BATCH_SIZE', '500')),
+        'sweep_max_batches': int(os.getenv('BOOKING_SWEEP_MAX_BATCHES', '20')),
+        # Group commit of concurrent single bookings for the same session; each booking waits up to
+        # batch_window seconds for others, so it is off unless enabled
+        'group_commit': os.getenv('BOOKING_GROUP_COMMIT', 'false').lower() == 'true',
+        'batch_window': float(os.getenv('BOOKING_BATCH_WINDOW', '0.002')),
+        'batch_max_size': int(os.getenv('BOOKING_BATCH_MAX_SIZE', '64')),
+        # One writer per session in this process, seat counts kept in memory
+        'session_writers': os.getenv('BOOKING_SESSION_WRITERS', 'false').lower() == 'true',
+        'session_state_ttl': float(os.getenv('BOOKING_SESSION_STATE_TTL', '1.0')),
+        # Durable intake: POST /bookings/ answers 202 with a ticket and workers book in batches
+        'intake': os.getenv('BOOKING_INTAKE', 'false').lower() == 'true',
+        'intake_path': os.getenv('BOOKING_INTAKE_PATH', 'booking_intake.db'),
+        'intake_workers': int(os.getenv('BOOKING_INTAKE_WORKERS', '4')),
+        'intake_batch_size': int(os.getenv('BOOKING_INTAKE_BATCH_SIZE', '100')),
+        'intake_max_attempts': int(os.getenv('BOOKING_INTAKE_MAX_ATTEMPTS', '5')),
+        'intake_retention': float(os.getenv('BOOKING_INTAKE_RETENTION', '3600')),
+        # Waiting rooms: processes sharing the secret accept each other's admission tokens
+        'waiting_room_secret': os.getenv('WAITING_ROOM_SECRET', ''),
+        'admission_ttl': float(os.getenv('WAITING_ROOM_ADMISSION_TTL', '300')),
+        # Rooms, queue numbers and used places, shared by the workers of this host
+        'waiting_room_path': os.getenv('WAITING_ROOM_PATH', 'waiting_rooms.db'),
+        # Sessions known to be full are refused without a query for sold_out_ttl seconds
+        'sold_out_cache': os.getenv('BOOKING_SOLD_OUT_CACHE', 'true').lower() == 'true',
+        'sold_out_ttl': float(os.getenv('BOOKING_SOLD_OUT_TTL', '2'))
+    }
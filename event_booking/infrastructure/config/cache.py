@@ -0,0 +1,18 @@
+import os
+from typing import Dict, Any
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+def get_cache_config() -> Dict[str, Any]:
+    """Get event cache configuration from environment variables."""
+    return {
+        'enabled': os.getenv('EVENT_CACHE_ENABLED', 'true').lower() == 'true',
+        'maxsize': int(os.getenv('EVENT_CACHE_SIZE', '1024')),
+        'ttl': float(os.getenv('EVENT_CACHE_TTL', '30')),
+        'availability_ttl': float(os.getenv('EVENT_CACHE_AVAILABILITY_TTL', '2')),
+        # Shared memory-mapped catalog snapshot; disabled when no path is set
+        'snapshot_path': os.getenv('CATALOG_SNAPSHOT_PATH', ''),
+        'snapshot_interval': float(os.getenv('CATALOG_SNAPSHOT_INTERVAL', '5'))
+    }
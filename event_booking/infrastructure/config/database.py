@@ -1,10 +1,20 @@
 import os
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+def parse_nodes(spec: Optional[str]) -> Optional[List[Tuple[str, int]]]:
+    """Parse a comma-separated host:port list; the port defaults to 3306."""
+    if not spec or not spec.strip():
+        return None
+    nodes = []
+    for entry in spec.split(','):
+        host, _, port = entry.strip().partition(':')
+        nodes.append((host, int(port or '3306')))
+    return nodes
+
 def get_database_config() -> Dict[str, Any]:
     """Get database configuration from environment variables."""
     return {
@@ -12,7 +22,80 @@ def get_database_config() -> Dict[str, Any]:
         'port': int(os.getenv('DB_PORT', '3309')),
         'user': os.getenv('DB_USER', 'app_user'),
         'password': os.getenv('DB_PASSWORD', 'app_password'),
-        'database': os.getenv('DB_NAME', 'event_booking')
+        'database': os.getenv('DB_NAME', 'event_booking'),
+        'pool_min_size': int(os.getenv('DB_POOL_MIN_SIZE', '1')),
+        'pool_max_size': int(os.getenv('DB_POOL_MAX_SIZE', '5')),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+        'pool_validate_after_idle': float(os.getenv('DB_POOL_VALIDATE_AFTER_IDLE', '30')),
+        'pool_max_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', '1800')),
+        'pool_max_idle_time': float(os.getenv('DB_POOL_MAX_IDLE_TIME', '600')),
+        'pool_maintenance_interval': float(os.getenv('DB_POOL_MAINTENANCE_INTERVAL', '30')),
+        # Galera nodes to connect to directly, bypassing DB_HOST (e.g. "node-1:3306,node-2:3306");
+        # the first healthy one takes all connections unless spreading is enabled for a read-only pool
+        'nodes': parse_nodes(os.getenv('DB_NODES')),
+        'pool_node_failure_backoff': float(os.getenv('DB_POOL_NODE_FAILURE_BACKOFF', '1')),
+        'pool_spread_nodes': os.getenv('DB_POOL_SPREAD_NODES', 'false').lower() == 'true',
+        'async_pool_min_size': int(os.getenv('DB_ASYNC_POOL_MIN_SIZE', '1')),
+        'async_pool_max_size': int(os.getenv('DB_ASYNC_POOL_MAX_SIZE', '20')),
+        # Read-only queries go to this endpoint when set, e.g. an HAProxy listener over all nodes
+        'read_host': os.getenv('DB_READ_HOST') or None,
+        'read_port': int(os.getenv('DB_READ_PORT', '3307')),
+        'read_pool_min_size': int(os.getenv('DB_READ_POOL_MIN_SIZE', '1')),
+        'read_pool_max_size': int(os.getenv('DB_READ_POOL_MAX_SIZE', '20')),
+        # wsrep_sync_wait mask applied to reads that must see the latest writes (1 = SELECT)
+        'read_sync_wait': int(os.getenv('DB_READ_SYNC_WAIT', '1')),
+        # Replays of transactions aborted by deadlocks and certification conflicts
+        'retry_max_attempts': int(os.getenv('DB_RETRY_MAX_ATTEMPTS', '5')),
+        'retry_base_delay': float(os.getenv('DB_RETRY_BASE_DELAY', '0.01')),
+        'retry_max_delay': float(os.getenv('DB_RETRY_MAX_DELAY', '0.2')),
+        'retry_deadline': float(os.getenv('DB_RETRY_DEADLINE', '2'))
+    }
+
+def get_pool_options(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract DatabaseConnectionPool routing, sizing and lifecycle options from a config."""
+    return {
+        'nodes': config['nodes'],
+        'node_failure_backoff': config['pool_node_failure_backoff'],
+        'spread_nodes': config['pool_spread_nodes'],
+        'min_size': config['pool_min_size'],
+        'max_size': config['pool_max_size'],
+        'checkout_timeout': config['pool_timeout'],
+        'validate_after_idle': config['pool_validate_after_idle'],
+        'max_lifetime': config['pool_max_lifetime'],
+        'max_idle_time': config['pool_max_idle_time'],
+        'maintenance_interval': config['pool_maintenance_interval']
+    }
+
+def get_async_pool_options(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract AsyncDatabaseConnectionPool routing, sizing and lifecycle options from a config."""
+    return {
+        'nodes': config['nodes'],
+        'node_failure_backoff': config['pool_node_failure_backoff'],
+        'spread_nodes': config['pool_spread_nodes'],
+        'min_size': config['async_pool_min_size'],
+        'max_size': config['async_pool_max_size'],
+        'checkout_timeout': config['pool_timeout'],
+        'validate_after_idle': config['pool_validate_after_idle'],
+        'max_lifetime': config['pool_max_lifetime']
+    }
+
+def get_read_pool_options(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract the read-only AsyncDatabaseConnectionPool options from a config."""
+    return {
+        'min_size': config['read_pool_min_size'],
+        'max_size': config['read_pool_max_size'],
+        'checkout_timeout': config['pool_timeout'],
+        'validate_after_idle': config['pool_validate_after_idle'],
+        'max_lifetime': config['pool_max_lifetime']
+    }
+
+def get_retry_options(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract RetryPolicy options from a config."""
+    return {
+        'max_attempts': config['retry_max_attempts'],
+        'base_delay': config['retry_base_delay'],
+        'max_delay': config['retry_max_delay'],
+        'deadline': config['retry_deadline']
     }
 
 def init_database_pool():
@@ -26,5 +109,5 @@ def init_database_pool():
         user=config['user'],
         password=config['password'],
         database=config['database'],
-        pool_size=5
+        **get_pool_options(config)
     ) 
\ No newline at end of file
@@ -0,0 +1,371 @@
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Sequence, Tuple
+import asyncio
+import logging
+import time
+import weakref
+import aiomysql
+import pymysql
+
+from .connection_pool import ConnectionPoolError, DatabaseUnavailableError, PoolExhaustedError
+from .galera_nodes import WSREP_STATUS_SQL, GaleraNode, GaleraNodeSet, is_node_failure
+
+logger = logging.getLogger('event_booking.db')
+
+class AsyncDatabaseConnectionPool:
+    """Connection pool for coroutines, backed by aiomysql.
+
+    Connections run in autocommit mode so a checkout never leaves a read
+    snapshot open; transaction() starts an explicit transaction and binds its
+    connection to the current task, the way DatabaseConnectionPool binds one
+    to the current thread.
+
+    aiomysql serves waiters in arrival order and drops idle connections the
+    server closed; like DatabaseConnectionPool, this pool also pings
+    connections idle for validate_after_idle seconds before handing them
+    out and backs off exponentially after failed connects.
+
+    With nodes, it keeps one aiomysql pool per Galera node it uses and
+    routes checkouts to the node GaleraNodeSet prefers, as
+    DatabaseConnectionPool does. A connect failure or a node failure error
+    during a checkout closes that node's pool and moves traffic to the next
+    node at once.
+    """
+
+    def __init__(self, host: str, port: int, user: str, password: str, database: str,
+                 min_size: int = 1, max_size: int = 10, checkout_timeout: float = 10.0,
+                 max_lifetime: float = 1800.0, validate_after_idle: float = 30.0,
+                 connect_backoff: float = 0.1, max_connect_backoff: float = 5.0,
+                 nodes: Optional[Sequence[Tuple[str, int]]] = None, node_failure_backoff: float = 1.0,
+                 spread_nodes: bool = False):
+        """Initialize the pool; open() must be awaited on the running loop before use.
+
+        nodes, node_failure_backoff and spread_nodes route connections straight to
+        Galera nodes like in DatabaseConnectionPool; host and port are then unused.
+        """
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        if not 0 <= min_size <= max_size:
+            raise ValueError("min_size must be between 0 and max_size")
+
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.database = database
+        self.min_size = min_size
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.max_lifetime = max_lifetime
+        self.validate_after_idle = validate_after_idle
+        self.connect_backoff = connect_backoff
+        self.max_connect_backoff = max_connect_backoff
+
+        # Pool of the single endpoint, or of the node that served the last checkout
+        self._pool = None
+        self._nodes = GaleraNodeSet(nodes, failure_backoff=node_failure_backoff,
+                                    spread=spread_nodes) if nodes else None
+        # node name -> pool of that node, opened on first use
+        self._node_pools: Dict[str, Any] = {}
+        self._node_of = weakref.WeakKeyDictionary()
+        self._open_lock = asyncio.Lock()
+        self._opened = False
+        # connection -> when it was last released
+        self._idle_since = weakref.WeakKeyDictionary()
+        self._connect_failures = 0
+        self._retry_connect_at = 0.0
+        # (task, connection) bound by transaction(); tasks spawned inside it
+        # inherit the context but must not share the connection
+        self._bound: ContextVar = ContextVar(f'async_pool_{id(self)}', default=None)
+
+        # Counters exposed through stats()
+        self._waiting = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_time = 0.0
+        self._failed_connects = 0
+        self._validations = 0
+        self._validation_failures = 0
+
+    async def _create_pool(self, host: Optional[str] = None, port: Optional[int] = None):
+        """Create the underlying aiomysql pool, to host and port when given."""
+        return await aiomysql.create_pool(
+            host=self.host if host is None else host,
+            port=self.port if port is None else port,
+            user=self.user,
+            password=self.password,
+            db=self.database,
+            minsize=self.min_size,
+            maxsize=self.max_size,
+            pool_recycle=self.max_lifetime if self.max_lifetime > 0 else -1,
+            cursorclass=aiomysql.DictCursor,
+            autocommit=True
+        )
+
+    async def open(self) -> None:
+        """Open the pool and its min_size connections.
+
+        Raises DatabaseUnavailableError if those connections cannot be made.
+        """
+        if self._nodes is not None:
+            if self._pool is None:
+                _, self._pool = await self._node_pool()
+                self._opened = True
+                logger.info(f"Async connection pool opened on Galera nodes ({self.min_size}-{self.max_size} "
+                            f"connections per node)")
+            return
+        if self._pool is None:
+            try:
+                self._pool = await self._create_pool()
+            except (pymysql.err.OperationalError, OSError) as e:
+                self._failed_connects += 1
+                raise DatabaseUnavailableError(f"Could not open connection pool: {e}") from e
+            self._opened = True
+            logger.info(f"Async connection pool opened ({self.min_size}-{self.max_size} connections)")
+
+    def is_open(self) -> bool:
+        return self._opened
+
+    async def _node_pool(self) -> Tuple[GaleraNode, Any]:
+        """Pool of the preferred node, opening pools down the candidates until one serves."""
+        for node in self._nodes.candidates():
+            pool = self._node_pools.get(node.name)
+            if pool is None:
+                async with self._open_lock:
+                    pool = self._node_pools.get(node.name) or await self._open_node(node)
+                if pool is None:
+                    continue
+            return node, pool
+        self._failed_connects += 1
+        raise DatabaseUnavailableError("Could not connect to any Galera node")
+
+    async def _open_node(self, node: GaleraNode):
+        """Open the pool of a node and probe its wsrep status; None if it cannot serve."""
+        started = time.monotonic()
+        try:
+            pool = await self._create_pool(node.host, node.port)
+        except (pymysql.err.OperationalError, OSError) as e:
+            self._nodes.record_failure(node, e)
+            return None
+        try:
+            status = await self._probe(pool)
+        except Exception as e:
+            self._nodes.record_failure(node, e)
+            await self._close_pool(pool)
+            return None
+        if not self._nodes.record_success(node, time.monotonic() - started, status):
+            await self._close_pool(pool)
+            return None
+        self._node_pools[node.name] = pool
+        return pool
+
+    @staticmethod
+    async def _probe(pool) -> Dict[str, str]:
+        """Read the wsrep status of the node behind a pool."""
+        connection = await pool.acquire()
+        try:
+            async with connection.cursor() as cursor:
+                await cursor.execute(WSREP_STATUS_SQL)
+                rows = await cursor.fetchall()
+        finally:
+            pool.release(connection)
+        return {row['Variable_name']: row['Value'] for row in rows}
+
+    async def _node_failed(self, node: GaleraNode, error: BaseException) -> None:
+        """Avoid a node and close its pool; checked out connections close when released."""
+        self._nodes.record_failure(node, error)
+        pool = self._node_pools.pop(node.name, None)
+        if pool is None:
+            return
+        if self._pool is pool:
+            self._pool = None
+        pool.close()
+        try:
+            await pool.clear()
+        except Exception:
+            pass
+
+    @staticmethod
+    async def _close_pool(pool) -> None:
+        pool.close()
+        await pool.wait_closed()
+
+    def _bound_connection(self):
+        bound = self._bound.get()
+        if bound is not None and bound[0] is asyncio.current_task():
+            return bound[1]
+        return None
+
+    async def _acquire(self, timeout: Optional[float]) -> Tuple[Any, Any]:
+        """Check out a connection; return it with the pool to release it to."""
+        if not self._opened:
+            raise ConnectionPoolError("Async connection pool is not open")
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        failovers = 0
+        while True:
+            node = None
+            if self._nodes is None:
+                pool = self._pool
+                connection = await self._checkout(pool, max(0.0, deadline - time.monotonic()))
+            else:
+                node, pool = await self._node_pool()
+                self._pool = pool
+                try:
+                    connection = await self._checkout(pool, max(0.0, deadline - time.monotonic()),
+                                                      backoff=False)
+                except DatabaseUnavailableError as e:
+                    # Fail over to the next node straight away, trying each node once
+                    await self._node_failed(node, e.__cause__ or e)
+                    failovers += 1
+                    if failovers >= len(self._nodes.nodes):
+                        self._failed_connects += 1
+                        raise
+                    continue
+                self._node_of[connection] = node
+            idle_since = self._idle_since.pop(connection, None)
+            if idle_since is None or time.monotonic() - idle_since < self.validate_after_idle:
+                return pool, connection
+            if await self._validate(connection):
+                return pool, connection
+            # Closed by _validate, so aiomysql drops it instead of keeping it
+            pool.release(connection)
+
+    async def _checkout(self, pool, timeout: float, backoff: bool = True):
+        """Acquire from one aiomysql pool; without backoff the node set paces reconnects instead."""
+        # Only an empty pool has to connect; while backing off, fail fast
+        must_connect = pool.freesize == 0
+        if backoff and must_connect and time.monotonic() < self._retry_connect_at:
+            raise DatabaseUnavailableError(
+                f"Database connections suspended for "
+                f"{self._retry_connect_at - time.monotonic():.2f}s after "
+                f"{self._connect_failures} failed attempts"
+            )
+        started = time.monotonic()
+        self._waiting += 1
+        try:
+            connection = await asyncio.wait_for(pool.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            raise PoolExhaustedError(
+                f"No database connection available after {timeout:.1f}s "
+                f"({self.max_size} in use)"
+            )
+        except (pymysql.err.OperationalError, OSError) as e:
+            if backoff:
+                # Back off exponentially so a dead server is not hammered
+                self._failed_connects += 1
+                self._connect_failures += 1
+                delay = min(self.max_connect_backoff, self.connect_backoff * 2 ** (self._connect_failures - 1))
+                self._retry_connect_at = time.monotonic() + delay
+            raise DatabaseUnavailableError(f"Could not connect to database: {e}") from e
+        finally:
+            self._waiting -= 1
+            self._wait_time += time.monotonic() - started
+        if must_connect:
+            self._connect_failures = 0
+            self._retry_connect_at = 0.0
+        self._checkouts += 1
+        return connection
+
+    async def _validate(self, connection) -> bool:
+        """Ping a connection that has been idle too long to trust; close it if dead."""
+        self._validations += 1
+        try:
+            await connection.ping(reconnect=False)
+            return True
+        except Exception as e:
+            logger.info(f"Dropping stale pooled connection: {e}")
+            self._validation_failures += 1
+            connection.close()
+            return False
+
+    @asynccontextmanager
+    async def get_connection(self, timeout: Optional[float] = None, readonly: bool = False):
+        """Get a connection from the pool, waiting up to timeout seconds.
+
+        readonly only matters to AsyncReadWritePool; a single pool serves both.
+        """
+        bound = self._bound_connection()
+        if bound is not None:
+            # Inside transaction(): share its connection, it handles commit and rollback
+            yield bound
+            return
+
+        pool, connection = await self._acquire(timeout)
+        try:
+            yield connection
+        except BaseException as e:
+            node = self._node_of.get(connection)
+            if node is not None and is_node_failure(e):
+                # Fail over now rather than at the next validation
+                connection.close()
+                await self._node_failed(node, e)
+            raise
+        finally:
+            # aiomysql closes connections released with a transaction still open
+            self._idle_since[connection] = time.monotonic()
+            pool.release(connection)
+
+    @asynccontextmanager
+    async def transaction(self, timeout: Optional[float] = None):
+        """Bind one connection to this task and commit it once on exit.
+
+        Nested transactions join the outer one.
+        """
+        bound = self._bound_connection()
+        if bound is not None:
+            yield bound
+            return
+
+        async with self.get_connection(timeout) as connection:
+            token = self._bound.set((asyncio.current_task(), connection))
+            try:
+                await connection.begin()
+                try:
+                    yield connection
+                except BaseException:
+                    try:
+                        await connection.rollback()
+                    except Exception:
+                        connection.close()
+                    raise
+                await connection.commit()
+            finally:
+                self._bound.reset(token)
+
+    def in_transaction(self) -> bool:
+        """Check whether the current task runs inside transaction()."""
+        return self._bound_connection() is not None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool sizing and saturation counters."""
+        pools = list(self._node_pools.values()) if self._nodes is not None else [self._pool]
+        size = sum(pool.size for pool in pools if pool is not None)
+        idle = sum(pool.freesize for pool in pools if pool is not None)
+        return {
+            'min_size': self.min_size,
+            'max_size': self.max_size,
+            'size': size,
+            'in_use': size - idle,
+            'idle': idle,
+            'waiting': self._waiting,
+            'checkouts': self._checkouts,
+            'wait_time_total': round(self._wait_time, 6),
+            'timeouts': self._timeouts,
+            'failed_connects': self._failed_connects,
+            'validations': self._validations,
+            'validation_failures': self._validation_failures,
+            'nodes': self._nodes.stats() if self._nodes is not None else None,
+        }
+
+    async def close(self) -> None:
+        """Close all connections once they are released."""
+        pools = list(self._node_pools.values()) if self._nodes is not None else [self._pool]
+        self._pool = None
+        self._node_pools = {}
+        self._opened = False
+        for pool in pools:
+            if pool is not None:
+                await self._close_pool(pool)
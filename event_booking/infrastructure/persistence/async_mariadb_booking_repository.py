@@ -0,0 +1,124 @@
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+from uuid import UUID
+import aiomysql
+
+from ...domain.entities.booking import Booking, BookingStatus
+from ...domain.repositories.async_booking_repository import AsyncBookingRepository
+from ...domain.repositories.pagination import PageCursor
+from .keyset import keyset_page
+from .mariadb_booking_repository import (
+    EXPIRABLE_HOLDS_SQL, FIND_ACTIVE_FOR_SESSION_SQL, FIND_BOOKING_SQL, INSERT_BOOKING_SQL,
+    RELEASED_STATUSES, STREAM_CHUNK_SIZE, booking_from_row, booking_params, created_between_condition,
+    expire_bookings, find_page_sql, stream_sql, update_statement
+)
+
+class AsyncMariaDBBookingRepository(AsyncBookingRepository):
+    """MariaDBBookingRepository issuing the same statements through an AsyncDatabaseConnectionPool."""
+
+    def __init__(self, connection_pool):
+        self.connection_pool = connection_pool
+
+    async def save(self, booking: Booking) -> Booking:
+        async with self.connection_pool.get_connection() as connection:
+            async with connection.cursor() as cursor:
+                await cursor.execute(INSERT_BOOKING_SQL, booking_params(booking))
+        return booking
+
+    async def save_all(self, bookings: List[Booking]) -> List[Booking]:
+        async with self.connection_pool.get_connection() as connection:
+            async with connection.cursor() as cursor:
+                await cursor.executemany(INSERT_BOOKING_SQL, [booking_params(booking) for booking in bookings])
+        return bookings
+
+    async def find_by_id(self, booking_id: UUID) -> Optional[Booking]:
+        async with self.connection_pool.get_connection(readonly=True) as connection:
+            async with connection.cursor(aiomysql.Cursor) as cursor:
+                await cursor.execute(FIND_BOOKING_SQL, (str(booking_id),))
+                row = await cursor.fetchone()
+                return booking_from_row(row) if row else None
+
+    async def find_by_user_id(self, user_id: UUID, limit: Optional[int] = None,
+                              after: Optional[PageCursor] = None) -> List[Booking]:
+        return await self._find_page("user_id = %s", [str(user_id)], limit, after)
+
+    async def find_by_session_id(self, session_id: UUID, limit: Optional[int] = None,
+                                 after: Optional[PageCursor] = None) -> List[Booking]:
+        return await self._find_page("session_id = %s", [str(session_id)], limit, after)
+
+    async def find_by_status(self, status: BookingStatus, limit: Optional[int] = None,
+                             after: Optional[PageCursor] = None) -> List[Booking]:
+        return await self._find_page("status = %s", [status.value], limit, after)
+
+    async def _find_page(self, condition: str, params: List, limit: Optional[int],
+                         after: Optional[PageCursor]) -> List[Booking]:
+        keyset, ordering, page_params = keyset_page(after, limit)
+        where = f"{condition} AND {keyset}" if keyset else condition
+        async with self.connection_pool.get_connection(readonly=True) as connection:
+            async with connection.cursor(aiomysql.Cursor) as cursor:
+                await cursor.execute(find_page_sql(where, ordering), params + page_params)
+                return [booking_from_row(row) for row in await cursor.fetchall()]
+
+    async def update(self, booking: Booking,
+                     expected_status: Optional[BookingStatus] = None) -> Optional[Booking]:
+        async with self.connection_pool.get_connection() as connection:
+            async with connection.cursor() as cursor:
+                await cursor.execute(*update_statement(booking, expected_status))
+                updated = cursor.rowcount > 0 or expected_status is None
+        return booking if updated else None
+
+    async def delete(self, booking_id: UUID) -> bool:
+        async with self.connection_pool.get_connection() as connection:
+            async with connection.cursor() as cursor:
+                await cursor.execute("DELETE FROM bookings WHERE id = %s", (str(booking_id),))
+                return cursor.rowcount > 0
+
+    async def find_active_bookings_for_session(self, session_id: UUID) -> List[Booking]:
+        async with self.connection_pool.get_connection(readonly=True) as connection:
+            async with connection.cursor(aiomysql.Cursor) as cursor:
+                await cursor.execute(FIND_ACTIVE_FOR_SESSION_SQL, (str(session_id),) + RELEASED_STATUSES)
+                return [booking_from_row(row) for row in await cursor.fetchall()]
+
+    async def expire_pending(self, created_before: datetime, limit: int) -> List[Booking]:
+        # Row locks must last until the status change, so not an autocommit connection
+        async with self.connection_pool.transaction() as connection:
+            async with connection.cursor(aiomysql.Cursor) as cursor:
+                await cursor.execute(EXPIRABLE_HOLDS_SQL, (BookingStatus.PENDING.value, created_before, limit))
+                bookings, statement = expire_bookings(await cursor.fetchall())
+                if statement:
+                    await cursor.execute(*statement)
+        return bookings
+
+    def iter_by_session_id(self, session_id: UUID,
+                           chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[Booking]:
+        return self._stream("session_id = %s", [str(session_id)], chunk_size)
+
+    def iter_by_status(self, status: BookingStatus,
+                       chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[Booking]:
+        return self._stream("status = %s", [status.value], chunk_size)
+
+    def iter_by_created_between(self, start: Optional[datetime], end: Optional[datetime],
+                                chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[Booking]:
+        condition, params = created_between_condition(start, end)
+        return self._stream(condition, params, chunk_size)
+
+    async def _stream(self, condition: str, params: List, chunk_size: int) -> AsyncIterator[Booking]:
+        """Yield matching bookings through an unbuffered cursor, chunk_size rows per fetch."""
+        async with self.connection_pool.get_connection(readonly=True) as connection:
+            cursor = await connection.cursor(aiomysql.SSCursor)
+            finished = False
+            try:
+                await cursor.execute(stream_sql(condition), params)
+                while True:
+                    rows = await cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield booking_from_row(row)
+                finished = True
+            finally:
+                if finished:
+                    await cursor.close()
+                else:
+                    # Closing the cursor would read the rest of the result; drop the connection instead
+                    connection.close()
@@ -0,0 +1,214 @@
+from typing import List, Optional
+from uuid import UUID
+import random
+import aiomysql
+import pymysql
+
+from ...domain.entities.event import Event
+from ...domain.entities.session import Session
+from ...domain.repositories.async_event_repository import AsyncEventRepository
+from ...domain.repositories.event_repository import SessionInUseError
+from ...domain.repositories.pagination import PageCursor
+from .keyset import keyset_page
+from .mariadb_event_repository import (
+    FIND_EVENT_BY_SESSION_SQL, FIND_SESSION_SQL, INSERT_CATEGORY_SQL, INSERT_EVENT_SQL,
+    INSERT_SESSION_SQL, RELEASE_SEATS_SQL, RESERVE_SEATS_SQL, bulk_load_queries, category_params,
+    changed_statements, event_params, events_from_rows, find_by_category_sql, is_referenced_by_bookings,
+    session_from_row, session_params, update_all_statements
+)
+from .seat_shards import (
+    ADJUST_SHARD_SQL, FIND_SEAT_SHARDS_SQL, INSERT_SHARD_SQL, LOCK_SESSION_SQL, LOCK_SHARDS_SQL,
+    RELEASE_SHARD_SQL, RESERVE_SHARD_SQL, SET_SEAT_SHARDS_SQL, SUM_SHARDS_SQL, plan_overflow,
+    seat_shard_modes, shard_rows
+)
+
+class AsyncMariaDBEventRepository(AsyncEventRepository):
+    """MariaDBEventRepository issuing the same statements through an AsyncDatabaseConnectionPool."""
+
+    def __init__(self, connection_pool):
+        self.connection_pool = connection_pool
+
+    async def save(self, event: Event) -> Event:
+        async with self.connection_pool.transaction() as connection:
+            async with connection.cursor() as cursor:
+                await cursor.execute(INSERT_EVENT_SQL, event_params(event))
+                if event.categories:
+                    await cursor.executemany(INSERT_CATEGORY_SQL, category_params(event.id, event.categories))
+                if event.sessions:
+                    await cursor.executemany(INSERT_SESSION_SQL,
+                                             [session_params(event.id, session) for session in event.sessions])
+        event.mark_persisted()
+        return event
+
+    async def find_by_id(self, event_id: UUID) -> Optional[Event]:
+        async with self.connection_pool.get_connection(readonly=True) as connection:
+            async with connection.cursor() as cursor:
+                await cursor.execute("SELECT * FROM events WHERE id = %s", (str(event_id),))
+                events = await self._load_events(cursor, await cursor.fetchall())
+                return events[0] if events else None
+
+    async def find_session(self, session_id: UUID) -> Optional[Session]:
+        async with self.connection_pool.get_connection(readonly=True) as connection:
+            async with connection.cursor() as cursor:
+                await cursor.execute(FIND_SESSION_SQL, (str(session_id),))
+                session_data = await cursor.fetchone()
+                return session_from_row(session_data) if session_data else None
+
+    async def find_event_by_session_id(self, session_id: UUID) -> Optional[Event]:
+        async with self.connection_pool.get_connection(readonly=True) as connection:
+            async with connection.cursor() as cursor:
+                await cursor.execute(FIND_EVENT_BY_SESSION_SQL, (str(session_id),))
+                events = await self._load_events(cursor, await cursor.fetchall())
+                return events[0] if events else None
+
+    async def find_all(self, limit: Optional[int] = None,
+                       after: Optional[PageCursor] = None) -> List[Event]:
+        async with self.connection_pool.get_connection(readonly=True) as connection:
+            async with connection.cursor() as cursor:
+                if limit is None and after is None:
+                    await cursor.execute("SELECT * FROM events")
+                else:
+                    keyset, ordering, params = keyset_page(after, limit)
+                    where = f"WHERE {keyset}" if keyset else ""
+                    await cursor.execute(f"SELECT * FROM events {where} {ordering}", params)
+                return await self._load_events(cursor, await cursor.fetchall())
+
+    async def find_by_category(self, category: str, limit: Optional[int] = None,
+                               after: Optional[PageCursor] = None) -> List[Event]:
+        async with self.connection_pool.get_connection(readonly=True) as connection:
+            async with connection.cursor() as cursor:
+                if limit is None and after is None:
+                    keyset, ordering, params = '', '', []
+                else:
+                    keyset, ordering, params = keyset_page(after, limit, alias='e')
+                await cursor.execute(find_by_category_sql(keyset, ordering), [category] + params)
+                return await self._load_events(cursor, await cursor.fetchall())
+
+    async def update(self, event: Event) -> Event:
+        if event.is_persisted():
+            statements = changed_statements(event)
+            if not statements:
+                return event
+        else:
+            statements = update_all_statements(event)
+
+        try:
+            async with self.connection_pool.transaction() as connection:
+                async with connection.cursor() as cursor:
+                    for sql, params, many in statements:
+                        if many:
+                            await cursor.executemany(sql, params)
+                        else:
+                            await cursor.execute(sql, params)
+        except pymysql.err.IntegrityError as e:
+            if is_referenced_by_bookings(e):
+                raise SessionInUseError("Session still has bookings") from e
+            raise
+        event.mark_persisted()
+        return event
+
+    async def reserve_seats(self, session_id: UUID, num_seats: int) -> Optional[int]:
+        return await self._adjust_seats(True, session_id, num_seats)
+
+    async def release_seats(self, session_id: UUID, num_seats: int) -> Optional[int]:
+        return await self._adjust_seats(False, session_id, num_seats)
+
+    async def _adjust_seats(self, reserve: bool, session_id: UUID, num_seats: int) -> Optional[int]:
+        key = str(session_id)
+        shards = seat_shard_modes.get(key)
+        if shards is None:
+            shards = await self._load_seat_shards(key)
+            if shards is None:
+                return None
+            return await self._adjust_counter(reserve, key, num_seats, shards)
+
+        booked_seats = await self._adjust_counter(reserve, key, num_seats, shards)
+        if booked_seats is None:
+            # The cached mode may predate shard_seats(); check once before giving up
+            fresh = await self._load_seat_shards(key)
+            if fresh is not None and fresh != shards:
+                booked_seats = await self._adjust_counter(reserve, key, num_seats, fresh)
+        return booked_seats
+
+    async def _adjust_counter(self, reserve: bool, key: str, num_seats: int, shards: int) -> Optional[int]:
+        if shards:
+            # The overflow path spans several statements, so it needs a transaction
+            async with self.connection_pool.transaction() as connection:
+                async with connection.cursor(aiomysql.Cursor) as cursor:
+                    return await self._adjust_shards(cursor, reserve, key, num_seats, shards)
+
+        async with self.connection_pool.get_connection() as connection:
+            async with connection.cursor(aiomysql.Cursor) as cursor:
+                await cursor.execute(RESERVE_SEATS_SQL if reserve else RELEASE_SEATS_SQL,
+                                     (num_seats, key, num_seats))
+                return cursor.lastrowid if cursor.rowcount else None
+
+    async def _load_seat_shards(self, key: str) -> Optional[int]:
+        async with self.connection_pool.get_connection() as connection:
+            async with connection.cursor(aiomysql.Cursor) as cursor:
+                await cursor.execute(FIND_SEAT_SHARDS_SQL, (key,))
+                row = await cursor.fetchone()
+        if row is None:
+            return None
+        seat_shard_modes.remember(key, row[0])
+        return row[0]
+
+    async def _adjust_shards(self, cursor, reserve: bool, key: str, num_seats: int,
+                             shards: int) -> Optional[int]:
+        """Move num_seats on a random shard, spreading over all of them when it lacks room."""
+        await cursor.execute(RESERVE_SHARD_SQL if reserve else RELEASE_SHARD_SQL,
+                             (num_seats, key, random.randrange(shards), num_seats))
+        if cursor.rowcount:
+            await cursor.execute(SUM_SHARDS_SQL, (key,))
+            return int((await cursor.fetchone())[0])
+
+        await cursor.execute(LOCK_SHARDS_SQL, (key,))
+        rows = await cursor.fetchall()
+        plan = plan_overflow(rows, num_seats, reserve)
+        if plan is None:
+            return None
+        for shard, delta in plan:
+            await cursor.execute(ADJUST_SHARD_SQL, (delta, key, shard))
+        return sum(row[2] for row in rows) + (num_seats if reserve else -num_seats)
+
+    async def shard_seats(self, session_id: UUID, shards: int) -> bool:
+        """Split the seat counter of a session over shards rows; see MariaDBEventRepository."""
+        if shards < 1:
+            raise ValueError("shards must be positive")
+        key = str(session_id)
+        async with self.connection_pool.transaction() as connection:
+            async with connection.cursor(aiomysql.Cursor) as cursor:
+                await cursor.execute(LOCK_SESSION_SQL, (key,))
+                row = await cursor.fetchone()
+                if row is None or row[2] != 0:
+                    return False
+                capacity, booked_seats, _ = row
+                await cursor.executemany(INSERT_SHARD_SQL, shard_rows(key, capacity, booked_seats, shards))
+                await cursor.execute(SET_SEAT_SHARDS_SQL, (shards, key))
+        seat_shard_modes.remember(key, shards)
+        return True
+
+    async def delete(self, event_id: UUID) -> bool:
+        try:
+            async with self.connection_pool.get_connection() as connection:
+                async with connection.cursor() as cursor:
+                    await cursor.execute("DELETE FROM events WHERE id = %s", (str(event_id),))
+                    return cursor.rowcount > 0
+        except pymysql.err.IntegrityError as e:
+            if is_referenced_by_bookings(e):
+                raise SessionInUseError("Session still has bookings") from e
+            raise
+
+    async def _load_events(self, cursor, events_data) -> List[Event]:
+        """Build events from event rows, loading their categories and sessions in bulk."""
+        if not events_data:
+            return []
+
+        category_rows, session_rows = [], []
+        for categories_sql, sessions_sql, ids in bulk_load_queries([row['id'] for row in events_data]):
+            await cursor.execute(categories_sql, ids)
+            category_rows.extend(await cursor.fetchall())
+            await cursor.execute(sessions_sql, ids)
+            session_rows.extend(await cursor.fetchall())
+
+        return events_from_rows(events_data, category_rows, session_rows)
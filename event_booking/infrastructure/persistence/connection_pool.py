@@ -1,39 +1,152 @@
-from typing import Optional
+from collections import deque
+from typing import Any, Dict, Optional, Sequence, Tuple
+import logging
+import threading
+import time
+import weakref
 import pymysql
 from pymysql.cursors import DictCursor
 from contextlib import contextmanager
 
+from .galera_nodes import WSREP_STATUS_SQL, GaleraNode, GaleraNodeSet, is_node_failure
+
+logger = logging.getLogger('event_booking.db')
+
+class ConnectionPoolError(Exception):
+    """Base class for connection pool errors."""
+    pass
+
+class PoolExhaustedError(ConnectionPoolError):
+    """Raised when no connection becomes available before the checkout timeout."""
+    pass
+
+class DatabaseUnavailableError(ConnectionPoolError):
+    """Raised while new connections are refused after repeated connect failures."""
+    pass
+
+def _maintenance_loop(pool_ref: 'weakref.ref', stop: threading.Event, interval: float) -> None:
+    while not stop.wait(interval):
+        pool = pool_ref()
+        if pool is None:
+            return
+        try:
+            pool.maintain()
+        except Exception as e:
+            logger.error(f"Connection pool maintenance failed: {e}")
+        del pool
+
+class _Waiter:
+    """A thread queued for a connection, served in FIFO order."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.connection = None
+        # Set when a slot was freed and the waiter may open its own connection
+        self.may_create = False
+
 class DatabaseConnectionPool:
     _instance: Optional['DatabaseConnectionPool'] = None
+    _instance_lock = threading.Lock()
 
-    def __init__(self, host: str, port: int, user: str, password: str, database: str, pool_size: int = 5):
-        """Initialize the connection pool."""
+    def __init__(self, host: str, port: int, user: str, password: str, database: str,
+                 min_size: int = 1, max_size: int = 5, checkout_timeout: float = 10.0,
+                 validate_after_idle: float = 30.0, max_lifetime: float = 1800.0,
+                 max_idle_time: float = 600.0, maintenance_interval: float = 30.0,
+                 connect_backoff: float = 0.1, max_connect_backoff: float = 5.0,
+                 nodes: Optional[Sequence[Tuple[str, int]]] = None, node_failure_backoff: float = 1.0,
+                 spread_nodes: bool = False):
+        """Initialize the connection pool.
+
+        With nodes, connections go straight to the Galera nodes instead of
+        host and port: to the first healthy one in configured order, or with
+        spread_nodes to the best scored one, which only read-only pools
+        should use. Without nodes the pool connects to a single endpoint
+        such as HAProxy.
+        """
         if DatabaseConnectionPool._instance is not None:
             raise RuntimeError("Use get_instance() to access DatabaseConnectionPool")
-        
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        if not 0 <= min_size <= max_size:
+            raise ValueError("min_size must be between 0 and max_size")
+
         self.host = host
         self.port = port
         self.user = user
         self.password = password
         self.database = database
-        self.pool_size = pool_size
-        self._connections = []
+        self.min_size = min_size
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        # Idle connections are pinged only after this many seconds without use
+        self.validate_after_idle = validate_after_idle
+        # Connections are recycled once they are older than this
+        self.max_lifetime = max_lifetime
+        # Idle connections above min_size are closed after this long
+        self.max_idle_time = max_idle_time
+        self.maintenance_interval = maintenance_interval
+        self.connect_backoff = connect_backoff
+        self.max_connect_backoff = max_connect_backoff
+        self._nodes = GaleraNodeSet(nodes, failure_backoff=node_failure_backoff,
+                                    spread=spread_nodes) if nodes else None
+
+        self._lock = threading.Lock()
+        # Idle entries are (connection, idle_since); the right end is the warmest
+        self._idle = deque()
+        self._waiters = deque()
+        self._born: Dict[int, float] = {}
+        # Node each connection was opened to, in multi-node mode
+        self._node_of: Dict[int, GaleraNode] = {}
+        self._size = 0
+        self._closed = False
+        self._connect_failures = 0
+        self._retry_connect_at = 0.0
+        # Connection bound to the current thread by transaction()
+        self._local = threading.local()
+
+        # Counters exposed through stats()
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._timeouts = 0
+        self._created = 0
+        self._discarded = 0
+        self._recycled = 0
+        self._validations = 0
+        self._validation_failures = 0
+        self._failed_connects = 0
+
+        self._fill_to_min_size()
+
+        self._stop_maintenance = threading.Event()
+        self._maintainer = None
+        if maintenance_interval > 0:
+            # The thread only holds a weak reference, so a dropped pool is still collected
+            self._maintainer = threading.Thread(
+                target=_maintenance_loop,
+                args=(weakref.ref(self), self._stop_maintenance, maintenance_interval),
+                name="db-pool-maintainer", daemon=True
+            )
+            self._maintainer.start()
 
     @classmethod
     def get_instance(cls, host: str = None, port: int = None, user: str = None,
-                    password: str = None, database: str = None, pool_size: int = 5) -> 'DatabaseConnectionPool':
+                    password: str = None, database: str = None,
+                    **pool_options) -> 'DatabaseConnectionPool':
         """Get or create the singleton instance of DatabaseConnectionPool."""
-        if cls._instance is None:
-            if not all([host, port, user, password, database]):
-                raise ValueError("All connection parameters must be provided when creating the pool")
-            cls._instance = DatabaseConnectionPool(host, port, user, password, database, pool_size)
-        return cls._instance
+        with cls._instance_lock:
+            if cls._instance is None:
+                if not all([host, port, user, password, database]):
+                    raise ValueError("All connection parameters must be provided when creating the pool")
+                cls._instance = DatabaseConnectionPool(host, port, user, password, database,
+                                                       **pool_options)
+            return cls._instance
 
-    def _create_connection(self):
-        """Create a new database connection."""
+    def _connect(self, host: str, port: int):
+        """Open a connection to one server."""
         return pymysql.connect(
-            host=self.host,
-            port=self.port,
+            host=host,
+            port=port,
             user=self.user,
             password=self.password,
             database=self.database,
@@ -41,53 +154,383 @@ class DatabaseConnectionPool:
             autocommit=False
         )
 
-    @contextmanager
-    def get_connection(self):
-        """Get a connection from the pool."""
-        connection = None
+    def _create_connection(self):
+        """Create a new database connection."""
+        if self._nodes is None:
+            return self._connect(self.host, self.port)
+
+        error = None
+        for node in self._nodes.candidates():
+            started = time.monotonic()
+            try:
+                connection = self._connect(node.host, node.port)
+            except Exception as e:
+                # Fail over to the next node straight away
+                self._nodes.record_failure(node, e)
+                error = e
+                continue
+            try:
+                status = self._probe(connection)
+            except Exception as e:
+                self._close_quietly(connection)
+                self._nodes.record_failure(node, e)
+                error = e
+                continue
+            if not self._nodes.record_success(node, time.monotonic() - started, status):
+                self._close_quietly(connection)
+                # Counted by _open_connection like a refused connect
+                error = pymysql.err.OperationalError(1047, f"Galera node {node.name} is not serving")
+                continue
+            with self._lock:
+                self._node_of[id(connection)] = node
+            return connection
+        raise error
+
+    @staticmethod
+    def _probe(connection) -> Dict[str, str]:
+        """Read the wsrep status of the node behind a connection."""
+        with connection.cursor(DictCursor) as cursor:
+            cursor.execute(WSREP_STATUS_SQL)
+            return {row['Variable_name']: row['Value'] for row in cursor.fetchall()}
+
+    def _fill_to_min_size(self) -> None:
+        """Open connections until min_size idle connections are warm."""
+        while True:
+            with self._lock:
+                if (self._closed or len(self._idle) >= self.min_size
+                        or self._size >= self.max_size):
+                    return
+                self._size += 1
+            try:
+                connection = self._open_connection()
+            except Exception as e:
+                logger.warning(f"Could not pre-open pooled connection: {e}")
+                return
+            self._release(connection)
+
+    def _open_connection(self):
+        """Open a connection for a slot already reserved in _size."""
         try:
-            # Try to get an existing connection
-            if self._connections:
-                connection = self._connections.pop()
-                try:
-                    # Test if connection is still alive
-                    connection.ping(reconnect=True)
-                except:
-                    # Connection is dead, create new one
-                    connection = self._create_connection()
+            with self._lock:
+                if time.monotonic() < self._retry_connect_at:
+                    raise DatabaseUnavailableError(
+                        f"Database connections suspended for "
+                        f"{self._retry_connect_at - time.monotonic():.2f}s after "
+                        f"{self._connect_failures} failed attempts"
+                    )
+            connection = self._create_connection()
+        except Exception as e:
+            with self._lock:
+                self._size -= 1
+                if not isinstance(e, DatabaseUnavailableError):
+                    # Back off exponentially so a dead node is not hammered
+                    self._failed_connects += 1
+                    self._connect_failures += 1
+                    delay = min(self.max_connect_backoff,
+                                self.connect_backoff * 2 ** (self._connect_failures - 1))
+                    self._retry_connect_at = time.monotonic() + delay
+                self._pass_slot_to_waiter()
+            raise
+        with self._lock:
+            self._created += 1
+            self._connect_failures = 0
+            self._retry_connect_at = 0.0
+            self._born[id(connection)] = time.monotonic()
+        return connection
+
+    def _pass_slot_to_waiter(self) -> None:
+        """Let the first waiter open a connection in a freed slot. Caller holds the lock."""
+        if self._waiters and self._size < self.max_size:
+            waiter = self._waiters.popleft()
+            self._size += 1
+            waiter.may_create = True
+            waiter.event.set()
+
+    def _is_expired(self, connection, now: float) -> bool:
+        """Check whether a connection has outlived max_lifetime. Caller holds the lock."""
+        born = self._born.get(id(connection), now)
+        return self.max_lifetime > 0 and now - born >= self.max_lifetime
+
+    def _checkout(self, timeout: float):
+        """Take an idle connection, open a new one or wait in FIFO order.
+
+        Returns the connection and the time it became idle, or None for a
+        freshly opened connection.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed")
+            if self._idle and not self._waiters:
+                return self._idle.pop()
+            if self._size < self.max_size and not self._waiters:
+                self._size += 1
+                waiter = None
             else:
-                # Create new connection
-                connection = self._create_connection()
+                waiter = _Waiter()
+                self._waiters.append(waiter)
+                self._waits += 1
 
-            yield connection
+        if waiter is None:
+            return self._open_connection(), None
 
-            # Return connection to pool if it's still usable
-            try:
-                if not connection.open:
-                    connection = self._create_connection()
-                self._connections.append(connection)
-            except:
-                # If connection is unusable, create new one for pool
-                self._connections.append(self._create_connection())
+        started = time.monotonic()
+        waiter.event.wait(timeout)
+        with self._lock:
+            self._wait_time += time.monotonic() - started
+            if not waiter.event.is_set():
+                self._waiters.remove(waiter)
+                self._timeouts += 1
+                raise PoolExhaustedError(
+                    f"No database connection available within {timeout:.1f}s "
+                    f"(max_size={self.max_size}, in use={self._size - len(self._idle)})"
+                )
+
+        if waiter.connection is not None:
+            # Handed over straight from another thread, so it was just in use
+            return waiter.connection, time.monotonic()
+        return self._open_connection(), None
+
+    def _acquire(self, timeout: Optional[float] = None):
+        """Check out a usable connection, applying the lifetime and idle validation policy."""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            self._checkouts += 1
 
+        while True:
+            connection, idle_since = self._checkout(max(0.0, deadline - time.monotonic()))
+            if idle_since is None:
+                return connection
+
+            now = time.monotonic()
+            with self._lock:
+                expired = self._is_expired(connection, now)
+            if expired:
+                self._discard(connection, recycled=True)
+                continue
+
+            if now - idle_since >= self.validate_after_idle:
+                if not self._validate(connection):
+                    self._discard(connection)
+                    continue
+            return connection
+
+    def _validate(self, connection) -> bool:
+        """Ping a connection that has been idle too long to trust.
+
+        In multi-node mode the wsrep status probe doubles as the ping.
+        """
+        with self._lock:
+            self._validations += 1
+            node = self._node_of.get(id(connection))
+        try:
+            if node is None:
+                connection.ping(reconnect=False)
+                return True
+            if self._nodes.record_status(node, self._probe(connection)):
+                return True
+            self._evict_node(node)
         except Exception as e:
-            # If any error occurs, ensure connection is closed
-            if connection:
-                try:
-                    connection.close()
-                except:
-                    pass
-            raise e
+            logger.info(f"Dropping stale pooled connection: {e}")
+            if node is not None:
+                self._node_failed(node, e)
+        with self._lock:
+            self._validation_failures += 1
+        return False
+
+    def _node_failed(self, node: GaleraNode, error: BaseException) -> None:
+        """Steer new connections away from a failed node and drop its idle ones."""
+        self._nodes.record_failure(node, error)
+        self._evict_node(node)
+
+    def _evict_node(self, node: GaleraNode) -> None:
+        with self._lock:
+            evicted = [c for c, _ in self._idle if self._node_of.get(id(c)) is node]
+            if not evicted:
+                return
+            self._idle = deque(entry for entry in self._idle if self._node_of.get(id(entry[0])) is not node)
+        for connection in evicted:
+            self._discard(connection)
+
+    def _release(self, connection) -> None:
+        """Hand a healthy connection to the next waiter or back to the idle set."""
+        with self._lock:
+            if not self._closed and not self._is_expired(connection, time.monotonic()):
+                if self._waiters:
+                    waiter = self._waiters.popleft()
+                    waiter.connection = connection
+                    waiter.event.set()
+                else:
+                    self._idle.append((connection, time.monotonic()))
+                return
+        self._discard(connection, recycled=not self._closed)
+
+    def _discard(self, connection, recycled: bool = False) -> None:
+        """Drop a connection and free its slot."""
+        self._close_quietly(connection)
+        with self._lock:
+            self._born.pop(id(connection), None)
+            self._node_of.pop(id(connection), None)
+            self._size -= 1
+            if recycled:
+                self._recycled += 1
+            else:
+                self._discarded += 1
+            self._pass_slot_to_waiter()
+
+    @staticmethod
+    def _close_quietly(connection) -> None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    @contextmanager
+    def get_connection(self, timeout: Optional[float] = None):
+        """Get a connection from the pool, waiting up to timeout seconds."""
+        bound = getattr(self._local, 'connection', None)
+        if bound is not None:
+            # Inside transaction(): share its connection, it handles commit and rollback
+            yield bound
+            return
+
+        connection = self._acquire(timeout)
+        try:
+            yield connection
+        except BaseException as e:
+            node = self._node_of.get(id(connection)) if self._nodes is not None else None
+            if node is not None and is_node_failure(e):
+                # Fail over now rather than at the next validation
+                self._discard(connection)
+                self._node_failed(node, e)
+                raise
+            # Roll back the failed or abandoned unit of work (GeneratorExit included);
+            # drop the connection if that fails too
+            try:
+                connection.rollback()
+            except Exception:
+                self._discard(connection)
+            else:
+                self._release(connection)
+            raise
+
+        if not connection.open:
+            self._discard(connection)
+            return
+        if getattr(self._local, 'connection', None) is connection:
+            # transaction() has just committed it
+            self._release(connection)
+            return
+        # End the read view or locks a plain checkout may have left open, as on error
+        try:
+            connection.rollback()
+        except Exception:
+            self._discard(connection)
+        else:
+            self._release(connection)
+
+    @contextmanager
+    def transaction(self, timeout: Optional[float] = None):
+        """Bind one connection to this thread and commit it once on exit.
+
+        Nested transactions join the outer one.
+        """
+        if getattr(self._local, 'connection', None) is not None:
+            yield self._local.connection
+            return
+
+        try:
+            with self.get_connection(timeout) as connection:
+                self._local.connection = connection
+                yield connection
+                connection.commit()
+        finally:
+            self._local.connection = None
+
+    def in_transaction(self) -> bool:
+        """Check whether the current thread runs inside transaction()."""
+        return getattr(self._local, 'connection', None) is not None
+
+    def commit(self, connection) -> None:
+        """Commit a repository call unless an enclosing transaction will commit it."""
+        if not self.in_transaction():
+            connection.commit()
+
+    def maintain(self) -> None:
+        """Evict stale idle connections, validate long-idle ones and keep min_size warm."""
+        now = time.monotonic()
+        stale = []
+        to_validate = []
+        with self._lock:
+            if self._closed:
+                return
+            keep = deque()
+            idle_count = len(self._idle)
+            # Oldest idle connections sit at the left end
+            for connection, idle_since in self._idle:
+                idle_for = now - idle_since
+                if self._is_expired(connection, now):
+                    stale.append((connection, True))
+                    idle_count -= 1
+                elif (self.max_idle_time > 0 and idle_for >= self.max_idle_time
+                      and idle_count > self.min_size):
+                    stale.append((connection, False))
+                    idle_count -= 1
+                elif idle_for >= self.validate_after_idle:
+                    to_validate.append(connection)
+                else:
+                    keep.append((connection, idle_since))
+            self._idle = keep
+
+        for connection, recycled in stale:
+            self._discard(connection, recycled=recycled)
+
+        for connection in to_validate:
+            if self._validate(connection):
+                self._release(connection)
+            else:
+                self._discard(connection)
+
+        self._fill_to_min_size()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool sizing and saturation counters."""
+        with self._lock:
+            return {
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'size': self._size,
+                'in_use': self._size - len(self._idle),
+                'idle': len(self._idle),
+                'waiting': len(self._waiters),
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'wait_time_total': round(self._wait_time, 6),
+                'timeouts': self._timeouts,
+                'created': self._created,
+                'discarded': self._discarded,
+                'recycled': self._recycled,
+                'validations': self._validations,
+                'validation_failures': self._validation_failures,
+                'failed_connects': self._failed_connects,
+                'nodes': self._nodes.stats() if self._nodes is not None else None,
+            }
 
     def close_all(self):
         """Close all connections in the pool."""
-        for conn in self._connections:
-            try:
-                conn.close()
-            except:
-                pass
-        self._connections.clear()
+        stop = getattr(self, '_stop_maintenance', None)
+        if stop is not None:
+            stop.set()
+        with self._lock:
+            self._closed = True
+            idle = [connection for connection, _ in self._idle]
+            self._idle.clear()
+        for conn in idle:
+            self._discard(conn, recycled=True)
 
     def __del__(self):
         """Ensure all connections are closed when object is destroyed."""
-        self.close_all() 
\ No newline at end of file
+        try:
+            self.close_all()
+        except Exception:
+            pass
@@ -0,0 +1,171 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import logging
+import math
+import threading
+import time
+import pymysql
+
+logger = logging.getLogger('event_booking.db')
+
+WSREP_STATUS_SQL = "SHOW GLOBAL STATUS WHERE Variable_name IN ('wsrep_ready', 'wsrep_local_state')"
+
+# wsrep_local_state values a node can serve queries in
+SYNCED = 4
+DONOR = 2
+# A donor streams state to a joiner and answers slowly meanwhile
+DONOR_PENALTY = 4.0
+
+# Server and client error codes meaning the node or the connection to it is gone
+NODE_FAILURE_ERRORS = {
+    1047,  # WSREP has not yet prepared node for application use
+    1053,  # Server shutdown in progress
+    2003,  # Can't connect to MySQL server
+    2006,  # MySQL server has gone away
+    2013,  # Lost connection to MySQL server during query
+    2055,  # Lost connection to MySQL server at '%s', system error
+}
+
+class GaleraNode:
+    """One cluster node and what the pool has observed about it."""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        # Moving average of connect plus probe time, in seconds; None until first contact
+        self.latency: Optional[float] = None
+        # Recent errors, halved on every success
+        self.errors = 0.0
+        self.consecutive_failures = 0
+        self.down_until = 0.0
+        self.ready = True
+        self.state: Optional[int] = None
+        self.connects = 0
+        self.failures = 0
+
+    @property
+    def name(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    @property
+    def serving(self) -> bool:
+        """Whether the last status probe found the node ready for queries."""
+        return self.ready and self.state in (None, SYNCED, DONOR)
+
+    def usable(self, now: float) -> bool:
+        return now >= self.down_until
+
+    def score(self, now: float) -> float:
+        """Lower is better; infinite for nodes that should not get new connections."""
+        if not self.usable(now):
+            return math.inf
+        penalty = 1.0 + self.errors
+        if self.state == DONOR:
+            penalty *= DONOR_PENALTY
+        # Nodes never contacted score 0 so each one is tried once
+        return (self.latency or 0.0) * penalty
+
+class GaleraNodeSet:
+    """Health scores for a list of Galera nodes, ordering them for new connections.
+
+    By default the first usable node in configured order is the primary and
+    gets every new connection, so writes stay on one node and do not conflict
+    in certification; the others only take over while it is down or a donor.
+    With spread, usable nodes are ranked by score instead, which suits pools
+    that only read.
+    """
+
+    def __init__(self, nodes: Sequence[Tuple[str, int]], failure_backoff: float = 1.0,
+                 max_failure_backoff: float = 30.0, latency_weight: float = 0.3,
+                 spread: bool = False):
+        if not nodes:
+            raise ValueError("At least one node is required")
+        self.nodes = [GaleraNode(host, port) for host, port in nodes]
+        self.failure_backoff = failure_backoff
+        self.max_failure_backoff = max_failure_backoff
+        self.latency_weight = latency_weight
+        self.spread = spread
+        self._lock = threading.Lock()
+
+    def candidates(self) -> List[GaleraNode]:
+        """Nodes to try in order: usable ones preferred first, then the rest by earliest recovery."""
+        now = time.monotonic()
+        with self._lock:
+            if self.spread:
+                preference = lambda n: n.score(now)
+            else:
+                # sorted is stable, so configured order decides among synced nodes
+                preference = lambda n: n.state == DONOR
+            usable = sorted((n for n in self.nodes if n.usable(now)), key=preference)
+            # Still worth a try when every node looks down
+            others = sorted((n for n in self.nodes if not n.usable(now)), key=lambda n: n.down_until)
+        return usable + others
+
+    def record_success(self, node: GaleraNode, latency: float,
+                       status: Optional[Dict[str, str]] = None) -> bool:
+        """Record a connect; return False when its status probe found the node not serving."""
+        with self._lock:
+            node.connects += 1
+            if node.latency is None:
+                node.latency = latency
+            else:
+                node.latency += self.latency_weight * (latency - node.latency)
+        if status is not None:
+            return self.record_status(node, status)
+        self._recovered(node)
+        return True
+
+    def record_status(self, node: GaleraNode, status: Dict[str, str]) -> bool:
+        """Record a wsrep status probe; return whether the node serves queries."""
+        with self._lock:
+            # Servers outside a cluster report neither variable and stay usable
+            node.ready = status.get('wsrep_ready', 'ON').upper() == 'ON'
+            state = status.get('wsrep_local_state')
+            node.state = int(state) if state is not None else None
+            serving = node.serving
+        if serving:
+            self._recovered(node)
+        else:
+            self.record_failure(node, f"not serving (wsrep_ready={status.get('wsrep_ready')}, "
+                                      f"wsrep_local_state={state})")
+        return serving
+
+    def _recovered(self, node: GaleraNode) -> None:
+        with self._lock:
+            node.consecutive_failures = 0
+            node.down_until = 0.0
+            node.errors /= 2
+
+    def record_failure(self, node: GaleraNode, error) -> None:
+        """Keep new connections away from a node, backing off longer while it keeps failing."""
+        with self._lock:
+            node.failures += 1
+            node.consecutive_failures += 1
+            node.errors += 1
+            delay = min(self.max_failure_backoff,
+                        self.failure_backoff * 2 ** (node.consecutive_failures - 1))
+            node.down_until = time.monotonic() + delay
+        logger.warning(f"Galera node {node.name} failed, avoiding it for {delay:.1f}s: {error}")
+
+    def stats(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    'node': node.name,
+                    'usable': node.usable(now),
+                    'latency_ms': round(node.latency * 1000, 3) if node.latency is not None else None,
+                    'errors': round(node.errors, 3),
+                    'ready': node.ready,
+                    'state': node.state,
+                    'connects': node.connects,
+                    'failures': node.failures,
+                }
+                for node in self.nodes
+            ]
+
+def is_node_failure(error: BaseException) -> bool:
+    """Check whether an error from a connection means its node should be avoided."""
+    if isinstance(error, pymysql.err.InterfaceError):
+        return True
+    return (isinstance(error, pymysql.err.OperationalError)
+            and bool(error.args) and error.args[0] in NODE_FAILURE_ERRORS)
@@ -0,0 +1,184 @@
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID, uuid4
+import sqlite3
+import threading
+
+class IntakeStatus(Enum):
+    QUEUED = "QUEUED"
+    PROCESSING = "PROCESSING"
+    BOOKED = "BOOKED"
+    FAILED = "FAILED"
+
+@dataclass
+class IntakeRecord:
+    ticket: UUID
+    user_id: UUID
+    session_id: UUID
+    seats: int
+    status: IntakeStatus
+    attempts: int
+    booking_id: Optional[UUID]
+    error: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS booking_requests (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        ticket TEXT NOT NULL UNIQUE,
+        user_id TEXT NOT NULL,
+        session_id TEXT NOT NULL,
+        seats INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        booking_id TEXT,
+        error TEXT,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    )
+"""
+CREATE_INDEX_SQL = "CREATE INDEX IF NOT EXISTS booking_requests_status ON booking_requests (status, seq)"
+
+COLUMNS = "ticket, user_id, session_id, seats, status, attempts, booking_id, error, created_at, updated_at"
+
+def _record_from_row(row) -> IntakeRecord:
+    ticket, user_id, session_id, seats, status, attempts, booking_id, error, created_at, updated_at = row
+    return IntakeRecord(
+        ticket=UUID(ticket),
+        user_id=UUID(user_id),
+        session_id=UUID(session_id),
+        seats=seats,
+        status=IntakeStatus(status),
+        attempts=attempts,
+        booking_id=UUID(booking_id) if booking_id else None,
+        error=error,
+        created_at=datetime.fromisoformat(created_at),
+        updated_at=datetime.fromisoformat(updated_at)
+    )
+
+class BookingIntakeQueue:
+    """Durable queue of booking requests in a local SQLite file.
+
+    enqueue returns once the request is in the write-ahead log, so an
+    accepted request survives a crash of the process. The ticket doubles
+    as the id of the booking it creates. Processes sharing the file claim
+    requests under SQLite's write lock and never get the same one, unless
+    a claim outlives its lease and is put back with requeue_stale.
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None,
+                                           check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=FULL")
+        self._connection.execute(CREATE_TABLE_SQL)
+        self._connection.execute(CREATE_INDEX_SQL)
+
+    def enqueue(self, user_id: UUID, session_id: UUID, seats: int) -> IntakeRecord:
+        """Durably queue one booking request and return its record."""
+        now = datetime.utcnow()
+        record = IntakeRecord(uuid4(), user_id, session_id, seats, IntakeStatus.QUEUED, 0, None, None, now, now)
+        with self._lock:
+            self._connection.execute(
+                f"INSERT INTO booking_requests ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, NULL, NULL, ?, ?)",
+                (str(record.ticket), str(user_id), str(session_id), seats, record.status.value, 0,
+                 now.isoformat(), now.isoformat())
+            )
+        return record
+
+    def claim(self, limit: int) -> List[IntakeRecord]:
+        """Mark up to limit of the oldest queued requests as processing and return them."""
+        now = datetime.utcnow().isoformat()
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                rows = connection.execute(
+                    f"SELECT seq, {COLUMNS} FROM booking_requests WHERE status = ? ORDER BY seq LIMIT ?",
+                    (IntakeStatus.QUEUED.value, limit)
+                ).fetchall()
+                if rows:
+                    placeholders = ', '.join('?' * len(rows))
+                    connection.execute(
+                        f"UPDATE booking_requests SET status = ?, attempts = attempts + 1, updated_at = ? "
+                        f"WHERE seq IN ({placeholders})",
+                        [IntakeStatus.PROCESSING.value, now] + [row[0] for row in rows]
+                    )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+        records = [_record_from_row(row[1:]) for row in rows]
+        for record in records:
+            record.status = IntakeStatus.PROCESSING
+            record.attempts += 1
+        return records
+
+    def finish(self, outcomes: Sequence[Tuple[UUID, Optional[UUID], Optional[str]]]) -> None:
+        """Record (ticket, booking_id, error) outcomes: booked with a booking id, failed with an error."""
+        now = datetime.utcnow().isoformat()
+        with self._lock:
+            self._connection.executemany(
+                "UPDATE booking_requests SET status = ?, booking_id = ?, error = ?, updated_at = ? WHERE ticket = ?",
+                [((IntakeStatus.BOOKED if booking_id else IntakeStatus.FAILED).value,
+                  str(booking_id) if booking_id else None, error, now, str(ticket))
+                 for ticket, booking_id, error in outcomes]
+            )
+
+    def retry(self, tickets: Sequence[UUID], error: str, max_attempts: int) -> None:
+        """Queue claimed requests again after a failed attempt; fail those out of attempts."""
+        if not tickets:
+            return
+        placeholders = ', '.join('?' * len(tickets))
+        with self._lock:
+            self._connection.execute(
+                f"UPDATE booking_requests SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                f"error = ?, updated_at = ? WHERE ticket IN ({placeholders})",
+                [max_attempts, IntakeStatus.FAILED.value, IntakeStatus.QUEUED.value, error,
+                 datetime.utcnow().isoformat()] + [str(ticket) for ticket in tickets]
+            )
+
+    def requeue_stale(self, claimed_before: datetime) -> int:
+        """Queue again requests claimed before the cutoff, whose worker presumably died."""
+        with self._lock:
+            return self._connection.execute(
+                "UPDATE booking_requests SET status = ?, updated_at = ? WHERE status = ? AND updated_at < ?",
+                (IntakeStatus.QUEUED.value, datetime.utcnow().isoformat(), IntakeStatus.PROCESSING.value,
+                 claimed_before.isoformat())
+            ).rowcount
+
+    def purge(self, finished_before: datetime) -> int:
+        """Delete booked and failed requests finished before the cutoff."""
+        with self._lock:
+            return self._connection.execute(
+                "DELETE FROM booking_requests WHERE status IN (?, ?) AND updated_at < ?",
+                (IntakeStatus.BOOKED.value, IntakeStatus.FAILED.value, finished_before.isoformat())
+            ).rowcount
+
+    def get(self, ticket: UUID) -> Optional[IntakeRecord]:
+        """Get the record of a ticket, or None once purged or if it never existed."""
+        with self._lock:
+            row = self._connection.execute(
+                f"SELECT {COLUMNS} FROM booking_requests WHERE ticket = ?", (str(ticket),)
+            ).fetchone()
+        return _record_from_row(row) if row else None
+
+    def counts(self) -> Dict[str, int]:
+        """Number of requests per status."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT status, COUNT(*) FROM booking_requests GROUP BY status"
+            ).fetchall()
+        counts = {status.value: 0 for status in IntakeStatus}
+        counts.update(dict(rows))
+        return counts
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,25 @@
+from typing import Any, List, Optional, Tuple
+
+from ...domain.repositories.pagination import PageCursor
+
+def keyset_page(after: Optional[PageCursor], limit: Optional[int],
+                alias: str = '') -> Tuple[str, str, List[Any]]:
+    """Build the keyset condition and ORDER BY/LIMIT clause for a (created_at, id) DESC page.
+
+    Returns the condition (to AND into the WHERE clause, empty if none), the
+    ordering clause and the parameters for both, in order.
+    """
+    prefix = f"{alias}." if alias else ''
+    condition = ''
+    params: List[Any] = []
+    if after is not None:
+        # Expanded form so the composite (..., created_at, id) index is used
+        condition = (f"({prefix}created_at < %s OR "
+                     f"({prefix}created_at = %s AND {prefix}id < %s))")
+        params += [after.created_at, after.created_at, str(after.id)]
+
+    ordering = f"ORDER BY {prefix}created_at DESC, {prefix}id DESC"
+    if limit is not None:
+        ordering += " LIMIT %s"
+        params.append(limit)
+    return condition, ordering, params
@@ -1,10 +1,133 @@
-from typing import List, Optional
+from datetime import datetime
+from functools import lru_cache
+from typing import Iterator, List, Optional, Sequence, Tuple
 from uuid import UUID
 import pymysql
-from pymysql.cursors import DictCursor
+from pymysql.cursors import Cursor, SSCursor
 
 from ...domain.entities.booking import Booking, BookingStatus
 from ...domain.repositories.booking_repository import BookingRepository
+from ...domain.repositories.pagination import PageCursor
+from .keyset import keyset_page
+
+INSERT_BOOKING_SQL = """
+    INSERT INTO bookings (
+        id, user_id, session_id, seats, price_per_seat,
+        status, created_at, confirmed_at, cancelled_at
+    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+UPDATE_BOOKING_SQL = """
+    UPDATE bookings
+    SET status = %s, confirmed_at = %s, cancelled_at = %s
+    WHERE id = %s
+"""
+
+# Status transitions that must not overwrite a concurrent one, e.g. a confirm racing the hold sweeper
+GUARDED_UPDATE_BOOKING_SQL = UPDATE_BOOKING_SQL + "    AND status = %s\n"
+
+# Read statements name their columns so booking_from_row can unpack rows by position
+BOOKING_COLUMNS = (
+    "id, user_id, session_id, seats, price_per_seat, status, created_at, confirmed_at, cancelled_at"
+)
+
+FIND_BOOKING_SQL = f"SELECT {BOOKING_COLUMNS} FROM bookings WHERE id = %s"
+
+FIND_ACTIVE_FOR_SESSION_SQL = f"""
+    SELECT {BOOKING_COLUMNS} FROM bookings
+    WHERE session_id = %s
+    AND status NOT IN (%s, %s)
+    ORDER BY created_at DESC
+"""
+
+# Statuses whose seats went back to the session
+RELEASED_STATUSES = (BookingStatus.CANCELLED.value, BookingStatus.EXPIRED.value)
+
+# Seeks idx_bookings_status (status, created_at, id) to the oldest stale holds only,
+# however many bookings the table holds; SKIP LOCKED lets several sweepers split the work
+EXPIRABLE_HOLDS_SQL = f"""
+    SELECT {BOOKING_COLUMNS} FROM bookings
+    WHERE status = %s AND created_at < %s
+    ORDER BY created_at, id
+    LIMIT %s
+    FOR UPDATE SKIP LOCKED
+"""
+
+def expire_holds_sql(count: int) -> str:
+    placeholders = ", ".join(["%s"] * count)
+    return f"UPDATE bookings SET status = %s, cancelled_at = %s WHERE id IN ({placeholders})"
+
+def find_page_sql(where: str, ordering: str) -> str:
+    return f"""
+        SELECT {BOOKING_COLUMNS} FROM bookings WHERE {where}
+        {ordering}
+    """
+
+# Rows fetched per round trip by the streaming iter_* methods
+STREAM_CHUNK_SIZE = 1000
+
+def stream_sql(condition: str) -> str:
+    # Oldest first so an export reads like a ledger; served by the (..., created_at, id) indexes
+    return f"SELECT {BOOKING_COLUMNS} FROM bookings WHERE {condition} ORDER BY created_at, id"
+
+def created_between_condition(start: Optional[datetime], end: Optional[datetime]) -> Tuple[str, List]:
+    """Condition for created_at in [start, end), either bound optional."""
+    conditions, params = [], []
+    if start is not None:
+        conditions.append("created_at >= %s")
+        params.append(start)
+    if end is not None:
+        conditions.append("created_at < %s")
+        params.append(end)
+    return " AND ".join(conditions) or "1 = 1", params
+
+_STATUSES = {status.value: status for status in BookingStatus}
+
+@lru_cache(maxsize=65536)
+def _shared_uuid(value: str) -> UUID:
+    # Users and sessions repeat across a listing; parse each one once and share the instance
+    return UUID(value)
+
+def booking_from_row(row: Sequence) -> Booking:
+    """Build a Booking from a bookings row selected as BOOKING_COLUMNS."""
+    booking_id, user_id, session_id, seats, price, status, created_at, confirmed_at, cancelled_at = row
+    return Booking(
+        id=UUID(booking_id),
+        user_id=_shared_uuid(user_id),
+        session_id=_shared_uuid(session_id),
+        seats=seats,
+        price_per_seat=price,
+        status=_STATUSES[status],
+        created_at=created_at,
+        confirmed_at=confirmed_at,
+        cancelled_at=cancelled_at
+    )
+
+def booking_params(booking: Booking) -> Tuple:
+    return (
+        str(booking.id), str(booking.user_id), str(booking.session_id),
+        booking.seats, booking.price_per_seat, booking.status.value,
+        booking.created_at, booking.confirmed_at, booking.cancelled_at
+    )
+
+def booking_update_params(booking: Booking) -> Tuple:
+    return (booking.status.value, booking.confirmed_at, booking.cancelled_at, str(booking.id))
+
+def update_statement(booking: Booking, expected_status: Optional[BookingStatus]) -> Tuple[str, Tuple]:
+    if expected_status is None:
+        return UPDATE_BOOKING_SQL, booking_update_params(booking)
+    return GUARDED_UPDATE_BOOKING_SQL, booking_update_params(booking) + (expected_status.value,)
+
+def expire_bookings(rows: Sequence[Sequence]) -> Tuple[List[Booking], Optional[Tuple[str, List]]]:
+    """Expire the locked hold rows; return them and the statement recording it, if any."""
+    bookings = [booking_from_row(row) for row in rows]
+    if not bookings:
+        return bookings, None
+    expired_at = datetime.utcnow()
+    for booking in bookings:
+        booking.expire(expired_at)
+    return bookings, (expire_holds_sql(len(bookings)),
+                      [BookingStatus.EXPIRED.value, expired_at] + [str(booking.id) for booking in bookings])
 
 class MariaDBBookingRepository(BookingRepository):
     def __init__(self, connection_pool):
@@ -13,151 +136,111 @@ class MariaDBBookingRepository(BookingRepository):
     def save(self, booking: Booking) -> Booking:
         with self.connection_pool.get_connection() as connection:
             with connection.cursor() as cursor:
-                cursor.execute("""
-                    INSERT INTO bookings (
-                        id, user_id, session_id, seats, price_per_seat,
-                        status, created_at, confirmed_at, cancelled_at
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """, (
-                    str(booking.id), str(booking.user_id), str(booking.session_id),
-                    booking.seats, booking.price_per_seat, booking.status.value,
-                    booking.created_at, booking.confirmed_at, booking.cancelled_at
-                ))
-            connection.commit()
+                cursor.execute(INSERT_BOOKING_SQL, booking_params(booking))
+            self.connection_pool.commit(connection)
             return booking
 
+    def save_all(self, bookings: List[Booking]) -> List[Booking]:
+        with self.connection_pool.get_connection() as connection:
+            with connection.cursor() as cursor:
+                # pymysql folds executemany on INSERT ... VALUES into multi-row inserts
+                cursor.executemany(INSERT_BOOKING_SQL, [booking_params(booking) for booking in bookings])
+            self.connection_pool.commit(connection)
+            return bookings
+
     def find_by_id(self, booking_id: UUID) -> Optional[Booking]:
         with self.connection_pool.get_connection() as connection:
-            with connection.cursor(DictCursor) as cursor:
-                cursor.execute("""
-                    SELECT * FROM bookings WHERE id = %s
-                """, (str(booking_id),))
-                data = cursor.fetchone()
+            with connection.cursor(Cursor) as cursor:
+                cursor.execute(FIND_BOOKING_SQL, (str(booking_id),))
+                row = cursor.fetchone()
 
-                if not data:
+                if not row:
                     return None
 
-                return Booking(
-                    id=UUID(data['id']),
-                    user_id=UUID(data['user_id']),
-                    session_id=UUID(data['session_id']),
-                    seats=data['seats'],
-                    price_per_seat=data['price_per_seat'],
-                    status=BookingStatus(data['status']),
-                    created_at=data['created_at'],
-                    confirmed_at=data['confirmed_at'],
-                    cancelled_at=data['cancelled_at']
-                )
-
-    def find_by_user_id(self, user_id: UUID) -> List[Booking]:
-        with self.connection_pool.get_connection() as connection:
-            with connection.cursor(DictCursor) as cursor:
-                cursor.execute("""
-                    SELECT * FROM bookings WHERE user_id = %s
-                    ORDER BY created_at DESC
-                """, (str(user_id),))
-                return [
-                    Booking(
-                        id=UUID(data['id']),
-                        user_id=UUID(data['user_id']),
-                        session_id=UUID(data['session_id']),
-                        seats=data['seats'],
-                        price_per_seat=data['price_per_seat'],
-                        status=BookingStatus(data['status']),
-                        created_at=data['created_at'],
-                        confirmed_at=data['confirmed_at'],
-                        cancelled_at=data['cancelled_at']
-                    )
-                    for data in cursor.fetchall()
-                ]
-
-    def find_by_session_id(self, session_id: UUID) -> List[Booking]:
-        with self.connection_pool.get_connection() as connection:
-            with connection.cursor(DictCursor) as cursor:
-                cursor.execute("""
-                    SELECT * FROM bookings WHERE session_id = %s
-                    ORDER BY created_at DESC
-                """, (str(session_id),))
-                return [
-                    Booking(
-                        id=UUID(data['id']),
-                        user_id=UUID(data['user_id']),
-                        session_id=UUID(data['session_id']),
-                        seats=data['seats'],
-                        price_per_seat=data['price_per_seat'],
-                        status=BookingStatus(data['status']),
-                        created_at=data['created_at'],
-                        confirmed_at=data['confirmed_at'],
-                        cancelled_at=data['cancelled_at']
-                    )
-                    for data in cursor.fetchall()
-                ]
-
-    def find_by_status(self, status: BookingStatus) -> List[Booking]:
+                return booking_from_row(row)
+
+    def find_by_user_id(self, user_id: UUID, limit: Optional[int] = None,
+                        after: Optional[PageCursor] = None) -> List[Booking]:
+        return self._find_page("user_id = %s", [str(user_id)], limit, after)
+
+    def find_by_session_id(self, session_id: UUID, limit: Optional[int] = None,
+                           after: Optional[PageCursor] = None) -> List[Booking]:
+        return self._find_page("session_id = %s", [str(session_id)], limit, after)
+
+    def find_by_status(self, status: BookingStatus, limit: Optional[int] = None,
+                       after: Optional[PageCursor] = None) -> List[Booking]:
+        return self._find_page("status = %s", [status.value], limit, after)
+
+    def _find_page(self, condition: str, params: List, limit: Optional[int],
+                   after: Optional[PageCursor]) -> List[Booking]:
+        """Fetch bookings matching a condition, newest first, one keyset page at a time."""
+        keyset, ordering, page_params = keyset_page(after, limit)
+        where = f"{condition} AND {keyset}" if keyset else condition
         with self.connection_pool.get_connection() as connection:
-            with connection.cursor(DictCursor) as cursor:
-                cursor.execute("""
-                    SELECT * FROM bookings WHERE status = %s
-                    ORDER BY created_at DESC
-                """, (status.value,))
-                return [
-                    Booking(
-                        id=UUID(data['id']),
-                        user_id=UUID(data['user_id']),
-                        session_id=UUID(data['session_id']),
-                        seats=data['seats'],
-                        price_per_seat=data['price_per_seat'],
-                        status=BookingStatus(data['status']),
-                        created_at=data['created_at'],
-                        confirmed_at=data['confirmed_at'],
-                        cancelled_at=data['cancelled_at']
-                    )
-                    for data in cursor.fetchall()
-                ]
-
-    def update(self, booking: Booking) -> Booking:
+            with connection.cursor(Cursor) as cursor:
+                cursor.execute(find_page_sql(where, ordering), params + page_params)
+                return [booking_from_row(row) for row in cursor.fetchall()]
+
+    def update(self, booking: Booking,
+               expected_status: Optional[BookingStatus] = None) -> Optional[Booking]:
         with self.connection_pool.get_connection() as connection:
             with connection.cursor() as cursor:
-                cursor.execute("""
-                    UPDATE bookings
-                    SET status = %s, confirmed_at = %s, cancelled_at = %s
-                    WHERE id = %s
-                """, (
-                    booking.status.value,
-                    booking.confirmed_at,
-                    booking.cancelled_at,
-                    str(booking.id)
-                ))
-            connection.commit()
-            return booking
+                cursor.execute(*update_statement(booking, expected_status))
+                updated = cursor.rowcount > 0 or expected_status is None
+            self.connection_pool.commit(connection)
+            return booking if updated else None
 
     def delete(self, booking_id: UUID) -> bool:
         with self.connection_pool.get_connection() as connection:
             with connection.cursor() as cursor:
                 cursor.execute("DELETE FROM bookings WHERE id = %s", (str(booking_id),))
-                connection.commit()
+                self.connection_pool.commit(connection)
                 return cursor.rowcount > 0
 
     def find_active_bookings_for_session(self, session_id: UUID) -> List[Booking]:
         with self.connection_pool.get_connection() as connection:
-            with connection.cursor(DictCursor) as cursor:
-                cursor.execute("""
-                    SELECT * FROM bookings
-                    WHERE session_id = %s
-                    AND status != %s
-                    ORDER BY created_at DESC
-                """, (str(session_id), BookingStatus.CANCELLED.value))
-                return [
-                    Booking(
-                        id=UUID(data['id']),
-                        user_id=UUID(data['user_id']),
-                        session_id=UUID(data['session_id']),
-                        seats=data['seats'],
-                        price_per_seat=data['price_per_seat'],
-                        status=BookingStatus(data['status']),
-                        created_at=data['created_at'],
-                        confirmed_at=data['confirmed_at'],
-                        cancelled_at=data['cancelled_at']
-                    )
-                    for data in cursor.fetchall()
-                ] 
\ No newline at end of file
+            with connection.cursor(Cursor) as cursor:
+                cursor.execute(FIND_ACTIVE_FOR_SESSION_SQL, (str(session_id),) + RELEASED_STATUSES)
+                return [booking_from_row(row) for row in cursor.fetchall()]
+
+    def expire_pending(self, created_before: datetime, limit: int) -> List[Booking]:
+        with self.connection_pool.get_connection() as connection:
+            with connection.cursor(Cursor) as cursor:
+                cursor.execute(EXPIRABLE_HOLDS_SQL, (BookingStatus.PENDING.value, created_before, limit))
+                bookings, statement = expire_bookings(cursor.fetchall())
+                if statement:
+                    cursor.execute(*statement)
+            self.connection_pool.commit(connection)
+            return bookings
+
+    def iter_by_session_id(self, session_id: UUID, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Booking]:
+        return self._stream("session_id = %s", [str(session_id)], chunk_size)
+
+    def iter_by_status(self, status: BookingStatus, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Booking]:
+        return self._stream("status = %s", [status.value], chunk_size)
+
+    def iter_by_created_between(self, start: Optional[datetime], end: Optional[datetime],
+                                chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Booking]:
+        condition, params = created_between_condition(start, end)
+        return self._stream(condition, params, chunk_size)
+
+    def _stream(self, condition: str, params: List, chunk_size: int) -> Iterator[Booking]:
+        """Yield matching bookings through an unbuffered cursor, chunk_size rows per fetch."""
+        with self.connection_pool.get_connection() as connection:
+            cursor = connection.cursor(SSCursor)
+            finished = False
+            try:
+                cursor.execute(stream_sql(condition), params)
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield booking_from_row(row)
+                finished = True
+            finally:
+                if finished:
+                    cursor.close()
+                else:
+                    # Closing the cursor would read the rest of the result; drop the connection instead
+                    connection.close()
@@ -1,11 +1,230 @@
-from typing import List, Optional
+from collections import defaultdict
+from typing import Any, List, Optional, Tuple
 from uuid import UUID
+import random
 import pymysql
-from pymysql.cursors import DictCursor
+from pymysql.cursors import Cursor, DictCursor
 
 from ...domain.entities.event import Event
 from ...domain.entities.session import Session
-from ...domain.repositories.event_repository import EventRepository
+from ...domain.repositories.event_repository import EventRepository, SessionInUseError
+from ...domain.repositories.pagination import PageCursor
+from .keyset import keyset_page
+from .seat_shards import (
+    ADJUST_SHARD_SQL, FIND_SEAT_SHARDS_SQL, INSERT_SHARD_SQL, LOCK_SESSION_SQL, LOCK_SHARDS_SQL,
+    RELEASE_SHARD_SQL, RESERVE_SHARD_SQL, SESSION_COLUMNS, SET_SEAT_SHARDS_SQL, SUM_SHARDS_SQL,
+    plan_overflow, seat_shard_modes, shard_rows
+)
+
+# Maximum number of event ids bound into a single IN (...) clause
+BULK_LOAD_CHUNK_SIZE = 1000
+
+# ER_ROW_IS_REFERENCED_2: bookings.session_id does not cascade, and cancelled
+# or expired bookings keep their rows after releasing their seats
+ROW_IS_REFERENCED = 1451
+
+INSERT_EVENT_SQL = """
+    INSERT INTO events (id, name, description, venue, created_at)
+    VALUES (%s, %s, %s, %s, %s)
+"""
+
+INSERT_CATEGORY_SQL = """
+    INSERT INTO event_categories (event_id, category)
+    VALUES (%s, %s)
+"""
+
+INSERT_SESSION_SQL = """
+    INSERT INTO sessions (id, event_id, start_time, end_time, capacity, booked_seats, base_price)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+# booked_seats is only changed by reserve/release_seats
+UPSERT_SESSION_SQL = INSERT_SESSION_SQL + """
+    ON DUPLICATE KEY UPDATE
+        start_time = VALUES(start_time),
+        end_time = VALUES(end_time),
+        capacity = VALUES(capacity),
+        base_price = VALUES(base_price)
+"""
+
+UPDATE_EVENT_SQL = """
+    UPDATE events
+    SET name = %s, description = %s, venue = %s
+    WHERE id = %s
+"""
+
+# LAST_INSERT_ID(expr) hands the new count back in the OK packet,
+# so the guarded update needs no follow-up SELECT
+RESERVE_SEATS_SQL = """
+    UPDATE sessions
+    SET booked_seats = LAST_INSERT_ID(booked_seats + %s)
+    WHERE id = %s AND seat_shards = 0 AND capacity - booked_seats >= %s
+"""
+
+RELEASE_SEATS_SQL = """
+    UPDATE sessions
+    SET booked_seats = LAST_INSERT_ID(booked_seats - %s)
+    WHERE id = %s AND seat_shards = 0 AND booked_seats >= %s
+"""
+
+FIND_SESSION_SQL = f"SELECT {SESSION_COLUMNS} FROM sessions s WHERE s.id = %s"
+
+FIND_EVENT_BY_SESSION_SQL = """
+    SELECT e.*
+    FROM events e
+    JOIN sessions s ON s.event_id = e.id
+    WHERE s.id = %s
+"""
+
+def find_by_category_sql(keyset: str, ordering: str) -> str:
+    return f"""
+        SELECT e.*
+        FROM events e
+        JOIN event_categories ec ON e.id = ec.event_id
+        WHERE ec.category = %s {"AND " + keyset if keyset else ""}
+        {ordering}
+    """
+
+def bulk_load_queries(event_ids: List[str]):
+    """Yield (categories sql, sessions sql, ids) for each chunk of event ids."""
+    for start in range(0, len(event_ids), BULK_LOAD_CHUNK_SIZE):
+        chunk = event_ids[start:start + BULK_LOAD_CHUNK_SIZE]
+        placeholders = ", ".join(["%s"] * len(chunk))
+        yield f"""
+            SELECT event_id, category FROM event_categories
+            WHERE event_id IN ({placeholders})
+        """, f"""
+            SELECT {SESSION_COLUMNS} FROM sessions s
+            WHERE s.event_id IN ({placeholders})
+        """, chunk
+
+def session_from_row(session_data) -> Session:
+    """Build a Session from a sessions row."""
+    seat_shard_modes.remember(session_data['id'], session_data.get('seat_shards', 0))
+    session = Session(
+        event_id=UUID(session_data['event_id']),
+        start_time=session_data['start_time'],
+        end_time=session_data['end_time'],
+        capacity=session_data['capacity'],
+        base_price=session_data['base_price'],
+        id=UUID(session_data['id']),
+        booked_seats=session_data['booked_seats']
+    )
+    session.mark_persisted()
+    return session
+
+def events_from_rows(events_data, category_rows, session_rows) -> List[Event]:
+    """Build events from event rows and the category and session rows loaded for them."""
+    categories = defaultdict(list)
+    sessions = defaultdict(list)
+    for row in category_rows:
+        categories[row['event_id']].append(row['category'])
+    for row in session_rows:
+        sessions[row['event_id']].append(session_from_row(row))
+
+    events = [
+        Event(
+            name=event_data['name'],
+            description=event_data['description'],
+            venue=event_data['venue'],
+            categories=categories[event_data['id']],
+            id=UUID(event_data['id']),
+            created_at=event_data['created_at'],
+            sessions=sessions[event_data['id']]
+        )
+        for event_data in events_data
+    ]
+    for event in events:
+        event.mark_persisted()
+    return events
+
+def event_params(event: Event) -> Tuple:
+    return (str(event.id), event.name, event.description, event.venue, event.created_at)
+
+def category_params(event_id: UUID, categories: List[str]) -> List[Tuple]:
+    return [(str(event_id), category) for category in dict.fromkeys(categories)]
+
+def session_params(event_id: UUID, session: Session) -> Tuple:
+    return (str(session.id), str(event_id), session.start_time, session.end_time,
+            session.capacity, session.booked_seats, session.base_price)
+
+def is_referenced_by_bookings(error: Exception) -> bool:
+    """Check whether a statement failed because booking rows still reference a session."""
+    return (isinstance(error, pymysql.err.IntegrityError)
+            and bool(error.args) and error.args[0] == ROW_IS_REFERENCED)
+
+def changed_statements(event: Event) -> List[Tuple[str, Any, bool]]:
+    """Build (sql, params, executemany) statements for what changed since the last load."""
+    statements = []
+    event_id = str(event.id)
+
+    changed = event.get_changed_fields()
+    columns = [name for name in ('name', 'description', 'venue') if name in changed]
+    if columns:
+        assignments = ", ".join(f"{name} = %s" for name in columns)
+        statements.append((
+            f"UPDATE events SET {assignments} WHERE id = %s",
+            [changed[name] for name in columns] + [event_id],
+            False
+        ))
+
+    if 'categories' in changed:
+        removed = event.get_removed_categories()
+        if removed:
+            placeholders = ", ".join(["%s"] * len(removed))
+            statements.append((
+                f"DELETE FROM event_categories WHERE event_id = %s AND category IN ({placeholders})",
+                [event_id] + removed,
+                False
+            ))
+        added = event.get_added_categories()
+        if added:
+            statements.append((
+                "INSERT INTO event_categories (event_id, category) VALUES (%s, %s)",
+                [(event_id, category) for category in added],
+                True
+            ))
+
+    removed_sessions = event.get_removed_session_ids()
+    if removed_sessions:
+        placeholders = ", ".join(["%s"] * len(removed_sessions))
+        statements.append((
+            f"DELETE FROM sessions WHERE event_id = %s AND id IN ({placeholders})",
+            [event_id] + [str(session_id) for session_id in removed_sessions],
+            False
+        ))
+
+    new_sessions = event.get_new_sessions()
+    if new_sessions:
+        statements.append((
+            INSERT_SESSION_SQL,
+            [session_params(event.id, session) for session in new_sessions],
+            True
+        ))
+
+    for session in event.get_changed_sessions():
+        session_changes = session.get_changed_fields()
+        assignments = ", ".join(f"{name} = %s" for name in session_changes)
+        statements.append((
+            f"UPDATE sessions SET {assignments} WHERE id = %s",
+            list(session_changes.values()) + [str(session.id)],
+            False
+        ))
+
+    return statements
+
+def update_all_statements(event: Event) -> List[Tuple[str, Any, bool]]:
+    """Build statements rewriting an event whose persisted state is unknown."""
+    statements = [
+        (UPDATE_EVENT_SQL, (event.name, event.description, event.venue, str(event.id)), False),
+        ("DELETE FROM event_categories WHERE event_id = %s", (str(event.id),), False)
+    ]
+    if event.categories:
+        statements.append((INSERT_CATEGORY_SQL, category_params(event.id, event.categories), True))
+    if event.sessions:
+        statements.append((UPSERT_SESSION_SQL,
+                           [session_params(event.id, session) for session in event.sessions], True))
+    return statements
 
 class MariaDBEventRepository(EventRepository):
     def __init__(self, connection_pool):
@@ -15,134 +234,201 @@ class MariaDBEventRepository(EventRepository):
         with self.connection_pool.get_connection() as connection:
             with connection.cursor() as cursor:
                 # Save event
-                cursor.execute("""
-                    INSERT INTO events (id, name, description, venue, created_at)
-                    VALUES (%s, %s, %s, %s, %s)
-                """, (str(event.id), event.name, event.description, event.venue, event.created_at))
+                cursor.execute(INSERT_EVENT_SQL, event_params(event))
 
                 # Save categories
-                for category in event.categories:
-                    cursor.execute("""
-                        INSERT INTO event_categories (event_id, category)
-                        VALUES (%s, %s)
-                    """, (str(event.id), category))
+                if event.categories:
+                    cursor.executemany(INSERT_CATEGORY_SQL, category_params(event.id, event.categories))
 
                 # Save sessions
-                for session in event.sessions:
-                    cursor.execute("""
-                        INSERT INTO sessions (id, event_id, start_time, end_time, capacity, booked_seats)
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                    """, (str(session.id), str(event.id), session.start_time, session.end_time,
-                          session.capacity, session.booked_seats))
-
-            connection.commit()
+                if event.sessions:
+                    cursor.executemany(INSERT_SESSION_SQL,
+                                       [session_params(event.id, session) for session in event.sessions])
+
+            self.connection_pool.commit(connection)
+            event.mark_persisted()
             return event
 
     def find_by_id(self, event_id: UUID) -> Optional[Event]:
         with self.connection_pool.get_connection() as connection:
             with connection.cursor(DictCursor) as cursor:
-                # Get event
                 cursor.execute("""
                     SELECT * FROM events WHERE id = %s
                 """, (str(event_id),))
-                event_data = cursor.fetchone()
+                events = self._load_events(cursor, cursor.fetchall())
+                return events[0] if events else None
 
-                if not event_data:
-                    return None
+    def find_session(self, session_id: UUID) -> Optional[Session]:
+        with self.connection_pool.get_connection() as connection:
+            with connection.cursor(DictCursor) as cursor:
+                cursor.execute(FIND_SESSION_SQL, (str(session_id),))
+                session_data = cursor.fetchone()
 
-                # Get categories
-                cursor.execute("""
-                    SELECT category FROM event_categories WHERE event_id = %s
-                """, (str(event_id),))
-                categories = [row['category'] for row in cursor.fetchall()]
+                if not session_data:
+                    return None
 
-                # Get sessions
-                cursor.execute("""
-                    SELECT * FROM sessions WHERE event_id = %s
-                """, (str(event_id),))
-                sessions_data = cursor.fetchall()
-
-                # Create Event object
-                event = Event(
-                    name=event_data['name'],
-                    description=event_data['description'],
-                    venue=event_data['venue'],
-                    categories=categories,
-                    id=UUID(event_data['id']),
-                    created_at=event_data['created_at']
-                )
-
-                # Add sessions
-                for session_data in sessions_data:
-                    session = Session(
-                        event_id=UUID(session_data['event_id']),
-                        start_time=session_data['start_time'],
-                        end_time=session_data['end_time'],
-                        capacity=session_data['capacity'],
-                        base_price=session_data['base_price'],
-                        id=UUID(session_data['id']),
-                        booked_seats=session_data['booked_seats']
-                    )
-                    event.add_session(session)
+                return session_from_row(session_data)
 
-                return event
+    def find_event_by_session_id(self, session_id: UUID) -> Optional[Event]:
+        with self.connection_pool.get_connection() as connection:
+            with connection.cursor(DictCursor) as cursor:
+                # Resolve the owning event through the sessions primary key
+                cursor.execute(FIND_EVENT_BY_SESSION_SQL, (str(session_id),))
+                events = self._load_events(cursor, cursor.fetchall())
+                return events[0] if events else None
 
-    def find_all(self) -> List[Event]:
+    def find_all(self, limit: Optional[int] = None,
+                 after: Optional[PageCursor] = None) -> List[Event]:
         with self.connection_pool.get_connection() as connection:
             with connection.cursor(DictCursor) as cursor:
-                cursor.execute("SELECT id FROM events")
-                event_ids = [UUID(row['id']) for row in cursor.fetchall()]
-                return [self.find_by_id(event_id) for event_id in event_ids]
+                if limit is None and after is None:
+                    cursor.execute("SELECT * FROM events")
+                else:
+                    keyset, ordering, params = keyset_page(after, limit)
+                    where = f"WHERE {keyset}" if keyset else ""
+                    cursor.execute(f"SELECT * FROM events {where} {ordering}", params)
+                return self._load_events(cursor, cursor.fetchall())
 
-    def find_by_category(self, category: str) -> List[Event]:
+    def find_by_category(self, category: str, limit: Optional[int] = None,
+                         after: Optional[PageCursor] = None) -> List[Event]:
         with self.connection_pool.get_connection() as connection:
             with connection.cursor(DictCursor) as cursor:
-                cursor.execute("""
-                    SELECT DISTINCT e.id
-                    FROM events e
-                    JOIN event_categories ec ON e.id = ec.event_id
-                    WHERE ec.category = %s
-                """, (category,))
-                event_ids = [UUID(row['id']) for row in cursor.fetchall()]
-                return [self.find_by_id(event_id) for event_id in event_ids]
+                if limit is None and after is None:
+                    keyset, ordering, params = '', '', []
+                else:
+                    keyset, ordering, params = keyset_page(after, limit, alias='e')
+                cursor.execute(find_by_category_sql(keyset, ordering), [category] + params)
+                return self._load_events(cursor, cursor.fetchall())
 
     def update(self, event: Event) -> Event:
+        if event.is_persisted():
+            statements = changed_statements(event)
+            if not statements:
+                return event
+        else:
+            statements = update_all_statements(event)
+
+        try:
+            with self.connection_pool.get_connection() as connection:
+                with connection.cursor() as cursor:
+                    for sql, params, many in statements:
+                        if many:
+                            cursor.executemany(sql, params)
+                        else:
+                            cursor.execute(sql, params)
+
+                self.connection_pool.commit(connection)
+        except pymysql.err.IntegrityError as e:
+            if is_referenced_by_bookings(e):
+                raise SessionInUseError("Session still has bookings") from e
+            raise
+        event.mark_persisted()
+        return event
+
+    def reserve_seats(self, session_id: UUID, num_seats: int) -> Optional[int]:
+        return self._adjust_seats(True, session_id, num_seats)
+
+    def release_seats(self, session_id: UUID, num_seats: int) -> Optional[int]:
+        return self._adjust_seats(False, session_id, num_seats)
+
+    def _adjust_seats(self, reserve: bool, session_id: UUID, num_seats: int) -> Optional[int]:
+        key = str(session_id)
         with self.connection_pool.get_connection() as connection:
-            with connection.cursor() as cursor:
-                # Update event
-                cursor.execute("""
-                    UPDATE events
-                    SET name = %s, description = %s, venue = %s
-                    WHERE id = %s
-                """, (event.name, event.description, event.venue, str(event.id)))
-
-                # Update categories
-                cursor.execute("DELETE FROM event_categories WHERE event_id = %s", (str(event.id),))
-                for category in event.categories:
-                    cursor.execute("""
-                        INSERT INTO event_categories (event_id, category)
-                        VALUES (%s, %s)
-                    """, (str(event.id), category))
-
-                # Update sessions
-                for session in event.sessions:
-                    cursor.execute("""
-                        INSERT INTO sessions (id, event_id, start_time, end_time, capacity, booked_seats)
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                        ON DUPLICATE KEY UPDATE
-                            start_time = VALUES(start_time),
-                            end_time = VALUES(end_time),
-                            capacity = VALUES(capacity),
-                            booked_seats = VALUES(booked_seats)
-                    """, (str(session.id), str(event.id), session.start_time, session.end_time,
-                          session.capacity, session.booked_seats))
-
-            connection.commit()
-            return event
+            with connection.cursor(Cursor) as cursor:
+                shards = seat_shard_modes.get(key)
+                if shards is None:
+                    shards = self._load_seat_shards(cursor, key)
+                    booked_seats = (None if shards is None
+                                    else self._adjust_counter(cursor, reserve, key, num_seats, shards))
+                else:
+                    booked_seats = self._adjust_counter(cursor, reserve, key, num_seats, shards)
+                    if booked_seats is None:
+                        # The cached mode may predate shard_seats(); check once before giving up
+                        fresh = self._load_seat_shards(cursor, key)
+                        if fresh is not None and fresh != shards:
+                            booked_seats = self._adjust_counter(cursor, reserve, key, num_seats, fresh)
+            # Commit either way: the overflow path may hold shard row locks
+            self.connection_pool.commit(connection)
+            return booked_seats
 
-    def delete(self, event_id: UUID) -> bool:
+    def _adjust_counter(self, cursor, reserve: bool, key: str, num_seats: int, shards: int) -> Optional[int]:
+        if shards:
+            return self._adjust_shards(cursor, reserve, key, num_seats, shards)
+        cursor.execute(RESERVE_SEATS_SQL if reserve else RELEASE_SEATS_SQL, (num_seats, key, num_seats))
+        return cursor.lastrowid if cursor.rowcount else None
+
+    def _load_seat_shards(self, cursor, key: str) -> Optional[int]:
+        cursor.execute(FIND_SEAT_SHARDS_SQL, (key,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        seat_shard_modes.remember(key, row[0])
+        return row[0]
+
+    def _adjust_shards(self, cursor, reserve: bool, key: str, num_seats: int, shards: int) -> Optional[int]:
+        """Move num_seats on a random shard, spreading over all of them when it lacks room."""
+        cursor.execute(RESERVE_SHARD_SQL if reserve else RELEASE_SHARD_SQL,
+                       (num_seats, key, random.randrange(shards), num_seats))
+        if cursor.rowcount:
+            cursor.execute(SUM_SHARDS_SQL, (key,))
+            return int(cursor.fetchone()[0])
+
+        cursor.execute(LOCK_SHARDS_SQL, (key,))
+        rows = cursor.fetchall()
+        plan = plan_overflow(rows, num_seats, reserve)
+        if plan is None:
+            return None
+        for shard, delta in plan:
+            cursor.execute(ADJUST_SHARD_SQL, (delta, key, shard))
+        return sum(row[2] for row in rows) + (num_seats if reserve else -num_seats)
+
+    def shard_seats(self, session_id: UUID, shards: int) -> bool:
+        """Split the seat counter of a session over shards rows.
+
+        Concurrent bookings then update different rows instead of queueing
+        on the sessions row. Returns False if the session does not exist or
+        is already sharded.
+        """
+        if shards < 1:
+            raise ValueError("shards must be positive")
+        key = str(session_id)
         with self.connection_pool.get_connection() as connection:
-            with connection.cursor() as cursor:
-                cursor.execute("DELETE FROM events WHERE id = %s", (str(event_id),))
-                connection.commit()
-                return cursor.rowcount > 0 
\ No newline at end of file
+            with connection.cursor(Cursor) as cursor:
+                cursor.execute(LOCK_SESSION_SQL, (key,))
+                row = cursor.fetchone()
+                split = row is not None and row[2] == 0
+                if split:
+                    capacity, booked_seats, _ = row
+                    cursor.executemany(INSERT_SHARD_SQL, shard_rows(key, capacity, booked_seats, shards))
+                    cursor.execute(SET_SEAT_SHARDS_SQL, (shards, key))
+            self.connection_pool.commit(connection)
+        if split:
+            seat_shard_modes.remember(key, shards)
+        return split
+
+    def delete(self, event_id: UUID) -> bool:
+        try:
+            with self.connection_pool.get_connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute("DELETE FROM events WHERE id = %s", (str(event_id),))
+                    self.connection_pool.commit(connection)
+                    return cursor.rowcount > 0
+        except pymysql.err.IntegrityError as e:
+            if is_referenced_by_bookings(e):
+                raise SessionInUseError("Session still has bookings") from e
+            raise
+
+    def _load_events(self, cursor, events_data) -> List[Event]:
+        """Build events from event rows, loading their categories and sessions in bulk."""
+        if not events_data:
+            return []
+
+        # Two queries per chunk of ids, whatever the number of events
+        category_rows, session_rows = [], []
+        for categories_sql, sessions_sql, ids in bulk_load_queries([row['id'] for row in events_data]):
+            cursor.execute(categories_sql, ids)
+            category_rows.extend(cursor.fetchall())
+            cursor.execute(sessions_sql, ids)
+            session_rows.extend(cursor.fetchall())
+
+        return events_from_rows(events_data, category_rows, session_rows)
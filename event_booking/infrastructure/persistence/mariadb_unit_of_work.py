@@ -0,0 +1,41 @@
+from contextlib import asynccontextmanager, contextmanager
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from ...domain.repositories.unit_of_work import AsyncUnitOfWork, UnitOfWork
+from .retry import RetryPolicy
+
+T = TypeVar('T')
+
+class MariaDBUnitOfWork(UnitOfWork):
+    def __init__(self, connection_pool, retry_policy: Optional[RetryPolicy] = None):
+        self.connection_pool = connection_pool
+        self.retry_policy = retry_policy or RetryPolicy()
+
+    @contextmanager
+    def transaction(self):
+        # Repositories sharing this pool reuse the bound connection and skip
+        # their own commits until the outermost transaction ends
+        with self.connection_pool.transaction():
+            yield
+
+    def run(self, work: Callable[[], T]) -> T:
+        if self.connection_pool.in_transaction():
+            # A conflict aborts the enclosing transaction too; its owner replays it
+            return work()
+        return self.retry_policy.run(lambda: super(MariaDBUnitOfWork, self).run(work))
+
+class AsyncMariaDBUnitOfWork(AsyncUnitOfWork):
+    def __init__(self, connection_pool, retry_policy: Optional[RetryPolicy] = None):
+        self.connection_pool = connection_pool
+        self.retry_policy = retry_policy or RetryPolicy()
+
+    @asynccontextmanager
+    async def transaction(self):
+        # Same contract as MariaDBUnitOfWork, with the connection bound to the current task
+        async with self.connection_pool.transaction():
+            yield
+
+    async def run(self, work: Callable[[], Awaitable[T]]) -> T:
+        if self.connection_pool.in_transaction():
+            return await work()
+        return await self.retry_policy.run_async(lambda: super(AsyncMariaDBUnitOfWork, self).run(work))
@@ -0,0 +1,138 @@
+from contextlib import AsyncExitStack, asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+import logging
+import time
+
+from .async_connection_pool import AsyncDatabaseConnectionPool
+from .connection_pool import DatabaseUnavailableError
+
+logger = logging.getLogger('event_booking.db')
+
+SET_SYNC_WAIT_SQL = "SET SESSION wsrep_sync_wait = %s"
+
+class AsyncReadWritePool:
+    """Routes read-only checkouts to a replica pool and everything else to the writer.
+
+    Writes and transactions always use the writer pool, and reads inside a
+    transaction share its connection. Other reads go to the reader pool,
+    which balances over every Galera node and may lag the writer by a few
+    milliseconds. Inside consistent_reads(), reader connections run with
+    wsrep_sync_wait so they wait for the node to catch up first.
+    Without a reader pool every checkout goes to the writer.
+
+    A reader that cannot be opened does not stop startup: reads go to the
+    writer and the reader is opened again on a read at most every
+    reader_retry_interval seconds.
+    """
+
+    def __init__(self, writer: AsyncDatabaseConnectionPool,
+                 reader: Optional[AsyncDatabaseConnectionPool] = None, sync_wait: int = 1,
+                 reader_retry_interval: float = 5.0):
+        if sync_wait <= 0:
+            raise ValueError("sync_wait must be a positive wsrep_sync_wait mask")
+        self.writer = writer
+        self.reader = reader
+        self.sync_wait = sync_wait
+        self.reader_retry_interval = reader_retry_interval
+        self._consistent: ContextVar = ContextVar(f'consistent_reads_{id(self)}', default=False)
+        self._reader_retry_at = 0.0
+
+        # Counters exposed through stats()
+        self._reads = 0
+        self._consistent_reads = 0
+        self._read_fallbacks = 0
+        self._reader_open_failures = 0
+
+    async def open(self) -> None:
+        await self.writer.open()
+        if self.reader is not None:
+            await self._open_reader()
+
+    async def _open_reader(self) -> bool:
+        """Open the reader unless a recent attempt failed; return whether it is open."""
+        if self.reader.is_open():
+            return True
+        if time.monotonic() < self._reader_retry_at:
+            return False
+        # Set before awaiting so concurrent reads fall back instead of piling on
+        self._reader_retry_at = time.monotonic() + self.reader_retry_interval
+        try:
+            await self.reader.open()
+        except DatabaseUnavailableError as e:
+            self._reader_open_failures += 1
+            logger.warning(f"Read pool could not be opened, reading from the writer: {e}")
+            return False
+        return True
+
+    @asynccontextmanager
+    async def get_connection(self, timeout: Optional[float] = None, readonly: bool = False):
+        """Get a writer connection, or a reader connection when readonly is set."""
+        if not readonly or self.reader is None or self.writer.in_transaction():
+            async with self.writer.get_connection(timeout) as connection:
+                yield connection
+            return
+
+        self._reads += 1
+        async with AsyncExitStack() as stack:
+            connection = None
+            if not await self._open_reader():
+                self._read_fallbacks += 1
+            else:
+                try:
+                    connection = await stack.enter_async_context(self.reader.get_connection(timeout))
+                except DatabaseUnavailableError as e:
+                    # The writer can serve reads too, only slower for everyone
+                    self._read_fallbacks += 1
+                    logger.warning(f"Read pool unavailable, reading from the writer: {e}")
+            if connection is None:
+                connection = await stack.enter_async_context(self.writer.get_connection(timeout))
+            elif self._consistent.get():
+                self._consistent_reads += 1
+                await self._set_sync_wait(connection, self.sync_wait)
+                stack.push_async_callback(self._reset_sync_wait, connection)
+            yield connection
+
+    @staticmethod
+    async def _set_sync_wait(connection, mask: int) -> None:
+        async with connection.cursor() as cursor:
+            await cursor.execute(SET_SYNC_WAIT_SQL, (mask,))
+
+    async def _reset_sync_wait(self, connection) -> None:
+        try:
+            await self._set_sync_wait(connection, 0)
+        except Exception:
+            # A closed connection is dropped on release instead of going back with the setting
+            connection.close()
+
+    @asynccontextmanager
+    async def consistent_reads(self):
+        """Make reads in this context see every write committed before it started."""
+        token = self._consistent.set(True)
+        try:
+            yield
+        finally:
+            self._consistent.reset(token)
+
+    def transaction(self, timeout: Optional[float] = None):
+        """Run a transaction on the writer; see AsyncDatabaseConnectionPool.transaction."""
+        return self.writer.transaction(timeout)
+
+    def in_transaction(self) -> bool:
+        return self.writer.in_transaction()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the writer and reader pool counters with routing counters."""
+        return {
+            'write': self.writer.stats(),
+            'read': self.reader.stats() if self.reader is not None else None,
+            'reads': self._reads,
+            'consistent_reads': self._consistent_reads,
+            'read_fallbacks': self._read_fallbacks,
+            'reader_open_failures': self._reader_open_failures,
+        }
+
+    async def close(self) -> None:
+        await self.writer.close()
+        if self.reader is not None:
+            await self.reader.close()
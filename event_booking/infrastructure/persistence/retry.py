@@ -0,0 +1,115 @@
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Optional, TypeVar
+import asyncio
+import logging
+import random
+import threading
+import time
+import pymysql
+
+logger = logging.getLogger('event_booking.db')
+
+T = TypeVar('T')
+
+# Errors after which the whole transaction has been rolled back and can be replayed
+RETRYABLE_ERRORS = frozenset({
+    1205,  # Lock wait timeout exceeded
+    1213,  # Deadlock found; also how Galera reports a failed certification
+    1047,  # WSREP has not yet prepared node for application use
+})
+
+class RetryPolicy:
+    """Replays transactions that failed on a transient conflict.
+
+    Delays grow exponentially from base_delay up to max_delay with full
+    jitter, so conflicting clients spread out instead of colliding again.
+    No attempt starts once deadline seconds have passed since the first.
+    """
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 0.01, max_delay: float = 0.2,
+                 deadline: float = 2.0, retryable: FrozenSet[int] = RETRYABLE_ERRORS):
+        if max_attempts <= 0:
+            raise ValueError("max_attempts must be positive")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retryable = retryable
+
+        self._lock = threading.Lock()
+        # Counters exposed through stats()
+        self._committed = 0
+        self._retries = 0
+        self._recovered = 0
+        self._exhausted = 0
+        self._errors = Counter()
+
+    def is_retryable(self, error: BaseException) -> bool:
+        return (isinstance(error, (pymysql.err.OperationalError, pymysql.err.InternalError))
+                and bool(error.args) and error.args[0] in self.retryable)
+
+    def _next_delay(self, error: BaseException, attempt: int, started: float) -> Optional[float]:
+        """Delay before the next attempt, or None to give up and re-raise."""
+        if not self.is_retryable(error):
+            return None
+        with self._lock:
+            self._errors[error.args[0]] += 1
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+            if attempt >= self.max_attempts or time.monotonic() + delay - started > self.deadline:
+                self._exhausted += 1
+                logger.warning(f"Transaction failed after {attempt} attempts: {error}")
+                return None
+            self._retries += 1
+        logger.info(f"Retrying transaction in {delay * 1000:.0f}ms after attempt {attempt}: {error}")
+        return delay
+
+    def _succeeded(self, attempt: int) -> None:
+        with self._lock:
+            self._committed += 1
+            if attempt > 1:
+                self._recovered += 1
+
+    def run(self, attempt_fn: Callable[[], T]) -> T:
+        """Call attempt_fn, replaying it after retryable errors."""
+        started = time.monotonic()
+        attempt = 1
+        while True:
+            try:
+                result = attempt_fn()
+            except Exception as e:
+                delay = self._next_delay(e, attempt, started)
+                if delay is None:
+                    raise
+            else:
+                self._succeeded(attempt)
+                return result
+            time.sleep(delay)
+            attempt += 1
+
+    async def run_async(self, attempt_fn: Callable[[], Awaitable[T]]) -> T:
+        """Await attempt_fn(), replaying it after retryable errors."""
+        started = time.monotonic()
+        attempt = 1
+        while True:
+            try:
+                result = await attempt_fn()
+            except Exception as e:
+                delay = self._next_delay(e, attempt, started)
+                if delay is None:
+                    raise
+            else:
+                self._succeeded(attempt)
+                return result
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return retry counters; errors counts retryable failures by MariaDB error code."""
+        with self._lock:
+            return {
+                'committed': self._committed,
+                'retries': self._retries,
+                'recovered': self._recovered,
+                'exhausted': self._exhausted,
+                'errors': dict(self._errors),
+            }
@@ -0,0 +1,115 @@
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+import threading
+
+# A sharded session keeps its counters in session_seat_shards; sessions.booked_seats
+# is frozen at the split and readers see the sum of the shards instead
+SESSION_COLUMNS = """
+    s.id, s.event_id, s.start_time, s.end_time, s.capacity, s.base_price, s.seat_shards,
+    IF(s.seat_shards = 0, s.booked_seats,
+       (SELECT COALESCE(SUM(sh.booked_seats), 0) FROM session_seat_shards sh
+        WHERE sh.session_id = s.id)) AS booked_seats
+"""
+
+FIND_SEAT_SHARDS_SQL = "SELECT seat_shards FROM sessions WHERE id = %s"
+
+RESERVE_SHARD_SQL = """
+    UPDATE session_seat_shards
+    SET booked_seats = booked_seats + %s
+    WHERE session_id = %s AND shard = %s AND capacity - booked_seats >= %s
+"""
+
+RELEASE_SHARD_SQL = """
+    UPDATE session_seat_shards
+    SET booked_seats = booked_seats - %s
+    WHERE session_id = %s AND shard = %s AND booked_seats >= %s
+"""
+
+# Overflow path: lock every shard of the session, then spread the change
+LOCK_SHARDS_SQL = """
+    SELECT shard, capacity, booked_seats FROM session_seat_shards
+    WHERE session_id = %s
+    ORDER BY shard
+    FOR UPDATE
+"""
+
+ADJUST_SHARD_SQL = """
+    UPDATE session_seat_shards
+    SET booked_seats = booked_seats + %s
+    WHERE session_id = %s AND shard = %s
+"""
+
+SUM_SHARDS_SQL = "SELECT COALESCE(SUM(booked_seats), 0) FROM session_seat_shards WHERE session_id = %s"
+
+LOCK_SESSION_SQL = "SELECT capacity, booked_seats, seat_shards FROM sessions WHERE id = %s FOR UPDATE"
+
+INSERT_SHARD_SQL = """
+    INSERT INTO session_seat_shards (session_id, shard, capacity, booked_seats)
+    VALUES (%s, %s, %s, %s)
+"""
+
+SET_SEAT_SHARDS_SQL = "UPDATE sessions SET seat_shards = %s WHERE id = %s"
+
+def split_counter(total: int, shards: int) -> List[int]:
+    """Split total into shards parts differing by at most one, larger parts first."""
+    base, extra = divmod(total, shards)
+    return [base + (1 if shard < extra else 0) for shard in range(shards)]
+
+def shard_rows(session_id: str, capacity: int, booked_seats: int, shards: int) -> List[Tuple]:
+    """Build session_seat_shards rows splitting capacity and booked seats evenly.
+
+    Both splits put their remainder on the lowest shards, so no shard
+    starts with more booked seats than capacity.
+    """
+    return [(session_id, shard, shard_capacity, shard_booked)
+            for shard, (shard_capacity, shard_booked)
+            in enumerate(zip(split_counter(capacity, shards), split_counter(booked_seats, shards)))]
+
+def plan_overflow(rows: Sequence[Tuple[int, int, int]], num_seats: int,
+                  reserve: bool) -> Optional[List[Tuple[int, int]]]:
+    """Spread num_seats over locked (shard, capacity, booked) rows.
+
+    Returns (shard, delta) pairs, drawing on the shards with the most room
+    first, or None when all shards together cannot cover the change.
+    """
+    room = [(capacity - booked if reserve else booked, shard) for shard, capacity, booked in rows]
+    room.sort(reverse=True)
+    remaining = num_seats
+    plan = []
+    for available, shard in room:
+        if remaining == 0:
+            break
+        take = min(available, remaining)
+        if take > 0:
+            plan.append((shard, take if reserve else -take))
+            remaining -= take
+    return plan if remaining == 0 else None
+
+class SeatShardModes:
+    """Process-wide cache of the number of seat shards per session.
+
+    Only a hint: the unsharded update is guarded on seat_shards = 0 and a
+    sharded update matches no row for an unsharded session, so a stale
+    entry costs one refresh, never a wrong count.
+    """
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self._modes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[int]:
+        with self._lock:
+            shards = self._modes.get(session_id)
+            if shards is not None:
+                self._modes.move_to_end(session_id)
+            return shards
+
+    def remember(self, session_id: str, shards: int) -> None:
+        with self._lock:
+            self._modes[session_id] = shards
+            self._modes.move_to_end(session_id)
+            while len(self._modes) > self.max_entries:
+                self._modes.popitem(last=False)
+
+seat_shard_modes = SeatShardModes()
@@ -0,0 +1,177 @@
+from typing import Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+import sqlite3
+import threading
+import time
+
+from ...domain.services.waiting_room import WaitingRoom, WaitingRoomStore
+
+CREATE_TABLES_SQL = (
+    """
+    CREATE TABLE IF NOT EXISTS waiting_rooms (
+        room_id TEXT PRIMARY KEY,
+        rate REAL NOT NULL,
+        burst INTEGER NOT NULL,
+        joined INTEGER NOT NULL,
+        front REAL NOT NULL,
+        updated REAL NOT NULL,
+        generation TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS waiting_room_sessions (
+        session_id TEXT PRIMARY KEY,
+        room_id TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS waiting_room_sessions_room ON waiting_room_sessions (room_id)",
+    """
+    CREATE TABLE IF NOT EXISTS waiting_room_places (
+        room_id TEXT NOT NULL,
+        number INTEGER NOT NULL,
+        used_until REAL NOT NULL,
+        PRIMARY KEY (room_id, number)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS waiting_room_places_expiry ON waiting_room_places (used_until)",
+)
+
+ROOM_COLUMNS = "room_id, rate, burst, joined, front, updated, generation"
+
+class SQLiteWaitingRoomStore(WaitingRoomStore):
+    """WaitingRoomStore in a local SQLite file.
+
+    Every worker of the host opening the same file shares the rooms, the
+    queue numbers and the used places, and they all survive a restart.
+    Queue numbers are taken under SQLite's write lock, so two workers
+    never hand out the same one; a place is claimed with a single guarded
+    upsert.
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        self.path = path
+        self._lock = threading.Lock()
+        self._next_purge = 0.0
+        self._connection = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None,
+                                           check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # Losing the last queue numbers to a power cut only lets a few visitors wait again
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        for sql in CREATE_TABLES_SQL:
+            self._connection.execute(sql)
+
+    def _room(self, row) -> WaitingRoom:
+        room_id, rate, burst, joined, front, updated, generation = row
+        session_ids = [UUID(session_id) for (session_id,) in self._connection.execute(
+            "SELECT session_id FROM waiting_room_sessions WHERE room_id = ?", (room_id,)
+        )]
+        return WaitingRoom(UUID(room_id), session_ids, rate, burst, joined, front, updated, generation)
+
+    def _find(self, room_id: UUID) -> Optional[WaitingRoom]:
+        row = self._connection.execute(
+            f"SELECT {ROOM_COLUMNS} FROM waiting_rooms WHERE room_id = ?", (str(room_id),)
+        ).fetchone()
+        return self._room(row) if row else None
+
+    def _save(self, room: WaitingRoom) -> None:
+        self._connection.execute(
+            "UPDATE waiting_rooms SET rate = ?, burst = ?, joined = ?, front = ?, updated = ? WHERE room_id = ?",
+            (room.rate, room.burst, room.joined, room.front, room.updated, str(room.room_id))
+        )
+
+    def _write(self, work):
+        """Run work under the write lock of the file and commit it."""
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                result = work()
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            return result
+
+    def get(self, room_id: UUID) -> Optional[WaitingRoom]:
+        with self._lock:
+            return self._find(room_id)
+
+    def all(self) -> List[WaitingRoom]:
+        with self._lock:
+            rows = self._connection.execute(f"SELECT {ROOM_COLUMNS} FROM waiting_rooms").fetchall()
+            return [self._room(row) for row in rows]
+
+    def rooms_of(self, session_ids: Iterable[UUID]) -> Set[UUID]:
+        session_ids = [str(session_id) for session_id in set(session_ids)]
+        if not session_ids:
+            return set()
+        placeholders = ', '.join('?' * len(session_ids))
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT DISTINCT room_id FROM waiting_room_sessions WHERE session_id IN ({placeholders})",
+                session_ids
+            ).fetchall()
+        return {UUID(room_id) for (room_id,) in rows}
+
+    def open(self, room_id: UUID, session_ids: List[UUID], rate: float, burst: int) -> WaitingRoom:
+        def work():
+            room = self._find(room_id)
+            if room is None:
+                room = WaitingRoom(room_id, session_ids, rate, burst)
+                self._connection.execute(
+                    f"INSERT INTO waiting_rooms ({ROOM_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (str(room_id), rate, burst, room.joined, room.front, room.updated, room.generation)
+                )
+            else:
+                room.configure(session_ids, rate, burst)
+                self._save(room)
+            self._connection.execute("DELETE FROM waiting_room_sessions WHERE room_id = ?", (str(room_id),))
+            # A session moves to the room opened last, as in MemoryWaitingRoomStore
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO waiting_room_sessions (session_id, room_id) VALUES (?, ?)",
+                [(str(session_id), str(room_id)) for session_id in room.session_ids]
+            )
+            return room
+        return self._write(work)
+
+    def close(self, room_id: UUID) -> bool:
+        def work():
+            key = (str(room_id),)
+            self._connection.execute("DELETE FROM waiting_room_sessions WHERE room_id = ?", key)
+            self._connection.execute("DELETE FROM waiting_room_places WHERE room_id = ?", key)
+            return self._connection.execute("DELETE FROM waiting_rooms WHERE room_id = ?", key).rowcount > 0
+        return self._write(work)
+
+    def join(self, room_id: UUID) -> Optional[Tuple[WaitingRoom, int]]:
+        def work():
+            room = self._find(room_id)
+            if room is None:
+                return None
+            number = room.join()
+            self._save(room)
+            return room, number
+        return self._write(work)
+
+    def claim(self, room_id: UUID, number: int, until: float) -> bool:
+        now = time.time()
+        with self._lock:
+            if now >= self._next_purge:
+                self._connection.execute("DELETE FROM waiting_room_places WHERE used_until <= ?", (now,))
+                self._next_purge = now + 1.0
+            # Inserts a new place or takes over an expired one; a place still in use changes nothing
+            return self._connection.execute(
+                "INSERT INTO waiting_room_places (room_id, number, used_until) VALUES (?, ?, ?) "
+                "ON CONFLICT (room_id, number) DO UPDATE SET used_until = excluded.used_until "
+                "WHERE waiting_room_places.used_until <= ?",
+                (str(room_id), number, until, now)
+            ).rowcount > 0
+
+    def release(self, room_id: UUID, number: int) -> None:
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM waiting_room_places WHERE room_id = ? AND number = ?", (str(room_id), number)
+            )
+
+    def disconnect(self) -> None:
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,146 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+import logging
+import threading
+import time
+
+from ...domain.services.booking_service import BatchMode, BookingRequest, BookingService
+from ..persistence.intake_queue import BookingIntakeQueue, IntakeRecord
+
+logger = logging.getLogger('event_booking.bookings')
+
+class BookingIntakeWorkers:
+    """Threads draining the booking intake queue through BookingService in batches.
+
+    Each batch is booked with one create_bookings call in BEST_EFFORT mode,
+    ordered by session so concurrent batches lock session rows in the same
+    order. A batch that fails as a whole goes back to the queue until
+    max_attempts. Requests claimed longer than lease seconds ago are put
+    back, and a request booked before its worker died is recognised by its
+    booking id, which is its ticket, instead of being booked twice.
+    """
+
+    def __init__(self, queue: BookingIntakeQueue, service: BookingService, workers: int = 4,
+                 batch_size: int = 100, poll_interval: float = 0.05, max_attempts: int = 5,
+                 lease: float = 60.0, retention: float = 3600.0):
+        if workers <= 0 or batch_size <= 0 or max_attempts <= 0:
+            raise ValueError("workers, batch_size and max_attempts must be positive")
+        self.queue = queue
+        self.service = service
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.lease = lease
+        self.retention = retention
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._next_maintenance = 0.0
+
+        self._lock = threading.Lock()
+        # Counters exposed through stats()
+        self._batches = 0
+        self._booked = 0
+        self._failed = 0
+        self._retried = 0
+        self._errors = 0
+
+    def process(self) -> int:
+        """Claim and book one batch; return the number of requests it claimed."""
+        records = self.queue.claim(self.batch_size)
+        if not records:
+            return 0
+
+        outcomes = []
+        try:
+            pending = self._skip_booked(records, outcomes)
+            pending.sort(key=lambda record: str(record.session_id))
+            if pending:
+                requests = [BookingRequest(record.user_id, record.session_id, record.seats, booking_id=record.ticket)
+                            for record in pending]
+                results = self.service.create_bookings(requests, BatchMode.BEST_EFFORT)
+                outcomes.extend(
+                    (record.ticket, result.booking.id if result.booking else None,
+                     str(result.error) if result.error else None)
+                    for record, result in zip(pending, results)
+                )
+        except Exception as e:
+            logger.error(f"Booking intake batch of {len(records)} failed: {e}")
+            self.queue.retry([record.ticket for record in records], str(e), self.max_attempts)
+            with self._lock:
+                self._batches += 1
+                self._errors += 1
+                self._retried += len(records)
+            return len(records)
+
+        self.queue.finish(outcomes)
+        booked = sum(1 for _, booking_id, _ in outcomes if booking_id)
+        with self._lock:
+            self._batches += 1
+            self._booked += booked
+            self._failed += len(outcomes) - booked
+        return len(records)
+
+    def _skip_booked(self, records: List[IntakeRecord], outcomes: list) -> List[IntakeRecord]:
+        # Only a claimed-again request can have been booked already
+        pending = []
+        for record in records:
+            if record.attempts > 1 and self.service.booking_repository.find_by_id(record.ticket) is not None:
+                outcomes.append((record.ticket, record.ticket, None))
+            else:
+                pending.append(record)
+        return pending
+
+    def maintain(self) -> None:
+        """Put back requests whose claim outlived the lease and purge old results."""
+        now = datetime.utcnow()
+        requeued = self.queue.requeue_stale(now - timedelta(seconds=self.lease))
+        if requeued:
+            logger.warning(f"Requeued {requeued} booking requests claimed over {self.lease:.0f}s ago")
+        self.queue.purge(now - timedelta(seconds=self.retention))
+
+    def notify(self) -> None:
+        """Wake idle workers after an enqueue instead of waiting for the next poll."""
+        self._wake.set()
+
+    def start(self) -> None:
+        self._threads = [threading.Thread(target=self._run, name=f"booking-intake-{index}", daemon=True)
+                         for index in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._maintain_when_due()
+                if self.process():
+                    continue
+            except Exception as e:
+                logger.error(f"Booking intake worker error: {e}")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def _maintain_when_due(self) -> None:
+        with self._lock:
+            if time.monotonic() < self._next_maintenance:
+                return
+            self._next_maintenance = time.monotonic() + min(self.lease, self.retention) / 2
+        self.maintain()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return batch counters and the number of requests per status."""
+        with self._lock:
+            stats = {
+                'batches': self._batches,
+                'booked': self._booked,
+                'failed': self._failed,
+                'retried': self._retried,
+                'errors': self._errors,
+            }
+        stats['queue'] = self.queue.counts()
+        return stats
@@ -0,0 +1,95 @@
+from typing import Any, Dict
+import logging
+import threading
+import time
+
+from ...domain.services.booking_service import BookingService
+
+logger = logging.getLogger('event_booking.bookings')
+
+class HoldSweeper:
+    """Expires stale booking holds in the background, one bounded batch per transaction.
+
+    Each sweep runs batches until one comes back short or max_batches is
+    reached, so a backlog is drained over several sweeps without holding
+    locks for long. Sweepers in several processes split the stale holds
+    between them instead of queueing on the same rows.
+    """
+
+    def __init__(self, service: BookingService, interval: float = 5.0,
+                 batch_size: int = 500, max_batches: int = 20):
+        if batch_size <= 0 or max_batches <= 0:
+            raise ValueError("batch_size and max_batches must be positive")
+        self.service = service
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self._stop = threading.Event()
+        self._thread = None
+
+        self._lock = threading.Lock()
+        # Counters exposed through stats()
+        self._sweeps = 0
+        self._batches = 0
+        self._expired = 0
+        self._errors = 0
+        self._last_expired = 0
+        self._last_duration = 0.0
+        self._max_duration = 0.0
+        self._total_duration = 0.0
+
+    def sweep(self) -> int:
+        """Run one sweep and return the number of holds it expired."""
+        started = time.monotonic()
+        expired = batches = 0
+        failed = False
+        try:
+            while batches < self.max_batches:
+                count = len(self.service.expire_holds(self.batch_size))
+                batches += 1
+                expired += count
+                if count < self.batch_size:
+                    break
+        except Exception as e:
+            failed = True
+            logger.error(f"Hold sweep failed after {expired} expired holds: {e}")
+        duration = time.monotonic() - started
+
+        with self._lock:
+            self._sweeps += 1
+            self._batches += batches
+            self._expired += expired
+            self._errors += failed
+            self._last_expired = expired
+            self._last_duration = duration
+            self._max_duration = max(self._max_duration, duration)
+            self._total_duration += duration
+        if expired:
+            logger.info(f"Expired {expired} booking holds in {duration * 1000:.0f}ms")
+        return expired
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="hold-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.sweep()
+            self._stop.wait(self.interval)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return sweep counters; durations are in milliseconds."""
+        with self._lock:
+            return {
+                'sweeps': self._sweeps,
+                'batches': self._batches,
+                'expired': self._expired,
+                'errors': self._errors,
+                'last_expired': self._last_expired,
+                'last_duration_ms': round(self._last_duration * 1000, 3),
+                'max_duration_ms': round(self._max_duration * 1000, 3),
+                'avg_duration_ms': round(self._total_duration * 1000 / self._sweeps, 3) if self._sweeps else 0.0,
+            }
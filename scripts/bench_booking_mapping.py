@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Compare the old dict-row booking mapping with the tuple-row one.
+
+    python scripts/bench_booking_mapping.py --rows 100000
+
+Rows are synthetic, shaped like the driver returns them: 2000 sessions and
+20000 users shared across the listing. The "before" path maps DictCursor rows
+into a dataclass without slots, parsing every UUID; the "after" path is
+booking_from_row on tuple cursor rows.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Optional
+from uuid import UUID, uuid4
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from event_booking.domain.entities.booking import BookingStatus
+from event_booking.infrastructure.persistence.mariadb_booking_repository import (
+    BOOKING_COLUMNS, _shared_uuid, booking_from_row
+)
+
+@dataclass
+class LegacyBooking:
+    user_id: UUID
+    session_id: UUID
+    seats: int
+    price_per_seat: Decimal
+    id: UUID = field(default_factory=uuid4)
+    status: BookingStatus = BookingStatus.PENDING
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    confirmed_at: Optional[datetime] = None
+    cancelled_at: Optional[datetime] = None
+
+def legacy_from_row(data) -> LegacyBooking:
+    return LegacyBooking(
+        id=UUID(data['id']),
+        user_id=UUID(data['user_id']),
+        session_id=UUID(data['session_id']),
+        seats=data['seats'],
+        price_per_seat=data['price_per_seat'],
+        status=BookingStatus(data['status']),
+        created_at=data['created_at'],
+        confirmed_at=data['confirmed_at'],
+        cancelled_at=data['cancelled_at']
+    )
+
+def make_rows(count):
+    sessions = [str(uuid4()) for _ in range(2000)]
+    users = [str(uuid4()) for _ in range(20000)]
+    start = datetime(2030, 1, 1)
+    return [
+        (str(uuid4()), users[i % len(users)], sessions[i % len(sessions)], 1 + i % 4, Decimal("25.00"),
+         'CONFIRMED', start + timedelta(seconds=i), start + timedelta(seconds=i + 60), None)
+        for i in range(count)
+    ]
+
+def measure(label, mapper, rows):
+    # Each pass starts with a cold UUID cache so both count its entries
+    _shared_uuid.cache_clear()
+    gc.collect()
+    started = time.perf_counter()
+    mapped = [mapper(row) for row in rows]
+    elapsed = time.perf_counter() - started
+    del mapped
+
+    _shared_uuid.cache_clear()
+    gc.collect()
+    tracemalloc.start()
+    mapped = [mapper(row) for row in rows]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del mapped
+
+    print(f"{label:<8} {elapsed * 1e9 / len(rows):8.0f} ns/row {peak / len(rows):8.0f} B/row "
+          f"{peak / 2**20:8.1f} MiB peak")
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    rows = make_rows(args.rows)
+    columns = BOOKING_COLUMNS.split(", ")
+    dict_rows = [dict(zip(columns, row)) for row in rows]
+
+    print(f"{args.rows} rows")
+    measure("before", legacy_from_row, dict_rows)
+    measure("after", booking_from_row, rows)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
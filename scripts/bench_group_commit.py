@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""Compare booking throughput and latency on one hot session with and without group commit.
+
+    python scripts/bench_group_commit.py --clients 64 --connections 10
+    python scripts/bench_group_commit.py --database --clients 64 --window-ms 2
+
+Every client books one seat at a time, first through
+AsyncBookingService.create_booking (one transaction per booking), then
+through BookingBatcher (one transaction per batch of concurrent bookings).
+
+Without --database the repositories are an in-process model: reserving
+seats takes the session row lock until commit, every statement and commit
+sleeps for the given latencies and at most --connections transactions run
+at once, so the numbers show how far batching relieves row lock queueing,
+not absolute MariaDB figures. With --database the benchmark creates its
+own event in the configured database (DB_* variables) and deletes it and
+its bookings afterwards.
+"""
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import uuid4
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from event_booking.domain.entities.event import Event
+from event_booking.domain.entities.session import Session
+from event_booking.domain.repositories.unit_of_work import AsyncUnitOfWork
+from event_booking.domain.services.async_booking_service import AsyncBookingService
+from event_booking.domain.services.booking_batcher import BookingBatcher
+from event_booking.infrastructure.config.database import get_async_pool_options, get_database_config
+
+CAPACITY = 100_000_000
+
+class ModelDatabase:
+    """Session rows whose locks are held by the current transaction until it commits."""
+
+    def __init__(self, statement_latency, commit_latency, connections):
+        self.statement_latency = statement_latency
+        self.commit_latency = commit_latency
+        self.connections = asyncio.Semaphore(connections)
+        self.sessions = {}
+        self.row_locks = {}
+        self.held: ContextVar = ContextVar('held_row_locks', default=None)
+
+    async def statement(self, rows=1):
+        await asyncio.sleep(self.statement_latency * rows)
+
+    async def lock(self, session_id):
+        held = self.held.get()
+        lock = self.row_locks.setdefault(session_id, asyncio.Lock())
+        if lock not in held:
+            await lock.acquire()
+            held.append(lock)
+
+class ModelUnitOfWork(AsyncUnitOfWork):
+    def __init__(self, db):
+        self.db = db
+
+    @asynccontextmanager
+    async def transaction(self):
+        if self.db.held.get() is not None:
+            yield
+            return
+        async with self.db.connections:
+            token = self.db.held.set([])
+            try:
+                yield
+                await asyncio.sleep(self.db.commit_latency)
+            finally:
+                for lock in self.db.held.get():
+                    lock.release()
+                self.db.held.reset(token)
+
+class ModelEventRepository:
+    def __init__(self, db):
+        self.db = db
+
+    async def find_session(self, session_id):
+        await self.db.statement()
+        return self.db.sessions.get(session_id)
+
+    async def reserve_seats(self, session_id, num_seats):
+        await self.db.lock(session_id)
+        await self.db.statement()
+        session = self.db.sessions[session_id]
+        return session.booked_seats if session.book_seats(num_seats) else None
+
+    async def release_seats(self, session_id, num_seats):
+        await self.db.lock(session_id)
+        await self.db.statement()
+        session = self.db.sessions[session_id]
+        return session.booked_seats if session.release_seats(num_seats) else None
+
+class ModelBookingRepository:
+    def __init__(self, db):
+        self.db = db
+
+    async def save(self, booking):
+        await self.db.statement()
+        return booking
+
+    async def save_all(self, bookings):
+        # One multi-row INSERT: a round trip plus a little per row
+        await self.db.statement(1 + len(bookings) / 20)
+        return bookings
+
+def new_session(event_id):
+    start = datetime.now() + timedelta(days=30)
+    return Session(event_id=event_id, start_time=start, end_time=start + timedelta(hours=2),
+                   capacity=CAPACITY, base_price=Decimal("50.00"))
+
+async def run(target, session_id, clients, duration):
+    latencies = []
+    errors = 0
+    stop = time.monotonic() + duration
+
+    async def client():
+        nonlocal errors
+        while time.monotonic() < stop:
+            started = time.monotonic()
+            try:
+                await target.create_booking(uuid4(), session_id, 1)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.monotonic() - started)
+
+    started = time.monotonic()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return latencies, errors, time.monotonic() - started
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+async def bench(args) -> int:
+    event = Event(name="bench_group_commit", description="", venue="bench", categories=["bench"])
+    if args.database:
+        from event_booking.infrastructure.persistence.async_connection_pool import AsyncDatabaseConnectionPool
+        from event_booking.infrastructure.persistence.async_mariadb_booking_repository import (
+            AsyncMariaDBBookingRepository
+        )
+        from event_booking.infrastructure.persistence.async_mariadb_event_repository import (
+            AsyncMariaDBEventRepository
+        )
+        from event_booking.infrastructure.persistence.mariadb_unit_of_work import AsyncMariaDBUnitOfWork
+
+        config = get_database_config()
+        options = get_async_pool_options(config)
+        options['max_size'] = args.connections
+        pool = AsyncDatabaseConnectionPool(config['host'], config['port'], config['user'], config['password'],
+                                           config['database'], **options)
+        await pool.open()
+        event_repository = AsyncMariaDBEventRepository(pool)
+        service = AsyncBookingService(AsyncMariaDBBookingRepository(pool), event_repository,
+                                      AsyncMariaDBUnitOfWork(pool))
+        await event_repository.save(event)
+        label = f"{config['host']}:{config['port']}"
+    else:
+        db = ModelDatabase(args.statement_ms / 1000, args.commit_ms / 1000, args.connections)
+        service = AsyncBookingService(ModelBookingRepository(db), ModelEventRepository(db), ModelUnitOfWork(db))
+        label = f"model, {args.statement_ms}ms statements, {args.commit_ms}ms commits"
+
+    async def create_session():
+        session = new_session(event.id)
+        if args.database:
+            event.add_session(session)
+            await event_repository.update(event)
+        else:
+            db.sessions[session.id] = session
+        return session.id
+
+    print(f"{label}, {args.clients} clients, {args.connections} connections, {args.duration}s per run")
+    print(f"{'mode':>12} {'bookings/s':>12} {'p50 ms':>8} {'p99 ms':>8} {'batch':>6} {'errors':>7}")
+    try:
+        batcher = BookingBatcher(service, window=args.window_ms / 1000, max_batch_size=args.max_batch_size)
+        for name, target in (("per-booking", service), ("group", batcher)):
+            latencies, errors, elapsed = await run(target, await create_session(), args.clients, args.duration)
+            batch = batcher.stats()['avg_batch_size'] if target is batcher else 1.0
+            print(f"{name:>12} {len(latencies) / elapsed:>12.0f} {percentile(latencies, 0.5) * 1000:>8.1f} "
+                  f"{percentile(latencies, 0.99) * 1000:>8.1f} {batch:>6.1f} {errors:>7}")
+    finally:
+        if args.database:
+            async with pool.transaction() as connection:
+                async with connection.cursor() as cursor:
+                    await cursor.execute(
+                        "DELETE FROM bookings WHERE session_id IN (SELECT id FROM sessions WHERE event_id = %s)",
+                        (str(event.id),)
+                    )
+            await event_repository.delete(event.id)
+            await pool.close()
+    return 0
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=64)
+    parser.add_argument('--connections', type=int, default=10, help="pool size")
+    parser.add_argument('--duration', type=float, default=3.0, help="seconds per mode")
+    parser.add_argument('--window-ms', type=float, default=2.0, help="group commit window")
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    parser.add_argument('--database', action='store_true', help="run against the configured database")
+    parser.add_argument('--statement-ms', type=float, default=0.2, help="model: latency per statement")
+    parser.add_argument('--commit-ms', type=float, default=2.0,
+                        help="model: commit latency, certification and flush included")
+    return asyncio.run(bench(parser.parse_args(argv)))
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""Measure booking throughput on one hot session for several seat shard counts.
+
+    python scripts/bench_seat_shards.py --threads 32 --shards 0,2,4,8,16
+    python scripts/bench_seat_shards.py --database --threads 64
+
+Every worker books one seat per transaction through MariaDBEventRepository
+and MariaDBUnitOfWork, as BookingService does. Shard count 0 is the single
+sessions.booked_seats counter.
+
+Without --database the statements run against an in-process model of the
+two tables: each UPDATE takes an exclusive row lock held until commit, and
+statements and commits sleep for the given latencies, so the numbers show
+how far sharding relieves row lock queueing, not absolute MariaDB figures.
+With --database the benchmark creates its own event in the configured
+database (DB_* variables) and deletes it afterwards.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from event_booking.domain.entities.event import Event
+from event_booking.domain.entities.session import Session
+from event_booking.infrastructure.config.database import get_database_config, get_pool_options
+from event_booking.infrastructure.persistence.connection_pool import DatabaseConnectionPool
+from event_booking.infrastructure.persistence.mariadb_event_repository import (
+    MariaDBEventRepository, RELEASE_SEATS_SQL, RESERVE_SEATS_SQL
+)
+from event_booking.infrastructure.persistence.mariadb_unit_of_work import MariaDBUnitOfWork
+from event_booking.infrastructure.persistence.seat_shards import (
+    ADJUST_SHARD_SQL, FIND_SEAT_SHARDS_SQL, INSERT_SHARD_SQL, LOCK_SESSION_SQL, LOCK_SHARDS_SQL,
+    RELEASE_SHARD_SQL, RESERVE_SHARD_SQL, SET_SEAT_SHARDS_SQL, SUM_SHARDS_SQL
+)
+
+CAPACITY = 100_000_000
+
+class ModelDatabase:
+    """Sessions and shard rows guarded by per-row locks released at commit."""
+
+    def __init__(self, statement_latency, commit_latency):
+        self.statement_latency = statement_latency
+        self.commit_latency = commit_latency
+        self.sessions = {}
+        self.shards = {}
+        self.row_locks = defaultdict(threading.Lock)
+        self.mutex = threading.Lock()
+
+    def lock(self, connection, row):
+        with self.mutex:
+            lock = self.row_locks[row]
+        if row not in connection.held:
+            lock.acquire()
+            connection.held[row] = lock
+
+class ModelCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.db = connection.db
+        self.rows = []
+        self.rowcount = 0
+        self.lastrowid = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params):
+        db = self.db
+        time.sleep(db.statement_latency)
+        self.rowcount = 0
+        if sql in (RESERVE_SEATS_SQL, RELEASE_SEATS_SQL):
+            delta, session_id, num_seats = params
+            db.lock(self.connection, ('session', session_id))
+            session = db.sessions[session_id]
+            delta = delta if sql is RESERVE_SEATS_SQL else -delta
+            if session['seat_shards'] == 0 and 0 <= session['booked_seats'] + delta <= session['capacity']:
+                session['booked_seats'] += delta
+                self.rowcount, self.lastrowid = 1, session['booked_seats']
+        elif sql in (RESERVE_SHARD_SQL, RELEASE_SHARD_SQL, ADJUST_SHARD_SQL):
+            if sql is ADJUST_SHARD_SQL:
+                delta, session_id, shard = params
+            else:
+                delta, session_id, shard, _ = params
+                delta = delta if sql is RESERVE_SHARD_SQL else -delta
+            db.lock(self.connection, ('shard', session_id, shard))
+            row = db.shards[(session_id, shard)]
+            if 0 <= row['booked_seats'] + delta <= row['capacity']:
+                row['booked_seats'] += delta
+                self.rowcount = 1
+        elif sql is LOCK_SHARDS_SQL:
+            session_id = params[0]
+            shards = sorted(shard for owner, shard in db.shards if owner == session_id)
+            for shard in shards:
+                db.lock(self.connection, ('shard', session_id, shard))
+            self.rows = [(shard, db.shards[(session_id, shard)]['capacity'],
+                          db.shards[(session_id, shard)]['booked_seats']) for shard in shards]
+        elif sql is SUM_SHARDS_SQL:
+            self.rows = [(sum(row['booked_seats'] for (owner, _), row in list(db.shards.items())
+                              if owner == params[0]),)]
+        elif sql is FIND_SEAT_SHARDS_SQL:
+            self.rows = [(db.sessions[params[0]]['seat_shards'],)]
+        elif sql is LOCK_SESSION_SQL:
+            db.lock(self.connection, ('session', params[0]))
+            session = db.sessions[params[0]]
+            self.rows = [(session['capacity'], session['booked_seats'], session['seat_shards'])]
+        elif sql is SET_SEAT_SHARDS_SQL:
+            db.sessions[params[1]]['seat_shards'] = params[0]
+        else:
+            raise NotImplementedError(sql)
+
+    def executemany(self, sql, params):
+        assert sql is INSERT_SHARD_SQL
+        for session_id, shard, capacity, booked_seats in params:
+            self.db.shards[(session_id, shard)] = {'capacity': capacity, 'booked_seats': booked_seats}
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return list(self.rows)
+
+class ModelConnection:
+    def __init__(self, db):
+        self.db = db
+        self.open = True
+        self.held = {}
+
+    def cursor(self, cursor_class=None):
+        return ModelCursor(self)
+
+    def _release(self):
+        held, self.held = self.held, {}
+        for lock in held.values():
+            lock.release()
+
+    def commit(self):
+        if self.held:
+            time.sleep(self.db.commit_latency)
+        self._release()
+
+    def rollback(self):
+        self._release()
+
+    def ping(self, reconnect=False):
+        pass
+
+    def close(self):
+        self.open = False
+
+class ModelPool(DatabaseConnectionPool):
+    def __init__(self, db, max_size):
+        self.db = db
+        super().__init__("model", 0, "user", "password", "db", min_size=0, max_size=max_size,
+                         maintenance_interval=0)
+
+    def _create_connection(self):
+        return ModelConnection(self.db)
+
+def create_session(repository, event, pool):
+    start = datetime.now() + timedelta(days=30)
+    session = Session(event_id=event.id, start_time=start, end_time=start + timedelta(hours=2),
+                      capacity=CAPACITY, base_price=Decimal("50.00"))
+    if isinstance(pool, ModelPool):
+        pool.db.sessions[str(session.id)] = {'capacity': CAPACITY, 'booked_seats': 0, 'seat_shards': 0}
+    else:
+        event.add_session(session)
+        repository.update(event)
+    return session.id
+
+def run(pool, session_id, threads, duration):
+    repository = MariaDBEventRepository(pool)
+    unit_of_work = MariaDBUnitOfWork(pool)
+    counts = [0] * threads
+    stop = time.monotonic() + duration
+
+    def worker(index):
+        while time.monotonic() < stop:
+            if unit_of_work.run(lambda: repository.reserve_seats(session_id, 1)) is not None:
+                counts[index] += 1
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    started = time.monotonic()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.monotonic() - started
+    return sum(counts), elapsed, unit_of_work.retry_policy.stats()['retries']
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=3.0, help="seconds per shard count")
+    parser.add_argument('--shards', default="0,2,4,8,16", help="comma-separated shard counts")
+    parser.add_argument('--database', action='store_true', help="run against the configured database")
+    parser.add_argument('--statement-ms', type=float, default=0.2, help="model: latency per statement")
+    parser.add_argument('--commit-ms', type=float, default=2.0,
+                        help="model: commit latency, certification and flush included")
+    args = parser.parse_args(argv)
+
+    if args.database:
+        config = get_database_config()
+        options = get_pool_options(config)
+        options['max_size'] = args.threads
+        pool = DatabaseConnectionPool(config['host'], config['port'], config['user'], config['password'],
+                                      config['database'], **options)
+        label = f"{config['host']}:{config['port']}"
+    else:
+        pool = ModelPool(ModelDatabase(args.statement_ms / 1000, args.commit_ms / 1000), args.threads)
+        label = f"model, {args.statement_ms}ms statements, {args.commit_ms}ms commits"
+
+    repository = MariaDBEventRepository(pool)
+    event = Event(name="bench_seat_shards", description="", venue="bench", categories=["bench"])
+    if args.database:
+        repository.save(event)
+
+    print(f"{label}, {args.threads} threads, {args.duration}s per run")
+    print(f"{'shards':>6} {'bookings/s':>12} {'speedup':>8} {'retries':>8}")
+    baseline = None
+    try:
+        for shards in [int(value) for value in args.shards.split(',')]:
+            session_id = create_session(repository, event, pool)
+            if shards:
+                repository.shard_seats(session_id, shards)
+            booked, elapsed, retries = run(pool, session_id, args.threads, args.duration)
+            throughput = booked / elapsed
+            baseline = baseline or throughput
+            print(f"{shards:>6} {throughput:>12.0f} {throughput / baseline:>7.1f}x {retries:>8}")
+    finally:
+        if args.database:
+            repository.delete(event.id)
+        pool.close_all()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
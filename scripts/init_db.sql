@@ -26,9 +26,21 @@ CREATE TABLE IF NOT EXISTS sessions (
     capacity INT NOT NULL,
     booked_seats INT NOT NULL DEFAULT 0,
     base_price DECIMAL(10, 2) NOT NULL,
+    -- 0: booked_seats is the counter; N: the counter is split over session_seat_shards
+    seat_shards INT NOT NULL DEFAULT 0,
     FOREIGN KEY (event_id) REFERENCES events(id) ON DELETE CASCADE
 );
 
+-- Seat counter slots of sharded sessions; availability is the sum over the slots
+CREATE TABLE IF NOT EXISTS session_seat_shards (
+    session_id VARCHAR(36) NOT NULL,
+    shard INT NOT NULL,
+    capacity INT NOT NULL,
+    booked_seats INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (session_id, shard),
+    FOREIGN KEY (session_id) REFERENCES sessions(id) ON DELETE CASCADE
+);
+
 CREATE TABLE IF NOT EXISTS bookings (
     id VARCHAR(36) PRIMARY KEY,
     user_id VARCHAR(36) NOT NULL,
@@ -44,11 +56,15 @@ CREATE TABLE IF NOT EXISTS bookings (
 
 -- Create indexes
 CREATE INDEX idx_events_venue ON events(venue);
+CREATE INDEX idx_events_created_at ON events(created_at, id);
 CREATE INDEX idx_sessions_event_id ON sessions(event_id);
 CREATE INDEX idx_sessions_start_time ON sessions(start_time);
-CREATE INDEX idx_bookings_user_id ON bookings(user_id);
-CREATE INDEX idx_bookings_session_id ON bookings(session_id);
-CREATE INDEX idx_bookings_status ON bookings(status);
+-- Composite indexes serve the keyset pages ordered by (created_at, id)
+CREATE INDEX idx_bookings_user_id ON bookings(user_id, created_at, id);
+CREATE INDEX idx_bookings_session_id ON bookings(session_id, created_at, id);
+CREATE INDEX idx_bookings_status ON bookings(status, created_at, id);  -- also the hold sweeper's seek to stale PENDING rows
+-- Date-range exports scan bookings in creation order
+CREATE INDEX idx_bookings_created_at ON bookings(created_at, id);
 
 -- Create HAProxy check user
 CREATE USER IF NOT EXISTS 'haproxy_check'@'%';
@@ -0,0 +1,85 @@
+import asyncio
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+from event_booking.domain.entities.session import Session
+
+class SeatRepository:
+    """Event repository holding bare sessions with guarded seat updates, counting every call."""
+
+    def __init__(self, *capacities):
+        start = datetime.now() + timedelta(days=1)
+        self.sessions = {}
+        for capacity in capacities:
+            session = Session(event_id=uuid4(), start_time=start, end_time=start + timedelta(hours=2),
+                              capacity=capacity, base_price=Decimal("50.00"))
+            self.sessions[session.id] = session
+        self.lookups = 0
+        self.updates = 0
+        # Session of every reservation, in call order
+        self.reserved = []
+
+    @property
+    def session(self):
+        """The only session, for repositories made with one capacity."""
+        (session,) = self.sessions.values()
+        return session
+
+    @property
+    def queries(self):
+        """Calls that would reach MariaDB."""
+        return self.lookups + self.updates
+
+    def find_session(self, session_id):
+        self.lookups += 1
+        return self.sessions.get(session_id)
+
+    def _start_update(self, session_id, reserve):
+        self.updates += 1
+        if reserve:
+            self.reserved.append(session_id)
+
+    def _apply(self, session_id, num_seats, reserve):
+        session = self.sessions.get(session_id)
+        if session is None:
+            return None
+        changed = session.book_seats(num_seats) if reserve else session.release_seats(num_seats)
+        return session.booked_seats if changed else None
+
+    def reserve_seats(self, session_id, num_seats):
+        self._start_update(session_id, True)
+        return self._apply(session_id, num_seats, True)
+
+    def release_seats(self, session_id, num_seats):
+        self._start_update(session_id, False)
+        return self._apply(session_id, num_seats, False)
+
+class AsyncSeatRepository(SeatRepository):
+    """SeatRepository for coroutines; seat updates take update_latency seconds and record their overlap."""
+
+    def __init__(self, *capacities, update_latency=0.001):
+        super().__init__(*capacities)
+        self.update_latency = update_latency
+        self.running = {}
+        self.max_per_session = 0
+        self.max_overall = 0
+
+    async def find_session(self, session_id):
+        await asyncio.sleep(0)
+        return super().find_session(session_id)
+
+    async def _adjust(self, session_id, num_seats, reserve):
+        self._start_update(session_id, reserve)
+        self.running[session_id] = self.running.get(session_id, 0) + 1
+        self.max_per_session = max(self.max_per_session, self.running[session_id])
+        self.max_overall = max(self.max_overall, sum(self.running.values()))
+        await asyncio.sleep(self.update_latency)
+        self.running[session_id] -= 1
+        return self._apply(session_id, num_seats, reserve)
+
+    async def reserve_seats(self, session_id, num_seats):
+        return await self._adjust(session_id, num_seats, True)
+
+    async def release_seats(self, session_id, num_seats):
+        return await self._adjust(session_id, num_seats, False)
@@ -0,0 +1,152 @@
+import asyncio
+
+import pymysql
+import pytest
+
+from event_booking.infrastructure.persistence.async_connection_pool import AsyncDatabaseConnectionPool
+from event_booking.infrastructure.persistence.connection_pool import DatabaseUnavailableError, PoolExhaustedError
+
+class FakeAsyncConnection:
+    def __init__(self):
+        self.begins = 0
+        self.commits = 0
+        self.rollbacks = 0
+        self.alive = True
+        self.closed = False
+
+    async def begin(self):
+        self.begins += 1
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+    async def ping(self, reconnect=True):
+        if not self.alive:
+            raise pymysql.err.OperationalError(2013, "Lost connection")
+
+    def close(self):
+        self.closed = True
+
+class FakeAioPool:
+    """Stands in for an aiomysql pool of at most max_size connections."""
+
+    def __init__(self, max_size):
+        self.free = []
+        self.available = asyncio.Semaphore(max_size)
+        self.size = 0
+        self.fail_connects = False
+
+    @property
+    def freesize(self):
+        return len(self.free)
+
+    async def acquire(self):
+        await self.available.acquire()
+        if self.free:
+            return self.free.pop()
+        if self.fail_connects:
+            self.available.release()
+            raise pymysql.err.OperationalError(2003, "Can't connect")
+        self.size += 1
+        return FakeAsyncConnection()
+
+    def release(self, connection):
+        if connection.closed:
+            self.size -= 1
+        else:
+            self.free.append(connection)
+        self.available.release()
+
+    def close(self):
+        pass
+
+    async def wait_closed(self):
+        pass
+
+class FakeAsyncPool(AsyncDatabaseConnectionPool):
+    def __init__(self, **kwargs):
+        super().__init__("localhost", 3306, "user", "password", "db", **kwargs)
+
+    async def _create_pool(self):
+        return FakeAioPool(self.max_size)
+
+def test_transaction_is_bound_to_the_task():
+    async def scenario():
+        pool = FakeAsyncPool(max_size=2)
+        await pool.open()
+        async with pool.transaction() as outer:
+            async with pool.get_connection() as inner:
+                assert inner is outer
+            async with pool.transaction() as nested:
+                assert nested is outer
+            # Another task does not see this transaction's connection
+            other = asyncio.create_task(_checkout(pool))
+            assert await other is not outer
+        assert (outer.begins, outer.commits) == (1, 1)
+        assert pool.stats()['in_use'] == 0
+        await pool.close()
+
+    async def _checkout(pool):
+        async with pool.get_connection() as connection:
+            return connection
+
+    asyncio.run(scenario())
+
+def test_transaction_rolls_back_on_error():
+    async def scenario():
+        pool = FakeAsyncPool(max_size=1)
+        await pool.open()
+        with pytest.raises(RuntimeError):
+            async with pool.transaction() as connection:
+                raise RuntimeError("boom")
+        assert (connection.commits, connection.rollbacks) == (0, 1)
+        assert not pool.in_transaction()
+
+    asyncio.run(scenario())
+
+def test_checkout_times_out_when_exhausted():
+    async def scenario():
+        pool = FakeAsyncPool(max_size=1, checkout_timeout=0.05)
+        await pool.open()
+        async with pool.get_connection():
+            with pytest.raises(PoolExhaustedError):
+                async with pool.get_connection():
+                    pass
+        assert pool.stats()['timeouts'] == 1
+
+    asyncio.run(scenario())
+
+def test_connection_idle_too_long_is_pinged_and_replaced_if_dead():
+    async def scenario():
+        pool = FakeAsyncPool(max_size=1, validate_after_idle=0)
+        await pool.open()
+        async with pool.get_connection() as first:
+            pass
+        first.alive = False
+
+        async with pool.get_connection() as second:
+            pass
+        assert second is not first and first.closed
+        stats = pool.stats()
+        assert (stats['validations'], stats['validation_failures'], stats['size']) == (1, 1, 1)
+
+    asyncio.run(scenario())
+
+def test_failed_connect_suspends_new_connections():
+    async def scenario():
+        pool = FakeAsyncPool(max_size=2, connect_backoff=60)
+        await pool.open()
+        pool._pool.fail_connects = True
+        with pytest.raises(DatabaseUnavailableError):
+            async with pool.get_connection():
+                pass
+        pool._pool.fail_connects = False
+        with pytest.raises(DatabaseUnavailableError):
+            async with pool.get_connection():
+                pass
+        assert pool.stats()['failed_connects'] == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,292 @@
+import asyncio
+import time
+import pymysql
+import pytest
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+from event_booking.domain.entities.booking import BookingStatus
+from event_booking.domain.entities.event import Event
+from event_booking.domain.entities.session import Session
+from event_booking.domain.repositories.unit_of_work import AsyncUnitOfWork
+from event_booking.domain.services.async_booking_service import AsyncBookingService
+from event_booking.domain.services.async_event_service import AsyncEventService
+from event_booking.domain.services.booking_service import (
+    BatchBookingError, BatchMode, BookingRequest, InsufficientSeatsError, SessionNotFoundError
+)
+from event_booking.domain.services.event_service import EventNotFoundError, SessionError
+from event_booking.infrastructure.cache.cached_event_repository import AsyncCachingEventRepository
+from event_booking.infrastructure.cache.ttl_cache import TTLCache
+from event_booking.infrastructure.persistence.retry import RetryPolicy
+
+class AsyncMockBookingRepository:
+    def __init__(self):
+        self.bookings = {}
+
+    async def save(self, booking):
+        await asyncio.sleep(0)
+        self.bookings[booking.id] = booking
+        return booking
+
+    async def save_all(self, bookings):
+        for booking in bookings:
+            self.bookings[booking.id] = booking
+        return bookings
+
+    async def find_by_id(self, booking_id):
+        return self.bookings.get(booking_id)
+
+    async def update(self, booking, expected_status=None):
+        self.bookings[booking.id] = booking
+        return booking
+
+class AsyncMockEventRepository:
+    def __init__(self, latency=0.0):
+        self.events = {}
+        self.latency = latency
+        self.calls = 0
+
+    async def _io(self):
+        # Yield to the loop like a real round trip would
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+
+    async def save(self, event):
+        await self._io()
+        self.events[event.id] = event
+        return event
+
+    async def find_by_id(self, event_id):
+        await self._io()
+        return self.events.get(event_id)
+
+    async def find_by_category(self, category, limit=None, after=None):
+        await self._io()
+        return [e for e in self.events.values() if category in e.categories]
+
+    async def find_session(self, session_id):
+        await self._io()
+        for event in self.events.values():
+            if (session := event.get_session(session_id)) is not None:
+                return session
+        return None
+
+    async def reserve_seats(self, session_id, num_seats):
+        await self._io()
+        for event in self.events.values():
+            session = event.get_session(session_id)
+            if session is not None:
+                return session.booked_seats if session.book_seats(num_seats) else None
+        return None
+
+    async def release_seats(self, session_id, num_seats):
+        await self._io()
+        for event in self.events.values():
+            session = event.get_session(session_id)
+            if session is not None:
+                return session.booked_seats if session.release_seats(num_seats) else None
+        return None
+
+    async def update(self, event):
+        await self._io()
+        self.events[event.id] = event
+        return event
+
+    async def delete(self, event_id):
+        await self._io()
+        return self.events.pop(event_id, None) is not None
+
+class RecordingAsyncUnitOfWork(AsyncUnitOfWork):
+    def __init__(self):
+        self.transactions = 0
+
+    @asynccontextmanager
+    async def transaction(self):
+        self.transactions += 1
+        yield
+
+class RetryingAsyncUnitOfWork(RecordingAsyncUnitOfWork):
+    def __init__(self):
+        super().__init__()
+        self.retry_policy = RetryPolicy(base_delay=0)
+
+    async def run(self, work):
+        return await self.retry_policy.run_async(lambda: super(RetryingAsyncUnitOfWork, self).run(work))
+
+def make_event(capacity=100):
+    event = Event(name="Test Event", description="Test Description", venue="Test Venue", categories=["test"])
+    event.add_session(Session(
+        event_id=event.id,
+        start_time=datetime.now() + timedelta(days=1),
+        end_time=datetime.now() + timedelta(days=1, hours=2),
+        capacity=capacity,
+        base_price=Decimal("50.00")
+    ))
+    return event
+
+def make_service(event, latency=0.0, unit_of_work=None):
+    event_repository = AsyncMockEventRepository(latency)
+    event_repository.events[event.id] = event
+    return AsyncBookingService(AsyncMockBookingRepository(), event_repository, unit_of_work)
+
+def test_create_and_cancel_booking():
+    event = make_event()
+    session = event.sessions[0]
+    unit_of_work = RecordingAsyncUnitOfWork()
+    service = make_service(event, unit_of_work=unit_of_work)
+
+    async def scenario():
+        booking = await service.create_booking(uuid4(), session.id, 2)
+        assert booking.price_per_seat == Decimal("40.00")
+        assert session.booked_seats == 2
+        await service.confirm_booking(booking.id)
+        cancelled = await service.cancel_booking(booking.id)
+        assert cancelled.status == BookingStatus.CANCELLED
+        assert await service.get_booking_status(booking.id) == BookingStatus.CANCELLED
+
+    asyncio.run(scenario())
+    assert session.booked_seats == 0
+    assert unit_of_work.transactions == 3
+
+def test_create_booking_errors():
+    event = make_event(capacity=2)
+    service = make_service(event)
+
+    with pytest.raises(SessionNotFoundError):
+        asyncio.run(service.create_booking(uuid4(), uuid4(), 1))
+    with pytest.raises(InsufficientSeatsError):
+        asyncio.run(service.create_booking(uuid4(), event.sessions[0].id, 3))
+    with pytest.raises(ValueError):
+        asyncio.run(service.create_booking(uuid4(), event.sessions[0].id, 0))
+
+def test_concurrent_bookings_never_oversell():
+    event = make_event(capacity=100)
+    session = event.sessions[0]
+    service = make_service(event)
+
+    async def scenario():
+        return await asyncio.gather(
+            *(service.create_booking(uuid4(), session.id, 3) for _ in range(50)),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+    assert sum(not isinstance(r, Exception) for r in results) == 33
+    assert all(isinstance(r, InsufficientSeatsError) for r in results if isinstance(r, Exception))
+    assert session.booked_seats == 99
+
+def test_requests_overlap_while_waiting_on_io():
+    event = make_event(capacity=1000)
+    session = event.sessions[0]
+    service = make_service(event, latency=0.05)
+
+    async def scenario():
+        await asyncio.gather(*(service.create_booking(uuid4(), session.id, 1) for _ in range(20)))
+
+    started = time.monotonic()
+    asyncio.run(scenario())
+    # Two round trips of 50ms each; run back to back this would take 2s
+    assert time.monotonic() - started < 1.0
+    assert session.booked_seats == 20
+
+def test_create_bookings_in_one_unit_of_work():
+    event = make_event(capacity=10)
+    session = event.sessions[0]
+    unit_of_work = RecordingAsyncUnitOfWork()
+    service = make_service(event, unit_of_work=unit_of_work)
+    requests = [BookingRequest(uuid4(), session.id, 4) for _ in range(3)]
+
+    with pytest.raises(BatchBookingError):
+        asyncio.run(service.create_bookings(requests))
+    assert session.booked_seats == 0
+
+    results = asyncio.run(service.create_bookings(requests, BatchMode.BEST_EFFORT))
+    assert [result.booking is not None for result in results] == [True, True, False]
+    assert session.booked_seats == 8
+    assert len(service.booking_repository.bookings) == 2
+    assert unit_of_work.transactions == 2
+
+def test_batch_is_replayed_from_scratch_after_a_conflict():
+    event = make_event(capacity=10)
+    session = event.sessions[0]
+    unit_of_work = RetryingAsyncUnitOfWork()
+    service = make_service(event, unit_of_work=unit_of_work)
+    repository = service.event_repository
+    reserve = repository.reserve_seats
+    conflicts = [pymysql.err.OperationalError(1213, "Deadlock found")]
+
+    # A concurrent transaction holds 6 seats during the first attempt, then is rolled back
+    session.book_seats(6)
+
+    async def conflicting_reserve(session_id, num_seats):
+        if conflicts:
+            session.release_seats(6)
+            raise conflicts.pop()
+        return await reserve(session_id, num_seats)
+
+    repository.reserve_seats = conflicting_reserve
+    requests = [BookingRequest(uuid4(), session.id, 4) for _ in range(3)]
+    results = asyncio.run(service.create_bookings(requests, BatchMode.BEST_EFFORT))
+
+    assert [result.booking is not None for result in results] == [True, True, False]
+    assert [type(result.error) for result in results] == [type(None), type(None), InsufficientSeatsError]
+    assert session.booked_seats == 8
+    assert unit_of_work.transactions == 2
+    assert unit_of_work.retry_policy.stats()['recovered'] == 1
+
+def test_best_effort_batch_books_what_fits_when_the_cache_overstates_seats():
+    event = make_event(capacity=10)
+    session = event.sessions[0]
+    repository = AsyncMockEventRepository()
+    repository.events[event.id] = event
+    cached = AsyncCachingEventRepository(repository, TTLCache())
+    service = AsyncBookingService(AsyncMockBookingRepository(), cached)
+
+    # Cache the session while it is empty, then let another worker take 7 seats
+    asyncio.run(cached.find_session(session.id))
+    session.book_seats(7)
+
+    requests = [BookingRequest(uuid4(), session.id, 2) for _ in range(3)]
+    results = asyncio.run(service.create_bookings(requests, BatchMode.BEST_EFFORT))
+
+    assert [result.booking is not None for result in results] == [True, False, False]
+    assert session.booked_seats == 9
+
+def test_event_service_rules():
+    repository = AsyncMockEventRepository()
+    service = AsyncEventService(repository)
+    start = datetime.now() + timedelta(days=1)
+
+    async def scenario():
+        event = await service.create_event("Concert", "Live", "Hall", ["music"])
+        session = await service.add_session(event.id, start, start + timedelta(hours=2), 10, Decimal("20"))
+        assert session.event_id == event.id
+        with pytest.raises(SessionError):
+            await service.add_session(event.id, start + timedelta(hours=1), start + timedelta(hours=3),
+                                      10, Decimal("20"))
+        assert [e.id for e in await service.get_events_by_category("music")] == [event.id]
+        assert await service.get_available_sessions(event.id) == [session]
+        assert await service.delete_event(event.id)
+        with pytest.raises(EventNotFoundError):
+            await service.get_available_sessions(event.id)
+
+    asyncio.run(scenario())
+
+def test_async_cache_serves_repeated_reads():
+    event = make_event()
+    delegate = AsyncMockEventRepository()
+    delegate.events[event.id] = event
+    repository = AsyncCachingEventRepository(delegate, TTLCache(), availability_ttl=60)
+
+    async def scenario():
+        first = await repository.find_by_id(event.id)
+        second = await repository.find_by_id(event.id)
+        assert first == second and first is not second
+        assert delegate.calls == 1
+        await repository.reserve_seats(event.sessions[0].id, 1)
+        await repository.find_session(event.sessions[0].id)
+        assert delegate.calls == 3
+
+    asyncio.run(scenario())
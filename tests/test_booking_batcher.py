@@ -0,0 +1,102 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from event_booking.domain.services.async_booking_service import AsyncBookingService
+from event_booking.domain.services.booking_batcher import BookingBatcher
+from event_booking.domain.services.booking_service import InsufficientSeatsError, SessionNotFoundError
+from seat_repository_fakes import AsyncSeatRepository
+
+class BookingLedger:
+    def __init__(self, fail=False):
+        self.inserts = []
+        self.fail = fail
+
+    async def save_all(self, bookings):
+        await asyncio.sleep(0)
+        if self.fail:
+            raise ConnectionError("lost connection")
+        self.inserts.append(list(bookings))
+        return bookings
+
+def make_batcher(*capacities, fail=False, **options):
+    counter = AsyncSeatRepository(*capacities)
+    service = AsyncBookingService(BookingLedger(fail), counter)
+    return BookingBatcher(service, **options), list(counter.sessions)
+
+async def book_all(batcher, session_id, seats):
+    return await asyncio.gather(*(batcher.create_booking(uuid4(), session_id, count) for count in seats),
+                                return_exceptions=True)
+
+def test_concurrent_bookings_share_one_transaction():
+    batcher, (session_id,) = make_batcher(100, window=0.01)
+
+    bookings = asyncio.run(book_all(batcher, session_id, [1] * 10))
+
+    assert [booking.seats for booking in bookings] == [1] * 10
+    assert len(batcher.service.event_repository.reserved) == 1
+    assert len(batcher.service.booking_repository.inserts) == 1
+    # Priced as if made one after another
+    prices = [booking.price_per_seat for booking in bookings]
+    assert prices == sorted(prices)
+    assert batcher.stats()['batches'] == 1 and batcher.stats()['sessions_queued'] == 0
+
+def test_each_caller_gets_its_own_error():
+    batcher, (session_id,) = make_batcher(5, window=0.01)
+
+    first, second, third = asyncio.run(book_all(batcher, session_id, [3, 3, 2]))
+
+    assert first.seats == 3
+    assert isinstance(second, InsufficientSeatsError)
+    assert third.seats == 2
+
+def test_full_batches_go_out_without_waiting_for_the_window():
+    batcher, (session_id,) = make_batcher(100, window=10.0, max_batch_size=4)
+
+    async def run():
+        return await asyncio.wait_for(book_all(batcher, session_id, [1] * 8), timeout=1.0)
+
+    assert len(asyncio.run(run())) == 8
+    assert batcher.stats()['batches'] == 2
+
+def test_requests_arriving_during_a_commit_form_the_next_batch():
+    batcher, (session_id,) = make_batcher(100, window=0.0, max_batch_size=3)
+
+    async def run():
+        first = asyncio.ensure_future(book_all(batcher, session_id, [1]))
+        while not batcher.service.event_repository.reserved:
+            await asyncio.sleep(0)
+        # The first batch is reserving seats; these queue behind it
+        later = await book_all(batcher, session_id, [1] * 5)
+        return await first, later
+
+    asyncio.run(run())
+    inserts = batcher.service.booking_repository.inserts
+    assert [len(batch) for batch in inserts] == [1, 3, 2]
+
+def test_sessions_are_batched_separately():
+    batcher, (first, second) = make_batcher(10, 10, window=0.01)
+
+    async def run():
+        return await asyncio.gather(book_all(batcher, first, [1, 1]), book_all(batcher, second, [2]),
+                                    batcher.create_booking(uuid4(), uuid4(), 1), return_exceptions=True)
+
+    booked_first, booked_second, missing = asyncio.run(run())
+    assert isinstance(missing, SessionNotFoundError)
+    assert [booking.session_id for booking in booked_first] == [first, first]
+    assert batcher.stats()['batches'] == 3
+
+def test_failed_batch_fails_every_caller():
+    batcher, (session_id,) = make_batcher(100, fail=True, window=0.01)
+
+    results = asyncio.run(book_all(batcher, session_id, [1, 2]))
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert batcher.stats()['failed_batches'] == 1
+
+def test_invalid_seat_count_is_rejected_up_front():
+    batcher, (session_id,) = make_batcher(100)
+    with pytest.raises(ValueError):
+        asyncio.run(batcher.create_booking(uuid4(), session_id, 0))
+    assert batcher.stats()['batches'] == 0
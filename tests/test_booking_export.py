@@ -0,0 +1,124 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from uuid import uuid4
+
+from event_booking.domain.entities.booking import Booking, BookingStatus
+from event_booking.infrastructure.api.export import csv_stream, ndjson_stream
+from event_booking.infrastructure.persistence.connection_pool import DatabaseConnectionPool
+from event_booking.infrastructure.persistence.mariadb_booking_repository import (
+    BOOKING_COLUMNS, MariaDBBookingRepository, booking_from_row
+)
+
+def booking_row(index):
+    # Tuple cursor row in BOOKING_COLUMNS order
+    return (str(uuid4()), str(uuid4()), str(uuid4()), 1, Decimal("10.00"), 'PENDING',
+            datetime(2030, 1, 1, 0, index), None, None)
+
+class StreamingCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.closed = False
+
+    def execute(self, sql, params):
+        self.connection.executed.append((sql, params))
+
+    def fetchmany(self, size):
+        self.connection.fetches += 1
+        rows = self.connection.rows[:size]
+        del self.connection.rows[:size]
+        return rows
+
+    def close(self):
+        self.closed = True
+
+class StreamingConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.open = True
+        self.executed = []
+        self.fetches = 0
+
+    def cursor(self, cursor_class=None):
+        self.last_cursor = StreamingCursor(self)
+        return self.last_cursor
+
+    def rollback(self):
+        if not self.open:
+            raise ConnectionError("closed")
+
+    def close(self):
+        self.open = False
+
+class StreamingPool(DatabaseConnectionPool):
+    def __init__(self, rows):
+        self.rows = rows
+        super().__init__("localhost", 3306, "user", "password", "db", min_size=0, maintenance_interval=0)
+
+    def _create_connection(self):
+        self.connection = StreamingConnection(list(self.rows))
+        return self.connection
+
+def test_iter_fetches_in_chunks_and_returns_connection():
+    pool = StreamingPool([booking_row(i) for i in range(5)])
+    repository = MariaDBBookingRepository(pool)
+
+    bookings = list(repository.iter_by_status(BookingStatus.PENDING, chunk_size=2))
+
+    assert len(bookings) == 5
+    assert pool.connection.fetches == 4
+    assert "ORDER BY created_at, id" in pool.connection.executed[0][0]
+    assert pool.connection.last_cursor.closed
+    assert pool.stats()['idle'] == 1
+
+def test_booking_from_tuple_row():
+    row = booking_row(3)
+    booking = booking_from_row(row)
+
+    assert [str(booking.id), str(booking.user_id), str(booking.session_id)] == list(row[:3])
+    assert booking.status is BookingStatus.PENDING
+    assert booking.created_at == datetime(2030, 1, 1, 0, 3)
+    assert not hasattr(booking, '__dict__')
+    # Repeated foreign keys map to one shared UUID
+    assert booking_from_row(row).session_id is booking.session_id
+    assert BOOKING_COLUMNS.split(", ")[:3] == ['id', 'user_id', 'session_id']
+
+def test_abandoned_iteration_drops_connection_instead_of_draining():
+    pool = StreamingPool([booking_row(i) for i in range(10)])
+    repository = MariaDBBookingRepository(pool)
+
+    stream = repository.iter_by_created_between(datetime(2030, 1, 1), None, chunk_size=2)
+    next(stream)
+    stream.close()
+
+    assert pool.connection.fetches == 1
+    assert not pool.connection.open
+    stats = pool.stats()
+    assert (stats['in_use'], stats['idle'], stats['discarded']) == (0, 0, 1)
+
+def test_export_streams_ndjson_and_csv():
+    bookings = [
+        Booking(user_id=uuid4(), session_id=uuid4(), seats=2, price_per_seat=Decimal("12.50"))
+        for _ in range(3)
+    ]
+
+    async def source():
+        for booking in bookings:
+            yield booking
+
+    async def collect(stream):
+        return [chunk async for chunk in stream]
+
+    ndjson = asyncio.run(collect(ndjson_stream(source(), batch_size=2)))
+    assert len(ndjson) == 2
+    lines = "".join(ndjson).splitlines()
+    assert [json.loads(line)['id'] for line in lines] == [str(b.id) for b in bookings]
+
+    chunks = asyncio.run(collect(csv_stream(source(), batch_size=2)))
+    assert chunks[0].startswith("id,user_id,session_id")
+    rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+    assert [row['price_per_seat'] for row in rows] == ["12.50"] * 3
+    assert rows[0]['status'] == 'PENDING'
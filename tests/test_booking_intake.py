@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from event_booking.domain.services.booking_service import BookingRequest, BookingService
+from event_booking.infrastructure.persistence.intake_queue import BookingIntakeQueue, IntakeStatus
+from event_booking.infrastructure.tasks.booking_intake import BookingIntakeWorkers
+from seat_repository_fakes import SeatRepository
+
+class StoredBookings:
+    def __init__(self, failures=0):
+        self.bookings = {}
+        self.failures = failures
+
+    def save_all(self, bookings):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("lost connection")
+        for booking in bookings:
+            self.bookings[booking.id] = booking
+        return bookings
+
+    def find_by_id(self, booking_id):
+        return self.bookings.get(booking_id)
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = BookingIntakeQueue(str(tmp_path / "intake.db"))
+    yield queue
+    queue.close()
+
+def make_workers(queue, *capacities, failures=0, **options):
+    seats = SeatRepository(*capacities)
+    service = BookingService(StoredBookings(failures), seats)
+    return BookingIntakeWorkers(queue, service, **options), list(seats.sessions)
+
+def test_enqueued_requests_survive_reopening(tmp_path):
+    path = str(tmp_path / "intake.db")
+    queue = BookingIntakeQueue(path)
+    record = queue.enqueue(uuid4(), uuid4(), 2)
+    queue.close()
+
+    reopened = BookingIntakeQueue(path)
+    stored = reopened.get(record.ticket)
+    reopened.close()
+    assert stored == record
+
+def test_claim_hands_out_each_request_once_in_order(queue):
+    tickets = [queue.enqueue(uuid4(), uuid4(), 1).ticket for _ in range(5)]
+
+    first, second = queue.claim(3), queue.claim(3)
+
+    assert [r.ticket for r in first + second] == tickets
+    assert all(r.status == IntakeStatus.PROCESSING and r.attempts == 1 for r in first + second)
+    assert queue.claim(3) == []
+    assert queue.counts()['PROCESSING'] == 5
+
+def test_batch_books_under_the_ticket_and_reports_failures(queue):
+    workers, (first, second) = make_workers(queue, 3, 10)
+    fits = queue.enqueue(uuid4(), first, 2)
+    too_many = queue.enqueue(uuid4(), first, 2)
+    other = queue.enqueue(uuid4(), second, 1)
+    missing = queue.enqueue(uuid4(), uuid4(), 1)
+
+    assert workers.process() == 4
+
+    booked = queue.get(fits.ticket)
+    assert booked.status == IntakeStatus.BOOKED and booked.booking_id == fits.ticket
+    assert workers.service.booking_repository.find_by_id(fits.ticket).seats == 2
+    assert queue.get(other.ticket).status == IntakeStatus.BOOKED
+    assert queue.get(too_many.ticket).error == "Not enough seats available"
+    assert queue.get(missing.ticket).status == IntakeStatus.FAILED
+    assert workers.stats()['booked'] == 2 and workers.stats()['failed'] == 2
+
+def test_sessions_are_locked_in_a_stable_order(queue):
+    workers, sessions = make_workers(queue, 10, 10, 10)
+    for session_id in reversed(sessions):
+        queue.enqueue(uuid4(), session_id, 1)
+
+    workers.process()
+
+    reserved = workers.service.event_repository.reserved
+    assert reserved == sorted(reserved, key=str)
+
+def test_failed_batch_is_queued_again_until_out_of_attempts(queue):
+    workers, (session_id,) = make_workers(queue, 10, failures=2, max_attempts=2)
+    record = queue.enqueue(uuid4(), session_id, 1)
+
+    workers.process()
+    assert queue.get(record.ticket).status == IntakeStatus.QUEUED
+    workers.process()
+    failed = queue.get(record.ticket)
+    assert failed.status == IntakeStatus.FAILED and failed.error == "lost connection"
+    assert workers.stats()['errors'] == 2
+
+def test_stale_claim_already_booked_is_not_booked_twice(queue):
+    workers, (session_id,) = make_workers(queue, 10)
+    queue.enqueue(uuid4(), session_id, 1)
+    # A worker books the request and dies before recording the outcome
+    (record,) = queue.claim(1)
+    workers.service.create_bookings([BookingRequest(record.user_id, session_id, 1, booking_id=record.ticket)])
+    assert queue.requeue_stale(datetime.utcnow() + timedelta(seconds=1)) == 1
+
+    workers.process()
+
+    assert queue.get(record.ticket).status == IntakeStatus.BOOKED
+    assert workers.service.event_repository.sessions[session_id].booked_seats == 1
+
+def test_maintain_requeues_expired_claims_and_purges_old_results(queue):
+    workers, (session_id,) = make_workers(queue, 10, lease=0.0, retention=0.0)
+    done = queue.enqueue(uuid4(), session_id, 1)
+    workers.process()
+    claimed = queue.enqueue(uuid4(), session_id, 1)
+    queue.claim(1)
+
+    workers.maintain()
+
+    assert queue.get(done.ticket) is None
+    assert queue.get(claimed.ticket).status == IntakeStatus.QUEUED
+
+def test_worker_threads_drain_the_queue(queue):
+    workers, (session_id,) = make_workers(queue, 100, workers=2, batch_size=5, poll_interval=1.0)
+    tickets = [queue.enqueue(uuid4(), session_id, 1).ticket for _ in range(12)]
+    workers.start()
+    workers.notify()
+    try:
+        deadline = datetime.utcnow() + timedelta(seconds=5)
+        while queue.counts()['BOOKED'] < len(tickets) and datetime.utcnow() < deadline:
+            workers._stop.wait(0.01)
+    finally:
+        workers.stop()
+    assert all(queue.get(ticket).status == IntakeStatus.BOOKED for ticket in tickets)
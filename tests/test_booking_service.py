@@ -1,4 +1,6 @@
 import pytest
+from contextlib import contextmanager
+from copy import deepcopy
 from datetime import datetime, timedelta
 from decimal import Decimal
 from uuid import uuid4
@@ -6,33 +8,55 @@ from uuid import uuid4
 from event_booking.domain.entities.booking import Booking, BookingStatus
 from event_booking.domain.entities.event import Event
 from event_booking.domain.entities.session import Session
+from event_booking.domain.repositories.unit_of_work import UnitOfWork
 from event_booking.domain.services.booking_service import (
-    BookingService, BookingError, InsufficientSeatsError, SessionNotFoundError
+    BatchBookingError, BatchMode, BookingRequest, BookingService, BookingError, HoldExpiredError,
+    InsufficientSeatsError, SessionNotFoundError
 )
 
 class MockBookingRepository:
     def __init__(self):
         self.bookings = {}
+        # Status as last written, which the shared entities cannot tell
+        self.stored_status = {}
+        self.batches = 0
 
     def save(self, booking):
         self.bookings[booking.id] = booking
+        self.stored_status[booking.id] = booking.status
         return booking
 
+    def save_all(self, bookings):
+        self.batches += 1
+        for booking in bookings:
+            self.save(booking)
+        return bookings
+
     def find_by_id(self, booking_id):
         return self.bookings.get(booking_id)
 
-    def find_by_user_id(self, user_id):
+    def find_by_user_id(self, user_id, limit=None, after=None):
         return [b for b in self.bookings.values() if b.user_id == user_id]
 
-    def find_by_session_id(self, session_id):
+    def find_by_session_id(self, session_id, limit=None, after=None):
         return [b for b in self.bookings.values() if b.session_id == session_id]
 
-    def find_by_status(self, status):
+    def find_by_status(self, status, limit=None, after=None):
         return [b for b in self.bookings.values() if b.status == status]
 
-    def update(self, booking):
-        self.bookings[booking.id] = booking
-        return booking
+    def update(self, booking, expected_status=None):
+        if expected_status is not None and self.stored_status.get(booking.id) != expected_status:
+            return None
+        return self.save(booking)
+
+    def expire_pending(self, created_before, limit):
+        stale = sorted((b for b in self.bookings.values()
+                        if self.stored_status[b.id] == BookingStatus.PENDING and b.created_at < created_before),
+                       key=lambda b: b.created_at)[:limit]
+        for booking in stale:
+            booking.expire()
+            self.stored_status[booking.id] = booking.status
+        return stale
 
     def delete(self, booking_id):
         if booking_id in self.bookings:
@@ -55,13 +79,43 @@ class MockEventRepository:
     def find_by_id(self, event_id):
         return self.events.get(event_id)
 
-    def find_all(self):
+    def find_all(self, limit=None, after=None):
         return list(self.events.values())
 
+    def find_session(self, session_id):
+        for event in self.events.values():
+            if (session := event.get_session(session_id)) is not None:
+                return session
+        return None
+
+    def find_event_by_session_id(self, session_id):
+        return next((e for e in self.events.values() if e.get_session(session_id)), None)
+
+    def reserve_seats(self, session_id, num_seats):
+        session = self.find_session(session_id)
+        if session is None or not session.book_seats(num_seats):
+            return None
+        return session.booked_seats
+
+    def release_seats(self, session_id, num_seats):
+        session = self.find_session(session_id)
+        if session is None or not session.release_seats(num_seats):
+            return None
+        return session.booked_seats
+
     def update(self, event):
         self.events[event.id] = event
         return event
 
+class RecordingUnitOfWork(UnitOfWork):
+    def __init__(self):
+        self.transactions = 0
+
+    @contextmanager
+    def transaction(self):
+        self.transactions += 1
+        yield
+
 @pytest.fixture
 def booking_service():
     return BookingService(MockBookingRepository(), MockEventRepository())
@@ -186,4 +240,196 @@ def test_dynamic_pricing(booking_service, test_event):
         num_seats=10
     )
 
-    assert booking2.price_per_seat > booking.price_per_seat 
\ No newline at end of file
+    assert booking2.price_per_seat > booking.price_per_seat 
+def test_create_booking_rejects_when_reservation_loses_race(booking_service, test_event):
+    session = test_event.sessions[0]
+    # Another booker took the seats between the read and the guarded update
+    booking_service.event_repository.reserve_seats = lambda session_id, num_seats: None
+
+    with pytest.raises(InsufficientSeatsError):
+        booking_service.create_booking(
+            user_id=uuid4(),
+            session_id=session.id,
+            num_seats=2
+        )
+    assert booking_service.booking_repository.bookings == {}
+
+def test_price_is_derived_from_reserved_count(booking_service, test_event):
+    session = test_event.sessions[0]
+    session.booked_seats = 70
+
+    booking = booking_service.create_booking(
+        user_id=uuid4(),
+        session_id=session.id,
+        num_seats=5
+    )
+
+    assert session.booked_seats == 75
+    assert booking.price_per_seat == session.get_price_for_booked_seats(70)
+    assert booking.price_per_seat == Decimal("60.00")
+
+def test_booking_does_not_scan_catalog(booking_service, test_event):
+    session = test_event.sessions[0]
+
+    def fail_find_all():
+        raise AssertionError("find_all must not be used to locate a session")
+    booking_service.event_repository.find_all = fail_find_all
+
+    booking = booking_service.create_booking(
+        user_id=uuid4(),
+        session_id=session.id,
+        num_seats=2
+    )
+    booking_service.confirm_booking(booking.id)
+    booking_service.cancel_booking(booking.id)
+    assert session.booked_seats == 0
+
+def test_booking_operations_run_in_one_transaction_each(test_event):
+    unit_of_work = RecordingUnitOfWork()
+    service = BookingService(MockBookingRepository(), MockEventRepository(), unit_of_work)
+    service.event_repository.save(test_event)
+    session = test_event.sessions[0]
+
+    booking = service.create_booking(user_id=uuid4(), session_id=session.id, num_seats=2)
+    service.confirm_booking(booking.id)
+    service.cancel_booking(booking.id)
+
+    assert unit_of_work.transactions == 3
+
+def add_session(event, capacity):
+    session = Session(
+        event_id=event.id,
+        start_time=datetime.now() + timedelta(days=2 + len(event.sessions)),
+        end_time=datetime.now() + timedelta(days=2 + len(event.sessions), hours=2),
+        capacity=capacity,
+        base_price=Decimal("50.00")
+    )
+    event.add_session(session)
+    return session
+
+def test_create_bookings_reserves_once_per_session(booking_service, test_event):
+    first = test_event.sessions[0]
+    second = add_session(test_event, capacity=10)
+    reservations = []
+    reserve_seats = booking_service.event_repository.reserve_seats
+
+    def recording_reserve(session_id, num_seats):
+        reservations.append((session_id, num_seats))
+        return reserve_seats(session_id, num_seats)
+    booking_service.event_repository.reserve_seats = recording_reserve
+
+    requests = [BookingRequest(uuid4(), first.id, 2), BookingRequest(uuid4(), second.id, 4),
+                BookingRequest(uuid4(), first.id, 3), BookingRequest(uuid4(), second.id, 4)]
+    results = booking_service.create_bookings(requests)
+
+    assert [result.booking.seats for result in results] == [2, 4, 3, 4]
+    assert reservations == [(first.id, 5), (second.id, 8)]
+    assert booking_service.booking_repository.batches == 1
+    assert (first.booked_seats, second.booked_seats) == (5, 8)
+    # Priced as if booked one after another: the last one sees 40% occupancy
+    assert [r.booking.price_per_seat for r in results if r.request.session_id == second.id] == [
+        second.get_price_for_booked_seats(0), second.get_price_for_booked_seats(4)
+    ]
+
+def test_create_bookings_all_or_nothing_books_nothing_on_failure(booking_service, test_event):
+    first = test_event.sessions[0]
+    second = add_session(test_event, capacity=3)
+    requests = [BookingRequest(uuid4(), first.id, 2), BookingRequest(uuid4(), second.id, 4)]
+
+    with pytest.raises(BatchBookingError) as error:
+        booking_service.create_bookings(requests, BatchMode.ALL_OR_NOTHING)
+
+    results = error.value.results
+    assert all(result.booking is None for result in results)
+    assert isinstance(results[1].error, InsufficientSeatsError)
+    assert (first.booked_seats, second.booked_seats) == (0, 0)
+    assert booking_service.booking_repository.bookings == {}
+
+def test_create_bookings_best_effort_reports_each_failure(booking_service, test_event):
+    small = add_session(test_event, capacity=5)
+    requests = [BookingRequest(uuid4(), small.id, 3), BookingRequest(uuid4(), small.id, 3),
+                BookingRequest(uuid4(), small.id, 2), BookingRequest(uuid4(), uuid4(), 1),
+                BookingRequest(uuid4(), small.id, 0)]
+
+    results = booking_service.create_bookings(requests, BatchMode.BEST_EFFORT)
+
+    assert [result.booking is not None for result in results] == [True, False, True, False, False]
+    assert isinstance(results[1].error, InsufficientSeatsError)
+    assert isinstance(results[3].error, SessionNotFoundError)
+    assert isinstance(results[4].error, BookingError)
+    assert small.booked_seats == 5
+    assert len(booking_service.booking_repository.bookings) == 2
+
+def test_create_bookings_best_effort_survives_overstated_availability(booking_service, test_event):
+    small = add_session(test_event, capacity=10)
+    small.booked_seats = 7
+    find_session = booking_service.event_repository.find_session
+
+    def stale_find_session(session_id):
+        # A cached read from before 7 seats were taken
+        session = deepcopy(find_session(session_id))
+        session.booked_seats = 0
+        return session
+    booking_service.event_repository.find_session = stale_find_session
+    booking_service.event_repository.reserve_seats = \
+        lambda session_id, num_seats: small.booked_seats if small.book_seats(num_seats) else None
+
+    requests = [BookingRequest(uuid4(), small.id, 2), BookingRequest(uuid4(), small.id, 2),
+                BookingRequest(uuid4(), small.id, 1)]
+    results = booking_service.create_bookings(requests, BatchMode.BEST_EFFORT)
+
+    assert [result.booking is not None for result in results] == [True, False, True]
+    assert isinstance(results[1].error, InsufficientSeatsError)
+    assert small.booked_seats == 10
+    assert [results[0].booking.price_per_seat, results[2].booking.price_per_seat] == [
+        small.get_price_for_booked_seats(7), small.get_price_for_booked_seats(9)
+    ]
+
+def backdate(booking, minutes):
+    booking.created_at -= timedelta(minutes=minutes)
+
+def test_expire_holds_releases_seats_of_stale_holds(test_event):
+    service = BookingService(MockBookingRepository(), MockEventRepository(), hold_ttl=timedelta(minutes=15))
+    service.event_repository.save(test_event)
+    session = test_event.sessions[0]
+    stale = [service.create_booking(uuid4(), session.id, seats) for seats in (2, 3)]
+    fresh = service.create_booking(uuid4(), session.id, 4)
+    confirmed = service.create_booking(uuid4(), session.id, 1)
+    service.confirm_booking(confirmed.id)
+    for booking in stale + [confirmed]:
+        backdate(booking, 20)
+
+    expired = service.expire_holds(limit=1)
+    assert expired == [stale[0]]
+    assert session.booked_seats == 8
+
+    assert service.expire_holds(limit=10) == [stale[1]]
+    assert service.expire_holds(limit=10) == []
+    assert session.booked_seats == 5
+    assert all(b.status == BookingStatus.EXPIRED and b.cancelled_at for b in stale)
+    assert fresh.status == BookingStatus.PENDING
+    assert confirmed.status == BookingStatus.CONFIRMED
+
+def test_expired_hold_cannot_be_confirmed(test_event):
+    service = BookingService(MockBookingRepository(), MockEventRepository(), hold_ttl=timedelta(minutes=15))
+    service.event_repository.save(test_event)
+    booking = service.create_booking(uuid4(), test_event.sessions[0].id, 2)
+    backdate(booking, 15)
+
+    with pytest.raises(HoldExpiredError):
+        service.confirm_booking(booking.id)
+    assert booking.status == BookingStatus.PENDING
+
+def test_confirm_does_not_overwrite_a_concurrent_expiry(booking_service, test_event):
+    booking = booking_service.create_booking(uuid4(), test_event.sessions[0].id, 2)
+    # The sweeper expired the row after the service read it
+    booking_service.booking_repository.stored_status[booking.id] = BookingStatus.EXPIRED
+
+    with pytest.raises(BookingError):
+        booking_service.confirm_booking(booking.id)
+
+def test_holds_never_expire_without_ttl(booking_service, test_event):
+    booking = booking_service.create_booking(uuid4(), test_event.sessions[0].id, 2)
+    backdate(booking, 60 * 24)
+    assert booking_service.expire_holds() == []
+    assert booking_service.confirm_booking(booking.id).status == BookingStatus.CONFIRMED
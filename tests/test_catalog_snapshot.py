@@ -0,0 +1,176 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+
+from event_booking.domain.entities.event import Event
+from event_booking.domain.entities.session import Session
+from event_booking.domain.repositories.pagination import PageCursor
+from event_booking.domain.repositories.unit_of_work import UnitOfWork
+from event_booking.infrastructure.cache.catalog_snapshot import (
+    CatalogChanges, CatalogSnapshotPublisher, CatalogSnapshotReader, CatalogSnapshotWriter,
+    SnapshotEventRepository
+)
+
+class MockEventRepository:
+    def __init__(self):
+        self.events = {}
+
+    def save(self, event):
+        self.events[event.id] = event
+        return event
+
+    def find_by_id(self, event_id):
+        return self.events.get(event_id)
+
+    def find_all(self, limit=None, after=None):
+        return list(self.events.values())
+
+    def find_session(self, session_id):
+        for event in self.events.values():
+            if (session := event.get_session(session_id)) is not None:
+                return session
+        return None
+
+    def find_event_by_session_id(self, session_id):
+        return next((e for e in self.events.values() if e.get_session(session_id)), None)
+
+    def find_by_category(self, category, limit=None, after=None):
+        return [event for event in self.events.values() if category in event.categories]
+
+    def update(self, event):
+        self.events[event.id] = event
+        return event
+
+class RepeatableReadRepository(MockEventRepository):
+    """Reads see the catalog as of the first read of their transaction, like InnoDB."""
+
+    def __init__(self):
+        super().__init__()
+        self.view = None
+
+    def find_all(self, limit=None, after=None):
+        if self.view is None:
+            self.view = super().find_all()
+        return self.view
+
+class ReadUnitOfWork(UnitOfWork):
+    def __init__(self, repository):
+        self.repository = repository
+
+    @contextmanager
+    def transaction(self):
+        try:
+            yield
+        finally:
+            self.repository.view = None
+
+def make_event(name, categories, sessions=1, created_at=None):
+    event = Event(name=name, description="", venue="Venue", categories=categories,
+                  created_at=created_at or datetime.now())
+    start_time = datetime(2030, 1, 1, 20, 0)
+    for offset in range(sessions):
+        event.add_session(Session(
+            event_id=event.id,
+            start_time=start_time + timedelta(days=offset),
+            end_time=start_time + timedelta(days=offset, hours=2),
+            capacity=100,
+            base_price=Decimal("50.00"),
+            booked_seats=offset
+        ))
+    return event
+
+@pytest.fixture
+def catalog(tmp_path):
+    repository = MockEventRepository()
+    for index in range(20):
+        # Pairs share a timestamp so pages also order by id
+        created_at = datetime(2029, 1, 1) + timedelta(minutes=index // 2)
+        repository.save(make_event(f"Event {index}", ["all", f"group{index % 3}"], sessions=index % 4,
+                                   created_at=created_at))
+    path = str(tmp_path / "catalog.snapshot")
+    writer = CatalogSnapshotWriter(repository, path)
+    return repository, writer, CatalogSnapshotReader(path, check_interval=0)
+
+def listing(events):
+    return sorted(events, key=lambda e: (e.created_at, e.id), reverse=True)
+
+def test_snapshot_serves_listings_page_by_page(catalog):
+    repository, writer, reader = catalog
+    assert reader.current() is None
+    assert writer.publish() == 1
+
+    snapshot_repository = SnapshotEventRepository(reader, MockEventRepository())
+    expected = listing(repository.events.values())
+    assert snapshot_repository.find_all() == expected
+    assert [e.get_changed_fields() for e in snapshot_repository.find_all()] == [{}] * 20
+
+    pages, after = [], None
+    while True:
+        page = snapshot_repository.find_all(limit=6, after=after)
+        pages.append(page)
+        if len(page) < 6:
+            break
+        after = PageCursor(page[-1].created_at, page[-1].id)
+    assert [len(page) for page in pages] == [6, 6, 6, 2]
+    assert [e.id for page in pages for e in page] == [e.id for e in expected]
+
+    group1 = [e for e in expected if "group1" in e.categories]
+    first = snapshot_repository.find_by_category("group1", limit=4)
+    cursor = PageCursor(first[-1].created_at, first[-1].id)
+    rest = snapshot_repository.find_by_category("group1", limit=4, after=cursor)
+    assert [e.id for e in first + rest] == [e.id for e in group1]
+
+def test_single_events_are_read_from_the_delegate(catalog):
+    repository, writer, reader = catalog
+    writer.publish()
+    snapshot_repository = SnapshotEventRepository(reader, repository)
+    event = next(iter(repository.events.values()))
+
+    event.name = "Renamed"
+    assert snapshot_repository.find_by_id(event.id).name == "Renamed"
+    del repository.events[event.id]
+    assert snapshot_repository.find_by_id(event.id) is None
+    assert snapshot_repository.find_event_by_session_id(uuid4()) is None
+
+def test_writes_from_any_worker_trigger_a_publish(catalog, tmp_path):
+    repository, writer, reader = catalog
+    changes = CatalogChanges(str(tmp_path / "catalog.snapshot.changes"))
+    publisher = CatalogSnapshotPublisher(writer, changes, interval=60)
+    seen, due = publisher.publish_if_due(None, 0.0)
+    assert reader.version == 1
+    assert publisher.publish_if_due(seen, due) == (seen, due)
+
+    # A worker that does not publish records its write through the shared file
+    worker = SnapshotEventRepository(CatalogSnapshotReader(writer.path, check_interval=0), repository,
+                                     CatalogChanges(changes.path).bump)
+    worker.save(make_event("New", ["all"]))
+    publisher.publish_if_due(seen, due)
+
+    assert reader.version == 2
+    assert len(worker.find_all()) == 21
+
+def test_each_publish_reads_rows_committed_since_the_last(tmp_path):
+    repository = RepeatableReadRepository()
+    repository.save(make_event("First", ["all"]))
+    writer = CatalogSnapshotWriter(repository, str(tmp_path / "catalog.snapshot"), ReadUnitOfWork(repository))
+    writer.publish()
+
+    repository.save(make_event("Second", ["all"]))
+    writer.publish()
+
+    assert len(CatalogSnapshotReader(writer.path).current().find_all()) == 2
+
+def test_readers_pick_up_new_versions(catalog):
+    repository, writer, reader = catalog
+    writer.publish()
+    first = reader.current()
+
+    repository.save(make_event("New", ["all"]))
+    assert writer.publish() == 2
+
+    assert reader.version == 2
+    assert reader.current() is not first
+    assert len(reader.current().find_all()) == 21
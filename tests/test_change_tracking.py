@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pymysql
+import pytest
+
+from event_booking.domain.entities.event import Event
+from event_booking.domain.entities.session import Session
+from event_booking.domain.services.event_service import EventService, SessionError
+from event_booking.infrastructure.persistence.connection_pool import DatabaseConnectionPool
+from event_booking.infrastructure.persistence.mariadb_event_repository import MariaDBEventRepository
+
+def make_event():
+    event = Event(
+        name="Test Event",
+        description="Test Description",
+        venue="Test Venue",
+        categories=["test", "music"]
+    )
+    start_time = datetime.now() + timedelta(days=1)
+    for offset in range(2):
+        event.add_session(Session(
+            event_id=event.id,
+            start_time=start_time + timedelta(days=offset),
+            end_time=start_time + timedelta(days=offset, hours=2),
+            capacity=100,
+            base_price=Decimal("50.00")
+        ))
+    event.mark_persisted()
+    return event
+
+def test_unpersisted_event_reports_every_field():
+    event = Event(name="Test", description="", venue="Venue", categories=["test"])
+    assert not event.is_persisted()
+    assert set(event.get_changed_fields()) == {'name', 'description', 'venue', 'categories'}
+
+def test_persisted_event_without_changes_is_clean():
+    event = make_event()
+    assert event.get_changed_fields() == {}
+    assert event.get_new_sessions() == []
+    assert event.get_removed_session_ids() == []
+    assert event.get_changed_sessions() == []
+
+def test_event_tracks_field_and_category_changes():
+    event = make_event()
+    event.venue = "Other Venue"
+    event.categories.append("jazz")
+    event.categories.remove("test")
+
+    assert event.get_changed_fields() == {
+        'venue': "Other Venue",
+        'categories': ["music", "jazz"]
+    }
+    assert event.get_added_categories() == ["jazz"]
+    assert event.get_removed_categories() == ["test"]
+
+def test_event_tracks_session_changes():
+    event = make_event()
+    removed, changed = event.sessions
+    event.remove_session(removed.id)
+    changed.capacity = 150
+    added = Session(
+        event_id=event.id,
+        start_time=datetime.now() + timedelta(days=5),
+        end_time=datetime.now() + timedelta(days=5, hours=2),
+        capacity=10,
+        base_price=Decimal("20.00")
+    )
+    event.add_session(added)
+
+    assert event.get_removed_session_ids() == [removed.id]
+    assert event.get_new_sessions() == [added]
+    assert event.get_changed_sessions() == [changed]
+    assert changed.get_changed_fields() == {'capacity': 150}
+
+    event.mark_persisted()
+    assert event.get_new_sessions() == []
+    assert event.get_changed_sessions() == []
+
+def test_booked_seats_are_not_tracked():
+    event = make_event()
+    event.sessions[0].book_seats(10)
+    assert event.get_changed_sessions() == []
+
+class ReferencedSessionsCursor:
+    """Fails session deletes like the bookings.session_id foreign key does."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        if sql.startswith("DELETE FROM sessions"):
+            raise pymysql.err.IntegrityError(1451, "Cannot delete or update a parent row")
+
+class ReferencedSessionsConnection:
+    def __init__(self):
+        self.open = True
+        self.rollbacks = 0
+
+    def cursor(self, cursor_class=None):
+        return ReferencedSessionsCursor()
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.open = False
+
+class ReferencedSessionsPool(DatabaseConnectionPool):
+    def __init__(self):
+        self.connection = ReferencedSessionsConnection()
+        super().__init__("localhost", 3306, "user", "password", "db", min_size=0, maintenance_interval=0)
+
+    def _create_connection(self):
+        return self.connection
+
+def test_session_with_only_cancelled_bookings_is_refused_not_a_server_error():
+    event = make_event()
+    session = event.sessions[0]
+    pool = ReferencedSessionsPool()
+    repository = MariaDBEventRepository(pool)
+    repository.find_by_id = lambda event_id: event
+
+    # No seats held, but booking rows still point at the session
+    with pytest.raises(SessionError):
+        EventService(repository).remove_session(event.id, session.id)
+    assert pool.connection.rollbacks == 1
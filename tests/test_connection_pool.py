@@ -0,0 +1,234 @@
+import gc
+import threading
+import time
+import weakref
+
+import pytest
+
+from event_booking.infrastructure.persistence.connection_pool import (
+    DatabaseConnectionPool, DatabaseUnavailableError, PoolExhaustedError
+)
+
+class FakeConnection:
+    def __init__(self):
+        self.open = True
+        self.rollbacks = 0
+        self.commits = 0
+        self.pings = 0
+
+    def commit(self):
+        self.commits += 1
+
+    def ping(self, reconnect=False):
+        self.pings += 1
+        if not self.open:
+            raise ConnectionError("connection lost")
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.open = False
+
+class FakeConnectionPool(DatabaseConnectionPool):
+    def __init__(self, **kwargs):
+        self.connections = []
+        self.fail_connects = False
+        kwargs.setdefault('maintenance_interval', 0)
+        super().__init__("localhost", 3306, "user", "password", "db", **kwargs)
+
+    def _create_connection(self):
+        if self.fail_connects:
+            raise ConnectionError("cannot connect")
+        connection = FakeConnection()
+        self.connections.append(connection)
+        return connection
+
+def test_pool_reuses_connections():
+    pool = FakeConnectionPool(min_size=0, max_size=2)
+    with pool.get_connection() as first:
+        pass
+    with pool.get_connection() as second:
+        pass
+    assert first is second
+    assert pool.stats()['created'] == 1
+
+def test_pool_prefills_min_size():
+    pool = FakeConnectionPool(min_size=2, max_size=4)
+    stats = pool.stats()
+    assert stats['idle'] == 2
+    assert stats['in_use'] == 0
+
+def test_pool_never_exceeds_max_size():
+    pool = FakeConnectionPool(min_size=0, max_size=1, checkout_timeout=0.05)
+    with pool.get_connection():
+        with pytest.raises(PoolExhaustedError):
+            with pool.get_connection():
+                pass
+    stats = pool.stats()
+    assert stats['created'] == 1
+    assert stats['timeouts'] == 1
+    assert stats['waits'] == 1
+
+def test_pool_serves_waiters_in_fifo_order():
+    pool = FakeConnectionPool(min_size=0, max_size=1, checkout_timeout=5)
+    order = []
+
+    def worker(name):
+        with pool.get_connection():
+            order.append(name)
+
+    with pool.get_connection():
+        threads = []
+        for name in range(3):
+            thread = threading.Thread(target=worker, args=(name,))
+            thread.start()
+            threads.append(thread)
+            # Make sure each worker is queued before the next one starts
+            while pool.stats()['waiting'] < name + 1:
+                time.sleep(0.001)
+    for thread in threads:
+        thread.join()
+
+    assert order == [0, 1, 2]
+    assert pool.stats()['created'] == 1
+
+def test_pool_rolls_back_and_keeps_connection_on_error():
+    pool = FakeConnectionPool(min_size=0, max_size=1)
+    with pytest.raises(RuntimeError):
+        with pool.get_connection() as connection:
+            raise RuntimeError("query failed")
+    assert connection.rollbacks == 1
+    assert pool.stats()['idle'] == 1
+
+def test_pool_ends_the_transaction_of_a_plain_checkout():
+    pool = FakeConnectionPool(min_size=0, max_size=1)
+    with pool.get_connection() as connection:
+        pass
+    # A read would otherwise keep its snapshot while the connection sits idle
+    assert connection.rollbacks == 1
+    assert pool.stats()['idle'] == 1
+
+def test_pool_replaces_closed_connection_for_waiter():
+    pool = FakeConnectionPool(min_size=0, max_size=1, checkout_timeout=5)
+    result = []
+
+    def worker():
+        with pool.get_connection() as connection:
+            result.append(connection)
+
+    with pool.get_connection() as connection:
+        thread = threading.Thread(target=worker)
+        thread.start()
+        while pool.stats()['waiting'] < 1:
+            time.sleep(0.001)
+        connection.close()
+    thread.join()
+
+    assert result[0] is not connection
+    stats = pool.stats()
+    assert stats['discarded'] == 1
+    assert stats['size'] == 1
+
+def test_pool_does_not_ping_recently_used_connections():
+    pool = FakeConnectionPool(min_size=0, max_size=1, validate_after_idle=60)
+    for _ in range(3):
+        with pool.get_connection() as connection:
+            pass
+    assert connection.pings == 0
+
+def test_pool_validates_idle_connections_before_reuse():
+    pool = FakeConnectionPool(min_size=0, max_size=1, validate_after_idle=0)
+    with pool.get_connection() as first:
+        pass
+    first.close()
+    with pool.get_connection() as second:
+        pass
+    assert second is not first
+    stats = pool.stats()
+    assert stats['validation_failures'] == 1
+    assert stats['size'] == 1
+
+def test_pool_recycles_connections_past_max_lifetime():
+    pool = FakeConnectionPool(min_size=0, max_size=1, max_lifetime=0.01)
+    with pool.get_connection() as first:
+        time.sleep(0.02)
+    with pool.get_connection() as second:
+        pass
+    assert second is not first
+    assert not first.open
+    assert pool.stats()['recycled'] == 1
+
+def test_pool_backs_off_after_connect_failure():
+    pool = FakeConnectionPool(min_size=0, max_size=2, connect_backoff=60)
+    pool.fail_connects = True
+    with pytest.raises(ConnectionError):
+        with pool.get_connection():
+            pass
+    pool.fail_connects = False
+    with pytest.raises(DatabaseUnavailableError):
+        with pool.get_connection():
+            pass
+    assert pool.stats()['failed_connects'] == 1
+    assert pool.stats()['size'] == 0
+
+def test_maintain_evicts_stale_and_keeps_min_size_warm():
+    pool = FakeConnectionPool(min_size=1, max_size=3, max_idle_time=0.01,
+                              validate_after_idle=60)
+    with pool.get_connection():
+        with pool.get_connection():
+            pass
+    assert pool.stats()['idle'] == 2
+    time.sleep(0.02)
+    pool.maintain()
+    stats = pool.stats()
+    assert stats['idle'] == 1
+    assert stats['discarded'] == 1
+
+    dead = pool.connections[0]
+    pool.validate_after_idle = 0
+    for connection in pool.connections:
+        connection.close()
+    pool.maintain()
+    stats = pool.stats()
+    assert stats['idle'] == 1
+    assert pool.connections[-1].open
+    assert dead.pings >= 1
+
+def test_transaction_shares_one_connection_and_commits_once():
+    pool = FakeConnectionPool(min_size=0, max_size=2)
+    with pool.transaction() as connection:
+        with pool.get_connection() as first:
+            pool.commit(first)
+        with pool.transaction():
+            with pool.get_connection() as second:
+                pool.commit(second)
+        assert pool.in_transaction()
+    assert first is connection and second is connection
+    assert connection.commits == 1
+    assert not pool.in_transaction()
+    assert pool.stats()['created'] == 1
+
+def test_transaction_rolls_back_on_error():
+    pool = FakeConnectionPool(min_size=0, max_size=1)
+    with pytest.raises(RuntimeError):
+        with pool.transaction() as connection:
+            with pool.get_connection():
+                raise RuntimeError("insert failed")
+    assert connection.commits == 0
+    assert connection.rollbacks == 1
+    assert pool.stats()['idle'] == 1
+
+def test_dropped_pool_is_collected_and_its_maintainer_stops():
+    pool = FakeConnectionPool(min_size=1, max_size=2, maintenance_interval=0.01)
+    connection = pool._idle[0][0]
+    maintainer = pool._maintainer
+    pool_ref = weakref.ref(pool)
+
+    del pool
+    gc.collect()
+
+    assert pool_ref() is None
+    assert not connection.open
+    maintainer.join(1.0)
+    assert not maintainer.is_alive()
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+from event_booking.infrastructure.persistence import mariadb_event_repository
+from event_booking.infrastructure.persistence.connection_pool import DatabaseConnectionPool
+from event_booking.infrastructure.persistence.mariadb_event_repository import MariaDBEventRepository
+
+class CatalogTables:
+    """In-memory events, event_categories and sessions rows."""
+
+    def __init__(self, num_events):
+        start = datetime.now() + timedelta(days=1)
+        self.events, self.categories, self.sessions = [], [], []
+        for number in range(num_events):
+            event_id = str(uuid4())
+            self.events.append({'id': event_id, 'name': f"Event {number}", 'description': "",
+                                'venue': "Venue", 'created_at': start})
+            self.categories.append({'event_id': event_id, 'category': f"category-{number}"})
+            for offset in range(number % 3):
+                self.sessions.append({'id': str(uuid4()), 'event_id': event_id,
+                                      'start_time': start + timedelta(days=offset),
+                                      'end_time': start + timedelta(days=offset, hours=2),
+                                      'capacity': 100 + number, 'booked_seats': 0,
+                                      'base_price': Decimal("50.00"), 'seat_shards': 0})
+        self.chunks = []
+
+class CatalogCursor:
+    def __init__(self, tables):
+        self.tables = tables
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        if "FROM event_categories" in sql:
+            self.tables.chunks.append(list(params))
+            self.rows = [row for row in self.tables.categories if row['event_id'] in params]
+        elif "FROM sessions" in sql:
+            self.rows = [row for row in self.tables.sessions if row['event_id'] in params]
+        else:
+            self.rows = list(self.tables.events)
+
+    def fetchall(self):
+        return list(self.rows)
+
+class CatalogConnection:
+    def __init__(self, tables):
+        self.tables = tables
+        self.open = True
+
+    def cursor(self, cursor_class=None):
+        return CatalogCursor(self.tables)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.open = False
+
+class CatalogPool(DatabaseConnectionPool):
+    def __init__(self, tables):
+        self.tables = tables
+        super().__init__("localhost", 3306, "user", "password", "db", min_size=0, maintenance_interval=0)
+
+    def _create_connection(self):
+        return CatalogConnection(self.tables)
+
+def test_listing_larger_than_a_chunk_attaches_children_to_their_events(monkeypatch):
+    monkeypatch.setattr(mariadb_event_repository, 'BULK_LOAD_CHUNK_SIZE', 4)
+    tables = CatalogTables(10)
+
+    events = MariaDBEventRepository(CatalogPool(tables)).find_all()
+
+    assert [len(chunk) for chunk in tables.chunks] == [4, 4, 2]
+    assert [str(event.id) for event in events] == [row['id'] for row in tables.events]
+    for number, event in enumerate(events):
+        assert event.categories == [f"category-{number}"]
+        assert len(event.sessions) == number % 3
+        assert all(session.event_id == event.id and session.capacity == 100 + number
+                   for session in event.sessions)
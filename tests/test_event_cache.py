@@ -0,0 +1,149 @@
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from event_booking.domain.entities.event import Event
+from event_booking.domain.entities.session import Session
+from event_booking.infrastructure.cache.cached_event_repository import CachingEventRepository
+from event_booking.infrastructure.cache.ttl_cache import MISSING, TTLCache
+
+class CountingEventRepository:
+    def __init__(self):
+        self.events = {}
+        self.calls = Counter()
+
+    def save(self, event):
+        self.events[event.id] = event
+        return event
+
+    def find_by_id(self, event_id):
+        self.calls['find_by_id'] += 1
+        return self.events.get(event_id)
+
+    def find_all(self, limit=None, after=None):
+        self.calls['find_all'] += 1
+        return list(self.events.values())
+
+    def find_by_category(self, category, limit=None, after=None):
+        self.calls['find_by_category'] += 1
+        return [e for e in self.events.values() if category in e.categories]
+
+    def find_session(self, session_id):
+        self.calls['find_session'] += 1
+        for event in self.events.values():
+            if (session := event.get_session(session_id)) is not None:
+                return session
+        return None
+
+    def find_event_by_session_id(self, session_id):
+        self.calls['find_event_by_session_id'] += 1
+        return next((e for e in self.events.values() if e.get_session(session_id)), None)
+
+    def reserve_seats(self, session_id, num_seats):
+        session = self.find_session(session_id)
+        if session is None or not session.book_seats(num_seats):
+            return None
+        return session.booked_seats
+
+    def release_seats(self, session_id, num_seats):
+        session = self.find_session(session_id)
+        if session is None or not session.release_seats(num_seats):
+            return None
+        return session.booked_seats
+
+    def update(self, event):
+        self.events[event.id] = event
+        return event
+
+    def delete(self, event_id):
+        return self.events.pop(event_id, None) is not None
+
+@pytest.fixture
+def delegate():
+    repository = CountingEventRepository()
+    event = Event(name="Test Event", description="", venue="Venue", categories=["test"])
+    event.add_session(Session(
+        event_id=event.id,
+        start_time=datetime.now() + timedelta(days=1),
+        end_time=datetime.now() + timedelta(days=1, hours=2),
+        capacity=10,
+        base_price=Decimal("50.00")
+    ))
+    repository.save(event)
+    repository.event = event
+    return repository
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is MISSING
+    assert cache.get('a') == 1
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['hits'] == 2
+    assert stats['misses'] == 1
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(maxsize=2, ttl=0.01)
+    cache.set('a', 1)
+    time.sleep(0.02)
+    assert cache.get('a') is MISSING
+    assert cache.stats()['expirations'] == 1
+
+def test_listing_is_served_from_cache(delegate):
+    repository = CachingEventRepository(delegate, TTLCache(ttl=60))
+    repository.find_all()
+    events = repository.find_all()
+    assert delegate.calls['find_all'] == 1
+    # Callers get copies, so mutating them does not leak into the cache
+    events[0].name = "Changed"
+    assert repository.find_all()[0].name == "Test Event"
+
+def test_writes_invalidate_cached_entries(delegate):
+    repository = CachingEventRepository(delegate, TTLCache(ttl=60), availability_ttl=60)
+    event = repository.find_by_id(delegate.event.id)
+    repository.find_by_category("test")
+
+    event.name = "Renamed"
+    repository.update(event)
+
+    assert repository.find_by_id(event.id).name == "Renamed"
+    assert delegate.calls['find_by_id'] == 2
+    repository.find_by_category("test")
+    assert delegate.calls['find_by_category'] == 2
+
+def test_seat_changes_invalidate_session_and_event(delegate):
+    repository = CachingEventRepository(delegate, TTLCache(ttl=60), availability_ttl=60)
+    session_id = delegate.event.sessions[0].id
+    repository.find_event_by_session_id(session_id)
+    assert repository.find_session(session_id).booked_seats == 0
+
+    assert repository.reserve_seats(session_id, 10) == 10
+
+    assert repository.find_session(session_id).available_seats == 0
+    event = repository.find_event_by_session_id(session_id)
+    assert event.get_session(session_id).booked_seats == 10
+
+def test_zero_availability_ttl_bypasses_cache(delegate):
+    repository = CachingEventRepository(delegate, TTLCache(ttl=60), availability_ttl=0)
+    session_id = delegate.event.sessions[0].id
+    repository.find_session(session_id)
+    repository.find_session(session_id)
+    assert delegate.calls['find_session'] == 2
+
+def test_listings_carry_seat_counts_no_longer_than_availability_ttl(delegate):
+    repository = CachingEventRepository(delegate, TTLCache(ttl=60), availability_ttl=0.01)
+    session_id = delegate.event.sessions[0].id
+    repository.find_all()
+
+    repository.reserve_seats(session_id, 4)
+    time.sleep(0.02)
+
+    assert repository.find_all()[0].get_session(session_id).booked_seats == 4
+    assert delegate.calls['find_all'] == 2
@@ -18,10 +18,31 @@ class MockEventRepository:
     def find_by_id(self, event_id):
         return self.events.get(event_id)
 
-    def find_all(self):
+    def find_all(self, limit=None, after=None):
         return list(self.events.values())
 
-    def find_by_category(self, category):
+    def find_session(self, session_id):
+        for event in self.events.values():
+            if (session := event.get_session(session_id)) is not None:
+                return session
+        return None
+
+    def find_event_by_session_id(self, session_id):
+        return next((e for e in self.events.values() if e.get_session(session_id)), None)
+
+    def reserve_seats(self, session_id, num_seats):
+        session = self.find_session(session_id)
+        if session is None or not session.book_seats(num_seats):
+            return None
+        return session.booked_seats
+
+    def release_seats(self, session_id, num_seats):
+        session = self.find_session(session_id)
+        if session is None or not session.release_seats(num_seats):
+            return None
+        return session.booked_seats
+
+    def find_by_category(self, category, limit=None, after=None):
         return [event for event in self.events.values() if category in event.categories]
 
     def update(self, event):
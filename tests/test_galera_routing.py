@@ -0,0 +1,275 @@
+import asyncio
+import socket
+import time
+
+import pymysql
+import pytest
+
+from event_booking.infrastructure.persistence.async_connection_pool import AsyncDatabaseConnectionPool
+from event_booking.infrastructure.persistence.connection_pool import DatabaseConnectionPool
+
+SYNCED = {'wsrep_ready': 'ON', 'wsrep_local_state': '4'}
+
+class StandInNode:
+    """Plays one Galera node: answers the wsrep probe and can go down."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.status = dict(SYNCED)
+        self.down = False
+        self.connections = []
+
+class StandInCursor:
+    def __init__(self, node):
+        self.node = node
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        if self.node.down:
+            raise pymysql.err.OperationalError(2013, "Lost connection to MySQL server during query")
+
+    def fetchall(self):
+        return [{'Variable_name': name, 'Value': value} for name, value in self.node.status.items()]
+
+class StandInConnection:
+    def __init__(self, node):
+        self.node = node
+        self.open = True
+
+    def cursor(self, cursor_class=None):
+        return StandInCursor(self.node)
+
+    def ping(self, reconnect=False):
+        pass
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.open = False
+
+class MultiNodePool(DatabaseConnectionPool):
+    def __init__(self, stand_ins, real_nodes=(), **kwargs):
+        self.stand_ins = stand_ins
+        kwargs.setdefault('maintenance_interval', 0)
+        kwargs.setdefault('min_size', 0)
+        super().__init__("haproxy", 3306, "user", "password", "db",
+                         nodes=list(real_nodes) + list(stand_ins), **kwargs)
+
+    def _connect(self, host, port):
+        node = self.stand_ins.get((host, port))
+        if node is None:
+            return super()._connect(host, port)
+        if node.down:
+            raise pymysql.err.OperationalError(2003, f"Can't connect to MySQL server on '{host}'")
+        time.sleep(node.latency)
+        connection = StandInConnection(node)
+        node.connections.append(connection)
+        return connection
+
+def node_stats(pool):
+    return {entry['node']: entry for entry in pool.stats()['nodes']}
+
+def test_connections_stick_to_the_first_configured_node():
+    nodes = {('node-1', 3306): StandInNode(0.02), ('node-2', 3306): StandInNode(0.0),
+             ('node-3', 3306): StandInNode(0.0)}
+    nodes[('node-2', 3306)].status = {'wsrep_ready': 'ON', 'wsrep_local_state': '2'}
+    pool = MultiNodePool(nodes, max_size=4)
+
+    with pool.get_connection(), pool.get_connection(), pool.get_connection():
+        pass
+    # Slower but synced, node-1 keeps every writer connection
+    assert len(nodes[('node-1', 3306)].connections) == 3
+    assert not nodes[('node-2', 3306)].connections and not nodes[('node-3', 3306)].connections
+
+
+def test_failover_prefers_synced_nodes_over_donors():
+    nodes = {('node-1', 3306): StandInNode(), ('node-2', 3306): StandInNode(),
+             ('node-3', 3306): StandInNode()}
+    nodes[('node-1', 3306)].down = True
+    nodes[('node-2', 3306)].status = {'wsrep_ready': 'ON', 'wsrep_local_state': '2'}
+    pool = MultiNodePool(nodes, max_size=3)
+
+    with pool.get_connection() as first, pool.get_connection() as second:
+        # node-2 serves as a donor, but once known as one it comes after node-3
+        assert first.node is nodes[('node-2', 3306)]
+        assert second.node is nodes[('node-3', 3306)]
+
+def test_spread_pools_send_new_connections_to_the_fastest_node():
+    nodes = {('node-1', 3306): StandInNode(0.02), ('node-2', 3306): StandInNode(0.0)}
+    pool = MultiNodePool(nodes, max_size=4, spread_nodes=True)
+
+    with pool.get_connection(), pool.get_connection():
+        # Each node is tried once before scores decide
+        pass
+    with pool.get_connection(), pool.get_connection(), pool.get_connection():
+        pass
+
+    assert len(nodes[('node-2', 3306)].connections) == 2
+    assert len(nodes[('node-1', 3306)].connections) == 1
+
+def test_connect_fails_over_to_the_next_node():
+    nodes = {('node-1', 3306): StandInNode(), ('node-2', 3306): StandInNode()}
+    nodes[('node-1', 3306)].down = True
+    pool = MultiNodePool(nodes)
+
+    with pool.get_connection() as connection:
+        assert connection.node is nodes[('node-2', 3306)]
+    stats = node_stats(pool)
+    assert not stats['node-1:3306']['usable']
+    assert stats['node-1:3306']['failures'] == 1
+    assert pool.stats()['failed_connects'] == 0
+
+def test_nodes_not_synced_are_skipped():
+    nodes = {('node-1', 3306): StandInNode(), ('node-2', 3306): StandInNode()}
+    nodes[('node-1', 3306)].status = {'wsrep_ready': 'OFF', 'wsrep_local_state': '1'}
+    pool = MultiNodePool(nodes)
+
+    with pool.get_connection() as connection:
+        assert connection.node is nodes[('node-2', 3306)]
+    assert not nodes[('node-1', 3306)].connections[0].open
+
+def test_query_error_evicts_the_node_immediately():
+    nodes = {('node-1', 3306): StandInNode(), ('node-2', 3306): StandInNode(0.01)}
+    pool = MultiNodePool(nodes, max_size=3)
+    with pool.get_connection(), pool.get_connection():
+        pass
+    first = nodes[('node-1', 3306)]
+    assert len(first.connections) == 2
+
+    first.down = True
+    with pytest.raises(pymysql.err.OperationalError):
+        with pool.get_connection() as connection:
+            assert connection.node is first
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+
+    # The idle connection to node-1 is dropped too and new ones fail over
+    assert pool.stats()['idle'] == 0
+    with pool.get_connection() as connection, pool.get_connection() as other:
+        assert connection.node is other.node is nodes[('node-2', 3306)]
+
+def test_refused_tcp_connect_fails_over():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        closed_port = probe.getsockname()[1]
+    nodes = {('node-2', 3306): StandInNode()}
+    # Nothing listens on the first node, so pymysql gets a real refused connection
+    pool = MultiNodePool(nodes, real_nodes=[('127.0.0.1', closed_port)])
+
+    with pool.get_connection() as connection:
+        assert connection.node is nodes[('node-2', 3306)]
+    assert node_stats(pool)[f'127.0.0.1:{closed_port}']['failures'] == 1
+
+class AsyncStandInCursor(StandInCursor):
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, sql, params=None):
+        super().execute(sql, params)
+
+    async def fetchall(self):
+        return super().fetchall()
+
+class AsyncStandInConnection(StandInConnection):
+    def cursor(self, cursor_class=None):
+        return AsyncStandInCursor(self.node)
+
+class StandInAioPool:
+    """Stands in for the aiomysql pool of one node."""
+
+    def __init__(self, node):
+        self.node = node
+        self.free = []
+        self.size = 0
+        self.closing = False
+
+    @property
+    def freesize(self):
+        return len(self.free)
+
+    async def acquire(self):
+        if self.free:
+            return self.free.pop()
+        if self.node.down:
+            raise pymysql.err.OperationalError(2003, "Can't connect to MySQL server")
+        connection = AsyncStandInConnection(self.node)
+        self.node.connections.append(connection)
+        self.size += 1
+        return connection
+
+    def release(self, connection):
+        if not connection.open or self.closing:
+            connection.close()
+            self.size -= 1
+        else:
+            self.free.append(connection)
+
+    def close(self):
+        self.closing = True
+
+    async def clear(self):
+        while self.free:
+            self.free.pop().close()
+            self.size -= 1
+
+    async def wait_closed(self):
+        await self.clear()
+
+class AsyncMultiNodePool(AsyncDatabaseConnectionPool):
+    def __init__(self, stand_ins, **kwargs):
+        self.stand_ins = stand_ins
+        super().__init__("haproxy", 3306, "user", "password", "db", nodes=list(stand_ins), **kwargs)
+
+    async def _create_pool(self, host=None, port=None):
+        return StandInAioPool(self.stand_ins[(host, port)])
+
+def test_async_pool_fails_over_on_a_node_failure():
+    nodes = {('node-1', 3306): StandInNode(), ('node-2', 3306): StandInNode()}
+    first, second = nodes[('node-1', 3306)], nodes[('node-2', 3306)]
+
+    async def scenario():
+        pool = AsyncMultiNodePool(nodes, max_size=3)
+        await pool.open()
+        async with pool.get_connection() as connection:
+            assert connection.node is first
+
+        first.down = True
+        with pytest.raises(pymysql.err.OperationalError):
+            async with pool.get_connection() as connection:
+                async with connection.cursor() as cursor:
+                    await cursor.execute("SELECT 1")
+
+        async with pool.get_connection() as connection:
+            assert connection.node is second
+        return pool
+
+    pool = asyncio.run(scenario())
+    assert not any(connection.open for connection in first.connections)
+    assert not node_stats(pool)['node-1:3306']['usable']
+
+def test_async_pool_opens_on_the_next_node_when_the_first_is_down():
+    nodes = {('node-1', 3306): StandInNode(), ('node-2', 3306): StandInNode()}
+    nodes[('node-1', 3306)].down = True
+
+    async def scenario():
+        pool = AsyncMultiNodePool(nodes)
+        await pool.open()
+        async with pool.get_connection() as connection:
+            return pool, connection
+
+    pool, connection = asyncio.run(scenario())
+    assert connection.node is nodes[('node-2', 3306)]
+    assert node_stats(pool)['node-1:3306']['failures'] == 1
+    assert pool.stats()['failed_connects'] == 0
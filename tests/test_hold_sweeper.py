@@ -0,0 +1,122 @@
+from datetime import datetime
+from decimal import Decimal
+from uuid import uuid4
+
+from event_booking.domain.entities.booking import BookingStatus
+from event_booking.infrastructure.persistence.connection_pool import DatabaseConnectionPool
+from event_booking.infrastructure.persistence.mariadb_booking_repository import (
+    EXPIRABLE_HOLDS_SQL, MariaDBBookingRepository
+)
+from event_booking.infrastructure.tasks.hold_sweeper import HoldSweeper
+
+class BacklogService:
+    """Expires holds from a backlog of the given size, failing on request."""
+
+    def __init__(self, backlog, fail_after=None):
+        self.backlog = backlog
+        self.fail_after = fail_after
+        self.calls = 0
+
+    def expire_holds(self, limit):
+        self.calls += 1
+        if self.fail_after is not None and self.calls > self.fail_after:
+            raise RuntimeError("connection lost")
+        count = min(limit, self.backlog)
+        self.backlog -= count
+        return [object()] * count
+
+def test_sweep_drains_backlog_batch_by_batch():
+    sweeper = HoldSweeper(BacklogService(25), batch_size=10)
+
+    assert sweeper.sweep() == 25
+    assert sweeper.service.calls == 3
+    assert sweeper.sweep() == 0
+
+    stats = sweeper.stats()
+    assert (stats['sweeps'], stats['batches'], stats['expired'], stats['last_expired']) == (2, 4, 25, 0)
+    assert stats['max_duration_ms'] >= stats['last_duration_ms'] >= 0
+
+def test_sweep_stops_at_max_batches():
+    sweeper = HoldSweeper(BacklogService(100), batch_size=10, max_batches=3)
+
+    assert sweeper.sweep() == 30
+    assert sweeper.sweep() == 30
+    assert sweeper.service.backlog == 40
+
+def test_failed_batch_is_counted_and_next_sweep_resumes():
+    service = BacklogService(30, fail_after=1)
+    sweeper = HoldSweeper(service, batch_size=10)
+
+    assert sweeper.sweep() == 10
+    assert sweeper.stats()['errors'] == 1
+    service.fail_after = None
+    assert sweeper.sweep() == 20
+
+class HoldCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params):
+        self.connection.executed.append((sql, params))
+
+    def fetchall(self):
+        return self.connection.rows
+
+class HoldConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.open = True
+        self.executed = []
+        self.commits = 0
+
+    def cursor(self, cursor_class=None):
+        return HoldCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.open = False
+
+class HoldPool(DatabaseConnectionPool):
+    def __init__(self, rows):
+        self.rows = rows
+        super().__init__("localhost", 3306, "user", "password", "db", min_size=0, maintenance_interval=0)
+
+    def _create_connection(self):
+        self.connection = HoldConnection(self.rows)
+        return self.connection
+
+def hold_row():
+    return (str(uuid4()), str(uuid4()), str(uuid4()), 2, Decimal("10.00"), 'PENDING',
+            datetime(2030, 1, 1), None, None)
+
+def test_expire_pending_locks_a_batch_and_expires_it_in_one_update():
+    rows = [hold_row() for _ in range(3)]
+    pool = HoldPool(rows)
+    cutoff = datetime(2030, 1, 2)
+
+    expired = MariaDBBookingRepository(pool).expire_pending(cutoff, 3)
+
+    assert [str(booking.id) for booking in expired] == [row[0] for row in rows]
+    assert all(booking.status == BookingStatus.EXPIRED for booking in expired)
+    (select, select_params), (update, update_params) = pool.connection.executed
+    assert select == EXPIRABLE_HOLDS_SQL and "SKIP LOCKED" in select
+    assert select_params == ('PENDING', cutoff, 3)
+    assert update_params[0] == 'EXPIRED' and update_params[2:] == [row[0] for row in rows]
+    assert pool.connection.commits == 1
+
+def test_expire_pending_with_nothing_stale_issues_no_update():
+    pool = HoldPool([])
+    assert MariaDBBookingRepository(pool).expire_pending(datetime(2030, 1, 2), 100) == []
+    assert len(pool.connection.executed) == 1
@@ -0,0 +1,168 @@
+import io
+import json
+from contextlib import contextmanager
+
+import pytest
+
+from event_booking.infrastructure.cli.import_events import (
+    Checkpoint, EventImporter, ImportAborted, file_digest, read_csv, read_jsonl
+)
+
+class RecordingCursor:
+    def __init__(self, pool):
+        self.pool = pool
+        self.rowcount = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def executemany(self, sql, rows):
+        if self.pool.fail_on_chunk == len(self.pool.committed) + 1:
+            raise RuntimeError("deadlock")
+        table, rows = sql.split()[2], list(rows)
+        # ON DUPLICATE KEY UPDATE id = id affects no row when the key exists
+        keys = self.pool.keys.setdefault(table, set())
+        new_keys = {tuple(row[:2]) if table == 'event_categories' else row[0] for row in rows} - keys
+        keys |= new_keys
+        self.rowcount = len(new_keys)
+        self.pool.pending.append((table, rows))
+
+class RecordingConnection:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def cursor(self):
+        return RecordingCursor(self.pool)
+
+class RecordingPool:
+    """Keeps the statements of each committed transaction and the keys written."""
+
+    def __init__(self, fail_on_chunk=None):
+        self.fail_on_chunk = fail_on_chunk
+        self.committed = []
+        self.pending = []
+        self.keys = {}
+
+    @contextmanager
+    def transaction(self):
+        self.pending = []
+        yield RecordingConnection(self)
+        self.committed.append(self.pending)
+
+    def rows(self, table):
+        return [row for chunk in self.committed for name, rows in chunk if name == table for row in rows]
+
+def event_line(name, sessions=(), **extra):
+    return json.dumps(dict({
+        'name': name, 'description': 'd', 'venue': 'Hall', 'categories': ['music'],
+        'sessions': [
+            {'start_time': start, 'end_time': end, 'capacity': 100, 'base_price': '25.00'}
+            for start, end in sessions
+        ]
+    }, **extra))
+
+EVENING = ('2030-05-01T20:00:00', '2030-05-01T22:00:00')
+MATINEE = ('2030-05-01T15:00:00', '2030-05-01T17:00:00')
+
+def test_imports_in_chunks_and_rejects_invalid_records():
+    lines = [
+        event_line('A', [EVENING, MATINEE]),
+        event_line('B', [EVENING, ('2030-05-01T21:00:00', '2030-05-01T23:00:00')]),  # overlap
+        '{not json',
+        event_line('C', [('2030-05-02T20:00:00', '2030-05-02T19:00:00')]),  # ends before start
+        event_line('D'),
+        event_line('E', [EVENING]),
+    ]
+    pool = RecordingPool()
+    rejects = io.StringIO()
+    stats = EventImporter(pool, commit_size=2, rejects=rejects).run(read_jsonl(io.StringIO("\n".join(lines))), 'f')
+
+    assert (stats.read, stats.events, stats.sessions, stats.rejected) == (6, 3, 3, 3)
+    assert len(pool.committed) == 2
+    assert [row[1] for row in pool.rows('events')] == ['A', 'D', 'E']
+    assert [json.loads(line)['record'] for line in rejects.getvalue().splitlines()] == [2, 3, 4]
+
+def test_resume_after_failed_chunk_writes_each_event_once(tmp_path):
+    source = tmp_path / 'season.jsonl'
+    source.write_text("\n".join(event_line(f"E{i}", [EVENING]) for i in range(5)))
+    digest = file_digest(str(source))
+    checkpoint = Checkpoint(str(tmp_path / 'season.checkpoint'), str(source), digest)
+
+    failing = RecordingPool(fail_on_chunk=2)
+    with pytest.raises(ImportAborted) as aborted:
+        with open(source) as stream:
+            EventImporter(failing, commit_size=2, checkpoint=checkpoint).run(read_jsonl(stream), digest)
+    assert aborted.value.records_done == 2
+    assert checkpoint.load() == 2
+
+    resumed = RecordingPool()
+    with open(source) as stream:
+        stats = EventImporter(resumed, commit_size=2, checkpoint=checkpoint).run(
+            read_jsonl(stream), digest, skip=checkpoint.load())
+    assert stats.skipped == 2
+    assert checkpoint.load() == 5
+
+    first_ids = [row[0] for row in failing.rows('events')]
+    resumed_ids = [row[0] for row in resumed.rows('events')]
+    assert len(first_ids) == 2 and len(resumed_ids) == 3
+    assert not set(first_ids) & set(resumed_ids)
+
+def test_checkpoint_refuses_a_changed_source(tmp_path):
+    source = tmp_path / 'season.jsonl'
+    source.write_text(event_line('A'))
+    Checkpoint(str(tmp_path / 'season.checkpoint'), str(source), file_digest(str(source))).save(1)
+
+    source.write_text(event_line('A (corrected)'))
+    checkpoint = Checkpoint(str(tmp_path / 'season.checkpoint'), str(source), file_digest(str(source)))
+    with pytest.raises(ValueError, match="changed since checkpoint"):
+        checkpoint.load()
+
+def test_reimport_counts_duplicates_and_a_corrected_file_gets_new_ids(tmp_path):
+    source = tmp_path / 'season.jsonl'
+    source.write_text("\n".join([event_line('A', [EVENING]), event_line('B')]))
+    pool = RecordingPool()
+
+    def run():
+        with open(source) as stream:
+            return EventImporter(pool).run(read_jsonl(stream), file_digest(str(source)))
+
+    first = run()
+    again = run()
+    assert (first.events, first.sessions, first.duplicate_events, first.duplicate_sessions) == (2, 1, 0, 0)
+    assert (again.events, again.sessions, again.duplicate_events, again.duplicate_sessions) == (0, 0, 2, 1)
+
+    source.write_text("\n".join([event_line('A', [EVENING]), event_line('B (corrected)')]))
+    corrected = run()
+    assert (corrected.events, corrected.sessions, corrected.duplicate_events) == (2, 1, 0)
+
+def test_ids_are_stable_across_runs():
+    lines = event_line('A', [EVENING])
+    first, second = RecordingPool(), RecordingPool()
+    EventImporter(first).run(read_jsonl(io.StringIO(lines)), 'f')
+    EventImporter(second).run(read_jsonl(io.StringIO(lines)), 'f')
+    assert first.rows('events')[0][0] == second.rows('events')[0][0]
+    assert first.rows('sessions')[0][0] == second.rows('sessions')[0][0]
+
+def test_csv_rows_are_grouped_by_event():
+    data = (
+        "event,name,description,venue,categories,start_time,end_time,capacity,base_price\n"
+        "1,A,d,Hall,music|jazz,2030-05-01T15:00:00,2030-05-01T17:00:00,100,20\n"
+        "1,A,d,Hall,music|jazz,2030-05-01T20:00:00,2030-05-01T22:00:00,100,30\n"
+        "2,B,d,Club,rock,,,,\n"
+    )
+    records = list(read_csv(io.StringIO(data)))
+    assert [len(r['sessions']) for r in records] == [2, 0]
+    assert records[0]['categories'] == ['music', 'jazz']
+
+    pool = RecordingPool()
+    stats = EventImporter(pool).run(iter(records), 'f.csv')
+    assert (stats.events, stats.sessions, stats.rejected) == (2, 2, 0)
+    assert len(pool.rows("event_categories")) == 3
+
+def test_csv_without_event_column_is_rejected():
+    data = "name,venue,start_time\nA,Hall,2030-05-01T15:00:00\n"
+    with pytest.raises(ValueError, match="event"):
+        read_csv(io.StringIO(data))
@@ -0,0 +1,30 @@
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from event_booking.domain.repositories.pagination import PageCursor, decode_cursor, encode_cursor
+from event_booking.infrastructure.persistence.keyset import keyset_page
+
+def test_cursor_round_trip():
+    created_at = datetime(2030, 1, 1, 20, 30, 15, 123456)
+    item_id = uuid4()
+    cursor = encode_cursor(created_at, item_id)
+    assert decode_cursor(cursor) == PageCursor(created_at=created_at, id=item_id)
+
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+def test_keyset_page_without_cursor_only_orders_and_limits():
+    condition, ordering, params = keyset_page(None, 50)
+    assert condition == ''
+    assert ordering == "ORDER BY created_at DESC, id DESC LIMIT %s"
+    assert params == [50]
+
+def test_keyset_page_after_cursor():
+    after = PageCursor(created_at=datetime(2030, 1, 1), id=uuid4())
+    condition, ordering, params = keyset_page(after, 10, alias='e')
+    assert condition == "(e.created_at < %s OR (e.created_at = %s AND e.id < %s))"
+    assert ordering == "ORDER BY e.created_at DESC, e.id DESC LIMIT %s"
+    assert params == [after.created_at, after.created_at, str(after.id), 10]
@@ -0,0 +1,149 @@
+import asyncio
+
+import pymysql
+
+from event_booking.infrastructure.persistence.async_connection_pool import AsyncDatabaseConnectionPool
+from event_booking.infrastructure.persistence.read_write_pool import AsyncReadWritePool
+
+class RecordingCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, sql, params=None):
+        self.connection.executed.append((sql, params))
+
+class FakeAsyncConnection:
+    def __init__(self, name):
+        self.name = name
+        self.executed = []
+
+    def cursor(self):
+        return RecordingCursor(self)
+
+    async def begin(self):
+        pass
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+class FakeAioPool:
+    def __init__(self, name, down=False):
+        self.connection = FakeAsyncConnection(name)
+        self.down = down
+        self.size = 1
+        self.freesize = 1
+
+    async def acquire(self):
+        if self.down:
+            raise pymysql.err.OperationalError(2003, "Can't connect")
+        return self.connection
+
+    def release(self, connection):
+        pass
+
+    def close(self):
+        pass
+
+    async def wait_closed(self):
+        pass
+
+class FakeAsyncPool(AsyncDatabaseConnectionPool):
+    def __init__(self, name, down=False, unreachable=False):
+        super().__init__("localhost", 3306, "user", "password", "db")
+        self.name = name
+        self.down = down
+        self.unreachable = unreachable
+
+    async def _create_pool(self):
+        # aiomysql connects minsize connections while creating the pool
+        if self.unreachable:
+            raise pymysql.err.OperationalError(2003, "Can't connect")
+        return FakeAioPool(self.name, self.down)
+
+async def checkout(pool, readonly):
+    async with pool.get_connection(readonly=readonly) as connection:
+        return connection
+
+def test_reads_go_to_the_reader_and_writes_to_the_writer():
+    async def scenario():
+        pool = AsyncReadWritePool(FakeAsyncPool("writer"), FakeAsyncPool("reader"))
+        await pool.open()
+        assert (await checkout(pool, readonly=True)).name == "reader"
+        assert (await checkout(pool, readonly=False)).name == "writer"
+        # Reads inside a transaction see its uncommitted writes
+        async with pool.transaction() as connection:
+            assert connection.name == "writer"
+            assert (await checkout(pool, readonly=True)) is connection
+        assert pool.stats()['reads'] == 1
+        await pool.close()
+
+    asyncio.run(scenario())
+
+def test_consistent_reads_wrap_the_checkout_in_wsrep_sync_wait():
+    async def scenario():
+        pool = AsyncReadWritePool(FakeAsyncPool("writer"), FakeAsyncPool("reader"), sync_wait=3)
+        await pool.open()
+        reader = await checkout(pool, readonly=True)
+        assert reader.executed == []
+
+        async with pool.consistent_reads():
+            await checkout(pool, readonly=True)
+            await checkout(pool, readonly=False)
+        assert [params for _, params in reader.executed] == [(3,), (0,)]
+        assert pool.writer._pool.connection.executed == []
+        assert pool.stats()['consistent_reads'] == 1
+
+    asyncio.run(scenario())
+
+def test_reads_fall_back_to_the_writer_when_the_reader_is_down():
+    async def scenario():
+        pool = AsyncReadWritePool(FakeAsyncPool("writer"), FakeAsyncPool("reader", down=True))
+        await pool.open()
+        async with pool.consistent_reads():
+            connection = await checkout(pool, readonly=True)
+        assert connection.name == "writer"
+        assert connection.executed == []
+        assert pool.stats()['read_fallbacks'] == 1
+
+    asyncio.run(scenario())
+
+def test_reader_dead_at_startup_is_reopened_lazily():
+    async def scenario():
+        reader = FakeAsyncPool("reader", unreachable=True)
+        pool = AsyncReadWritePool(FakeAsyncPool("writer"), reader, reader_retry_interval=60)
+        await pool.open()
+        assert (await checkout(pool, readonly=True)).name == "writer"
+        # Within the retry interval reads do not try to connect again
+        reader.unreachable = False
+        assert (await checkout(pool, readonly=True)).name == "writer"
+        assert pool.stats()['reader_open_failures'] == 1
+        assert pool.stats()['read_fallbacks'] == 2
+
+        pool.reader_retry_interval = 0
+        pool._reader_retry_at = 0.0
+        assert (await checkout(pool, readonly=True)).name == "reader"
+        await pool.close()
+
+    asyncio.run(scenario())
+
+def test_without_reader_everything_uses_the_writer():
+    async def scenario():
+        pool = AsyncReadWritePool(FakeAsyncPool("writer"))
+        await pool.open()
+        async with pool.consistent_reads():
+            assert (await checkout(pool, readonly=True)).name == "writer"
+        assert pool.stats()['read'] is None
+
+    asyncio.run(scenario())
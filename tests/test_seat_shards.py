@@ -0,0 +1,185 @@
+from uuid import uuid4
+
+import pytest
+
+from event_booking.infrastructure.persistence.connection_pool import DatabaseConnectionPool
+from event_booking.infrastructure.persistence.mariadb_event_repository import (
+    MariaDBEventRepository, RELEASE_SEATS_SQL, RESERVE_SEATS_SQL
+)
+from event_booking.infrastructure.persistence.seat_shards import (
+    ADJUST_SHARD_SQL, FIND_SEAT_SHARDS_SQL, INSERT_SHARD_SQL, LOCK_SESSION_SQL, LOCK_SHARDS_SQL,
+    RELEASE_SHARD_SQL, RESERVE_SHARD_SQL, SET_SEAT_SHARDS_SQL, SUM_SHARDS_SQL, plan_overflow,
+    shard_rows
+)
+
+class SeatTables:
+    """In-memory sessions and session_seat_shards rows."""
+
+    def __init__(self):
+        self.sessions = {}
+        self.shards = {}
+        self.executed = []
+
+    def add_session(self, capacity, booked_seats=0):
+        session_id = str(uuid4())
+        self.sessions[session_id] = {'capacity': capacity, 'booked_seats': booked_seats, 'seat_shards': 0}
+        return session_id
+
+    def shards_of(self, session_id):
+        return sorted((shard, row) for (owner, shard), row in self.shards.items() if owner == session_id)
+
+class TableCursor:
+    def __init__(self, tables):
+        self.tables = tables
+        self.rows = []
+        self.rowcount = 0
+        self.lastrowid = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params):
+        tables = self.tables
+        tables.executed.append(sql)
+        self.rowcount = 0
+        if sql in (RESERVE_SEATS_SQL, RELEASE_SEATS_SQL):
+            delta, session_id, num_seats = params
+            session = tables.sessions.get(session_id)
+            if session and session['seat_shards'] == 0:
+                room = session['capacity'] - session['booked_seats'] if sql is RESERVE_SEATS_SQL \
+                    else session['booked_seats']
+                if room >= num_seats:
+                    session['booked_seats'] += delta if sql is RESERVE_SEATS_SQL else -delta
+                    self.rowcount, self.lastrowid = 1, session['booked_seats']
+        elif sql in (RESERVE_SHARD_SQL, RELEASE_SHARD_SQL):
+            delta, session_id, shard, num_seats = params
+            row = tables.shards.get((session_id, shard))
+            if row:
+                room = row['capacity'] - row['booked_seats'] if sql is RESERVE_SHARD_SQL else row['booked_seats']
+                if room >= num_seats:
+                    row['booked_seats'] += delta if sql is RESERVE_SHARD_SQL else -delta
+                    self.rowcount = 1
+        elif sql is ADJUST_SHARD_SQL:
+            delta, session_id, shard = params
+            tables.shards[(session_id, shard)]['booked_seats'] += delta
+            self.rowcount = 1
+        elif sql is FIND_SEAT_SHARDS_SQL:
+            session = tables.sessions.get(params[0])
+            self.rows = [(session['seat_shards'],)] if session else []
+        elif sql is SUM_SHARDS_SQL:
+            self.rows = [(sum(row['booked_seats'] for _, row in tables.shards_of(params[0])),)]
+        elif sql is LOCK_SHARDS_SQL:
+            self.rows = [(shard, row['capacity'], row['booked_seats'])
+                         for shard, row in tables.shards_of(params[0])]
+        elif sql is LOCK_SESSION_SQL:
+            session = tables.sessions.get(params[0])
+            self.rows = [(session['capacity'], session['booked_seats'], session['seat_shards'])] \
+                if session else []
+        elif sql is SET_SEAT_SHARDS_SQL:
+            tables.sessions[params[1]]['seat_shards'] = params[0]
+        else:
+            raise AssertionError(f"unexpected statement: {sql}")
+
+    def executemany(self, sql, params):
+        assert sql is INSERT_SHARD_SQL
+        for session_id, shard, capacity, booked_seats in params:
+            self.tables.shards[(session_id, shard)] = {'capacity': capacity, 'booked_seats': booked_seats}
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return list(self.rows)
+
+class TableConnection:
+    def __init__(self, tables):
+        self.tables = tables
+        self.open = True
+
+    def cursor(self, cursor_class=None):
+        return TableCursor(self.tables)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.open = False
+
+class TablePool(DatabaseConnectionPool):
+    def __init__(self, tables):
+        self.tables = tables
+        super().__init__("localhost", 3306, "user", "password", "db", min_size=0, maintenance_interval=0)
+
+    def _create_connection(self):
+        return TableConnection(self.tables)
+
+def total_booked(tables, session_id):
+    return sum(row['booked_seats'] for _, row in tables.shards_of(session_id))
+
+def test_shard_rows_split_capacity_and_bookings_evenly():
+    rows = shard_rows("s", 103, 101, 4)
+    assert [row[2] for row in rows] == [26, 26, 26, 25]
+    assert [row[3] for row in rows] == [26, 25, 25, 25]
+    assert all(booked <= capacity for _, _, capacity, booked in rows)
+
+def test_overflow_draws_on_the_shards_with_most_room():
+    rows = [(0, 10, 9), (1, 10, 4), (2, 10, 7)]
+    assert plan_overflow(rows, 8, reserve=True) == [(1, 6), (2, 2)]
+    assert plan_overflow(rows, 11, reserve=True) is None
+    assert plan_overflow(rows, 12, reserve=False) == [(0, -9), (2, -3)]
+
+def test_sharded_session_books_on_shards_and_reports_the_total():
+    tables = SeatTables()
+    session_id = tables.add_session(capacity=40, booked_seats=6)
+    repository = MariaDBEventRepository(TablePool(tables))
+
+    assert repository.shard_seats(session_id, 4)
+    assert not repository.shard_seats(session_id, 4)
+    assert total_booked(tables, session_id) == 6
+
+    assert repository.reserve_seats(session_id, 3) == 9
+    assert tables.sessions[session_id]['booked_seats'] == 6
+    assert repository.release_seats(session_id, 5) == 4
+    assert total_booked(tables, session_id) == 4
+
+def test_reservation_overflows_when_its_shard_is_full():
+    tables = SeatTables()
+    session_id = tables.add_session(capacity=20)
+    repository = MariaDBEventRepository(TablePool(tables))
+    repository.shard_seats(session_id, 4)
+
+    # No single shard holds 7 seats, together they do
+    assert repository.reserve_seats(session_id, 7) == 7
+    assert LOCK_SHARDS_SQL in tables.executed
+    assert repository.reserve_seats(session_id, 13) == 20
+    assert repository.reserve_seats(session_id, 1) is None
+    assert all(row['booked_seats'] == row['capacity'] for _, row in tables.shards_of(session_id))
+
+def test_session_sharded_by_another_process_is_picked_up():
+    tables = SeatTables()
+    session_id = tables.add_session(capacity=10)
+    repository = MariaDBEventRepository(TablePool(tables))
+    assert repository.reserve_seats(session_id, 2) == 2
+
+    # Split behind this process's back: its cached mode still says unsharded
+    other = MariaDBEventRepository(TablePool(tables))
+    for row in shard_rows(session_id, 10, 2, 2):
+        tables.shards[(row[0], row[1])] = {'capacity': row[2], 'booked_seats': row[3]}
+    tables.sessions[session_id]['seat_shards'] = 2
+
+    assert repository.reserve_seats(session_id, 1) == 3
+    assert tables.sessions[session_id]['booked_seats'] == 2
+    assert other.release_seats(session_id, 3) == 0
+
+def test_unknown_session_and_bad_shard_count():
+    repository = MariaDBEventRepository(TablePool(SeatTables()))
+    assert repository.reserve_seats(uuid4(), 1) is None
+    assert not repository.shard_seats(uuid4(), 2)
+    with pytest.raises(ValueError):
+        repository.shard_seats(uuid4(), 0)
@@ -0,0 +1,177 @@
+import asyncio
+from contextlib import asynccontextmanager, nullcontext
+from uuid import uuid4
+
+import pytest
+
+from event_booking.domain.entities.booking import BookingStatus
+from event_booking.domain.repositories.unit_of_work import AsyncUnitOfWork
+from event_booking.domain.services.async_booking_service import AsyncBookingService
+from event_booking.domain.services.booking_service import BookingError, InsufficientSeatsError
+from event_booking.domain.services.session_writers import SessionWriters
+from seat_repository_fakes import AsyncSeatRepository
+
+class WriterUnitOfWork(AsyncUnitOfWork):
+    def __init__(self):
+        self.active = False
+
+    @asynccontextmanager
+    async def transaction(self):
+        self.active = True
+        try:
+            yield
+        finally:
+            self.active = False
+
+class BookingTable:
+    def __init__(self, fail=False, unit_of_work=None):
+        self.bookings = {}
+        self.fail = fail
+        # With a unit of work, reads outside it come from a replica that has not seen any booking
+        self.unit_of_work = unit_of_work
+
+    async def save_all(self, bookings):
+        await asyncio.sleep(0)
+        if self.fail:
+            raise ConnectionError("lost connection")
+        for booking in bookings:
+            self.bookings[booking.id] = booking
+        return bookings
+
+    async def find_by_id(self, booking_id):
+        if self.unit_of_work is not None and not self.unit_of_work.active:
+            return None
+        return self.bookings.get(booking_id)
+
+    async def update(self, booking, expected_status=None):
+        return booking
+
+class ReplayingUnitOfWork(AsyncUnitOfWork):
+    """Rolls the first attempt back, as after a deadlock, and replays it."""
+
+    def __init__(self, table):
+        self.table = table
+        self.attempts = 0
+
+    def transaction(self):
+        return nullcontext()
+
+    async def run(self, work):
+        booked = {session_id: session.booked_seats for session_id, session in self.table.sessions.items()}
+        self.attempts += 1
+        await work()
+        for session_id, seats in booked.items():
+            self.table.sessions[session_id].booked_seats = seats
+        self.attempts += 1
+        return await work()
+
+def make_writers(*capacities, fail=False, unit_of_work=None, **options):
+    table = AsyncSeatRepository(*capacities)
+    service = AsyncBookingService(BookingTable(fail, unit_of_work), table, unit_of_work)
+    writers = SessionWriters(service, **options)
+    return writers, table, list(table.sessions)
+
+async def book_all(writers, session_id, seats):
+    return await asyncio.gather(*(writers.create_booking(uuid4(), session_id, count) for count in seats),
+                                return_exceptions=True)
+
+def test_bookings_of_a_session_never_overlap():
+    writers, table, (session_id,) = make_writers(100, max_batch_size=4)
+
+    bookings = asyncio.run(book_all(writers, session_id, [1] * 10))
+
+    assert [booking.seats for booking in bookings] == [1] * 10
+    assert table.max_per_session == 1
+    # Queued bookings share transactions of up to 4
+    assert table.updates == writers.stats()['transactions'] == 3
+    assert table.sessions[session_id].booked_seats == 10
+
+def test_sessions_are_written_in_parallel():
+    writers, table, (first, second) = make_writers(10, 10)
+
+    async def run():
+        return await asyncio.gather(book_all(writers, first, [1]), book_all(writers, second, [1]))
+
+    asyncio.run(run())
+    assert table.max_overall == 2
+
+def test_sold_out_session_is_rejected_from_memory():
+    writers, table, (session_id,) = make_writers(3)
+
+    async def run():
+        await book_all(writers, session_id, [3])
+        updates, lookups = table.updates, table.lookups
+        with pytest.raises(InsufficientSeatsError):
+            await writers.create_booking(uuid4(), session_id, 1)
+        return updates, lookups
+
+    updates, lookups = asyncio.run(run())
+    assert (table.updates, table.lookups) == (updates, lookups)
+    assert writers.stats()['rejected_from_memory'] == 1
+
+def test_cancellation_returns_seats_to_memory():
+    writers, table, (session_id,) = make_writers(2)
+
+    async def run():
+        (booking,) = await book_all(writers, session_id, [2])
+        await writers.confirm_booking(booking.id)
+        cancelled = await writers.cancel_booking(booking.id)
+        rebooked = await writers.create_booking(uuid4(), session_id, 2)
+        return cancelled, rebooked
+
+    cancelled, rebooked = asyncio.run(run())
+    assert cancelled.status == BookingStatus.CANCELLED
+    assert rebooked.seats == 2
+    # Loaded once; every later write kept memory in step
+    assert writers.stats()['reloads'] == 1
+
+def test_booking_lookup_reads_from_the_writer():
+    writers, _, (session_id,) = make_writers(2, unit_of_work=WriterUnitOfWork())
+
+    async def run():
+        (booking,) = await book_all(writers, session_id, [1])
+        return await writers.confirm_booking(booking.id)
+
+    assert asyncio.run(run()).status == BookingStatus.CONFIRMED
+
+def test_replayed_transaction_is_screened_against_committed_counts():
+    table = AsyncSeatRepository(3)
+    (session_id,) = table.sessions
+    unit_of_work = ReplayingUnitOfWork(table)
+    writers = SessionWriters(AsyncBookingService(BookingTable(), table, unit_of_work))
+
+    async def run():
+        # Load the session into memory first
+        await writers.create_booking(uuid4(), session_id, 1)
+        return await writers.create_booking(uuid4(), session_id, 2)
+
+    assert asyncio.run(run()).seats == 2
+    assert unit_of_work.attempts == 4
+    assert writers._lanes[session_id].session.booked_seats == table.sessions[session_id].booked_seats == 3
+
+def test_unknown_booking_is_not_queued():
+    writers, _, _ = make_writers(2)
+    with pytest.raises(BookingError):
+        asyncio.run(writers.confirm_booking(uuid4()))
+    assert writers.stats()['sessions'] == 0
+
+def test_failed_write_reloads_the_session():
+    writers, table, (session_id,) = make_writers(10, fail=True)
+
+    results = asyncio.run(book_all(writers, session_id, [2]))
+
+    assert isinstance(results[0], ConnectionError)
+    # The seat update went through in this fake, the insert did not: memory is dropped
+    assert writers._lanes[session_id].session is None
+
+def test_stale_memory_is_reloaded_before_rejecting():
+    writers, table, (session_id,) = make_writers(2, state_ttl=0.0)
+
+    async def run():
+        await book_all(writers, session_id, [2])
+        # Another process frees the seats
+        table.sessions[session_id].release_seats(2)
+        return await writers.create_booking(uuid4(), session_id, 2)
+
+    assert asyncio.run(run()).seats == 2
+    assert writers.stats()['rejected_from_memory'] == 0
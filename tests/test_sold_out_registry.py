@@ -0,0 +1,177 @@
+import asyncio
+from contextlib import contextmanager
+from uuid import uuid4
+
+import pytest
+
+from event_booking.domain.entities.booking import BookingStatus
+from event_booking.domain.repositories.unit_of_work import UnitOfWork
+from event_booking.domain.services.async_booking_service import AsyncBookingService
+from event_booking.domain.services.booking_service import (
+    BatchBookingError, BatchMode, BookingRequest, BookingService, InsufficientSeatsError
+)
+from event_booking.domain.services.sold_out_registry import SoldOutRegistry
+from seat_repository_fakes import AsyncSeatRepository, SeatRepository
+
+class Bookings:
+    def __init__(self):
+        self.bookings = {}
+        self.fail = False
+
+    def save(self, booking):
+        if self.fail:
+            raise ConnectionError("lost connection")
+        self.bookings[booking.id] = booking
+        return booking
+
+    def save_all(self, bookings):
+        for booking in bookings:
+            self.save(booking)
+        return bookings
+
+    def find_by_id(self, booking_id):
+        return self.bookings.get(booking_id)
+
+    def update(self, booking, expected_status=None):
+        return booking
+
+class SeatUnitOfWork(UnitOfWork):
+    """Rolls seat counts back on failure and notes what the registry knew at commit."""
+
+    def __init__(self, sessions, registry):
+        self.sessions = sessions
+        self.registry = registry
+        self.sold_out_at_commit = None
+
+    @contextmanager
+    def transaction(self):
+        booked = self.sessions.session.booked_seats
+        try:
+            yield
+        except BaseException:
+            self.sessions.session.booked_seats = booked
+            raise
+        self.sold_out_at_commit = self.registry.stats()['sold_out_sessions']
+
+def make_service(capacity, **options):
+    sessions = SeatRepository(capacity)
+    return BookingService(Bookings(), sessions, sold_out=SoldOutRegistry(**options)), sessions
+
+def make_transactional_service(capacity):
+    sessions = SeatRepository(capacity)
+    registry = SoldOutRegistry()
+    unit_of_work = SeatUnitOfWork(sessions, registry)
+    return BookingService(Bookings(), sessions, unit_of_work, sold_out=registry), sessions, unit_of_work
+
+def test_registry_rejects_only_what_cannot_fit():
+    registry = SoldOutRegistry()
+    session_id = uuid4()
+    registry.record(session_id, 2)
+
+    assert not registry.rejects(session_id, 2)
+    assert registry.rejects(session_id, 3)
+    assert not registry.rejects(uuid4(), 100)
+    assert registry.stats()['rejected'] == 1 and registry.stats()['rejected_seats'] == 3
+
+def test_entries_expire_and_are_bounded():
+    registry = SoldOutRegistry(ttl=0.0, max_entries=2)
+    first = uuid4()
+    registry.record(first, 0)
+    assert not registry.rejects(first, 1)
+
+    registry = SoldOutRegistry(max_entries=2)
+    sessions = [uuid4() for _ in range(3)]
+    for session_id in sessions:
+        registry.record(session_id, 0)
+    assert not registry.rejects(sessions[0], 1)
+    assert registry.stats()['sold_out_sessions'] == 2
+
+def test_sold_out_session_is_refused_without_a_query():
+    service, sessions = make_service(2)
+    session_id = sessions.session.id
+    service.create_booking(uuid4(), session_id, 2)
+    queries = sessions.queries
+
+    with pytest.raises(InsufficientSeatsError):
+        service.create_booking(uuid4(), session_id, 1)
+    assert sessions.queries == queries
+    assert service.sold_out.stats()['rejected'] == 1
+
+def test_failed_request_teaches_the_registry():
+    service, sessions = make_service(5)
+    session_id = sessions.session.id
+    sessions.session.booked_seats = 4  # booked by another process
+
+    with pytest.raises(InsufficientSeatsError):
+        service.create_booking(uuid4(), session_id, 3)
+    with pytest.raises(InsufficientSeatsError):
+        service.create_booking(uuid4(), session_id, 2)
+    assert service.sold_out.stats()['rejected'] == 1
+    # The one seat left is still bookable
+    assert service.create_booking(uuid4(), session_id, 1).seats == 1
+
+def test_counts_are_recorded_once_the_transaction_commits():
+    service, sessions, unit_of_work = make_transactional_service(2)
+
+    service.create_booking(uuid4(), sessions.session.id, 2)
+
+    assert unit_of_work.sold_out_at_commit == 0
+    assert service.sold_out.stats()['sold_out_sessions'] == 1
+
+def test_rolled_back_reservation_is_forgotten():
+    service, sessions, _ = make_transactional_service(2)
+    session_id = sessions.session.id
+    service.create_booking(uuid4(), session_id, 1)
+    service.booking_repository.fail = True
+
+    with pytest.raises(ConnectionError):
+        service.create_booking(uuid4(), session_id, 1)
+
+    # The rolled back seat is free again and not refused from memory
+    assert not service.sold_out.rejects(session_id, 1)
+    service.booking_repository.fail = False
+    assert service.create_booking(uuid4(), session_id, 1).seats == 1
+
+def test_cancellation_clears_the_entry_at_once():
+    service, sessions = make_service(2)
+    session_id = sessions.session.id
+    booking = service.create_booking(uuid4(), session_id, 2)
+    booking.status = BookingStatus.CONFIRMED
+
+    service.cancel_booking(booking.id)
+
+    assert service.create_booking(uuid4(), session_id, 2).seats == 2
+
+def test_batches_skip_requests_known_not_to_fit():
+    service, sessions = make_service(3)
+    session_id = sessions.session.id
+    service.create_booking(uuid4(), session_id, 3)
+    queries = sessions.queries
+
+    results = service.create_bookings([BookingRequest(uuid4(), session_id, 1)], BatchMode.BEST_EFFORT)
+    assert isinstance(results[0].error, InsufficientSeatsError)
+    assert sessions.queries == queries
+
+    with pytest.raises(BatchBookingError):
+        service.create_bookings([BookingRequest(uuid4(), session_id, 1)])
+    assert sessions.queries == queries
+
+def test_async_service_shares_the_fast_path():
+    sessions = AsyncSeatRepository(1)
+    registry = SoldOutRegistry()
+
+    class AsyncBookings(Bookings):
+        async def save(self, booking):
+            return super().save(booking)
+
+    service = AsyncBookingService(AsyncBookings(), sessions, sold_out=registry)
+
+    async def run():
+        await service.create_booking(uuid4(), sessions.session.id, 1)
+        queries = sessions.queries
+        with pytest.raises(InsufficientSeatsError):
+            await service.create_booking(uuid4(), sessions.session.id, 1)
+        return queries
+
+    assert asyncio.run(run()) == sessions.queries
+    assert registry.stats()['rejected'] == 1
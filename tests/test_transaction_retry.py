@@ -0,0 +1,99 @@
+import pymysql
+import pytest
+
+from event_booking.infrastructure.persistence.connection_pool import DatabaseConnectionPool
+from event_booking.infrastructure.persistence.mariadb_unit_of_work import MariaDBUnitOfWork
+from event_booking.infrastructure.persistence.retry import RetryPolicy
+
+def deadlock():
+    return pymysql.err.OperationalError(1213, "Deadlock found when trying to get lock; try restarting transaction")
+
+class FakeConnection:
+    def __init__(self):
+        self.open = True
+        self.commits = 0
+        self.rollbacks = 0
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.open = False
+
+class FakeConnectionPool(DatabaseConnectionPool):
+    def __init__(self):
+        super().__init__("localhost", 3306, "user", "password", "db", min_size=0, maintenance_interval=0)
+
+    def _create_connection(self):
+        self.connection = FakeConnection()
+        return self.connection
+
+class FlakyWork:
+    """Fails with the given errors in turn, then succeeds."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "done"
+
+def make_unit_of_work(**policy):
+    policy.setdefault('base_delay', 0)
+    return MariaDBUnitOfWork(FakeConnectionPool(), RetryPolicy(**policy))
+
+def test_deadlocked_transaction_is_rolled_back_and_replayed():
+    unit_of_work = make_unit_of_work()
+    work = FlakyWork(deadlock(), pymysql.err.OperationalError(1205, "Lock wait timeout exceeded"))
+
+    assert unit_of_work.run(work) == "done"
+    assert work.calls == 3
+    connection = unit_of_work.connection_pool.connection
+    assert (connection.rollbacks, connection.commits) == (2, 1)
+    stats = unit_of_work.retry_policy.stats()
+    assert (stats['committed'], stats['retries'], stats['recovered']) == (1, 2, 1)
+    assert stats['errors'] == {1213: 1, 1205: 1}
+
+def test_other_errors_are_not_replayed():
+    unit_of_work = make_unit_of_work()
+    work = FlakyWork(pymysql.err.OperationalError(1062, "Duplicate entry"))
+
+    with pytest.raises(pymysql.err.OperationalError):
+        unit_of_work.run(work)
+    assert work.calls == 1
+    assert unit_of_work.retry_policy.stats()['retries'] == 0
+
+def test_gives_up_after_max_attempts():
+    unit_of_work = make_unit_of_work(max_attempts=3)
+    work = FlakyWork(deadlock(), deadlock(), deadlock(), deadlock())
+
+    with pytest.raises(pymysql.err.OperationalError):
+        unit_of_work.run(work)
+    assert work.calls == 3
+    assert unit_of_work.retry_policy.stats()['exhausted'] == 1
+
+def test_gives_up_at_the_deadline():
+    unit_of_work = make_unit_of_work(base_delay=1.0, max_delay=1.0, deadline=0.0)
+    work = FlakyWork(deadlock())
+
+    with pytest.raises(pymysql.err.OperationalError):
+        unit_of_work.run(work)
+    assert work.calls == 1
+
+def test_nested_run_leaves_retries_to_the_outer_transaction():
+    unit_of_work = make_unit_of_work()
+    inner = FlakyWork(deadlock())
+
+    def outer():
+        return unit_of_work.run(inner)
+
+    assert unit_of_work.run(outer) == "done"
+    # The conflict aborted the whole transaction, so the outer run replayed it
+    assert inner.calls == 2
+    assert unit_of_work.retry_policy.stats()['retries'] == 1
@@ -0,0 +1,173 @@
+import time
+from uuid import uuid4
+
+import pytest
+
+from event_booking.domain.services import waiting_room
+from event_booking.domain.services.waiting_room import AdmissionError, AdmissionTokens, WaitingRoom, WaitingRooms
+from event_booking.infrastructure.persistence import waiting_room_store
+from event_booking.infrastructure.persistence.waiting_room_store import SQLiteWaitingRoomStore
+
+class Clock:
+    """Stands in for the time module so admission can be stepped through."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(waiting_room, 'time', clock)
+    monkeypatch.setattr(waiting_room_store, 'time', clock)
+    return clock
+
+def test_tokens_are_verified_by_signature_kind_and_expiry():
+    tokens = AdmissionTokens(b"secret")
+    room_id = uuid4()
+    token = tokens.issue('admit', room_id, 'g1', 7, time.time() + 60)
+
+    assert tokens.verify(token, 'admit')[:3] == (room_id, 'g1', 7)
+    assert tokens.verify(token, 'queue') is None
+    assert AdmissionTokens(b"other").verify(token, 'admit') is None
+    assert tokens.verify(token, 'admit', now=time.time() + 120) is None
+    signature = token.split('.')[1]
+    forged = tokens.issue('admit', room_id, 'g1', 8, time.time() + 60).split('.')[0]
+    assert tokens.verify(f"{forged}.{signature}", 'admit') is None
+    assert tokens.verify("garbage", 'admit') is None
+
+def test_room_admits_a_burst_then_at_its_rate(clock):
+    room = WaitingRoom(uuid4(), [], rate=2.0, burst=3)
+    numbers = [room.join() for _ in range(10)]
+
+    assert [room.position(n) for n in numbers[:4]] == [0, 0, 0, 1]
+    clock.now += 1.0
+    assert room.admitted_upto == 5
+    assert room.estimated_wait(numbers[-1]) == 2.5
+
+def test_idle_room_does_not_bank_admissions(clock):
+    room = WaitingRoom(uuid4(), [], rate=10.0, burst=2)
+    clock.now += 3600
+    numbers = [room.join() for _ in range(5)]
+
+    # Only the burst goes straight in after an hour with nobody waiting
+    assert [room.position(n) for n in numbers] == [0, 0, 1, 2, 3]
+
+def test_paused_room_has_no_estimate(clock):
+    room = WaitingRoom(uuid4(), [], rate=0.0)
+    number = room.join()
+    clock.now += 60
+    assert room.position(number) == 1 and room.estimated_wait(number) is None
+
+def make_rooms(clock, **options):
+    rooms = WaitingRooms(AdmissionTokens(b"secret"), **options)
+    session_ids = [uuid4(), uuid4()]
+    event_id = uuid4()
+    rooms.open(event_id, session_ids, rate=1.0)
+    return rooms, event_id, session_ids
+
+def test_visitor_is_admitted_when_their_turn_comes(clock):
+    rooms, event_id, (session_id, _) = make_rooms(clock)
+    first, second = rooms.join(event_id), rooms.join(event_id)
+
+    assert first['position'] == 1 and first['admission_token'] is None
+    clock.now += 1.0
+    admitted = rooms.status(first['ticket'])
+    assert admitted['position'] == 0 and admitted['admission_token']
+    assert rooms.status(second['ticket'])['position'] == 1
+
+    assert rooms.admit(admitted['admission_token'], [session_id]) == (event_id, 1)
+    assert rooms.stats()['rooms'][0]['waiting'] == 1
+
+def test_each_place_books_once_even_with_a_fresh_token(clock):
+    rooms, event_id, (session_id, other_session) = make_rooms(clock)
+    ticket = rooms.join(event_id)['ticket']
+    clock.now += 1.0
+    rooms.admit(rooms.status(ticket)['admission_token'], [session_id])
+
+    with pytest.raises(AdmissionError):
+        rooms.admit(rooms.status(ticket)['admission_token'], [other_session])
+    assert rooms.stats()['bookings_refused'] == 1
+
+def test_released_place_can_book_again(clock):
+    rooms, event_id, (session_id, _) = make_rooms(clock)
+    ticket = rooms.join(event_id)['ticket']
+    clock.now += 1.0
+    token = rooms.status(ticket)['admission_token']
+
+    rooms.release(rooms.admit(token, [session_id]))
+    assert rooms.admit(token, [session_id]) == (event_id, 1)
+
+def test_protected_sessions_need_a_token_for_their_own_room(clock):
+    rooms, event_id, (session_id, _) = make_rooms(clock)
+    other_room = uuid4()
+    rooms.open(other_room, [uuid4()], rate=0.0, burst=1)
+    foreign = rooms.join(other_room)['admission_token']
+
+    with pytest.raises(AdmissionError):
+        rooms.admit(None, [session_id])
+    with pytest.raises(AdmissionError):
+        rooms.admit(foreign, [session_id])
+    assert rooms.admit(None, [uuid4()]) is None
+
+def test_closing_a_room_unprotects_its_sessions(clock):
+    rooms, event_id, (session_id, _) = make_rooms(clock)
+    assert rooms.close(event_id)
+    assert not rooms.is_protected(session_id)
+    assert rooms.join(event_id) is None
+    assert not rooms.close(event_id)
+
+@pytest.mark.parametrize('reopen_with', ['memory', 'sqlite'])
+def test_tokens_of_a_closed_room_do_not_count_once_it_reopens(clock, tmp_path, reopen_with):
+    if reopen_with == 'memory':
+        rooms, event_id, (session_id, _) = make_rooms(clock)
+    else:
+        rooms, event_id, session_id = sqlite_rooms(tmp_path / "rooms.db"), uuid4(), uuid4()
+        rooms.open(event_id, [session_id], rate=1.0)
+    old = rooms.join(event_id)
+    clock.now += 1.0
+    token = rooms.status(old['ticket'])['admission_token']
+    rooms.admit(token, [session_id])
+
+    rooms.close(event_id)
+    rooms.open(event_id, [session_id], rate=0.0)
+    assert rooms.status(old['ticket']) is None
+    with pytest.raises(AdmissionError):
+        rooms.admit(token, [session_id])
+    assert rooms.join(event_id)['position'] == 1
+
+def sqlite_rooms(path):
+    return WaitingRooms(AdmissionTokens(b"secret"), store=SQLiteWaitingRoomStore(str(path)))
+
+def test_workers_sharing_a_file_share_the_queue(clock, tmp_path):
+    first, second = sqlite_rooms(tmp_path / "rooms.db"), sqlite_rooms(tmp_path / "rooms.db")
+    event_id, session_id = uuid4(), uuid4()
+    first.open(event_id, [session_id], rate=1.0)
+
+    tickets = [first.join(event_id)['ticket'], second.join(event_id)['ticket']]
+    assert [second.status(ticket)['position'] for ticket in tickets] == [1, 2]
+    clock.now += 1.0
+    token = second.status(tickets[0])['admission_token']
+
+    assert first.admit(token, [session_id]) == (event_id, 1)
+    with pytest.raises(AdmissionError):
+        second.admit(token, [session_id])
+    second.release((event_id, 1))
+    assert first.admit(token, [session_id]) == (event_id, 1)
+
+def test_rooms_survive_a_restart(clock, tmp_path):
+    rooms = sqlite_rooms(tmp_path / "rooms.db")
+    event_id, session_id = uuid4(), uuid4()
+    rooms.open(event_id, [session_id], rate=1.0, burst=1)
+    token = rooms.join(event_id)['admission_token']
+    rooms.admit(token, [session_id])
+    rooms.store.disconnect()
+
+    restarted = sqlite_rooms(tmp_path / "rooms.db")
+    assert restarted.is_protected(session_id)
+    assert restarted.join(event_id)['position'] == 1
+    with pytest.raises(AdmissionError):
+        restarted.admit(token, [session_id])
+    assert restarted.close(event_id) and not restarted.is_protected(session_id)